@@ -0,0 +1,28 @@
+"""
+genai-bench 스크립트 공통 유틸리티
+"""
+
+import math
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def load_lambda_module_path(variant):
+    """지정한 리전 변형(terraform / terraform-seoul)의 Lambda 코드 경로를 import 경로에 추가"""
+    lambda_dir = os.path.join(REPO_ROOT, variant, 'layers', '06-lambda-genai')
+    if not os.path.isdir(lambda_dir):
+        raise SystemExit(f"Lambda 디렉토리를 찾을 수 없습니다: {lambda_dir}")
+    if lambda_dir not in sys.path:
+        sys.path.insert(0, lambda_dir)
+    return lambda_dir
+
+
+def percentile(values, pct):
+    """nearest-rank 방식 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+RDS Data API 결과 디코더 마이크로 벤치마크
+합성 execute_statement 응답(기본 20,000행)을 기존 셀 단위 if/elif 파싱과
+rds_decoder.py 의 컬럼 구성별 컴파일 변환(dict / tuple / columns, JSON formattedRecords)으로 디코딩해서 행당 비용 비교
+
+사용법:
+    python3 scripts/genai-bench/decoder_bench.py [--variant terraform-seoul] [--rows 20000] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from bench_common import load_lambda_module_path
+
+COLUMN_METADATA = [
+    {'name': 'id', 'typeName': 'INT UNSIGNED'},
+    {'name': 'first_name', 'typeName': 'VARCHAR'},
+    {'name': 'last_name', 'typeName': 'VARCHAR'},
+    {'name': 'pet_name', 'typeName': 'VARCHAR'},
+    {'name': 'visit_date', 'typeName': 'DATE'},
+    {'name': 'weight', 'typeName': 'DOUBLE'},
+    {'name': 'description', 'typeName': 'VARCHAR'},
+]
+
+
+def build_response(rows, seed=7):
+    """typed records 응답과 같은 내용의 JSON formattedRecords 응답 생성"""
+    rng = random.Random(seed)
+    names = ['George', 'Betty', 'Eduardo', 'Harold', 'Peter', 'Jean', 'Jeff', 'Maria', 'David', 'Carlos']
+    pets = ['Leo', 'Basil', 'Rosy', 'Jewel', 'Iggy', 'George', 'Samantha', 'Max', 'Lucky', 'Mulligan']
+    records = []
+    json_rows = []
+    for i in range(rows):
+        description = rng.choice(['rabies shot', 'neutered', 'spayed', None])
+        row = {
+            'id': i + 1,
+            'first_name': rng.choice(names),
+            'last_name': rng.choice(names) + 'son',
+            'pet_name': rng.choice(pets),
+            'visit_date': f"20{rng.randint(10, 24):02d}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'weight': round(rng.uniform(0.5, 40.0), 2),
+            'description': description,
+        }
+        json_rows.append(row)
+        records.append([
+            {'longValue': row['id']},
+            {'stringValue': row['first_name']},
+            {'stringValue': row['last_name']},
+            {'stringValue': row['pet_name']},
+            {'stringValue': row['visit_date']},
+            {'doubleValue': row['weight']},
+            {'stringValue': description} if description is not None else {'isNull': True},
+        ])
+    typed = {'columnMetadata': COLUMN_METADATA, 'records': records}
+    formatted = {'columnMetadata': COLUMN_METADATA, 'formattedRecords': json.dumps(json_rows)}
+    return typed, formatted
+
+
+def legacy_decode(response):
+    """기존 execute_sql 파싱 (셀마다 필드 존재 여부를 순서대로 확인)"""
+    column_names = [col['name'] for col in response.get('columnMetadata', [])]
+    results = []
+    for record in response['records']:
+        row = {}
+        for i, value in enumerate(record):
+            column_name = column_names[i] if i < len(column_names) else f'col_{i}'
+            if 'stringValue' in value:
+                row[column_name] = value['stringValue']
+            elif 'longValue' in value:
+                row[column_name] = value['longValue']
+            elif 'doubleValue' in value:
+                row[column_name] = value['doubleValue']
+            elif 'booleanValue' in value:
+                row[column_name] = value['booleanValue']
+            elif 'isNull' in value and value['isNull']:
+                row[column_name] = None
+            else:
+                row[column_name] = str(value)
+        results.append(row)
+    return results
+
+
+def measure(fn, repeat):
+    """repeat 회 실행 중 가장 빠른 시간 (ms)"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RDS Data API 결과 디코더 벤치마크')
+    parser.add_argument('--variant', default='terraform-seoul', choices=['terraform', 'terraform-seoul'])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    load_lambda_module_path(args.variant)
+    from rds_decoder import decode_response
+
+    typed, formatted = build_response(args.rows)
+
+    # 결과가 기존 파싱과 같은지 먼저 확인
+    expected = legacy_decode(typed)
+    if decode_response(typed, 'dict') != expected or decode_response(formatted, 'dict') != expected:
+        print("디코딩 결과가 기존 파싱 결과와 다릅니다")
+        return 1
+
+    cases = [
+        ('기존 셀 단위 파싱 (dict)', lambda: legacy_decode(typed)),
+        ('컴파일 변환 (dict)', lambda: decode_response(typed, 'dict')),
+        ('컴파일 변환 (tuple)', lambda: decode_response(typed, 'tuple')),
+        ('컴파일 변환 (columns)', lambda: decode_response(typed, 'columns')),
+        ('JSON formattedRecords (dict)', lambda: decode_response(formatted, 'dict')),
+        ('JSON formattedRecords (columns)', lambda: decode_response(formatted, 'columns')),
+    ]
+
+    typed_bytes = len(json.dumps(typed['records']))
+    json_bytes = len(formatted['formattedRecords'])
+    print(f"{args.rows:,}행 x {len(COLUMN_METADATA)}컬럼, {args.repeat}회 중 최솟값")
+    print(f"응답 크기: typed records {typed_bytes / 1024:,.0f}KB / JSON formattedRecords {json_bytes / 1024:,.0f}KB")
+    baseline = None
+    for label, fn in cases:
+        elapsed_ms = measure(fn, args.repeat)
+        per_row_us = elapsed_ms * 1000 / args.rows
+        baseline = baseline or per_row_us
+        print(f"  {label:<34} {elapsed_ms:8.1f}ms  {per_row_us:6.2f}us/행  x{baseline / per_row_us:.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
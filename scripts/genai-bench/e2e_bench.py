@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+GenAI Lambda 오프라인 종단 간 벤치마크
+가짜 bedrock-runtime(모델 계열별 지연 주입) + petclinic_mysql.sql 을 적재한 SQLite 기반 가짜 rds-data 로
+lambda_handler 에 질문 코퍼스를 재생하고 단계별 p50/p95/p99, 요청당 호출 수, 요청당 메모리 할당량 측정
+
+사용법:
+    python3 scripts/genai-bench/e2e_bench.py [--variant terraform-seoul] [--repeat 3] [--latency-scale 0.1]
+        [--env GENAI_PIPELINE_MODE=planner] [--json-out result.json] [--baseline previous.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+from bench_common import load_lambda_module_path, percentile
+from fake_aws import FakeBedrockRuntime, FakeRdsData, install_fake_boto3
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'e2e_corpus.jsonl')
+
+# (단계 이름, lambda_function 함수 이름) - 모듈 전역 함수를 감싸서 단계별 시간 측정
+STAGES = [
+    ('classify', 'analyze_question'),
+    ('classify_bedrock', 'classify_question_with_bedrock'),
+    ('sql_generate', 'generate_sql_from_question'),
+    ('sql_execute', 'fetch_question_rows'),
+    ('answer', 'call_bedrock_ai'),
+]
+
+DEFAULT_SQL = "SELECT o.first_name, o.last_name FROM owners o LIMIT 20"
+
+# 분류 / SQL 생성 / 플래너 프롬프트 끝의 질문 (프롬프트 예시의 '질문: "..."' 와 구분)
+_PROMPT_QUESTION = re.compile(r'사용자 질문: "(.*)"\s*$', re.MULTILINE)
+
+
+def normalize(question):
+    return re.sub(r'\s+', ' ', question.strip().strip('"')).lower()
+
+
+class ScriptedResponder:
+    """코퍼스 정답(type / sql)으로 분류, SQL 생성, 플래너, 최종 답변 응답 생성"""
+
+    def __init__(self, corpus):
+        self.by_question = {normalize(item['question']): item for item in corpus}
+
+    def _lookup(self, prompt):
+        matches = _PROMPT_QUESTION.findall(prompt)
+        return (self.by_question.get(normalize(matches[-1])) if matches else None) or {}
+
+    @staticmethod
+    def stage(prompt):
+        """프롬프트 → 파이프라인 단계 (plan / classify / sql / answer)"""
+        if 'DATABASE_QUERY이면 실행할 SQL 쿼리까지' in prompt:
+            return 'plan'
+        if '어떤 유형인지 판단해주세요' in prompt:
+            return 'classify'
+        if 'SQL 쿼리를 생성해주세요' in prompt:
+            return 'sql'
+        return 'answer'
+
+    def __call__(self, prompt, model_id):
+        stage = self.stage(prompt)
+        if stage == 'plan':
+            item = self._lookup(prompt)
+            question_type = item.get('type', 'GENERAL_ADVICE')
+            return json.dumps({
+                'type': question_type, 'reason': 'bench', 'database': 'petclinic',
+                'sql': item.get('sql', DEFAULT_SQL) if question_type == 'DATABASE_QUERY' else '',
+                'description': 'bench'
+            }, ensure_ascii=False)
+        if stage == 'classify':
+            item = self._lookup(prompt)
+            return json.dumps({'type': item.get('type', 'GENERAL_ADVICE'), 'reason': 'bench'}, ensure_ascii=False)
+        if stage == 'sql':
+            item = self._lookup(prompt)
+            return json.dumps({'database': 'petclinic', 'sql': item.get('sql', DEFAULT_SQL),
+                               'description': 'bench'}, ensure_ascii=False)
+        # 최종 답변: 길이가 일정한 한국어 문장
+        return '조회 결과를 바탕으로 답변드립니다. ' * 6
+
+
+class StageRecorder:
+    """요청 단위 단계별 소요 시간 수집 (추측 실행 등 다른 스레드 호출도 현재 요청에 기록)"""
+
+    def __init__(self):
+        self.current = None
+        self._lock = threading.Lock()
+
+    def wrap(self, stage, fn):
+        def _wrapped(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                with self._lock:
+                    if self.current is not None:
+                        self.current[stage] = self.current.get(stage, 0.0) + elapsed_ms
+        return _wrapped
+
+
+class BenchContext:
+    # 요청 시작 시점의 남은 실행 시간 (--timeout-ms, STAGE_DEADLINES_ENABLED 의 요청 기한 기준)
+    remaining_ms = 900000
+
+    def __init__(self, request_id):
+        self.aws_request_id = request_id
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+def load_corpus(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(values):
+    return {
+        'count': len(values),
+        'p50': round(percentile(values, 50), 2),
+        'p95': round(percentile(values, 95), 2),
+        'p99': round(percentile(values, 99), 2),
+        'mean': round(sum(values) / len(values), 2) if values else 0.0,
+        'max': round(max(values), 2) if values else 0.0,
+    }
+
+
+def usage_delta(before, after):
+    """측정 구간의 단계 / 모델 ID별 Bedrock 호출 수와 토큰 수 (FakeBedrockRuntime.usage_snapshot 차이)"""
+    delta = {}
+    for stage, models in after.items():
+        for model_id, values in models.items():
+            previous = before.get(stage, {}).get(model_id, {})
+            delta.setdefault(stage, {})[model_id] = {key: value - previous.get(key, 0) for key, value in values.items()}
+    return delta
+
+
+def invoke(lf, question, request_id):
+    event = {'httpMethod': 'POST', 'path': '/genai', 'body': json.dumps({'question': question}, ensure_ascii=False)}
+    response = lf.lambda_handler(event, BenchContext(request_id))
+    if response.get('statusCode') != 200:
+        raise RuntimeError(f"lambda_handler 오류 응답: {response}")
+    return json.loads(response['body'])
+
+
+def run(args):
+    corpus = load_corpus(args.corpus)
+    questions = [item['question'] for item in corpus]
+
+    # lambda_function 은 import 시점에 환경 변수를 읽으므로 먼저 설정
+    os.environ.setdefault('DB_CLUSTER_ARN', 'arn:aws:rds:local:000000000000:cluster:genai-bench')
+    os.environ.setdefault('DB_SECRET_ARN', 'arn:aws:secretsmanager:local:000000000000:secret:genai-bench')
+    if args.model_id:
+        os.environ['BEDROCK_MODEL_ID'] = args.model_id
+    for assignment in args.env:
+        key, _, value = assignment.partition('=')
+        os.environ[key] = value
+
+    bedrock = FakeBedrockRuntime(ScriptedResponder(corpus), latency_scale=args.latency_scale,
+                                 slow_rate=args.bedrock_slow_rate, slow_ms=args.bedrock_slow_ms,
+                                 stage_of=ScriptedResponder.stage)
+    BenchContext.remaining_ms = args.timeout_ms
+    rds = FakeRdsData(latency_ms=args.rds_latency_ms)
+    install_fake_boto3({'bedrock-runtime': bedrock, 'rds-data': rds})
+
+    load_lambda_module_path(args.variant)
+    # 모듈 import = Lambda INIT 단계 (클라이언트 생성, 사전 적재 포함)
+    started = time.perf_counter()
+    import lambda_function as lf
+    import_ms = (time.perf_counter() - started) * 1000
+    init_profile = getattr(lf, 'init_profile', None)
+
+    recorder = StageRecorder()
+    for stage, name in STAGES:
+        setattr(lf, name, recorder.wrap(stage, getattr(lf, name)))
+
+    # 첫 요청(INIT 단계에서 만들지 않은 클라이언트/인덱스 초기화 포함)은 따로 기록
+    started = time.perf_counter()
+    invoke(lf, questions[0], 'bench-cold')
+    cold_ms = (time.perf_counter() - started) * 1000
+
+    # 단계 기한 초과 부분 답변 안내 문구 (STAGE_DEADLINES_ENABLED)
+    partial_notice = getattr(lf, 'PARTIAL_ANSWER_NOTICE', None)
+    usage_before = bedrock.usage_snapshot()
+    samples = []
+    for round_index in range(args.repeat):
+        for position, question in enumerate(questions):
+            bedrock_before, rds_before = bedrock.calls, rds.calls
+            tokens_before = bedrock.input_tokens + bedrock.output_tokens
+            timings = {}
+            recorder.current = timings
+            started = time.perf_counter()
+            body = invoke(lf, question, f'bench-{round_index}-{position}')
+            timings['total'] = (time.perf_counter() - started) * 1000
+            recorder.current = None
+            samples.append({
+                'timings': timings,
+                'bedrock_calls': bedrock.calls - bedrock_before,
+                'rds_calls': rds.calls - rds_before,
+                'tokens': bedrock.input_tokens + bedrock.output_tokens - tokens_before,
+                'cached': bool(body.get('cached')),
+                'partial': bool(partial_notice) and str(body.get('answer', '')).startswith(partial_notice),
+            })
+
+    usage_after = bedrock.usage_snapshot()
+
+    # 메모리 할당량은 tracemalloc 오버헤드가 지연 측정에 섞이지 않도록 별도 1회 재생
+    allocations = []
+    tracemalloc.start()
+    baseline_current, _ = tracemalloc.get_traced_memory()
+    for position, question in enumerate(questions):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        invoke(lf, question, f'bench-alloc-{position}')
+        current, peak = tracemalloc.get_traced_memory()
+        allocations.append({'peak_kb': (peak - before) / 1024, 'retained_kb': (current - before) / 1024})
+    retained_total_kb = (tracemalloc.get_traced_memory()[0] - baseline_current) / 1024
+    tracemalloc.stop()
+
+    stage_names = ['total'] + [stage for stage, _ in STAGES]
+    return {
+        'config': {
+            'variant': args.variant,
+            'model_id': os.getenv('BEDROCK_MODEL_ID', ''),
+            'questions': len(questions),
+            'repeat': args.repeat,
+            'latency_scale': args.latency_scale,
+            'env': args.env,
+            'bedrock_slow_rate': args.bedrock_slow_rate,
+            'bedrock_slow_ms': args.bedrock_slow_ms,
+            'timeout_ms': args.timeout_ms,
+        },
+        'import_ms': round(import_ms, 2),
+        'init_phases': init_profile.get_stats()['phases'] if init_profile else {},
+        'cold_start_ms': round(cold_ms, 2),
+        'stages': {
+            stage: summarize([s['timings'][stage] for s in samples if stage in s['timings']])
+            for stage in stage_names
+        },
+        'calls_per_request': {
+            'bedrock': summarize([s['bedrock_calls'] for s in samples]),
+            'rds_data': summarize([s['rds_calls'] for s in samples]),
+            'tokens': summarize([s['tokens'] for s in samples]),
+        },
+        'cache_hit_rate': round(sum(s['cached'] for s in samples) / len(samples), 4),
+        'partial_answers': sum(s['partial'] for s in samples),
+        'bedrock_slow_calls': bedrock.slow_calls,
+        'bedrock_usage': usage_delta(usage_before, usage_after),
+        'prompt_cache_tokens': {'read': bedrock.cache_read_tokens, 'write': bedrock.cache_write_tokens},
+        'allocations_kb': {
+            'peak_per_request': summarize([a['peak_kb'] for a in allocations]),
+            'retained_per_request': summarize([a['retained_kb'] for a in allocations]),
+            'retained_total': round(retained_total_kb, 1),
+        },
+    }
+
+
+def print_report(result):
+    config = result['config']
+    print(f"{config['variant']} / {config['model_id'] or '기본 모델'} / 질문 {config['questions']}개 x {config['repeat']}회 "
+          f"(지연 배율 {config['latency_scale']})")
+    if config['env']:
+        print(f"환경 변수: {' '.join(config['env'])}")
+    if config.get('bedrock_slow_rate'):
+        print(f"느린 Bedrock 호출: {config['bedrock_slow_rate']:.1%} x +{config['bedrock_slow_ms']:.0f}ms "
+              f"(발생 {result['bedrock_slow_calls']}회), 요청 제한 시간 {config['timeout_ms']}ms")
+    phases = ', '.join(f"{name} {ms:.1f}ms" for name, ms in result.get('init_phases', {}).items())
+    print(f"모듈 import(INIT): {result.get('import_ms', 0.0):.1f}ms" + (f" ({phases})" if phases else ''))
+    print(f"첫 요청(초기화 포함): {result['cold_start_ms']:.1f}ms")
+    print(f"\n{'단계':<18}{'요청 수':>8}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+    for stage, stats in result['stages'].items():
+        if stats['count']:
+            print(f"{stage:<18}{stats['count']:>8}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}")
+
+    calls = result['calls_per_request']
+    print(f"\n요청당 Bedrock 호출: 평균 {calls['bedrock']['mean']:.2f} (최대 {calls['bedrock']['max']:.0f}), "
+          f"Data API 호출: 평균 {calls['rds_data']['mean']:.2f} (최대 {calls['rds_data']['max']:.0f}), "
+          f"토큰: 평균 {calls['tokens']['mean']:.0f}")
+    print(f"답변 캐시 적중률: {result['cache_hit_rate']:.1%}")
+    if result.get('partial_answers'):
+        print(f"기한 초과 부분 답변: {result['partial_answers']}건")
+    prompt_cache = result.get('prompt_cache_tokens', {})
+    if prompt_cache.get('read') or prompt_cache.get('write'):
+        print(f"프롬프트 캐시 토큰: 읽기 {prompt_cache['read']} / 쓰기 {prompt_cache['write']}")
+    allocations = result['allocations_kb']
+    print(f"요청당 메모리 할당 peak: p50 {allocations['peak_per_request']['p50']:.1f}KB / "
+          f"p95 {allocations['peak_per_request']['p95']:.1f}KB, 재생 후 유지: {allocations['retained_total']:.1f}KB")
+
+
+def compare(result, baseline, max_regression):
+    """기준 결과 대비 변화 출력 → 허용치를 넘은 회귀 항목 목록"""
+    regressions = []
+    print(f"\n기준 결과 대비 ({baseline['config']['variant']})")
+    for key, label in (('import_ms', '모듈 import(INIT)'), ('cold_start_ms', '첫 요청')):
+        if key in baseline:
+            print(f"  {label:<18}{baseline[key]:>9.1f} → {result[key]:>9.1f}ms")
+    for stage, stats in result['stages'].items():
+        before = baseline['stages'].get(stage, {})
+        if not stats['count'] or not before.get('count'):
+            continue
+        for key in ('p50', 'p95'):
+            change = (stats[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            print(f"  {stage:<18}{key} {before[key]:>9.1f} → {stats[key]:>9.1f}ms ({change:+.1f}%)")
+            if stage == 'total' and key == 'p95' and change > max_regression:
+                regressions.append(f"total p95 {change:+.1f}%")
+    for name in ('bedrock', 'rds_data'):
+        before = baseline['calls_per_request'][name]['mean']
+        after = result['calls_per_request'][name]['mean']
+        print(f"  요청당 {name} 호출 {before:.2f} → {after:.2f}")
+        if after > before + 1e-9:
+            regressions.append(f"요청당 {name} 호출 증가 {before:.2f} → {after:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GenAI Lambda 오프라인 종단 간 벤치마크')
+    parser.add_argument('--variant', default='terraform-seoul', choices=['terraform', 'terraform-seoul'])
+    parser.add_argument('--corpus', default=CORPUS_PATH, help='질문 코퍼스 (jsonl: question / type / sql)')
+    parser.add_argument('--repeat', type=int, default=3, help='코퍼스 재생 횟수')
+    parser.add_argument('--model-id', default=None, help='BEDROCK_MODEL_ID (기본: 변형별 기본 모델)')
+    parser.add_argument('--latency-scale', type=float, default=0.1,
+                        help='모델 계열별 지연(MODEL_LATENCY) 배율, 0이면 지연 없음')
+    parser.add_argument('--rds-latency-ms', type=float, default=0.0, help='Data API 호출당 추가 지연')
+    parser.add_argument('--bedrock-slow-rate', type=float, default=0.0,
+                        help='첫 토큰 전에 --bedrock-slow-ms 만큼 더 지연되는 Bedrock 호출 비율 (꼬리 지연 흉내)')
+    parser.add_argument('--bedrock-slow-ms', type=float, default=0.0, help='느린 Bedrock 호출의 추가 지연 (배율 미적용)')
+    parser.add_argument('--timeout-ms', type=int, default=900000,
+                        help='요청마다 context.get_remaining_time_in_millis() 가 반환할 남은 시간 (Lambda 제한 시간)')
+    parser.add_argument('--env', action='append', default=[], help='Lambda 환경 변수 (KEY=VALUE, 여러 번 지정 가능)')
+    parser.add_argument('--log-level', default='ERROR', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'])
+    parser.add_argument('--json-out', help='결과를 JSON 파일로 저장 (다음 실행의 --baseline 으로 사용)')
+    parser.add_argument('--baseline', help='비교할 이전 --json-out 결과')
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help='--baseline 대비 total p95 허용 증가율(%%), 넘으면 종료 코드 1')
+    parser.add_argument('--init-budget-ms', type=float, default=0.0,
+                        help='모듈 import(INIT) + 첫 요청 시간 예산(ms), 넘으면 종료 코드 1 (0이면 확인 안 함)')
+    args = parser.parse_args()
+
+    # lambda_function 이 import 시 로거 레벨을 LOG_LEVEL(버퍼 사용 시 DEBUG)로 바꾸므로 출력은 핸들러 레벨로 거름 (로그 레코드 생성 비용은 측정에 포함)
+    handler = logging.StreamHandler()
+    handler.setLevel(getattr(logging, args.log_level))
+    handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+    logging.getLogger().addHandler(handler)
+    result = run(args)
+    print_report(result)
+
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.json_out}")
+
+    cold_total_ms = result['import_ms'] + result['cold_start_ms']
+    if args.init_budget_ms and cold_total_ms > args.init_budget_ms:
+        print(f"\n콜드 스타트 예산 초과: {cold_total_ms:.1f}ms > {args.init_budget_ms:.0f}ms")
+        return 1
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(result, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\n회귀 감지: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+SQL 예시 선택(example_store) 정확도 / 프롬프트 크기 평가
+정답 SQL 이 있는 질문 코퍼스(e2e_corpus.jsonl 의 DATABASE_QUERY)로 SQL_EXAMPLE_MODE=all 과 top-k / 토큰 예산 조합별
+- 패턴 적중률: 프롬프트에 정답 SQL 과 같은 패턴(문자열 / 숫자 값 제외)의 예시가 들어갔는지 (모델 정확도의 대리 지표)
+- SQL 생성 프롬프트 토큰 수 (system + user, 입력 토큰이 줄면 첫 토큰 시간도 줄어듦)
+- 예시 선택 지연 시간
+을 비교 (평가 질문과 같은 질문의 예시는 빼고 선택 - leave-one-out)
+
+사용법:
+    python3 scripts/genai-bench/example_eval.py [--variant terraform-seoul] [--top-k 2,3,4,6] [--budget 200,400,0]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from bench_common import load_lambda_module_path, percentile
+from fake_aws import FakeBedrockRuntime, FakeRdsData, install_fake_boto3
+
+def load_lambda(variant):
+    """가짜 AWS 클라이언트로 lambda_function import (프롬프트 구성 함수만 사용)"""
+    os.environ.setdefault('DB_CLUSTER_ARN', 'arn:aws:rds:local:000000000000:cluster:genai-bench')
+    os.environ.setdefault('DB_SECRET_ARN', 'arn:aws:secretsmanager:local:000000000000:secret:genai-bench')
+    os.environ['SQL_EXAMPLE_MODE'] = 'all'
+    install_fake_boto3({
+        'bedrock-runtime': FakeBedrockRuntime(lambda prompt, model_id: '', latency_scale=0),
+        'rds-data': FakeRdsData(latency_ms=0),
+    })
+    load_lambda_module_path(variant)
+    import lambda_function as lf
+    return lf
+
+
+def evaluate(lf, items, mode, top_k=0, budget=0):
+    """설정 하나로 코퍼스 질문마다 SQL 생성 프롬프트를 만들어 패턴 적중 / 토큰 / 선택 시간 집계"""
+    from example_store import ExampleStore, estimate_tokens, sql_skeleton
+
+    full_store = lf.get_sql_example_store()
+    os.environ.update({'SQL_EXAMPLE_MODE': mode, 'SQL_EXAMPLE_TOP_K': str(top_k),
+                       'SQL_EXAMPLE_TOKEN_BUDGET': str(budget)})
+    results = []
+    try:
+        for item in items:
+            gold = sql_skeleton(item['sql'])
+            # 평가 질문 자체가 예시에 있으면 빼고 비교
+            candidates = [example for example in full_store.examples
+                          if example.question.lower() != item['question'].lower()]
+            if mode == 'all':
+                covered = {example.skeleton for example in candidates
+                           if f'질문: "{example.question}"' in lf.SQL_EXAMPLES}
+                selected_ms = 0.0
+            else:
+                lf.sql_example_store = ExampleStore(candidates, full_store.notes)
+                started = time.perf_counter()
+                selected = lf.sql_example_store.select(item['question'], top_k=top_k, token_budget=budget)
+                selected_ms = (time.perf_counter() - started) * 1000
+                covered = {example.skeleton for example in selected}
+            system, prompt = lf.build_sql_generation_prompt(item['question'])
+            results.append({
+                'question': item['question'],
+                'hit': gold in covered,
+                'coverable': any(example.skeleton == gold for example in candidates),
+                'tokens': estimate_tokens(system) + estimate_tokens(prompt),
+                'select_us': selected_ms * 1000,
+            })
+    finally:
+        lf.sql_example_store = full_store
+    return results
+
+
+def main():
+    from e2e_bench import CORPUS_PATH, load_corpus
+
+    parser = argparse.ArgumentParser(description='SQL 예시 선택 정확도 / 프롬프트 크기 평가')
+    parser.add_argument('--variant', default='terraform-seoul', choices=['terraform', 'terraform-seoul'])
+    parser.add_argument('--corpus', default=CORPUS_PATH, help='정답 SQL 이 있는 질문 코퍼스 (jsonl: question / type / sql)')
+    parser.add_argument('--top-k', default='2,3,4,6', help='비교할 top-k 목록 (쉼표 구분)')
+    parser.add_argument('--budget', default='200,400,0', help='비교할 예시 토큰 예산 목록 (쉼표 구분, 0이면 제한 없음)')
+    parser.add_argument('--show-misses', action='store_true', help='설정별 패턴 미적중 질문 출력')
+    args = parser.parse_args()
+
+    items = [item for item in load_corpus(args.corpus) if item.get('sql')]
+    lf = load_lambda(args.variant)
+    store = lf.get_sql_example_store()
+
+    configs = [('all', 0, 0)] + [('select', int(k), int(b)) for k in args.top_k.split(',') for b in args.budget.split(',')]
+    print(f"{args.variant} / 정답 SQL 질문 {len(items)}개 / 예시 라이브러리 {len(store.examples)}개 ({store.total_tokens} 토큰)")
+    print("all = SQL_EXAMPLES 전체, select = SQL_EXAMPLES + sql_examples.jsonl 에서 선택\n")
+    print(f"{'설정':<22}{'패턴 적중':>10}{'프롬프트 토큰':>14}{'all 대비':>10}{'선택 p50(us)':>14}{'p95(us)':>10}")
+
+    reference = None
+    for mode, top_k, budget in configs:
+        results = evaluate(lf, items, mode, top_k, budget)
+        hits = sum(result['hit'] for result in results)
+        tokens = sum(result['tokens'] for result in results) / len(results)
+        reference = reference or tokens
+        select_us = [result['select_us'] for result in results]
+        name = 'all' if mode == 'all' else f"top{top_k} / 예산 {budget or '∞'}"
+        print(f"{name:<22}{hits / len(results):>10.1%}"
+              f"{tokens:>14.0f}{(tokens - reference) / reference:>+10.1%}"
+              f"{percentile(select_us, 50):>14.0f}{percentile(select_us, 95):>10.0f}")
+        if args.show_misses:
+            for result in results:
+                if not result['hit']:
+                    print(f"    미적중: {result['question']}{'' if result['coverable'] else ' (라이브러리에 같은 패턴 없음)'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,463 @@
+"""
+genai-bench 로컬 가짜 AWS 클라이언트
+- FakeBedrockRuntime: invoke_model / invoke_model_with_response_stream (모델 계열별 응답 형식 + 지연 주입)
+- FakeRdsData: petclinic_mysql.sql 을 SQLite 메모리 DB로 적재해서 execute_statement 실행 (typed / JSON 응답)
+AWS 자격 증명이나 네트워크 없이 lambda_function.py 전체 파이프라인을 실행하기 위한 용도
+"""
+
+import io
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+import types
+import zlib
+from datetime import date, datetime
+
+from bench_common import REPO_ROOT
+
+PETCLINIC_SQL = os.path.join(REPO_ROOT, 'petclinic_mysql.sql')
+
+# 모델 계열별 (첫 토큰 지연 ms, 출력 토큰당 ms) - 접두사가 긴 항목부터 매칭
+MODEL_LATENCY = {
+    'anthropic.claude-3-haiku': (350.0, 6.0),
+    'anthropic.claude-3-5-sonnet': (600.0, 12.0),
+    'anthropic.claude-3-sonnet': (700.0, 14.0),
+    'anthropic': (500.0, 10.0),
+    'amazon.titan': (400.0, 9.0),
+    'meta.llama': (450.0, 10.0),
+}
+
+# Data API 응답 크기 제한 (1MB)
+DATA_API_MAX_RESPONSE_BYTES = 1024 * 1024
+
+
+def model_family(model_id):
+    """요청/응답 형식 기준 모델 계열 (model_adapters.resolve_adapter_class 와 같은 판별)"""
+    lowered = model_id.lower()
+    if 'titan' in lowered:
+        return 'titan'
+    if 'llama' in lowered or 'meta' in lowered:
+        return 'llama'
+    return 'anthropic'
+
+
+def model_latency(model_id):
+    for prefix in sorted(MODEL_LATENCY, key=len, reverse=True):
+        if model_id.startswith(prefix) or f'.{prefix}' in model_id:
+            return MODEL_LATENCY[prefix]
+    return MODEL_LATENCY['anthropic']
+
+
+def estimate_tokens(text):
+    """대략적인 토큰 수 (문자 3개당 1토큰)"""
+    return max(1, len(text) // 3)
+
+
+def _block_text(content):
+    if isinstance(content, list):
+        return ''.join(block.get('text', '') for block in content if isinstance(block, dict))
+    return content or ''
+
+
+def extract_prompt(body):
+    """모델 계열별 request body 에서 프롬프트 텍스트 추출 (Claude system 블록 포함)"""
+    if 'messages' in body:
+        system = _block_text(body.get('system'))
+        content = _block_text(body['messages'][-1]['content'])
+        return f"{system}\n\n{content}" if system else content
+    return body.get('inputText') or body.get('prompt') or ''
+
+
+class _StreamingBody:
+    def __init__(self, payload):
+        self._buffer = io.BytesIO(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+    def read(self):
+        return self._buffer.read()
+
+
+class FakeThrottlingError(Exception):
+    """Bedrock ThrottlingException (botocore ClientError 와 같은 response 형식)"""
+
+    def __init__(self, operation):
+        self.response = {'Error': {'Code': 'ThrottlingException',
+                                   'Message': 'Too many requests, please wait before trying again.'},
+                         'ResponseMetadata': {'HTTPStatusCode': 429}}
+        super().__init__(f"An error occurred (ThrottlingException) when calling the {operation} operation: "
+                         f"{self.response['Error']['Message']}")
+
+
+class FakeBedrockRuntime:
+    """bedrock-runtime 가짜 클라이언트
+
+    responder(prompt, model_id) → 응답 텍스트. latency_scale 로 MODEL_LATENCY 지연을 배율 조정 (0이면 지연 없음)
+    Claude system 블록에 cache_control 이 있으면 같은 블록의 두 번째 호출부터 캐시 읽기 토큰으로 집계 (지연은 동일)
+    max_concurrency 를 지정하면 진행 중인 호출이 그 수를 넘는 호출은 ThrottlingException (계정 할당량 흉내)
+    slow_rate 비율의 호출은 첫 토큰 전에 slow_ms 만큼 더 지연 (꼬리 지연 흉내, latency_scale 과 관계없는 절대 시간, 고정 시드)
+    stage_of(prompt) 를 지정하면 단계 / 모델 ID별 호출 수와 토큰 수를 usage 에 집계 (모델 조합별 비용 계산용)
+    """
+
+    def __init__(self, responder, latency_scale=1.0, max_concurrency=None, slow_rate=0.0, slow_ms=0.0, stage_of=None):
+        self.responder = responder
+        self.stage_of = stage_of
+        self.usage = {}
+        self.latency_scale = latency_scale
+        self.max_concurrency = max_concurrency
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.slow_calls = 0
+        self._random = random.Random(0)
+        self.active = 0
+        self.throttled = 0
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self._cached_prefixes = set()
+        self._lock = threading.Lock()
+
+    def _prepare(self, modelId, body):
+        request = json.loads(body)
+        prompt = extract_prompt(request)
+        text = self.responder(prompt, modelId)
+        input_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        stage = self.stage_of(prompt) if self.stage_of else 'all'
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            usage = self.usage.setdefault(stage, {}).setdefault(modelId, {'calls': 0, 'input_tokens': 0,
+                                                                          'output_tokens': 0})
+            usage['calls'] += 1
+            usage['input_tokens'] += input_tokens
+            usage['output_tokens'] += output_tokens
+        return text, input_tokens, output_tokens
+
+    def usage_snapshot(self):
+        """{단계: {모델 ID: {calls, input_tokens, output_tokens}}} 복사본"""
+        with self._lock:
+            return {stage: {model: dict(values) for model, values in models.items()}
+                    for stage, models in self.usage.items()}
+
+    def _cache_usage(self, modelId, body):
+        """cache_control 이 붙은 system 블록 토큰 → (캐시 읽기, 캐시 쓰기)"""
+        blocks = json.loads(body).get('system')
+        if not isinstance(blocks, list) or not any('cache_control' in block for block in blocks):
+            return 0, 0
+        prefix = _block_text(blocks)
+        tokens = estimate_tokens(prefix)
+        with self._lock:
+            if (modelId, prefix) in self._cached_prefixes:
+                self.cache_read_tokens += tokens
+                return tokens, 0
+            self._cached_prefixes.add((modelId, prefix))
+            self.cache_write_tokens += tokens
+            return 0, tokens
+
+    def _sleep(self, ms):
+        if self.latency_scale and ms > 0:
+            time.sleep(ms * self.latency_scale / 1000)
+
+    def _tail_delay(self):
+        with self._lock:
+            slow = self.slow_rate > 0 and self._random.random() < self.slow_rate
+            self.slow_calls += slow
+        if slow:
+            time.sleep(self.slow_ms / 1000)
+
+    def _enter(self, operation):
+        with self._lock:
+            if self.max_concurrency is not None and self.active >= self.max_concurrency:
+                self.throttled += 1
+                raise FakeThrottlingError(operation)
+            self.active += 1
+
+    def _exit(self):
+        with self._lock:
+            self.active -= 1
+
+    def invoke_model(self, modelId, body, contentType='application/json', **kwargs):
+        self._enter('InvokeModel')
+        try:
+            return self._invoke_model(modelId, body, contentType)
+        finally:
+            self._exit()
+
+    def _invoke_model(self, modelId, body, contentType):
+        text, input_tokens, output_tokens = self._prepare(modelId, body)
+        cache_read, cache_write = self._cache_usage(modelId, body)
+        # 캐시로 처리한 토큰은 input_tokens 에서 제외 (Anthropic usage 와 같은 방식)
+        input_tokens -= cache_read + cache_write
+        first_ms, per_token_ms = model_latency(modelId)
+        self._tail_delay()
+        self._sleep(first_ms + per_token_ms * output_tokens)
+
+        family = model_family(modelId)
+        if family == 'titan':
+            payload = {'inputTextTokenCount': input_tokens,
+                       'results': [{'tokenCount': output_tokens, 'outputText': text, 'completionReason': 'FINISH'}]}
+        elif family == 'llama':
+            payload = {'generation': text, 'prompt_token_count': input_tokens,
+                       'generation_token_count': output_tokens, 'stop_reason': 'stop'}
+        else:
+            payload = {'type': 'message', 'role': 'assistant', 'content': [{'type': 'text', 'text': text}],
+                       'stop_reason': 'end_turn',
+                       'usage': {'input_tokens': input_tokens, 'output_tokens': output_tokens,
+                                 'cache_read_input_tokens': cache_read, 'cache_creation_input_tokens': cache_write}}
+        return {
+            'body': _StreamingBody(payload),
+            'contentType': 'application/json',
+            'ResponseMetadata': {'HTTPHeaders': {
+                'x-amzn-bedrock-input-token-count': str(input_tokens),
+                'x-amzn-bedrock-output-token-count': str(output_tokens),
+                'x-amzn-bedrock-cache-read-input-token-count': str(cache_read),
+                'x-amzn-bedrock-cache-write-input-token-count': str(cache_write),
+            }}
+        }
+
+    def invoke_model_with_response_stream(self, modelId, body, contentType='application/json', **kwargs):
+        self._enter('InvokeModelWithResponseStream')
+        try:
+            text, input_tokens, output_tokens = self._prepare(modelId, body)
+        except BaseException:
+            self._exit()
+            raise
+        return {'body': self._event_stream(modelId, text, input_tokens, output_tokens), 'contentType': contentType}
+
+    def _event_stream(self, model_id, text, input_tokens, output_tokens):
+        """진행 중 호출 수는 스트림을 다 읽거나 닫을 때 반환"""
+        try:
+            yield from self._event_chunks(model_id, text, input_tokens, output_tokens)
+        finally:
+            self._exit()
+
+    def _event_chunks(self, model_id, text, input_tokens, output_tokens):
+        def chunk(payload):
+            return {'chunk': {'bytes': json.dumps(payload, ensure_ascii=False).encode('utf-8')}}
+
+        first_ms, per_token_ms = model_latency(model_id)
+        family = model_family(model_id)
+        self._tail_delay()
+        self._sleep(first_ms)
+        if family == 'anthropic':
+            yield chunk({'type': 'message_start', 'message': {'role': 'assistant',
+                                                               'usage': {'input_tokens': input_tokens}}})
+        pieces = [text[i:i + 3] for i in range(0, len(text), 3)] or ['']
+        for position, piece in enumerate(pieces):
+            if position:
+                self._sleep(per_token_ms)
+            if family == 'titan':
+                yield chunk({'outputText': piece, 'index': 0})
+            elif family == 'llama':
+                yield chunk({'generation': piece})
+            else:
+                yield chunk({'type': 'content_block_delta', 'index': 0, 'delta': {'type': 'text_delta', 'text': piece}})
+        yield chunk({'type': 'message_stop', 'amazon-bedrock-invocationMetrics': {
+            'inputTokenCount': input_tokens, 'outputTokenCount': output_tokens}})
+
+
+class FakeDataApiError(Exception):
+    """Data API 오류 (BadRequestException 메시지 형식)"""
+
+
+def load_petclinic_sqlite(path=PETCLINIC_SQL):
+    """MySQL 덤프(petclinic_mysql.sql)를 SQLite 메모리 DB로 변환해서 적재"""
+    with open(path, encoding='utf-8') as f:
+        script = f.read()
+    script = re.sub(r'^\s*(CREATE DATABASE|USE)\b.*?;\s*$', '', script, flags=re.MULTILINE | re.IGNORECASE)
+    script = re.sub(r',\s*INDEX\s*\([^)]*\)', '', script, flags=re.IGNORECASE)
+    script = re.sub(r'INT\(\d+\)\s+UNSIGNED', 'INTEGER', script, flags=re.IGNORECASE)
+    script = re.sub(r'\s+AUTO_INCREMENT', '', script, flags=re.IGNORECASE)
+    script = re.sub(r'\)\s*engine\s*=\s*\w+\s*;', ');', script, flags=re.IGNORECASE)
+    script = re.sub(r'INSERT\s+IGNORE', 'INSERT OR IGNORE', script, flags=re.IGNORECASE)
+
+    conn = sqlite3.connect(':memory:', check_same_thread=False)
+    conn.executescript(script)
+    # 생성 SQL 에 자주 나오는 MySQL 함수
+    conn.create_function('CONCAT', -1, lambda *values: None if None in values else ''.join(str(v) for v in values))
+    conn.create_function('YEAR', 1, lambda value: int(str(value)[:4]) if value else None)
+    conn.create_function('MONTH', 1, lambda value: int(str(value)[5:7]) if value else None)
+    conn.create_function('NOW', 0, lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    conn.create_function('CURDATE', 0, lambda: date.today().isoformat())
+    # 테이블 데이터 버전 조회 (table_versions.build_table_version_sql)
+    conn.create_function('CONCAT_WS', -1, lambda sep, *values: sep.join(str(v) for v in values if v is not None))
+    conn.create_function('CRC32', 1, lambda value: None if value is None else zlib.crc32(str(value).encode('utf-8')))
+    conn.create_aggregate('BIT_XOR', 1, _BitXor)
+    return conn
+
+
+class _BitXor:
+    """MySQL BIT_XOR 집계 (행이 없으면 0)"""
+
+    def __init__(self):
+        self.value = 0
+
+    def step(self, value):
+        if value is not None:
+            self.value ^= int(value)
+
+    def finalize(self):
+        return self.value
+
+
+def _type_name(values):
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return 'BIT'
+        if isinstance(value, int):
+            return 'BIGINT'
+        if isinstance(value, float):
+            return 'DOUBLE'
+        if isinstance(value, bytes):
+            return 'BLOB'
+        return 'VARCHAR'
+    return 'VARCHAR'
+
+
+def _typed_value(value, type_name):
+    if value is None:
+        return {'isNull': True}
+    if type_name == 'BIGINT':
+        return {'longValue': value}
+    if type_name == 'DOUBLE':
+        return {'doubleValue': value}
+    if type_name == 'BIT':
+        return {'booleanValue': value}
+    if type_name == 'BLOB':
+        return {'blobValue': value}
+    return {'stringValue': str(value)}
+
+
+class FakeRdsData:
+    """rds-data 가짜 클라이언트 (SQLite 실행, Data API 응답 형식 / 응답 크기 제한 재현)"""
+
+    def __init__(self, conn=None, max_response_bytes=DATA_API_MAX_RESPONSE_BYTES, latency_ms=0.0):
+        self.conn = conn or load_petclinic_sqlite()
+        self.max_response_bytes = max_response_bytes
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def execute_statement(self, resourceArn=None, secretArn=None, database=None, sql='', parameters=None,
+                          includeResultMetadata=False, formatRecordsAs='NONE', **kwargs):
+        with self._lock:
+            self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        if sql.lstrip().upper().startswith('EXPLAIN '):
+            values = {p['name']: next(iter(p['value'].values())) for p in parameters or []}
+            names, rows = self._explain(sql.lstrip()[len('EXPLAIN '):].strip().rstrip(';'), values)
+        else:
+            values = {p['name']: next(iter(p['value'].values())) for p in parameters or []}
+            cursor = self._cursor(sql.strip().rstrip(';'), values)
+            names = [column[0] for column in cursor.description or []]
+            rows = cursor.fetchall()
+
+        type_names = [_type_name(row[i] for row in rows) for i in range(len(names))]
+        response = {'numberOfRecordsUpdated': 0}
+        if includeResultMetadata:
+            response['columnMetadata'] = [{'name': name, 'label': name, 'typeName': type_name}
+                                          for name, type_name in zip(names, type_names)]
+        if formatRecordsAs == 'JSON':
+            response['formattedRecords'] = json.dumps([dict(zip(names, row)) for row in rows], ensure_ascii=False)
+            size = len(response['formattedRecords'])
+        else:
+            response['records'] = [[_typed_value(v, t) for v, t in zip(row, type_names)] for row in rows]
+            size = len(json.dumps(response['records'], ensure_ascii=False))
+        if self.max_response_bytes and size > self.max_response_bytes:
+            raise FakeDataApiError(
+                'An error occurred (BadRequestException) when calling the ExecuteStatement operation: '
+                'Database returned more than the allowed response size limit'
+            )
+        return response
+
+    def _explain(self, sql, values):
+        """SQLite EXPLAIN QUERY PLAN → MySQL EXPLAIN 과 비슷한 행 (SCAN 은 테이블 전체 행 수, SEARCH 는 1행)"""
+        tables = {name.lower() for (name,) in self._execute("SELECT name FROM sqlite_master WHERE type = 'table'", {})}
+        aliases = {table: table for table in tables}
+        for table, alias in re.findall(r'(?:\bFROM|\bJOIN|,)\s*(\w+)(?:\s+(?:AS\s+)?(\w+))?', sql, re.IGNORECASE):
+            if table.lower() in tables and alias:
+                aliases[alias.lower()] = table.lower()
+        try:
+            plan = self._execute(f"EXPLAIN QUERY PLAN {sql}", values)
+        except sqlite3.Error as e:
+            raise FakeDataApiError(
+                f'An error occurred (BadRequestException) when calling the ExecuteStatement operation: {e}'
+            )
+        rows = []
+        for _, _, _, detail in plan:
+            match = re.match(r'(SCAN|SEARCH) (?:TABLE )?(\w+)(?: AS (\w+))?', detail)
+            if not match:
+                continue
+            table = aliases.get((match.group(3) or match.group(2)).lower(), match.group(2).lower())
+            if match.group(1) == 'SCAN':
+                (count,), = self._execute(f"SELECT COUNT(*) FROM {table}", {})
+                rows.append((1, 'SIMPLE', table, 'ALL', count, 100.0, detail))
+            else:
+                rows.append((1, 'SIMPLE', table, 'eq_ref', 1, 100.0, detail))
+        return ['id', 'select_type', 'table', 'type', 'rows', 'filtered', 'Extra'], rows
+
+    def _execute(self, sql, values):
+        with self._lock:
+            return self.conn.execute(sql, values).fetchall()
+
+    def _cursor(self, sql, values):
+        try:
+            with self._lock:
+                cursor = self.conn.execute(sql, values)
+                # 잠금 밖에서 fetch 하지 않도록 결과를 미리 읽어 둔 커서 대용
+                return _Result(cursor.description, cursor.fetchall())
+        except sqlite3.Error as e:
+            raise FakeDataApiError(
+                f'An error occurred (BadRequestException) when calling the ExecuteStatement operation: {e}'
+            )
+
+
+class _Result:
+    def __init__(self, description, rows):
+        self.description = description
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+class _FakeConfig:
+    """botocore 가 없을 때 쓰는 botocore.config.Config 대용 (설정값만 보관)"""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+def install_fake_boto3(clients):
+    """boto3.client(서비스 이름) 이 가짜 클라이언트를 반환하도록 설정 (boto3 / botocore 가 없으면 최소 모듈 등록)"""
+    def client(service_name, *args, **kwargs):
+        if service_name not in clients:
+            raise RuntimeError(f"genai-bench 에 가짜 클라이언트가 없는 서비스: {service_name}")
+        return clients[service_name]
+
+    try:
+        import botocore.config  # noqa: F401
+    except ImportError:
+        botocore = types.ModuleType('botocore')
+        botocore.config = types.ModuleType('botocore.config')
+        botocore.config.Config = _FakeConfig
+        sys.modules['botocore'] = botocore
+        sys.modules['botocore.config'] = botocore.config
+
+    try:
+        import boto3
+    except ImportError:
+        boto3 = types.ModuleType('boto3')
+        sys.modules['boto3'] = boto3
+    boto3.client = client
+    return boto3
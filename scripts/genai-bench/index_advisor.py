@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+생성 SQL 워크로드 인덱스 분석
+Lambda 가 기록한 SQL 지문 통계(SQL_WORKLOAD 로그 줄 / {"sql_workload": true} 이벤트 응답)를 모아
+petclinic 스키마(petclinic_mysql.sql)에 없는 인덱스 후보(B-tree / FULLTEXT ngram)를 만들고,
+행 수를 늘린 SQLite 대역 DB 에서 인덱스 추가 전후 실행 비용(SQLite VM 명령 수)과 실행 계획을 비교해 효과를 추정
+워크로드 파일을 주지 않으면 e2e_corpus.jsonl 을 가짜 AWS 로 재생해서 기록한 워크로드 사용
+
+사용법:
+    python3 scripts/genai-bench/index_advisor.py [--workload sql_workload.log ...] [--scale 200] [--json-out advice.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+from bench_common import load_lambda_module_path
+from fake_aws import PETCLINIC_SQL, FakeBedrockRuntime, FakeRdsData, install_fake_boto3, load_petclinic_sqlite
+
+LOG_MARKER = 'SQL_WORKLOAD'
+
+# 행 수를 늘리지 않는 코드 테이블 (실제 운영에서도 몇 행 수준)
+LOOKUP_TABLES = ('types', 'specialties')
+# 복제할 때 값이 겹치지 않게 번호를 붙이는 컬럼 (이름 검색 선택도를 실제와 비슷하게 유지)
+DISTINCT_COLUMNS = ('first_name', 'last_name', 'name')
+# 진행 콜백 간격 (VM 명령 수)
+PROGRESS_OPS = 10
+
+_CLAUSE_WORDS = ('ON', 'USING', 'WHERE', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'CROSS', 'NATURAL',
+                 'GROUP', 'ORDER', 'HAVING', 'LIMIT', 'UNION')
+_TABLE_REF_PATTERN = re.compile(
+    rf"(?:\bFROM|\bJOIN|,)\s+(\w+)(?:\s+(?:AS\s+)?(?!(?:{'|'.join(_CLAUSE_WORDS)})\b)(\w+))?", re.IGNORECASE
+)
+_REF = r'(?:(\w+)\.)?(\w+)'
+_JOIN_PATTERN = re.compile(r'\b(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)\b')
+_USAGE_PATTERNS = (
+    ('function', re.compile(rf'\b(?:YEAR|MONTH|DATE|LOWER|UPPER)\s*\(\s*{_REF}\s*\)', re.IGNORECASE)),
+    ('contains', re.compile(rf"\b{_REF}\s+LIKE\s+'%", re.IGNORECASE)),
+    ('prefix', re.compile(rf"\b{_REF}\s+LIKE\s+'(?!%)", re.IGNORECASE)),
+    ('eq', re.compile(rf"\b{_REF}\s*(?:=|<=>)\s*(?:\?|:\w+|'|\d)|\b{_REF}\s+(?:IN\s*\(|IS\s+(?:NOT\s+)?NULL)",
+                      re.IGNORECASE)),
+    ('range', re.compile(rf'\b{_REF}\s*(?:<=|>=|<|>|BETWEEN\b)', re.IGNORECASE)),
+)
+_ORDER_PATTERN = re.compile(r'\bORDER\s+BY\s+(.*?)(?=\bLIMIT\b|\)|$)', re.IGNORECASE | re.DOTALL)
+_CREATE_TABLE_PATTERN = re.compile(r'CREATE TABLE IF NOT EXISTS (\w+) \((.*?)\)\s*engine', re.IGNORECASE | re.DOTALL)
+
+
+# ---------------------------------------------------------------------------
+# 워크로드
+# ---------------------------------------------------------------------------
+
+def _snapshots_from_text(text):
+    """워크로드 파일 → 스냅샷 목록 (이벤트 응답 JSON / 스냅샷 JSON / SQL_WORKLOAD 로그 줄)"""
+    try:
+        document = json.loads(text)
+    except json.JSONDecodeError:
+        document = None
+    if isinstance(document, dict):
+        body = document.get('body', document)
+        if isinstance(body, str):
+            body = json.loads(body)
+        snapshot = body.get('workload', body)
+        return [snapshot] if snapshot and 'fingerprints' in snapshot else []
+
+    snapshots = []
+    for line in text.splitlines():
+        if LOG_MARKER not in line:
+            continue
+        # LOG_FORMAT=json 이면 message 필드, CloudWatch Logs 내보내기는 타임스탬프 등이 앞에 붙음
+        try:
+            record = json.loads(line)
+            line = record.get('message', '') if isinstance(record, dict) else line
+        except json.JSONDecodeError:
+            pass
+        start = line.find(LOG_MARKER) + len(LOG_MARKER)
+        try:
+            snapshots.append(json.loads(line[start:].strip()))
+        except json.JSONDecodeError:
+            print(f"  스냅샷 JSON 파싱 실패: {line[:80]}...", file=sys.stderr)
+    return snapshots
+
+
+def merge_snapshots(snapshots):
+    """여러 컨테이너 / 기간의 스냅샷을 지문 ID 별로 합산"""
+    merged = {}
+    for snapshot in snapshots:
+        for item in snapshot.get('fingerprints', []):
+            entry = merged.setdefault(item['id'], {
+                'id': item['id'], 'sql': item['sql'], 'count': 0, 'errors': 0, 'total_ms': 0.0,
+                'p95_ms': 0.0, 'rows': 0, 'sources': {},
+            })
+            entry['count'] += item.get('count', 0)
+            entry['errors'] += item.get('errors', 0)
+            entry['total_ms'] += item.get('total_ms', 0.0)
+            entry['p95_ms'] = max(entry['p95_ms'], item.get('p95_ms', 0.0))
+            entry['rows'] += item.get('rows', 0)
+            for source, count in item.get('sources', {}).items():
+                entry['sources'][source] = entry['sources'].get(source, 0) + count
+    for entry in merged.values():
+        entry['avg_ms'] = entry['total_ms'] / entry['count'] if entry['count'] else 0.0
+    return sorted(merged.values(), key=lambda entry: -entry['total_ms'])
+
+
+def load_workload(paths):
+    snapshots = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            found = _snapshots_from_text(f.read())
+        print(f"{path}: 스냅샷 {len(found)}개")
+        snapshots.extend(found)
+    return merge_snapshots(snapshots)
+
+
+def replay_corpus_workload(variant, corpus_path, repeat):
+    """e2e_corpus.jsonl 을 가짜 AWS 로 재생하고 Lambda 워크로드 기록기의 스냅샷을 반환"""
+    from e2e_bench import BenchContext, ScriptedResponder, invoke, load_corpus
+
+    corpus = load_corpus(corpus_path)
+    os.environ.setdefault('DB_CLUSTER_ARN', 'arn:aws:rds:local:000000000000:cluster:genai-bench')
+    os.environ.setdefault('DB_SECRET_ARN', 'arn:aws:secretsmanager:local:000000000000:secret:genai-bench')
+    os.environ.setdefault('LOG_LEVEL', 'ERROR')
+    os.environ.update({'SQL_WORKLOAD_ENABLED': 'true', 'SQL_WORKLOAD_LOG_INTERVAL': '0', 'ANSWER_CACHE_ENABLED': 'false'})
+    install_fake_boto3({
+        'bedrock-runtime': FakeBedrockRuntime(ScriptedResponder(corpus), latency_scale=0),
+        'rds-data': FakeRdsData(latency_ms=0),
+    })
+    load_lambda_module_path(variant)
+    import lambda_function as lf
+
+    for round_index in range(repeat):
+        for position, item in enumerate(corpus):
+            invoke(lf, item['question'], f'advisor-{round_index}-{position}')
+    response = lf.lambda_handler({'sql_workload': True}, BenchContext('advisor-snapshot'))
+    return merge_snapshots([response['body']['workload']])
+
+
+# ---------------------------------------------------------------------------
+# 스키마 / SQLite 대역 DB
+# ---------------------------------------------------------------------------
+
+def parse_schema(path=PETCLINIC_SQL):
+    """MySQL 스키마 → 테이블별 컬럼 / 타입, 기존 인덱스(PK, INDEX, UNIQUE, InnoDB 외래 키 자동 인덱스), 외래 키"""
+    with open(path, encoding='utf-8') as f:
+        script = f.read()
+    schema = {'tables': {}, 'indexes': {}, 'foreign_keys': {}}
+    for table, body in _CREATE_TABLE_PATTERN.findall(script):
+        columns, indexes, foreign_keys = {}, [], {}
+        for line in (line.strip().rstrip(',') for line in body.splitlines()):
+            match = re.match(r'(INDEX|UNIQUE|KEY)\s*\w*\s*\(([^)]*)\)', line, re.IGNORECASE)
+            if match:
+                indexes.append(tuple(column.strip() for column in match.group(2).split(',')))
+                continue
+            match = re.match(r'FOREIGN KEY\s*\((\w+)\)\s*REFERENCES\s+(\w+)', line, re.IGNORECASE)
+            if match:
+                foreign_keys[match.group(1)] = match.group(2)
+                indexes.append((match.group(1),))
+                continue
+            match = re.match(r'(\w+)\s+(\w+)', line)
+            if match:
+                columns[match.group(1)] = match.group(2).upper()
+                if 'PRIMARY KEY' in line.upper():
+                    indexes.append((match.group(1),))
+        schema['tables'][table] = columns
+        schema['indexes'][table] = indexes
+        schema['foreign_keys'][table] = foreign_keys
+    return schema
+
+
+def is_covered(schema, table, columns):
+    """기존 인덱스의 왼쪽 컬럼들로 이미 처리되는 인덱스인지"""
+    return any(index[:len(columns)] == tuple(columns) for index in schema['indexes'].get(table, []))
+
+
+def build_standin(schema, scale, seed):
+    """SQLite 대역 DB (petclinic 데이터를 scale 배로 복제 + MySQL 과 같은 인덱스 + ANALYZE 통계)"""
+    conn = load_petclinic_sqlite()
+    # MySQL 기본 collation 처럼 LIKE '값%' 가 인덱스 범위 조회를 쓸 수 있게 함 (SQLite 기본 LIKE 는 인덱스 사용 안 함)
+    conn.execute('PRAGMA case_sensitive_like = ON')
+    rng = random.Random(seed)
+    strides = {}
+    for table, columns in schema['tables'].items():
+        if table in LOOKUP_TABLES or scale <= 1:
+            continue
+        strides[table] = conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0] if 'id' in columns else None
+        conn.execute(f"CREATE TEMP TABLE base_{table} AS SELECT * FROM {table}")
+        for copy in range(1, scale):
+            expressions = []
+            for column, column_type in columns.items():
+                ref = schema['foreign_keys'][table].get(column)
+                if column == 'id':
+                    expressions.append(f"id + {copy * strides[table]}")
+                elif ref in strides and strides[ref]:
+                    expressions.append(f"{column} + {copy * strides[ref]}")
+                elif column in DISTINCT_COLUMNS:
+                    expressions.append(f"{column} || '{copy}'")
+                elif column_type == 'DATE':
+                    expressions.append(f"date({column}, '-{rng.randrange(1, 3650)} days')")
+                else:
+                    expressions.append(column)
+            conn.execute(f"INSERT INTO {table} ({', '.join(columns)}) "
+                         f"SELECT {', '.join(expressions)} FROM base_{table}")
+        conn.execute(f"DROP TABLE base_{table}")
+    for table, indexes in schema['indexes'].items():
+        for index in indexes:
+            if index != ('id',):
+                conn.execute(f"CREATE INDEX base_{table}_{'_'.join(index)} ON {table} ({', '.join(index)})")
+    conn.execute('ANALYZE')
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# 지문 분석 / 인덱스 후보
+# ---------------------------------------------------------------------------
+
+def table_aliases(schema, sql):
+    aliases = {}
+    for table, alias in _TABLE_REF_PATTERN.findall(sql):
+        if table.lower() in schema['tables']:
+            aliases[table.lower()] = table.lower()
+            if alias:
+                aliases[alias.lower()] = table.lower()
+    return aliases
+
+
+def resolve_column(schema, aliases, qualifier, column):
+    """별칭.컬럼 / 컬럼 → (테이블, 컬럼) (스키마에 없으면 None)"""
+    column = column.lower()
+    if qualifier:
+        table = aliases.get(qualifier.lower())
+        return (table, column) if table and column in schema['tables'][table] else None
+    tables = [table for table in set(aliases.values()) if column in schema['tables'][table]]
+    return (tables[0], column) if len(tables) == 1 else None
+
+
+def analyze_fingerprint(schema, sql):
+    """지문 SQL → 테이블별 컬럼 사용 (eq / range / prefix / contains / function / join / order)"""
+    aliases = table_aliases(schema, sql)
+    usage = {}
+
+    def add(kind, resolved):
+        if resolved:
+            columns = usage.setdefault(resolved[0], {}).setdefault(kind, [])
+            if resolved[1] not in columns:
+                columns.append(resolved[1])
+
+    for left_alias, left, right_alias, right in _JOIN_PATTERN.findall(sql):
+        add('join', resolve_column(schema, aliases, left_alias, left))
+        add('join', resolve_column(schema, aliases, right_alias, right))
+    for kind, pattern in _USAGE_PATTERNS:
+        for match in pattern.finditer(sql):
+            groups = match.groups()
+            qualifier, column = (groups[0], groups[1]) if groups[1] else (groups[2], groups[3])
+            add(kind, resolve_column(schema, aliases, qualifier, column))
+    for clause in _ORDER_PATTERN.findall(sql):
+        for item in clause.split(','):
+            match = re.match(rf'\s*{_REF}(?:\s+(?:ASC|DESC))?\s*$', item, re.IGNORECASE)
+            if match:
+                add('order', resolve_column(schema, aliases, match.group(1), match.group(2)))
+    return aliases, usage
+
+
+def propose_candidates(schema, workload):
+    """지문별 컬럼 사용 → 기존 인덱스로 처리되지 않는 인덱스 후보 {(종류, 테이블, 컬럼들): 후보}"""
+    candidates = {}
+
+    def add(kind, table, columns, fingerprint, note=None):
+        columns = tuple(columns)
+        if kind == 'btree' and is_covered(schema, table, columns):
+            return
+        candidate = candidates.setdefault((kind, table, columns), {
+            'kind': kind, 'table': table, 'columns': columns, 'fingerprints': [], 'notes': [],
+        })
+        if fingerprint['id'] not in candidate['fingerprints']:
+            candidate['fingerprints'].append(fingerprint['id'])
+        if note and note not in candidate['notes']:
+            candidate['notes'].append(note)
+
+    for fingerprint in workload:
+        _, usage = analyze_fingerprint(schema, fingerprint['sql'])
+        fingerprint['usage'] = usage
+        for table, kinds in usage.items():
+            for column in kinds.get('eq', []) + kinds.get('range', []) + kinds.get('prefix', []):
+                add('btree', table, [column], fingerprint)
+            for column in kinds.get('function', []):
+                add('btree', table, [column], fingerprint,
+                    f"{column} 을 함수로 감싼 조건은 인덱스를 못 씀 - 범위 조건으로 바꿔야 효과")
+            for column in kinds.get('contains', []):
+                if schema['tables'][table][column] != 'VARCHAR':
+                    continue
+                add('btree', table, [column], fingerprint,
+                    f"'%값%' 는 SQL_GUARD_EXTRA_INDEXED_COLUMNS={table}.{column} 로 접두 일치 변환할 때만 효과")
+                add('fulltext', table, [column], fingerprint,
+                    "MATCH ... AGAINST 로 쿼리 변경 필요 (한글 2자 검색어는 ngram_token_size=2)")
+            order = kinds.get('order', [])
+            if order:
+                lookup = (kinds.get('eq', []) + kinds.get('join', []))[:1]
+                if lookup and lookup[0] != order[0]:
+                    add('btree', table, lookup + order[:1], fingerprint, f"{order[0]} 정렬 생략")
+                add('btree', table, order[:1], fingerprint, f"{order[0]} 정렬 생략 (LIMIT 와 함께 앞부분만 조회)")
+    return list(candidates.values())
+
+
+def index_ddl(candidate):
+    table, columns = candidate['table'], candidate['columns']
+    if candidate['kind'] == 'fulltext':
+        return (f"ALTER TABLE {table} ADD FULLTEXT INDEX ft_{table}_{'_'.join(columns)} "
+                f"({', '.join(columns)}) WITH PARSER ngram;")
+    return f"CREATE INDEX idx_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)});"
+
+
+# ---------------------------------------------------------------------------
+# SQLite 대역 DB 에서 실행 비용 비교
+# ---------------------------------------------------------------------------
+
+def _quote(value):
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class Binder:
+    """지문의 ? 자리를 대역 DB 의 실제 값으로 채운 실행 가능한 SQL 생성 (같은 seed 면 같은 값)"""
+
+    def __init__(self, conn, schema, seed):
+        self.conn = conn
+        self.schema = schema
+        self.seed = seed
+        self._values = {}
+
+    def _sample(self, rng, resolved):
+        if resolved not in self._values:
+            table, column = resolved
+            self._values[resolved] = [value for (value,) in self.conn.execute(
+                f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY {column}")]
+        values = self._values[resolved]
+        return rng.choice(values) if values else None
+
+    def bind(self, sql, sample_index):
+        rng = random.Random(f'{self.seed}:{sample_index}:{sql}')
+        aliases = table_aliases(self.schema, sql)
+
+        def sample(qualifier, column):
+            resolved = resolve_column(self.schema, aliases, qualifier, column)
+            return self._sample(rng, resolved) if resolved else None
+
+        def _function(match):
+            value = sample(match.group(2), match.group(3))
+            part = {'YEAR': slice(0, 4), 'MONTH': slice(5, 7)}[match.group(1).upper()]
+            return f"{match.group(0)[:-1]}{int(str(value)[part]) if value else 'NULL'}"
+
+        def _like(match):
+            qualifier, column, leading, trailing = match.groups()
+            value = str(sample(qualifier, column) or '')
+            pattern = value[1:4] if leading else value[:3]
+            return f"{qualifier + '.' if qualifier else ''}{column} LIKE '{leading}{pattern}{trailing}'"
+
+        def _compare(match):
+            value = sample(match.group(1), match.group(2))
+            return f"{match.group(0)[:-1]}{_quote(value) if value is not None else 'NULL'}"
+
+        sql = re.sub(rf'\b(YEAR|MONTH)\s*\(\s*{_REF}\s*\)\s*(?:=|<=|>=|<|>)\s*\?', _function, sql, flags=re.IGNORECASE)
+        sql = re.sub(rf"\b{_REF}\s+LIKE\s+'(%?)\?(%?)'", _like, sql, flags=re.IGNORECASE)
+        sql = re.sub(rf'\b{_REF}\s+IN\s*\(\s*\?', _compare, sql, flags=re.IGNORECASE)
+        sql = re.sub(rf'\b{_REF}\s*(?:=|<>|!=|<=|>=|<|>)\s*\?', _compare, sql, flags=re.IGNORECASE)
+        sql = re.sub(r'\bLIMIT\s+\?', 'LIMIT 20', sql, flags=re.IGNORECASE)
+        sql = re.sub(r'\bOFFSET\s+\?', 'OFFSET 0', sql, flags=re.IGNORECASE)
+        return re.sub(r'\?|(?<![\w:]):\w+', 'NULL', sql)
+
+
+def run_cost(conn, sql):
+    """SQL 실행 비용 (SQLite VM 명령 수, 실행 시간 ms) - 실행할 수 없으면 None"""
+    steps = [0]
+
+    def _tick():
+        steps[0] += PROGRESS_OPS
+        return 0
+
+    conn.set_progress_handler(_tick, PROGRESS_OPS)
+    started = time.perf_counter()
+    try:
+        conn.execute(sql).fetchall()
+    except Exception:
+        return None
+    finally:
+        conn.set_progress_handler(None, 0)
+    return steps[0], (time.perf_counter() - started) * 1000
+
+
+def query_plan(conn, sql):
+    try:
+        return [detail for *_, detail in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    except Exception:
+        return []
+
+
+def prefix_rewrite(sql, aliases_for, table, column):
+    """guard 의 접두 일치 변환을 지문에 적용 ('%?%' → '?%', 후보 컬럼만)"""
+    def _rewrite(match):
+        if aliases_for(match.group(1)) == table and match.group(2).lower() == column:
+            return match.group(0).replace("'%?", "'?", 1)
+        return match.group(0)
+    return re.sub(rf"\b(\w+)\.(\w+)\s+LIKE\s+'%\?%?'", _rewrite, sql, flags=re.IGNORECASE)
+
+
+def evaluate_candidates(conn, schema, workload, candidates, samples, seed):
+    """후보 인덱스 하나씩 만들어 영향받는 지문의 실행 비용 / 계획을 기존 인덱스만 있을 때와 비교"""
+    binder = Binder(conn, schema, seed)
+    by_id = {fingerprint['id']: fingerprint for fingerprint in workload}
+
+    def measure(sql):
+        costs = [run_cost(conn, binder.bind(sql, index)) for index in range(samples)]
+        if any(cost is None for cost in costs):
+            return None
+        return sum(cost[0] for cost in costs) / samples
+
+    for fingerprint in workload:
+        fingerprint['steps'] = measure(fingerprint['sql'])
+
+    for candidate in candidates:
+        candidate.update({'steps_before': 0.0, 'steps_after': 0.0, 'saved_steps': 0.0, 'saved_ms': 0.0,
+                          'executions': 0, 'plan_uses_index': None, 'unmeasured': []})
+        affected = [by_id[key] for key in candidate['fingerprints']]
+        candidate['executions'] = sum(fingerprint['count'] for fingerprint in affected)
+        if candidate['kind'] == 'fulltext':
+            # SQLite 대역 DB 로는 ngram FULLTEXT 를 재현할 수 없으므로 현재 비용 전체를 효과 상한으로 표시
+            for fingerprint in affected:
+                if fingerprint['steps'] is not None:
+                    candidate['steps_before'] += fingerprint['count'] * fingerprint['steps']
+                    candidate['saved_ms'] += fingerprint['total_ms']
+            candidate['saved_steps'] = candidate['steps_before']
+            continue
+
+        name = f"candidate_{candidate['table']}_{'_'.join(candidate['columns'])}"
+        conn.execute(f"CREATE INDEX {name} ON {candidate['table']} ({', '.join(candidate['columns'])})")
+        conn.execute(f"ANALYZE {name}")
+        try:
+            uses_index = False
+            for fingerprint in affected:
+                sql = fingerprint['sql']
+                if candidate['columns'][0] in fingerprint['usage'][candidate['table']].get('contains', []):
+                    aliases = table_aliases(schema, sql)
+                    sql = prefix_rewrite(sql, lambda alias: aliases.get(alias.lower()),
+                                         candidate['table'], candidate['columns'][0])
+                after = measure(sql)
+                if fingerprint['steps'] is None or after is None:
+                    candidate['unmeasured'].append(fingerprint['id'])
+                    continue
+                uses_index |= any(name in detail for detail in query_plan(conn, binder.bind(sql, 0)))
+                before = fingerprint['steps']
+                candidate['steps_before'] += fingerprint['count'] * before
+                candidate['steps_after'] += fingerprint['count'] * after
+                if before:
+                    candidate['saved_ms'] += fingerprint['total_ms'] * max(0.0, 1 - after / before)
+            candidate['saved_steps'] = candidate['steps_before'] - candidate['steps_after']
+            candidate['plan_uses_index'] = uses_index
+        finally:
+            conn.execute(f"DROP INDEX {name}")
+    return candidates
+
+
+# ---------------------------------------------------------------------------
+# 보고서
+# ---------------------------------------------------------------------------
+
+def print_workload(workload, limit):
+    total_ms = sum(fingerprint['total_ms'] for fingerprint in workload) or 1.0
+    print(f"\n워크로드: 지문 {len(workload)}개 / 실행 {sum(f['count'] for f in workload)}회 "
+          f"/ 총 {sum(f['total_ms'] for f in workload):.1f}ms")
+    print(f"{'지문':<14}{'실행':>6}{'평균(ms)':>10}{'비중':>8}{'VM 명령':>10}  SQL")
+    for fingerprint in workload[:limit]:
+        steps = f"{fingerprint['steps']:.0f}" if fingerprint.get('steps') is not None else '-'
+        sql = fingerprint['sql'] if len(fingerprint['sql']) <= 90 else fingerprint['sql'][:87] + '...'
+        print(f"{fingerprint['id']:<14}{fingerprint['count']:>6}{fingerprint['avg_ms']:>10.2f}"
+              f"{fingerprint['total_ms'] / total_ms:>8.1%}{steps:>10}  {sql}")
+
+
+def print_candidates(candidates, min_gain):
+    useful = [c for c in candidates if c['steps_before'] and c['saved_steps'] / c['steps_before'] >= min_gain]
+    useless = [c for c in candidates if c not in useful]
+    print(f"\n인덱스 제안 (SQLite 대역 DB 실행 비용 감소 {min_gain:.0%} 이상, 절감량 순)")
+    print(f"{'감소':>7}{'절감 VM 명령':>14}{'절감(ms)':>10}{'지문':>6}{'실행':>6}{'계획':>6}  DDL (MySQL)")
+    for candidate in sorted(useful, key=lambda c: -c['saved_steps']):
+        gain = candidate['saved_steps'] / candidate['steps_before']
+        plan = {True: '사용', False: '미사용', None: 'n/a'}[candidate['plan_uses_index']]
+        prefix = '≤' if candidate['kind'] == 'fulltext' else ''
+        print(f"{prefix + format(gain, '.0%'):>7}{candidate['saved_steps']:>14.0f}{candidate['saved_ms']:>10.2f}"
+              f"{len(candidate['fingerprints']):>6}{candidate['executions']:>6}{plan:>6}  {index_ddl(candidate)}")
+        for note in candidate['notes']:
+            print(f"{'':>49}- {note}")
+    if useless:
+        print("\n효과 없음 / 측정 불가:")
+        for candidate in useless:
+            reason = '실행 불가 지문만 있음' if not candidate['steps_before'] else (
+                f"감소 {candidate['saved_steps'] / candidate['steps_before']:.0%}")
+            print(f"  {index_ddl(candidate)} ({reason})")
+            for note in candidate['notes']:
+                print(f"    - {note}")
+
+
+def main():
+    from e2e_bench import CORPUS_PATH
+
+    parser = argparse.ArgumentParser(description='생성 SQL 워크로드 인덱스 분석')
+    parser.add_argument('--workload', action='append', default=[],
+                        help='SQL_WORKLOAD 로그 / sql_workload 이벤트 응답 파일 (여러 번 지정 가능, 없으면 코퍼스 재생)')
+    parser.add_argument('--variant', default='terraform-seoul', choices=['terraform', 'terraform-seoul'])
+    parser.add_argument('--corpus', default=CORPUS_PATH, help='코퍼스 재생에 쓸 질문 코퍼스 (jsonl: question / type / sql)')
+    parser.add_argument('--repeat', type=int, default=1, help='코퍼스 재생 횟수')
+    parser.add_argument('--scale', type=int, default=200, help='SQLite 대역 DB 행 수 배율 (코드 테이블 제외)')
+    parser.add_argument('--samples', type=int, default=5, help='지문마다 값을 바꿔 실행할 횟수')
+    parser.add_argument('--min-gain', type=float, default=0.1, help='제안할 최소 실행 비용 감소율')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--top', type=int, default=20, help='출력할 지문 수')
+    parser.add_argument('--json-out', help='분석 결과를 JSON 파일로 저장')
+    args = parser.parse_args()
+
+    if args.workload:
+        workload = load_workload(args.workload)
+    else:
+        print(f"워크로드 파일 없음 - {os.path.basename(args.corpus)} 를 {args.variant} Lambda 로 재생")
+        workload = replay_corpus_workload(args.variant, args.corpus, args.repeat)
+    if not workload:
+        print("분석할 SQL 지문이 없습니다")
+        return 1
+
+    schema = parse_schema()
+    started = time.perf_counter()
+    conn = build_standin(schema, args.scale, args.seed)
+    counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in schema['tables']}
+    print(f"SQLite 대역 DB: x{args.scale} ({', '.join(f'{t} {n}' for t, n in counts.items())}) "
+          f"{(time.perf_counter() - started) * 1000:.0f}ms")
+
+    candidates = propose_candidates(schema, workload)
+    evaluate_candidates(conn, schema, workload, candidates, args.samples, args.seed)
+    print_workload(workload, args.top)
+    print_candidates(candidates, args.min_gain)
+
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump({
+                'workload': workload,
+                'candidates': [dict(candidate, ddl=index_ddl(candidate)) for candidate in candidates],
+                'standin_rows': counts,
+            }, f, ensure_ascii=False, indent=2, default=list)
+        print(f"\n결과 저장: {args.json_out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
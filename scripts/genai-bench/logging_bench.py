@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+GenAI Lambda 로깅 오버헤드 벤치마크
+가짜 AWS 클라이언트(fake_aws.py, 지연 없음)로 lambda_handler 에 코퍼스를 재생하면서 로그 설정별
+호출당 소요 시간과 로그 출력량(줄 수 / 바이트)을 비교 (로그는 Lambda 런타임과 같은 형식으로 버퍼에 기록)
+--before-ref 를 주면 해당 git 리비전의 Lambda 코드를 같은 조건으로 측정해서 변경 전후를 비교
+
+사용법:
+    python3 scripts/genai-bench/logging_bench.py [--variant terraform-seoul] [--repeat 20] [--before-ref HEAD~1]
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+from bench_common import REPO_ROOT, load_lambda_module_path, percentile
+
+# (이름, Lambda 환경 변수) - 변경 후 코드에서 측정할 로그 설정
+CONFIGS = [
+    ('text', {}),
+    ('text+buffer', {'LOG_DEBUG_BUFFER_SIZE': '100'}),
+    ('json+buffer', {'LOG_FORMAT': 'json', 'LOG_DEBUG_BUFFER_SIZE': '100'}),
+    ('json+sample10%', {'LOG_FORMAT': 'json', 'LOG_SAMPLE_RATE': '0.1'}),
+    ('text+debug', {'LOG_LEVEL': 'DEBUG'}),
+]
+
+# Lambda Python 런타임 기본 로그 형식
+LAMBDA_LOG_FORMAT = '[%(levelname)s]\t%(asctime)s.%(msecs)03dZ\t%(request_id)s\t%(message)s\n'
+
+
+class _RequestIdDefault(logging.Filter):
+    """변경 전 코드에는 request_id 속성이 없으므로 런타임 필터처럼 기본값을 채움"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = 'bench'
+        return True
+
+
+def run_worker(args):
+    """하위 프로세스: 지정한 Lambda 디렉토리를 import 해서 측정 후 JSON 한 줄 출력"""
+    from e2e_bench import BenchContext, ScriptedResponder, load_corpus
+    from fake_aws import FakeBedrockRuntime, FakeRdsData, install_fake_boto3
+
+    corpus = load_corpus(args.corpus)
+    questions = [item['question'] for item in corpus]
+    os.environ.setdefault('DB_CLUSTER_ARN', 'arn:aws:rds:local:000000000000:cluster:genai-bench')
+    os.environ.setdefault('DB_SECRET_ARN', 'arn:aws:secretsmanager:local:000000000000:secret:genai-bench')
+    for assignment in args.env:
+        key, _, value = assignment.partition('=')
+        os.environ[key] = value
+
+    output = io.StringIO()
+    handler = logging.StreamHandler(output)
+    handler.addFilter(_RequestIdDefault())
+    handler.setFormatter(logging.Formatter(LAMBDA_LOG_FORMAT))
+    logging.getLogger().addHandler(handler)
+
+    install_fake_boto3({
+        'bedrock-runtime': FakeBedrockRuntime(ScriptedResponder(corpus), latency_scale=0),
+        'rds-data': FakeRdsData(latency_ms=0),
+    })
+    sys.path.insert(0, args.lambda_dir)
+    import lambda_function as lf
+
+    def _invoke(question, request_id):
+        event = {'question': question}
+        response = lf.lambda_handler(event, BenchContext(request_id))
+        if response.get('statusCode') != 200:
+            raise RuntimeError(f"lambda_handler 오류 응답: {response}")
+
+    _invoke(questions[0], 'bench-warmup')
+    output.seek(0)
+    output.truncate()
+
+    durations = []
+    for round_index in range(args.repeat):
+        for position, question in enumerate(questions):
+            started = time.perf_counter()
+            _invoke(question, f'bench-{round_index}-{position}')
+            durations.append((time.perf_counter() - started) * 1e6)
+
+    text = output.getvalue()
+    invocations = len(durations)
+    print(json.dumps({
+        'invocations': invocations,
+        'mean_us': sum(durations) / invocations,
+        'p50_us': percentile(durations, 50),
+        'p95_us': percentile(durations, 95),
+        'lines_per_invocation': sum(1 for line in text.splitlines() if line.strip()) / invocations,
+        'bytes_per_invocation': len(text.encode('utf-8')) / invocations,
+    }))
+
+
+def export_revision(ref, variant, target):
+    """git 리비전의 Lambda 디렉토리를 임시 디렉토리에 풀어서 경로 반환"""
+    path = f'{variant}/layers/06-lambda-genai'
+    archive = subprocess.run(['git', 'archive', '--format=tar', ref, path], cwd=REPO_ROOT,
+                             check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+    return os.path.join(target, path)
+
+
+def measure(lambda_dir, env, args):
+    command = [sys.executable, os.path.abspath(__file__), '--worker', '--lambda-dir', lambda_dir,
+               '--corpus', args.corpus, '--repeat', str(args.repeat)]
+    for key, value in env.items():
+        command += ['--env', f'{key}={value}']
+    completed = subprocess.run(command, check=True, capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    from e2e_bench import CORPUS_PATH
+
+    parser = argparse.ArgumentParser(description='GenAI Lambda 로깅 오버헤드 벤치마크')
+    parser.add_argument('--variant', default='terraform-seoul', choices=['terraform', 'terraform-seoul'])
+    parser.add_argument('--corpus', default=CORPUS_PATH, help='질문 코퍼스 (jsonl: question / type / sql)')
+    parser.add_argument('--repeat', type=int, default=20, help='코퍼스 재생 횟수')
+    parser.add_argument('--before-ref', help='변경 전 코드로 비교할 git 리비전 (예: HEAD~1)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--lambda-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--env', action='append', default=[], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return 0
+
+    lambda_dir = load_lambda_module_path(args.variant)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.before_ref:
+            before_dir = export_revision(args.before_ref, args.variant, workdir)
+            results.append((f'before ({args.before_ref})', measure(before_dir, {}, args)))
+        for name, env in CONFIGS:
+            results.append((name, measure(lambda_dir, env, args)))
+
+    reference = results[0][1]['p50_us']
+    print(f"{args.variant} / 호출 {results[0][1]['invocations']}회 (가짜 AWS, 지연 없음)\n")
+    print(f"{'설정':<22}{'평균(us)':>10}{'p50(us)':>10}{'p95(us)':>10}{'p50 대비':>10}{'줄/호출':>9}{'바이트/호출':>12}")
+    for name, result in results:
+        change = (result['p50_us'] - reference) / reference * 100
+        print(f"{name:<22}{result['mean_us']:>10.0f}{result['p50_us']:>10.0f}{result['p95_us']:>10.0f}"
+              f"{change:>+9.1f}%{result['lines_per_invocation']:>9.1f}{result['bytes_per_invocation']:>12.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
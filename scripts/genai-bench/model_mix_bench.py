@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+GenAI Lambda 단계별 모델 조합 비교 벤치마크
+모델 조합(BEDROCK_MODEL_ID + BEDROCK_<단계>_MODEL_ID)마다 e2e_bench.py 를 별도 프로세스로 실행해서
+단계별(분류 / SQL 생성 / 답변) 지연 시간과 모델 단가로 계산한 1천 요청당 Bedrock 비용을 비교
+가짜 Bedrock 의 모델별 지연은 fake_aws.MODEL_LATENCY, 토큰 수는 문자 수 추정값 (프롬프트 캐시 할인 미반영)
+
+조합 형식: 'sonnet' (모든 단계), 'sonnet,classify=haiku,sql=haiku' (지정하지 않은 단계는 첫 모델)
+모델은 별칭(MODEL_ALIASES) 또는 모델 ID
+
+사용법:
+    python3 scripts/genai-bench/model_mix_bench.py [--variant terraform-seoul] [--repeat 2] [--latency-scale 0.1]
+        [--mix haiku --mix sonnet --mix sonnet,classify=haiku,sql=haiku] [--price anthropic.claude-3-haiku=0.25/1.25]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from e2e_bench import CORPUS_PATH
+
+MODEL_ALIASES = {
+    'haiku': 'anthropic.claude-3-haiku-20240307-v1:0',
+    'haiku-3-5': 'anthropic.claude-3-5-haiku-20241022-v1:0',
+    'sonnet': 'anthropic.claude-3-5-sonnet-20240620-v1:0',
+    'sonnet-3': 'anthropic.claude-3-sonnet-20240229-v1:0',
+    'titan': 'amazon.titan-text-express-v1',
+    'llama': 'meta.llama3-8b-instruct-v1:0',
+}
+
+# 모델 접두사별 (입력, 출력) 100만 토큰당 USD (us-east-1 온디맨드) - 접두사가 긴 항목부터 매칭, --price 로 변경
+MODEL_PRICES = {
+    'anthropic.claude-3-haiku': (0.25, 1.25),
+    'anthropic.claude-3-5-haiku': (0.80, 4.00),
+    'anthropic.claude-3-5-sonnet': (3.00, 15.00),
+    'anthropic.claude-3-sonnet': (3.00, 15.00),
+    'amazon.titan-text-express': (0.20, 0.60),
+    'meta.llama3-8b': (0.30, 0.60),
+}
+
+DEFAULT_MIXES = ['haiku', 'sonnet', 'sonnet,classify=haiku,sql=haiku']
+
+# (단계, e2e_bench 단계별 시간 이름) - 플래너 호출은 단계 시간을 따로 재지 않음
+STAGE_TIMINGS = [('classify', 'classify_bedrock'), ('sql', 'sql_generate'), ('plan', None), ('answer', 'answer')]
+
+
+def resolve_model(name):
+    return MODEL_ALIASES.get(name, name)
+
+
+def parse_mix(spec):
+    """'sonnet,classify=haiku' → {'BEDROCK_MODEL_ID': ..., 'BEDROCK_CLASSIFY_MODEL_ID': ...}"""
+    env = {}
+    for item in spec.split(','):
+        stage, _, model = item.strip().rpartition('=')
+        if stage:
+            env[f'BEDROCK_{stage.upper()}_MODEL_ID'] = resolve_model(model)
+        else:
+            env['BEDROCK_MODEL_ID'] = resolve_model(model)
+    if 'BEDROCK_MODEL_ID' not in env:
+        raise SystemExit(f"조합에 기본 모델이 없습니다: {spec}")
+    return env
+
+
+def model_price(model_id, prices):
+    for prefix in sorted(prices, key=len, reverse=True):
+        if model_id.startswith(prefix) or f'.{prefix}' in model_id:
+            return prices[prefix]
+    raise SystemExit(f"모델 단가가 없습니다: {model_id} (--price {model_id}=입력/출력 으로 지정)")
+
+
+def measure(spec, args):
+    """조합 하나로 e2e_bench.py 실행 → 결과 JSON"""
+    with tempfile.TemporaryDirectory() as workdir:
+        output = os.path.join(workdir, 'result.json')
+        command = [sys.executable, 'e2e_bench.py', '--variant', args.variant, '--corpus', args.corpus,
+                   '--repeat', str(args.repeat), '--latency-scale', str(args.latency_scale), '--json-out', output]
+        for key, value in parse_mix(spec).items():
+            command += ['--env', f'{key}={value}']
+        for assignment in args.env:
+            command += ['--env', assignment]
+        subprocess.run(command, check=True, capture_output=True, text=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        with open(output, encoding='utf-8') as f:
+            return json.load(f)
+
+
+def stage_cost(models, prices):
+    """{모델 ID: 사용량} → (호출 수, USD)"""
+    calls, cost = 0, 0.0
+    for model_id, usage in models.items():
+        input_price, output_price = model_price(model_id, prices)
+        calls += usage['calls']
+        cost += (usage['input_tokens'] * input_price + usage['output_tokens'] * output_price) / 1e6
+    return calls, cost
+
+
+def print_report(results, prices):
+    print(f"{'조합':<36}{'단계':<10}{'모델':<42}{'호출/요청':>10}{'p50':>9}{'p95':>9}{'$/1k 요청':>11}")
+    for spec, result in results:
+        requests = result['config']['questions'] * result['config']['repeat']
+        usage = result.get('bedrock_usage', {})
+        total_cost = 0.0
+        for stage, timing in STAGE_TIMINGS:
+            models = usage.get(stage, {})
+            if not models:
+                continue
+            calls, cost = stage_cost(models, prices)
+            total_cost += cost
+            stats = result['stages'].get(timing, {}) if timing else {}
+            p50 = f"{stats['p50']:>9.1f}" if stats.get('count') else f"{'-':>9}"
+            p95 = f"{stats['p95']:>9.1f}" if stats.get('count') else f"{'-':>9}"
+            print(f"{spec:<36}{stage:<10}{', '.join(sorted(models)):<42}{calls / requests:>10.2f}{p50}{p95}"
+                  f"{cost / requests * 1000:>11.4f}")
+        total = result['stages']['total']
+        print(f"{spec:<36}{'total':<10}{'':<42}{'':>10}{total['p50']:>9.1f}{total['p95']:>9.1f}"
+              f"{total_cost / requests * 1000:>11.4f}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GenAI Lambda 단계별 모델 조합 지연 / 비용 비교')
+    parser.add_argument('--variant', default='terraform-seoul', choices=['terraform', 'terraform-seoul'])
+    parser.add_argument('--corpus', default=CORPUS_PATH, help='질문 코퍼스 (jsonl: question / type / sql)')
+    parser.add_argument('--repeat', type=int, default=2, help='조합별 코퍼스 재생 횟수')
+    parser.add_argument('--latency-scale', type=float, default=0.1, help='모델 계열별 지연(MODEL_LATENCY) 배율')
+    parser.add_argument('--mix', action='append', default=[],
+                        help=f"모델 조합 (여러 번 지정 가능, 기본: {' / '.join(DEFAULT_MIXES)})")
+    parser.add_argument('--price', action='append', default=[],
+                        help='모델 접두사별 100만 토큰당 단가 (MODEL=입력/출력, 예: anthropic.claude-3-haiku=0.25/1.25)')
+    parser.add_argument('--env', action='append', default=[], help='모든 조합에 공통인 Lambda 환경 변수 (KEY=VALUE)')
+    args = parser.parse_args()
+
+    prices = dict(MODEL_PRICES)
+    for assignment in args.price:
+        model, _, value = assignment.partition('=')
+        input_price, _, output_price = value.partition('/')
+        prices[resolve_model(model)] = (float(input_price), float(output_price))
+
+    results = [(spec, measure(spec, args)) for spec in args.mix or DEFAULT_MIXES]
+    first = results[0][1]['config']
+    print(f"{args.variant} / 질문 {first['questions']}개 x {first['repeat']}회 (지연 배율 {args.latency_scale})"
+          + (f" / 환경 변수: {' '.join(args.env)}" if args.env else '') + '\n')
+    print_report(results, prices)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
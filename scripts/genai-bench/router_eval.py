@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+로컬 의도 분류기(intent_router) 평가 스크립트
+lambda_function.py 프롬프트에 포함된 예시 질문 + intent_corpus.jsonl 을 정답 코퍼스로 사용해서
+적중률(LLM 호출 생략 비율), 적중 정확도, 분류 지연 시간을 출력
+
+사용법:
+    python3 scripts/genai-bench/router_eval.py [--variant terraform-seoul] [--min-confidence 0.75]
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import sys
+import time
+
+from bench_common import load_lambda_module_path, percentile, REPO_ROOT
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def read_prompt_constants(lambda_path):
+    """boto3 없이 lambda_function.py 의 문자열 상수만 읽기"""
+    with open(lambda_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    constants[target.id] = node.value.value
+    return constants
+
+
+def build_corpus(lambda_path):
+    """프롬프트 예시 질문과 추가 코퍼스 파일로 (질문, 정답 유형) 목록 생성"""
+    constants = read_prompt_constants(lambda_path)
+    corpus = []
+
+    current_type = None
+    for line in constants.get('QUESTION_TYPE_EXAMPLES', '').splitlines():
+        if line.startswith('DATABASE_QUERY'):
+            current_type = 'DATABASE_QUERY'
+        elif line.startswith('GENERAL_ADVICE'):
+            current_type = 'GENERAL_ADVICE'
+        match = re.match(r'- "(.+?)"', line)
+        if match and current_type:
+            corpus.append({'question': match.group(1), 'type': current_type, 'source': 'prompt'})
+
+    # SQL 예시 질문은 모두 데이터베이스 조회 질문
+    for match in re.finditer(r'질문: "(.+?)"', constants.get('SQL_EXAMPLES', '')):
+        corpus.append({'question': match.group(1), 'type': 'DATABASE_QUERY', 'source': 'prompt'})
+
+    corpus_path = os.path.join(HERE, 'intent_corpus.jsonl')
+    with open(corpus_path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                corpus.append(dict(json.loads(line), source='corpus'))
+
+    # 중복 질문 제거
+    seen = set()
+    unique = []
+    for item in corpus:
+        if item['question'] not in seen:
+            seen.add(item['question'])
+            unique.append(item)
+    return unique
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 의도 분류기 평가')
+    parser.add_argument('--variant', default='terraform-seoul', choices=['terraform', 'terraform-seoul'])
+    parser.add_argument('--min-confidence', type=float, default=0.75)
+    parser.add_argument('--iterations', type=int, default=200, help='지연 시간 측정 반복 횟수')
+    args = parser.parse_args()
+
+    lambda_dir = load_lambda_module_path(args.variant)
+    from intent_router import IntentRouter
+
+    corpus = build_corpus(os.path.join(lambda_dir, 'lambda_function.py'))
+    router = IntentRouter(min_confidence=args.min_confidence)
+
+    correct = 0
+    misrouted = []
+    fallbacks = []
+    for item in corpus:
+        decision = router.route(item['question'])
+        if decision is None:
+            fallbacks.append(item)
+        elif decision['type'] == item['type']:
+            correct += 1
+        else:
+            misrouted.append((item, decision))
+
+    latencies = []
+    for _ in range(args.iterations):
+        for item in corpus:
+            started = time.perf_counter()
+            router.classify(item['question'])
+            latencies.append((time.perf_counter() - started) * 1_000_000)
+
+    hits = len(corpus) - len(fallbacks)
+    print(f"코퍼스: {len(corpus)}개 질문 ({os.path.relpath(lambda_dir, REPO_ROOT)})")
+    print(f"적중률 (LLM 분류 생략): {hits / len(corpus):.1%} ({hits}/{len(corpus)})")
+    print(f"적중 정확도: {correct / hits:.1%} ({correct}/{hits})" if hits else "적중 정확도: -")
+    print(f"분류 지연 시간: p50 {percentile(latencies, 50):.1f}us / "
+          f"p95 {percentile(latencies, 95):.1f}us / p99 {percentile(latencies, 99):.1f}us")
+
+    if misrouted:
+        print("\n잘못 분류된 질문:")
+        for item, decision in misrouted:
+            print(f"  - {item['question']} (정답 {item['type']}, 분류 {decision['type']}, 신뢰도 {decision['confidence']:.2f})")
+    if fallbacks:
+        print("\nLLM 분류로 넘어간 질문:")
+        for item in fallbacks:
+            decision = router.classify(item['question'])
+            print(f"  - {item['question']} ({decision['type']}, 신뢰도 {decision['confidence']:.2f})")
+
+    return 1 if misrouted else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
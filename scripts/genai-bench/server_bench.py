@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+GenAI 비동기 서버 처리량 / 비용 비교 벤치마크
+e2e_bench.py 와 같은 가짜 bedrock-runtime / rds-data 로 async_server.py 를 프로세스 안에서 띄우고
+동시 연결 수별로 코퍼스를 재생해서 처리량과 지연 시간을 측정한 뒤 1천 요청당 Lambda / Fargate 비용을 추정
+--bedrock-max-concurrency 를 지정하면 가짜 Bedrock 이 그 수를 넘는 동시 호출을 ThrottlingException 으로 거절
+(BEDROCK_LIMITER_ENABLED=true 와 비교해서 버스트에서 AI 오류 답변 수 / 처리량 확인)
+
+Lambda 는 컨테이너가 한 번에 요청 하나만 처리하므로 요청 지연 시간 전체가 과금 시간,
+서버는 태스크 시간당 비용을 측정한 처리량(목표 사용률 반영)으로 나눈 값
+
+사용법:
+    python3 scripts/genai-bench/server_bench.py [--variant terraform-seoul] [--concurrency 1,8,32] [--requests 200]
+        [--latency-scale 1.0] [--max-workers 32] [--env ANSWER_CACHE_ENABLED=true] [--bedrock-max-concurrency 8]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+from bench_common import load_lambda_module_path, percentile
+from e2e_bench import CORPUS_PATH, ScriptedResponder, load_corpus
+from fake_aws import FakeBedrockRuntime, FakeRdsData, install_fake_boto3
+
+# 기본 단가 (us-east-1 온디맨드, x86) - 리전 / 약정 가격은 옵션으로 지정
+LAMBDA_GB_SECOND_PRICE = 0.0000166667
+LAMBDA_REQUEST_PRICE_PER_MILLION = 0.20
+FARGATE_VCPU_HOUR_PRICE = 0.04048
+FARGATE_GB_HOUR_PRICE = 0.004445
+
+
+class Client:
+    """keep-alive 연결 하나로 POST /genai 를 순서대로 보내는 클라이언트"""
+
+    def __init__(self, port):
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def post(self, question):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+        data = json.dumps({'question': question}, ensure_ascii=False).encode('utf-8')
+        self.writer.write(f'POST /genai HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n'
+                          f'Content-Length: {len(data)}\r\n\r\n'.encode('latin-1') + data)
+        await self.writer.drain()
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split()[1])
+        headers = {name.lower(): value.strip() for name, _, value in (line.partition(':') for line in lines[1:] if line)}
+        payload = await self.reader.readexactly(int(headers.get('content-length', '0')))
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def is_ai_error(status, payload):
+    """Bedrock 호출 실패로 만든 답변 (lambda_function.call_bedrock_ai 는 오류도 200 + 오류 문장으로 응답)"""
+    if status != 200:
+        return False
+    try:
+        return json.loads(payload).get('answer', '').startswith('AI 서비스 오류')
+    except ValueError:
+        return False
+
+
+async def run_level(port, questions, concurrency, total):
+    """동시 연결 concurrency 개로 total 요청 → (지연 시간 목록, 상태 코드별 수, AI 오류 답변 수, 소요 초, CPU 초)
+
+    CPU 초는 같은 프로세스의 벤치 클라이언트 / 가짜 AWS 클라이언트 시간까지 포함 (서버 CPU 를 크게 잡는 쪽)
+    """
+    latencies = []
+    statuses = {}
+    ai_errors = [0]
+    queue = asyncio.Queue()
+    for index in range(total):
+        queue.put_nowait(questions[index % len(questions)])
+
+    async def worker():
+        client = Client(port)
+        try:
+            while True:
+                try:
+                    question = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                status, payload = await client.post(question)
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+                ai_errors[0] += is_ai_error(status, payload)
+        finally:
+            client.close()
+
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latencies, statuses, ai_errors[0], time.perf_counter() - started, time.process_time() - cpu_started
+
+
+def estimate_costs(level, args):
+    """1천 요청당 비용 추정 (Lambda: 평균 지연 x 메모리, 서버: 태스크 시간당 비용 / 처리량)"""
+    lambda_per_1k = 1000 * (level['mean_ms'] / 1000 * args.lambda_memory_mb / 1024 * args.lambda_gb_second_price
+                            + args.lambda_request_price / 1_000_000)
+    task_hour = args.task_vcpu * args.fargate_vcpu_hour_price + args.task_memory_gb * args.fargate_gb_hour_price
+    # 측정 처리량과 CPU 시간 기준 상한(태스크 vCPU 를 다 쓸 때) 중 작은 값
+    cpu_bound_rps = args.task_vcpu / level['cpu_ms_per_request'] * 1000 if level['cpu_ms_per_request'] else float('inf')
+    rps = min(level['throughput_rps'], cpu_bound_rps) * args.utilization
+    server_per_1k = task_hour / (rps * 3600) * 1000 if rps else float('inf')
+    return {'lambda_per_1k': round(lambda_per_1k, 6), 'server_per_1k': round(server_per_1k, 6),
+            'cpu_bound_rps': round(cpu_bound_rps, 1)}
+
+
+async def run_server(args, questions, bedrock):
+    import async_server
+    server = async_server.create_server(args.max_workers)
+    await server.start('127.0.0.1', 0)
+    levels = []
+    try:
+        # 첫 요청(초기화 포함)은 측정에서 제외
+        warmup = Client(server.port)
+        await warmup.post(questions[0])
+        warmup.close()
+        for concurrency in args.concurrency:
+            throttled = bedrock.throttled
+            latencies, statuses, ai_errors, elapsed, cpu_seconds = await run_level(
+                server.port, questions, concurrency, args.requests)
+            level = {
+                'concurrency': concurrency,
+                'requests': len(latencies),
+                'statuses': {str(code): count for code, count in sorted(statuses.items())},
+                'ai_errors': ai_errors,
+                'bedrock_throttled': bedrock.throttled - throttled,
+                'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+                'p50_ms': round(percentile(latencies, 50), 2),
+                'p95_ms': round(percentile(latencies, 95), 2),
+                'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+                'cpu_ms_per_request': round(cpu_seconds * 1000 / len(latencies), 3) if latencies else 0.0,
+            }
+            level.update(estimate_costs(level, args))
+            levels.append(level)
+    finally:
+        stats = server.get_stats()
+        await server.shutdown()
+    return levels, stats
+
+
+def print_report(result):
+    config = result['config']
+    print(f"{config['variant']} / 질문 {config['questions']}개 / 동시 연결별 {config['requests']}요청 "
+          f"(지연 배율 {config['latency_scale']}, worker {config['max_workers']})")
+    if config['env']:
+        print(f"환경 변수: {' '.join(config['env'])}")
+    print(f"Lambda {config['lambda_memory_mb']}MB / 서버 태스크 {config['task_vcpu']} vCPU, {config['task_memory_gb']}GB "
+          f"(목표 사용률 {config['utilization']:.0%})")
+    if config['bedrock_max_concurrency']:
+        print(f"가짜 Bedrock 동시 호출 한도: {config['bedrock_max_concurrency']} (넘으면 ThrottlingException)")
+    print(f"\n{'동시 연결':>8}{'처리량/s':>10}{'p50':>9}{'p95':>9}{'CPU/요청':>10}{'CPU 상한/s':>11}"
+          f"{'Lambda/1k':>12}{'서버/1k':>12}{'스로틀링':>8}{'AI 오류':>8}  상태 코드")
+    for level in result['levels']:
+        print(f"{level['concurrency']:>8}{level['throughput_rps']:>10.1f}{level['p50_ms']:>9.1f}{level['p95_ms']:>9.1f}"
+              f"{level['cpu_ms_per_request']:>10.2f}{level['cpu_bound_rps']:>11.1f}"
+              f"{'$%.5f' % level['lambda_per_1k']:>12}{'$%.5f' % level['server_per_1k']:>12}"
+              f"{level['bedrock_throttled']:>8}{level['ai_errors']:>8}  {level['statuses']}")
+    server = result['server']
+    print(f"\n서버: 요청 {server['requests']} / 최대 동시 처리 {server['max_pending']} / 거절 {server['rejected']} / "
+          f"시간 초과 {server['timeouts']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GenAI 비동기 서버 처리량 / 비용 비교 벤치마크')
+    parser.add_argument('--variant', default='terraform-seoul', choices=['terraform', 'terraform-seoul'])
+    parser.add_argument('--corpus', default=CORPUS_PATH, help='질문 코퍼스 (jsonl: question / type / sql)')
+    parser.add_argument('--concurrency', default='1,8,32', help='동시 연결 수 목록 (쉼표 구분)')
+    parser.add_argument('--requests', type=int, default=200, help='동시 연결 수마다 보낼 요청 수')
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help='모델 계열별 지연(MODEL_LATENCY) 배율 (서버는 대기 시간 동안 다른 요청을 처리하므로 실제 지연 권장)')
+    parser.add_argument('--rds-latency-ms', type=float, default=20.0, help='Data API 호출당 추가 지연')
+    parser.add_argument('--max-workers', type=int, default=32, help='서버 동시 처리 요청 수 (SERVER_MAX_WORKERS)')
+    parser.add_argument('--bedrock-max-concurrency', type=int,
+                        help='가짜 Bedrock 동시 호출 한도 (넘는 호출은 ThrottlingException, 지정하지 않으면 제한 없음)')
+    parser.add_argument('--env', action='append', default=[], help='환경 변수 (KEY=VALUE, 여러 번 지정 가능)')
+    parser.add_argument('--lambda-memory-mb', type=int, default=512)
+    parser.add_argument('--lambda-gb-second-price', type=float, default=LAMBDA_GB_SECOND_PRICE)
+    parser.add_argument('--lambda-request-price', type=float, default=LAMBDA_REQUEST_PRICE_PER_MILLION,
+                        help='Lambda 요청 100만 건당 가격')
+    parser.add_argument('--task-vcpu', type=float, default=0.5)
+    parser.add_argument('--task-memory-gb', type=float, default=1.0)
+    parser.add_argument('--fargate-vcpu-hour-price', type=float, default=FARGATE_VCPU_HOUR_PRICE)
+    parser.add_argument('--fargate-gb-hour-price', type=float, default=FARGATE_GB_HOUR_PRICE)
+    parser.add_argument('--utilization', type=float, default=0.6, help='서버 태스크 평균 목표 사용률 (0~1)')
+    parser.add_argument('--json-out', help='결과를 JSON 파일로 저장')
+    args = parser.parse_args()
+    args.concurrency = [int(value) for value in args.concurrency.split(',') if value.strip()]
+
+    logging.basicConfig(level=logging.ERROR, format='%(levelname)s %(message)s')
+    corpus = load_corpus(args.corpus)
+    questions = [item['question'] for item in corpus]
+
+    # lambda_function 은 import 시점에 환경 변수를 읽으므로 먼저 설정
+    os.environ.setdefault('DB_CLUSTER_ARN', 'arn:aws:rds:local:000000000000:cluster:genai-bench')
+    os.environ.setdefault('DB_SECRET_ARN', 'arn:aws:secretsmanager:local:000000000000:secret:genai-bench')
+    os.environ.setdefault('LOG_LEVEL', 'ERROR')
+    for assignment in args.env:
+        key, _, value = assignment.partition('=')
+        os.environ[key] = value
+    bedrock = FakeBedrockRuntime(ScriptedResponder(corpus), latency_scale=args.latency_scale,
+                                 max_concurrency=args.bedrock_max_concurrency)
+    install_fake_boto3({
+        'bedrock-runtime': bedrock,
+        'rds-data': FakeRdsData(latency_ms=args.rds_latency_ms),
+    })
+    load_lambda_module_path(args.variant)
+
+    levels, server_stats = asyncio.run(run_server(args, questions, bedrock))
+    result = {
+        'config': {
+            'variant': args.variant, 'questions': len(questions), 'requests': args.requests,
+            'latency_scale': args.latency_scale, 'max_workers': args.max_workers, 'env': args.env,
+            'bedrock_max_concurrency': args.bedrock_max_concurrency,
+            'lambda_memory_mb': args.lambda_memory_mb, 'task_vcpu': args.task_vcpu,
+            'task_memory_gb': args.task_memory_gb, 'utilization': args.utilization,
+        },
+        'levels': levels,
+        'server': server_stats,
+    }
+    print_report(result)
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.json_out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Bedrock 응답 스트리밍 평가 스크립트
+로컬 가짜 이벤트 스트림(토큰 간격 지정)을 bedrock_stream.py 로 파싱해서
+일반 호출(전체 답변 대기)과 스트리밍 호출의 첫 바이트 시간(TTFB)을 비교
+
+사용법:
+    python3 scripts/genai-bench/stream_eval.py [--variant terraform-seoul] [--tokens 200] [--token-interval-ms 15]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from bench_common import load_lambda_module_path
+
+SAMPLE_TEXT = 'George Franklin님이 Leo를 키우고 있습니다. 최근 방문일은 2013-01-01이며 예방접종을 받았습니다. '
+
+
+def fake_event_stream(model_id, tokens, interval_ms, first_token_ms):
+    """invoke_model_with_response_stream 응답 body 와 같은 형식의 이벤트 스트림"""
+    def chunk(payload):
+        return {'chunk': {'bytes': json.dumps(payload, ensure_ascii=False).encode('utf-8')}}
+
+    time.sleep(first_token_ms / 1000)
+    if 'titan' not in model_id and 'llama' not in model_id:
+        yield chunk({'type': 'message_start', 'message': {'role': 'assistant'}})
+    for i in range(tokens):
+        if i:
+            time.sleep(interval_ms / 1000)
+        text = SAMPLE_TEXT[(i * 4) % len(SAMPLE_TEXT):][:4] or SAMPLE_TEXT[:4]
+        if 'titan' in model_id:
+            yield chunk({'outputText': text, 'index': 0})
+        elif 'llama' in model_id:
+            yield chunk({'generation': text})
+        else:
+            yield chunk({'type': 'content_block_delta', 'index': 0, 'delta': {'type': 'text_delta', 'text': text}})
+    yield chunk({'type': 'message_stop', 'amazon-bedrock-invocationMetrics': {'inputTokenCount': 120, 'outputTokenCount': tokens}})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bedrock 응답 스트리밍 평가')
+    parser.add_argument('--variant', default='terraform-seoul', choices=['terraform', 'terraform-seoul'])
+    parser.add_argument('--model-id', default='anthropic.claude-3-haiku-20240307-v1:0')
+    parser.add_argument('--tokens', type=int, default=200, help='가짜 스트림 토큰 수')
+    parser.add_argument('--token-interval-ms', type=float, default=15.0, help='토큰 사이 간격')
+    parser.add_argument('--first-token-ms', type=float, default=400.0, help='첫 토큰까지의 모델 지연')
+    args = parser.parse_args()
+
+    load_lambda_module_path(args.variant)
+    from bedrock_stream import format_sse, iter_stream_text
+
+    # 일반 호출: 전체 답변을 모은 뒤 한 번에 응답
+    started = time.perf_counter()
+    buffered = ''.join(iter_stream_text(args.model_id, fake_event_stream(
+        args.model_id, args.tokens, args.token_interval_ms, args.first_token_ms)))
+    buffered_ms = (time.perf_counter() - started) * 1000
+
+    # 스트리밍 호출: 첫 텍스트 조각이 도착하는 즉시 SSE 이벤트 전송
+    usage = {}
+    first_byte_ms = None
+    streamed = []
+    started = time.perf_counter()
+    for text in iter_stream_text(args.model_id, fake_event_stream(
+            args.model_id, args.tokens, args.token_interval_ms, args.first_token_ms), usage):
+        format_sse('token', {'text': text})
+        if first_byte_ms is None:
+            first_byte_ms = (time.perf_counter() - started) * 1000
+        streamed.append(text)
+    streamed_ms = (time.perf_counter() - started) * 1000
+
+    if ''.join(streamed) != buffered:
+        print("스트리밍 결과가 일반 호출 결과와 다릅니다")
+        return 1
+
+    print(f"모델: {args.model_id} / 토큰 {args.tokens}개 (간격 {args.token_interval_ms}ms, 첫 토큰 {args.first_token_ms}ms)")
+    print(f"일반 호출 TTFB: {buffered_ms:.1f}ms (전체 답변 완료 시점)")
+    print(f"스트리밍 TTFB: {first_byte_ms:.1f}ms / 전체 {streamed_ms:.1f}ms")
+    print(f"TTFB 단축: {buffered_ms - first_byte_ms:.1f}ms ({(1 - first_byte_ms / buffered_ms):.1%})")
+    print(f"토큰 사용량: {usage}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,17 @@
+"""
+GenAI Lambda 모듈 단위 테스트 공통 설정
+GENAI_VARIANT(기본 terraform-seoul) 변형의 Lambda 코드 경로를 import 경로에 추가
+
+사용법:
+    python3 -m pytest scripts/genai-bench/tests [-q]
+    GENAI_VARIANT=terraform python3 -m pytest scripts/genai-bench/tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_common import load_lambda_module_path  # noqa: E402
+
+load_lambda_module_path(os.getenv('GENAI_VARIANT', 'terraform-seoul'))
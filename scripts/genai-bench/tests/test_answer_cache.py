@@ -0,0 +1,119 @@
+"""answer_cache 답변 캐시 - TTL / LRU / 데이터 버전 무효화, 테이블 버전, 조회 실패 답변 미저장"""
+
+import os
+import time
+
+import pytest
+
+from fake_aws import install_fake_boto3, load_petclinic_sqlite
+
+install_fake_boto3({})
+os.environ.setdefault('CLIENT_EAGER_INIT', 'false')
+
+import lambda_function  # noqa: E402
+from answer_cache import AnswerCache, DataVersionTracker, SQLiteCacheStore, make_cache_key  # noqa: E402
+from local_replica import PETCLINIC_SCHEMA  # noqa: E402
+from table_versions import build_table_version_sql, digest_versions, parse_table_versions  # noqa: E402
+
+
+def test_cache_key_ignores_case_spacing_and_trailing_punctuation():
+    assert make_cache_key('Leo의 주인은  누구야?', 'm', 'v1') == make_cache_key('leo의 주인은 누구야', 'm', 'v1')
+    assert make_cache_key('Leo의 주인은 누구야', 'm', 'v1') != make_cache_key('Leo의 주인은 누구야', 'm', 'v2')
+
+
+def test_memory_lru_and_ttl(monkeypatch):
+    cache = AnswerCache(max_entries=2, ttl_seconds=10)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, {'answer': key}, 'v1')
+    assert cache.get('a') is None
+    assert cache.get('c') == {'answer': 'c'}
+
+    now = time.time()
+    monkeypatch.setattr('answer_cache.time.time', lambda: now + 11)
+    assert cache.get('c') is None
+    stats = cache.get_stats()
+    assert (stats['evictions'], stats['expirations']) == (1, 1)
+
+
+def test_store_tier_survives_memory_and_invalidation_keeps_current_version(tmp_path):
+    store = SQLiteCacheStore(str(tmp_path / 'cache.sqlite3'))
+    cache = AnswerCache(ttl_seconds=60, store=store)
+    cache.set('old', {'answer': 'old'}, 'v1')
+    cache.set('new', {'answer': 'new'}, 'v2')
+
+    cold = AnswerCache(ttl_seconds=60, store=store)
+    assert cold.get('old') == {'answer': 'old'}
+    assert cold.get_stats()['store_hits'] == 1
+
+    cold.invalidate(keep_version='v2')
+    assert cold.get('old') is None
+    assert cold.get('new') == {'answer': 'new'}
+
+
+def test_data_version_tracker_invalidates_on_change():
+    versions = iter(['v1', 'v1', 'v2'])
+    changes = []
+    tracker = DataVersionTracker(lambda: next(versions), ttl_seconds=0, on_change=changes.append)
+    assert [tracker.current() for _ in range(3)] == ['v1', 'v1', 'v2']
+    assert changes == ['v1', 'v2']
+
+    def fail():
+        raise RuntimeError('Data API 오류')
+    assert DataVersionTracker(fail).current() is None
+
+
+def test_table_versions_change_on_write_and_ignore_row_order():
+    conn = load_petclinic_sqlite()
+    sql = build_table_version_sql(PETCLINIC_SCHEMA)
+    before = parse_table_versions(conn.execute(sql).fetchall())
+    assert set(before) == set(PETCLINIC_SCHEMA)
+
+    conn.execute("UPDATE owners SET city = 'Seoul' WHERE id = 1")
+    after = parse_table_versions(conn.execute(sql).fetchall())
+    assert after['owners'] != before['owners']
+    assert after['pets'] == before['pets']
+    assert digest_versions(after) != digest_versions(before)
+    assert digest_versions(dict(reversed(list(after.items())))) == digest_versions(after)
+
+
+@pytest.fixture
+def cached_pipeline(monkeypatch):
+    """정적 데이터 버전 + 메모리 캐시로 답변 캐시를 켜고 Bedrock 호출을 고정 답변으로 대체"""
+    monkeypatch.setenv('ANSWER_CACHE_ENABLED', 'true')
+    monkeypatch.setenv('ANSWER_CACHE_STORE', 'none')
+    monkeypatch.setenv('ANSWER_CACHE_DATA_VERSION', 'static')
+    monkeypatch.setenv('SINGLE_FLIGHT_ENABLED', 'false')
+    monkeypatch.setenv('SPECULATIVE_ADVICE_ENABLED', 'false')
+    monkeypatch.setattr(lambda_function, 'answer_cache', None)
+    monkeypatch.setattr(lambda_function, 'analyze_question', lambda question: {'type': 'DATABASE_QUERY'})
+    monkeypatch.setattr(lambda_function, 'call_bedrock_ai',
+                        lambda question, context_data, is_general_advice=False: '일반 상담 답변')
+    monkeypatch.setattr(lambda_function, 'resolve_question_sql',
+                        lambda question, sql_info=None: {'database': 'petclinic', 'sql': 'SELECT 1'})
+    return lambda_function
+
+
+def test_database_failure_falls_back_without_caching(cached_pipeline, monkeypatch):
+    def fail(sql_info):
+        raise RuntimeError('Aurora 재개 중')
+    monkeypatch.setattr(cached_pipeline, 'fetch_question_rows', fail)
+
+    result = cached_pipeline.run_cached_genai_pipeline('Leo의 주인은 누구야?')
+    assert result['data_source'] == 'general_advice_fallback'
+    assert result['answer'] == '일반 상담 답변'
+    assert cached_pipeline.answer_cache.get_stats()['sets'] == 0
+
+    monkeypatch.setattr(cached_pipeline, 'fetch_question_rows', lambda sql_info: [])
+    monkeypatch.setattr(cached_pipeline, 'render_database_answer', lambda question, rows: '해당 정보를 찾을 수 없습니다')
+    result = cached_pipeline.run_cached_genai_pipeline('Leo의 주인은 누구야?')
+    assert (result['data_source'], result['cached']) == ('aurora_rds_data_api', False)
+    assert cached_pipeline.answer_cache.get_stats()['sets'] == 1
+
+
+def test_batch_lookup_failure_falls_back_without_caching(cached_pipeline):
+    cache_key = cached_pipeline.get_answer_cache_key('Leo의 주인은 누구야?')
+    analysis = {'type': 'DATABASE_QUERY', 'cache_key': cache_key}
+
+    result = cached_pipeline.answer_batch_question('Leo의 주인은 누구야?', analysis, None)
+    assert result['data_source'] == 'general_advice_fallback'
+    assert cached_pipeline.answer_cache.get_stats()['sets'] == 0
@@ -0,0 +1,46 @@
+"""answer_renderer 규칙 기반 답변 - 결과 모양별 답변(없음 / 개수 / 한 행 / 짧은 목록)과 모델에 맡기는 경우"""
+
+import pytest
+
+from answer_renderer import AnswerRenderer
+
+OWNER = {'first_name': 'George', 'last_name': 'Franklin', 'city': 'Madison'}
+
+
+@pytest.mark.parametrize('question, rows, expected', [
+    ('Leo의 주인은 누구야?', [], '조회 결과 해당하는 정보를 찾을 수 없습니다.'),
+    ('Who owns Leo?', [], 'No matching records were found.'),
+    ('고양이는 몇 마리야?', [{'count': 3}], '조회 결과 3마리입니다.'),
+    ('How many vets are there?', [{'COUNT(*)': 6}], 'The count is 6.'),
+    ('Leo라는 반려동물이 있어?', [{'cnt': 1}], '네, 조회 결과 1건 있습니다.'),
+    ('Leo라는 반려동물이 있어?', [{'cnt': 0}], '아니요, 조회 결과 해당하는 정보가 없습니다.'),
+    ('Leo의 주인은 누구야?', [OWNER], '조회 결과입니다.\n- 이름: George Franklin | 도시: Madison'),
+    ('Madison에 사는 고객 목록', [OWNER, dict(OWNER, first_name='Betty', last_name='Davis')],
+     '조회 결과 2건입니다.\n1. 이름: George Franklin | 도시: Madison\n2. 이름: Betty Davis | 도시: Madison'),
+])
+def test_renders_simple_shapes(question, rows, expected):
+    assert AnswerRenderer().render(question, rows) == expected
+
+
+@pytest.mark.parametrize('question, rows, reason', [
+    ('Leo의 주인에게 산책 방법을 추천해줘', [OWNER], 'needs_model'),
+    ('고객 목록', [OWNER] * 6, 'too_many_rows'),
+    ('고객 목록', [dict(OWNER, address='a', telephone='1')], 'too_many_columns'),
+    ('고객 목록', [{'first_name': 'George', 'loyalty_score': 9}], 'unknown_column'),
+    ('방문 내용', [{'description': 'x' * 201}], 'long_value'),
+    ('몇 명이야?', [{'count': '3'}], 'unknown_value'),
+])
+def test_defers_to_model(question, rows, reason):
+    renderer = AnswerRenderer()
+    assert renderer.render(question, rows) is None
+    assert renderer.get_stats()['deferred'] == {reason: 1}
+
+
+def test_stats_track_bypass_rate_by_shape():
+    renderer = AnswerRenderer()
+    renderer.render('고양이는 몇 마리야?', [{'count': 3}])
+    renderer.render('Leo의 주인은 누구야?', [OWNER])
+    renderer.render('고객 목록', [OWNER] * 6)
+    stats = renderer.get_stats()
+    assert stats['by_shape'] == {'count': 1, 'single_row': 1}
+    assert stats['bypass_rate'] == pytest.approx(2 / 3, abs=1e-4)
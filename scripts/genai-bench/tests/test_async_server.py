@@ -0,0 +1,85 @@
+"""async_server 비동기 HTTP 서버 - 이벤트 변환과 keep-alive, 스트리밍 chunked 전송, 408 / 413 / 404 / 504 응답"""
+
+import asyncio
+import json
+import time
+
+from async_server import GenAIServer
+
+
+def serve(handler, requests, **options):
+    """서버를 띄우고 연결 하나로 요청 바이트를 보낸 뒤 연결이 닫힐 때까지 받은 응답 → (응답 바이트, 서버 통계)"""
+    async def run():
+        server = GenAIServer(handler, max_workers=2, **options)
+        await server.start('127.0.0.1', 0)
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+            for request in requests:
+                writer.write(request)
+                await writer.drain()
+            data = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return data, server.get_stats()
+        finally:
+            await server.shutdown()
+    return asyncio.run(run())
+
+
+def post(path, body, connection='keep-alive'):
+    data = json.dumps(body).encode('utf-8')
+    return (f'POST {path} HTTP/1.1\r\nHost: test\r\nContent-Type: application/json\r\n'
+            f'Content-Length: {len(data)}\r\nConnection: {connection}\r\n\r\n').encode('latin-1') + data
+
+
+def echo_handler(event, context):
+    return {'statusCode': 200, 'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({'path': event['path'], 'body': json.loads(event['body']),
+                                'query': event['queryStringParameters']})}
+
+
+def test_requests_become_proxy_events_on_keep_alive_connection():
+    data, stats = serve(echo_handler, [post('/genai?lang=ko', {'question': 'Leo'}),
+                                       post('/genai', {'question': '수의사'}, connection='close')])
+    responses = data.split(b'HTTP/1.1 ')[1:]
+    assert len(responses) == 2
+    assert all(response.startswith(b'200 OK') for response in responses)
+    first = json.loads(responses[0].split(b'\r\n\r\n', 1)[1])
+    assert first == {'path': '/genai', 'body': {'question': 'Leo'}, 'query': {'lang': 'ko'}}
+    assert b'Connection: close' in responses[1]
+    assert (stats['connections'], stats['requests']) == (1, 2)
+
+
+def test_streaming_body_is_sent_chunked():
+    def handler(event, context):
+        return {'statusCode': 200, 'headers': {'Content-Type': 'text/event-stream'},
+                'body': iter(['event: token\n\n', '', 'event: done\n\n'])}
+    data, stats = serve(handler, [post('/genai', {'stream': True}, connection='close')])
+    head, body = data.split(b'\r\n\r\n', 1)
+    assert b'Transfer-Encoding: chunked' in head
+    assert body == b'e\r\nevent: token\n\n\r\nd\r\nevent: done\n\n\r\n0\r\n\r\n'
+    # 제너레이터가 아닌 iterator 본문도 닫은 뒤 처리 중 요청 수를 줄임
+    assert stats['pending'] == 0
+
+
+def test_unknown_route_and_large_body():
+    data, _ = serve(echo_handler, [b'GET /admin HTTP/1.1\r\nConnection: close\r\n\r\n'])
+    assert data.startswith(b'HTTP/1.1 404')
+    data, _ = serve(echo_handler, [post('/genai', {'question': 'x' * 100})], max_body_bytes=10)
+    assert data.startswith(b'HTTP/1.1 413')
+
+
+def test_slow_headers_get_408_and_idle_connection_is_closed():
+    data, stats = serve(echo_handler, [b'POST /genai HTTP/1.1\r\nHost: test\r\n'], header_timeout=0.1)
+    assert data.startswith(b'HTTP/1.1 408')
+    data, stats = serve(echo_handler, [], header_timeout=0.1)
+    assert data == b''
+    assert stats['read_timeouts'] == 1
+
+
+def test_slow_handler_gets_504():
+    def handler(event, context):
+        time.sleep(0.3)
+        return {'statusCode': 200, 'body': '{}'}
+    data, stats = serve(handler, [post('/genai', {}, connection='close')], request_timeout=0.05)
+    assert data.startswith(b'HTTP/1.1 504')
+    assert stats['timeouts'] == 1
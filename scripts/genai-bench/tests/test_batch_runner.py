@@ -0,0 +1,119 @@
+"""batch_runner 배치 질문 처리 - 중복 제거, UNION ALL 묶음 / 분리와 파라미터 이름 변경, 묶음 실패 대체, 기한 초과 답변"""
+
+import os
+
+import pytest
+
+from fake_aws import install_fake_boto3, load_petclinic_sqlite
+
+install_fake_boto3({})
+os.environ.setdefault('CLIENT_EAGER_INIT', 'false')
+
+import lambda_function  # noqa: E402
+from batch_runner import BatchRunner, combine_queries, dedupe_questions, is_combinable, split_combined_rows  # noqa: E402
+
+OWNER_SQL = "SELECT o.first_name, o.last_name FROM owners o WHERE o.last_name = :name LIMIT 5"
+
+
+def owner_query(name):
+    return {'database': 'petclinic', 'sql': OWNER_SQL, 'parameters': [{'name': 'name', 'value': {'stringValue': name}}]}
+
+
+def run_sqlite(conn, sql_info):
+    values = {p['name']: p['value']['stringValue'] for p in sql_info.get('parameters') or []}
+    cursor = conn.execute(sql_info['sql'], values)
+    columns = [c[0] for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def test_dedupe_questions_by_normalized_text():
+    unique, mapping = dedupe_questions(['Leo 주인은?', 'leo  주인은', '수의사 목록'])
+    assert unique == ['Leo 주인은?', '수의사 목록']
+    assert mapping == [0, 0, 1]
+
+
+@pytest.mark.parametrize('sql, combinable', [
+    (OWNER_SQL, True),
+    ("SELECT COUNT(*) FROM pets p WHERE p.type_id = :type", True),
+    ("SELECT COUNT(*) FROM pets p GROUP BY p.type_id", False),
+    ("SELECT * FROM owners o WHERE o.city = :city", False),
+    ("SELECT * FROM owners o ORDER BY o.id LIMIT 5", False),
+    ("SELECT * FROM owners o ORDER BY o.id LIMIT 1", True),
+])
+def test_is_combinable(sql, combinable):
+    assert is_combinable(sql) == combinable
+
+
+def test_combine_renames_parameters_and_split_matches_single_queries():
+    conn = load_petclinic_sqlite()
+    queries = [owner_query('Davis'), owner_query('Franklin'), owner_query('없는이름')]
+    combined = combine_queries(queries)
+    assert [p['name'] for p in combined['parameters']] == ['name_0', 'name_1', 'name_2']
+    assert ':name_2' in combined['sql'] and ':name ' not in combined['sql']
+
+    grouped = split_combined_rows(run_sqlite(conn, combined), len(queries))
+    assert grouped == [run_sqlite(conn, query) for query in queries]
+    assert grouped[2] == []
+
+
+def test_run_combines_same_sql_and_falls_back_per_item():
+    conn = load_petclinic_sqlite()
+    plans = {'a': owner_query('Davis'), 'b': owner_query('Franklin'), 'c': owner_query('Davis')}
+    calls = []
+
+    def fetch(sql_info):
+        calls.append('single')
+        return run_sqlite(conn, sql_info)
+
+    def fetch_combined(sql_info):
+        calls.append('combined')
+        raise RuntimeError('응답 크기 제한')
+
+    result = BatchRunner(max_workers=2).run(
+        ['a', 'b', 'c', 'a'],
+        analyze=lambda question: {'analysis': {'type': 'DATABASE_QUERY'}, 'sql_info': plans[question]},
+        fetch=fetch, fetch_combined=fetch_combined,
+        answer=lambda question, analysis, rows: {'answer': len(rows), 'data_source': 'aurora_rds_data_api',
+                                                 'question_type': 'DATABASE_QUERY'}
+    )
+    summary = result['summary']
+    # 같은 SQL + 같은 파라미터(a, c)는 한 번만, 묶음 실패는 항목별 조회로 대체
+    assert (summary['unique_questions'], summary['queries'], summary['combine_fallbacks']) == (3, 3, 1)
+    assert sorted(calls) == ['combined', 'single', 'single']
+    answers = [item['answer'] for item in result['results']]
+    assert answers[0] == answers[2] == answers[3] == len(run_sqlite(conn, plans['a']))
+    assert result['results'][3]['deduplicated'] is True
+
+
+def test_failed_unit_passes_none_rows_to_answer():
+    received = []
+
+    def fail(sql_info):
+        raise RuntimeError('Aurora 재개 중')
+
+    BatchRunner(max_workers=1).run(
+        ['q'],
+        analyze=lambda question: {'analysis': {'type': 'DATABASE_QUERY'}, 'sql_info': owner_query('Davis')},
+        fetch=fail,
+        fetch_combined=lambda sql_info: [],
+        answer=lambda question, analysis, rows: received.append(rows) or {'answer': 'x'}
+    )
+    assert received == [None]
+
+
+def test_batch_deadline_exceeded_returns_partial_answer_without_caching(monkeypatch):
+    monkeypatch.setenv('ANSWER_CACHE_ENABLED', 'true')
+    monkeypatch.setenv('ANSWER_CACHE_STORE', 'none')
+    monkeypatch.setenv('ANSWER_CACHE_DATA_VERSION', 'static')
+    monkeypatch.setattr(lambda_function, 'answer_cache', None)
+    bedrock_calls = []
+    monkeypatch.setattr(lambda_function, 'call_bedrock_ai', lambda *args, **kwargs: bedrock_calls.append(args))
+
+    cache_key = lambda_function.get_answer_cache_key('Leo의 주인은 누구야?')
+    analysis = dict(lambda_function.build_deadline_analysis('classify', TimeoutError()), cache_key=cache_key)
+    result = lambda_function.answer_batch_question('Leo의 주인은 누구야?', analysis, None)
+
+    assert result['data_source'] == 'deadline_exceeded'
+    assert result['answer'].startswith(lambda_function.PARTIAL_ANSWER_NOTICE)
+    assert bedrock_calls == []
+    assert lambda_function.answer_cache.get_stats()['sets'] == 0
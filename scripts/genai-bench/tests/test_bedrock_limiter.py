@@ -0,0 +1,100 @@
+"""bedrock_limiter 동시 호출 한도 - 대기열 기한, 스로틀링 재시도, AIMD 한도 조정"""
+
+import threading
+import time
+
+import pytest
+
+from bedrock_limiter import AdaptiveLimit, BedrockLimiter, BedrockLimiterTimeout, retry_after_seconds
+
+
+class ThrottlingError(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__('ThrottlingException')
+        headers = {'retry-after': str(retry_after)} if retry_after is not None else {}
+        self.response = {'Error': {'Code': 'ThrottlingException'}, 'ResponseMetadata': {'HTTPHeaders': headers}}
+
+
+def flaky(failures, error=ThrottlingError):
+    attempts = []
+
+    def call():
+        attempts.append(time.monotonic())
+        if len(attempts) <= failures:
+            raise error()
+        return 'ok'
+    return call, attempts
+
+
+def test_throttled_call_is_retried_within_deadline():
+    limiter = BedrockLimiter(base_delay=0.01, max_delay=0.02)
+    call, attempts = flaky(2)
+    assert limiter.call('model', call) == 'ok'
+    assert len(attempts) == 3
+    stats = limiter.get_stats()['models']['model']
+    assert (stats['throttles'], stats['retries'], stats['in_flight']) == (2, 2, 0)
+
+
+def test_non_throttling_error_is_not_retried():
+    limiter = BedrockLimiter(base_delay=0.01)
+    call, attempts = flaky(1, error=lambda: ValueError('잘못된 요청'))
+    with pytest.raises(ValueError):
+        limiter.call('model', call)
+    assert len(attempts) == 1
+
+
+def test_retries_stop_at_max_retries():
+    limiter = BedrockLimiter(max_retries=1, base_delay=0.01, max_delay=0.01)
+    call, attempts = flaky(5)
+    with pytest.raises(ThrottlingError):
+        limiter.call('model', call)
+    assert len(attempts) == 2
+
+
+def test_retry_after_longer_than_deadline_fails_fast():
+    limiter = BedrockLimiter(deadline_seconds=0.2, base_delay=0.01)
+    call, attempts = flaky(1, error=lambda: ThrottlingError(retry_after=5))
+    started = time.monotonic()
+    with pytest.raises(ThrottlingError):
+        limiter.call('model', call)
+    assert len(attempts) == 1
+    assert time.monotonic() - started < 0.2
+    assert retry_after_seconds(ThrottlingError(retry_after=2)) == 2.0
+
+
+def test_queued_call_times_out_at_deadline():
+    limiter = BedrockLimiter(initial_limit=1, deadline_seconds=0.1)
+    result, release = limiter.open('model', lambda: 'stream')
+    started = time.monotonic()
+    with pytest.raises(BedrockLimiterTimeout):
+        limiter.call('model', lambda: 'ok')
+    assert 0.09 <= time.monotonic() - started < 1.0
+    release()
+    assert limiter.call('model', lambda: 'ok') == 'ok'
+    assert limiter.get_stats()['models']['model']['timeouts'] == 1
+
+
+def test_queued_call_runs_when_slot_is_released():
+    limiter = BedrockLimiter(initial_limit=1, deadline_seconds=5)
+    _, release = limiter.open('model', lambda: 'stream')
+    timer = threading.Timer(0.05, release)
+    timer.start()
+    assert limiter.call('model', lambda: 'ok') == 'ok'
+    timer.join()
+    stats = limiter.get_stats()['models']['model']
+    assert stats['queued'] == 1
+    assert stats['max_queue_wait_ms'] >= 40
+
+
+def test_adaptive_limit_halves_once_per_burst_and_grows_on_success():
+    limit = AdaptiveLimit(initial_limit=8)
+    deadline = time.monotonic() + 1
+    burst = [limit.acquire(deadline)[0] for _ in range(4)]
+    for started in burst:
+        limit.release(started, throttled=True)
+    assert limit.limit == 4.0
+    assert limit.get_stats()['decreases'] == 1
+
+    started, _, _ = limit.acquire(deadline)
+    limit.release(started)
+    assert limit.limit == pytest.approx(4.25)
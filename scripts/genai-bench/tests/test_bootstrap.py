@@ -0,0 +1,31 @@
+"""bootstrap 클라이언트 설정 - 재시도 포함 호출 시간 예산"""
+
+import pytest
+
+from fake_aws import install_fake_boto3
+
+install_fake_boto3({})
+
+from bootstrap import build_client_config, fit_retry_budget  # noqa: E402
+
+
+@pytest.mark.parametrize('connect, read, attempts, budget, expected', [
+    (2, 50, 3, 55, (50, 1)),
+    (2, 45, 3, 55, (45, 1)),
+    (2, 25, 3, 55, (25, 2)),
+    (2, 10, 3, 55, (10, 3)),
+    (2, 70, 3, 55, (53, 1)),
+    (2, 50, 3, 0, (50, 3)),
+])
+def test_fit_retry_budget(connect, read, attempts, budget, expected):
+    read_timeout, max_attempts = fit_retry_budget(connect, read, attempts, budget)
+    assert (read_timeout, max_attempts) == expected
+    if budget:
+        assert max_attempts * (connect + read_timeout) <= budget
+
+
+def test_build_client_config_applies_budget():
+    config = build_client_config(connect_timeout=2, read_timeout=50, max_attempts=3, time_budget=55)
+    options = getattr(config, 'kwargs', None) or vars(config)
+    assert options['read_timeout'] == 50
+    assert options['retries']['max_attempts'] == 1
@@ -0,0 +1,66 @@
+"""entity_index 이름 → id 변환 - 리터럴 / 파라미터 LIKE 변환, 추가된 행, 만료 / 미적중 시 원래 조건 유지"""
+
+import time
+
+from entity_index import ENTITY_SOURCES, EntityIndex, normalize_name, strip_korean_suffix
+from fake_aws import load_petclinic_sqlite
+
+
+def petclinic_index(conn=None, ttl_seconds=300.0):
+    conn = conn or load_petclinic_sqlite()
+    index = EntityIndex(lambda sql: conn.execute(sql).fetchall(), ttl_seconds=ttl_seconds)
+    assert index.load()
+    return index, conn
+
+
+def run(conn, sql, parameters=None):
+    values = {p['name']: p['value']['stringValue'] for p in parameters or []}
+    return sorted(conn.execute(sql.replace(':name', '?'), [values['name']] if values else []).fetchall())
+
+
+def test_normalize_and_suffix():
+    assert normalize_name('  Leo   Davis ') == 'leo davis'
+    assert strip_korean_suffix('춘식이를') == '춘식'
+    assert len(ENTITY_SOURCES) == 7
+
+
+def test_literal_like_rewritten_to_id_list_with_same_rows():
+    index, conn = petclinic_index()
+    sql = "SELECT p.id, p.name FROM pets p WHERE p.name LIKE '%leo%'"
+    rewritten = index.rewrite_sql(sql)
+    assert 'p.id IN (' in rewritten
+    assert run(conn, rewritten) == run(conn, sql)
+    assert index.get_stats()['resolved_predicates'] == 1
+
+
+def test_parameter_like_rewritten_and_keeps_parameter():
+    index, conn = petclinic_index()
+    sql = "SELECT o.id FROM owners o WHERE o.last_name LIKE :name"
+    parameters = [{'name': 'name', 'value': {'stringValue': '%Davis%'}}]
+    rewritten = index.rewrite_sql(sql, parameters)
+    assert 'o.id IN (' in rewritten and ':name' in rewritten
+    assert run(conn, rewritten, parameters) == run(conn, sql, parameters)
+
+    # 접두 일치 값은 부분 일치 인덱스로 바꾸지 않음
+    prefix = [{'name': 'name', 'value': {'stringValue': 'Davis%'}}]
+    assert index.rewrite_sql(sql, prefix) == sql
+
+
+def test_rows_inserted_after_load_are_still_found():
+    index, conn = petclinic_index()
+    conn.execute("INSERT INTO pets (id, name, birth_date, type_id, owner_id) VALUES (900, 'Leonardo', '2020-01-01', 1, 1)")
+    sql = "SELECT p.id FROM pets p WHERE p.name LIKE '%leo%'"
+    assert (900,) in run(conn, index.rewrite_sql(sql))
+
+
+def test_missing_name_and_stale_index_keep_original_predicate(monkeypatch):
+    index, _ = petclinic_index()
+    sql = "SELECT p.id FROM pets p WHERE p.name LIKE '%없는이름%'"
+    assert index.rewrite_sql(sql) == sql
+    assert index.get_stats()['unresolved_predicates'] == 1
+
+    now = time.time()
+    monkeypatch.setattr('entity_index.time.time', lambda: now + 301)
+    sql = "SELECT p.id FROM pets p WHERE p.name LIKE '%leo%'"
+    assert index.rewrite_sql(sql) == sql
+    assert index.get_stats()['stale_skips'] == 1
@@ -0,0 +1,82 @@
+"""hedging 단계 기한 / 지연 헤지 - 헤지 시작 시점, 먼저 끝난 응답 사용, 기한 초과"""
+
+import threading
+import time
+
+import pytest
+
+from hedging import DeadlineExceeded, HedgedCaller, RequestBudget
+
+
+def slow(seconds, value):
+    def call():
+        time.sleep(seconds)
+        return value
+    return call
+
+
+def test_fast_primary_is_not_hedged():
+    caller = HedgedCaller(min_delay_ms=100, default_delay_ms=100)
+    hedged = []
+    assert caller.call('classify', slow(0, 'primary'), hedge=lambda: hedged.append(1)) == 'primary'
+    assert hedged == []
+    assert caller.get_stats()['stages']['classify']['hedged'] == 0
+
+
+def test_slow_primary_is_hedged_after_delay_and_hedge_wins():
+    caller = HedgedCaller(min_delay_ms=50, default_delay_ms=50)
+    release = threading.Event()
+    hedge_started = []
+
+    def hedge():
+        hedge_started.append(time.monotonic())
+        return 'hedge'
+
+    started = time.monotonic()
+    assert caller.call('answer', lambda: release.wait(5) and 'primary', hedge=hedge) == 'hedge'
+    release.set()
+    assert hedge_started[0] - started >= 0.045
+    stats = caller.get_stats()['stages']['answer']
+    assert (stats['hedged'], stats['hedge_wins']) == (1, 1)
+
+
+def test_hedge_delay_follows_recent_latency_percentile():
+    caller = HedgedCaller(min_delay_ms=10, default_delay_ms=3000, min_samples=5)
+    assert caller.hedge_delay_ms('sql') == 3000
+    for _ in range(5):
+        caller.call('sql', slow(0.02, 'ok'))
+    caller._executor.shutdown(wait=True)
+    assert 15 <= caller.hedge_delay_ms('sql') < 1000
+
+
+def test_deadline_exceeded():
+    caller = HedgedCaller(hedge=False)
+    release = threading.Event()
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        caller.call('classify', lambda: release.wait(5), timeout=0.05)
+    release.set()
+    assert time.monotonic() - started < 1.0
+    with pytest.raises(DeadlineExceeded):
+        caller.call('classify', lambda: 'ok', timeout=0)
+    assert caller.get_stats()['stages']['classify']['deadline_exceeded'] == 2
+
+
+def test_primary_error_propagates_without_hedge():
+    caller = HedgedCaller(min_delay_ms=1000, default_delay_ms=1000)
+    hedged = []
+
+    def fail():
+        raise ValueError('bedrock')
+
+    with pytest.raises(ValueError):
+        caller.call('answer', fail, hedge=lambda: hedged.append(1))
+    assert hedged == []
+    assert caller.get_stats()['stages']['answer']['errors'] == 1
+
+
+def test_request_budget_stage_share():
+    budget = RequestBudget(remaining_ms=11500, reserve_ms=1500)
+    assert budget.remaining() == pytest.approx(10, abs=0.1)
+    assert budget.stage_timeout('classify') == pytest.approx(3, abs=0.1)
+    assert budget.stage_timeout('answer') == pytest.approx(10, abs=0.1)
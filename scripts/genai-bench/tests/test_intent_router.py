@@ -0,0 +1,60 @@
+"""intent_router 로컬 의도 분류 - 유형 / 신뢰도, LLM 대체, 등록한 분류기 결과 선택과 잘못된 결과 무시"""
+
+import pytest
+
+from intent_router import DATABASE_QUERY, GENERAL_ADVICE, IntentRouter, KeywordIntentRouter
+
+
+class FixedRouter:
+    def __init__(self, name, decision):
+        self.name = name
+        self.decision = decision
+
+    def route(self, question):
+        if isinstance(self.decision, Exception):
+            raise self.decision
+        return dict(self.decision)
+
+
+@pytest.mark.parametrize('question, question_type', [
+    ('Leo의 주인은 누구야?', DATABASE_QUERY),
+    ('수의사 목록 알려줘', DATABASE_QUERY),
+    ('강아지가 기침을 해요. 어떻게 해야 하나요?', GENERAL_ADVICE),
+    ('고양이에게 초콜릿을 먹여도 되나요?', GENERAL_ADVICE),
+])
+def test_keyword_router_routes_confident_questions(question, question_type):
+    decision = IntentRouter().route(question)
+    assert decision is not None
+    assert decision['type'] == question_type
+    assert decision['router'] == 'keyword'
+
+
+def test_low_confidence_falls_back_to_llm():
+    router = IntentRouter()
+    assert router.route('안녕하세요') is None
+    stats = router.get_stats()
+    assert (stats['requests'], stats['hits'], stats['fallbacks'], stats['hit_rate']) == (1, 0, 1, 0.0)
+
+
+def test_opposing_evidence_lowers_confidence():
+    keyword = KeywordIntentRouter()
+    mixed = keyword.route('Leo의 주인이 사료를 어떻게 급여해야 하나요?')
+    pure = keyword.route('Leo의 주인은 누구야?')
+    assert mixed['confidence'] < pure['confidence']
+
+
+def test_registered_router_wins_with_higher_confidence_and_errors_are_skipped():
+    router = IntentRouter(min_confidence=0.5)
+    router.register(FixedRouter('broken', RuntimeError('모델 로드 실패')), first=True)
+    router.register(FixedRouter('custom', {'type': DATABASE_QUERY, 'reason': 'x', 'confidence': 0.99}))
+    decision = router.route('안녕하세요')
+    assert (decision['type'], decision['router']) == (DATABASE_QUERY, 'custom')
+    assert router.get_stats()['hits_by_type'] == {DATABASE_QUERY: 1, GENERAL_ADVICE: 0}
+
+
+def test_unknown_question_type_is_ignored():
+    router = IntentRouter(routers=[FixedRouter('custom', {'type': 'SMALL_TALK', 'confidence': 1.0})])
+    assert router.route('안녕하세요') is None
+    stats = router.get_stats()
+    assert (stats['invalid_decisions'], stats['fallbacks']) == (1, 1)
+    assert stats['hits_by_type'] == {DATABASE_QUERY: 0, GENERAL_ADVICE: 0}
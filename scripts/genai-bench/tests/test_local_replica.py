@@ -0,0 +1,102 @@
+"""local_replica 내장 읽기 복제본 - 적재 / 조회, 변경된 테이블만 갱신, 허용 지연 초과와 지원하지 않는 문법은 Data API 로"""
+
+import time
+
+import pytest
+
+from fake_aws import load_petclinic_sqlite
+from local_replica import PETCLINIC_SCHEMA, LocalReplica
+from table_versions import build_table_version_sql, parse_table_versions
+
+VERSION_SQL = build_table_version_sql(PETCLINIC_SCHEMA)
+
+
+@pytest.fixture
+def source():
+    return load_petclinic_sqlite()
+
+
+def make_replica(source, with_versions=True, **kwargs):
+    def fetch_rows(sql, parameters):
+        values = {p['name']: next(iter(p['value'].values())) for p in parameters or []}
+        cursor = source.execute(sql, values)
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def fetch_versions():
+        return parse_table_versions(source.execute(VERSION_SQL).fetchall())
+
+    options = dict(refresh_interval=3600, full_reload_interval=0, page_size=4, background_refresh=False)
+    options.update(kwargs)
+    replica = LocalReplica(fetch_rows, fetch_versions if with_versions else None, **options)
+    replica.load()
+    return replica
+
+
+def test_load_and_query_match_source(source):
+    replica = make_replica(source)
+    sql = ("SELECT o.last_name, COUNT(*) AS pets FROM owners o JOIN pets p ON p.owner_id = o.id "
+           "GROUP BY o.last_name ORDER BY o.last_name")
+    assert [tuple(row.values()) for row in replica.query(sql)] == source.execute(sql).fetchall()
+
+    rows = replica.query("SELECT p.name FROM pets p WHERE p.name = :name",
+                         [{'name': 'name', 'value': {'stringValue': 'LEO'}}])
+    assert rows == [{'name': 'Leo'}]
+    assert replica.get_stats()['served'] == 2
+
+
+@pytest.mark.parametrize('sql', [
+    "SELECT id / 2 FROM pets",
+    "SELECT * FROM visits WHERE visit_date > DATE_SUB(NOW(), INTERVAL 30 DAY)",
+    "SELECT * FROM information_schema.tables",
+])
+def test_unsupported_mysql_syntax_falls_back(source, sql):
+    replica = make_replica(source)
+    assert replica.query(sql) is None
+    assert replica.get_stats()['unsupported'] == 1
+    assert replica.query("SELECT COUNT(*) AS n FROM pets WHERE name = 'a/b'") == [{'n': 0}]
+
+
+def test_refresh_appends_new_rows_and_reloads_changed_tables(source):
+    replica = make_replica(source)
+    source.execute("INSERT INTO types (id, name) VALUES (100, 'ferret')")
+    replica.refresh()
+    stats = replica.get_stats()
+    assert (stats['refresh_rows'], stats['table_reloads']) == (1, 0)
+
+    source.execute("UPDATE owners SET city = 'Seoul' WHERE id = 1")
+    source.execute("DELETE FROM visits WHERE id = 1")
+    replica.refresh()
+    assert replica.get_stats()['table_reloads'] == 2
+    assert replica.query("SELECT city FROM owners WHERE id = 1") == [{'city': 'Seoul'}]
+    assert replica.query("SELECT COUNT(*) AS n FROM visits WHERE id = 1") == [{'n': 0}]
+    assert replica.query("SELECT name FROM types WHERE id = 100") == [{'name': 'ferret'}]
+
+
+def test_refresh_without_versions_does_not_advance_sync_time(source):
+    replica = make_replica(source, with_versions=False)
+    synced_at = replica.synced_at
+    source.execute("INSERT INTO types (id, name) VALUES (100, 'ferret')")
+    replica.refresh()
+    assert replica.synced_at == synced_at
+    assert replica.get_stats()['unverified_refreshes'] == 1
+    assert replica.query("SELECT name FROM types WHERE id = 100") == [{'name': 'ferret'}]
+
+
+def test_stale_snapshot_is_not_served_and_failed_refresh_keeps_snapshot(source, monkeypatch):
+    replica = make_replica(source, refresh_interval=60, max_staleness=300)
+    now = time.time()
+
+    def fail(sql, parameters):
+        raise RuntimeError('Aurora 재개 중')
+    monkeypatch.setattr(replica, 'fetch_rows', fail)
+    monkeypatch.setattr(replica, 'fetch_versions', lambda: {})
+
+    # 갱신 주기가 지났지만 허용 지연 안 - 갱신 실패해도 기존 스냅샷으로 응답
+    monkeypatch.setattr('local_replica.time.time', lambda: now + 120)
+    assert replica.query("SELECT COUNT(*) AS n FROM types") == [{'n': 6}]
+    assert replica.get_stats()['refresh_errors'] == 1
+
+    monkeypatch.setattr('local_replica.time.time', lambda: now + 301)
+    assert replica.query("SELECT COUNT(*) AS n FROM types") is None
+    assert replica.get_stats()['stale'] == 1
@@ -0,0 +1,85 @@
+"""model_adapters 모델 계열별 어댑터와 단계별 모델 선택 - 요청 / 응답 형식, 단계 모델 상속, 지연 기반 대체 모델 전환"""
+
+import time
+
+import pytest
+
+from model_adapters import (AnthropicAdapter, LlamaAdapter, ModelAdapter, StageModelRouter, TitanAdapter,
+                            get_adapter, parse_stage_values)
+
+CLAUDE = 'anthropic.claude-3-haiku-20240307-v1:0'
+SONNET = 'anthropic.claude-3-5-sonnet-20240620-v1:0'
+TITAN = 'amazon.titan-text-express-v1'
+
+
+@pytest.mark.parametrize('model_id, adapter_class', [
+    (CLAUDE, AnthropicAdapter),
+    ('us.anthropic.claude-3-5-haiku-20241022-v1:0', AnthropicAdapter),
+    (TITAN, TitanAdapter),
+    ('meta.llama3-8b-instruct-v1:0', LlamaAdapter),
+    ('mistral.mistral-7b-instruct-v0:2', ModelAdapter),
+])
+def test_adapter_resolution_is_cached(model_id, adapter_class):
+    adapter = get_adapter(model_id)
+    assert type(adapter) is adapter_class
+    assert get_adapter(model_id) is adapter
+
+
+def test_request_and_response_formats():
+    claude = get_adapter(CLAUDE)
+    body = claude.build_body('질문', 100, system='스키마')
+    assert body['messages'][0]['content'] == '질문' and body['system']
+    assert claude.parse_response({'content': [{'text': '답변'}]}) == '답변'
+    assert claude.extract_chunk_text({'type': 'content_block_delta', 'delta': {'text': '조각'}}) == '조각'
+    assert claude.extract_chunk_text({'type': 'message_start'}) == ''
+
+    titan = get_adapter(TITAN)
+    body = titan.build_body('질문', 100, system='스키마')
+    assert body['inputText'] == '스키마\n\n질문'
+    assert body['textGenerationConfig']['maxTokenCount'] == 100
+    assert titan.parse_response({'results': [{'outputText': '답변'}]}) == '답변'
+
+
+def test_parse_stage_values_ignores_unknown_stages():
+    assert parse_stage_values('classify=2000, answer=8000,bogus=1,sql=') == {'classify': 2000.0, 'answer': 8000.0}
+
+
+def test_stage_models_inherit_and_model_key():
+    router = StageModelRouter(CLAUDE, stage_models={'sql': TITAN, 'answer': SONNET, 'classify': ''})
+    assert [router.primary(stage) for stage in ('classify', 'sql', 'plan', 'answer')] == [CLAUDE, TITAN, TITAN, SONNET]
+    assert router.model_key() == f'{CLAUDE}+{TITAN}+{SONNET}'
+    assert StageModelRouter(CLAUDE).model_key() == CLAUDE
+
+
+def test_slow_stage_switches_to_fallback_until_cooldown_ends(monkeypatch):
+    router = StageModelRouter(CLAUDE, stage_models={'answer': SONNET}, fallback_model=CLAUDE,
+                              p95_thresholds_ms={'answer': 1000}, min_samples=5, cooldown_seconds=30)
+    for _ in range(4):
+        router.record('answer', SONNET, 5000)
+    assert router.select('answer') == SONNET
+    router.record('answer', SONNET, 5000)
+    assert router.select('answer') == CLAUDE
+    # 다른 단계는 전환하지 않음
+    assert router.select('classify') == CLAUDE and router.get_stats()['fallback_active'] == ['answer']
+
+    now = time.monotonic()
+    monkeypatch.setattr('model_adapters.time.monotonic', lambda: now + 31)
+    assert router.select('answer') == SONNET
+    stats = router.get_stats()
+    assert stats['stages']['answer']['switches'] == 1
+    assert stats['stages']['answer']['fallback_calls'] == 1
+    # 전환 뒤에는 지연 표본을 비우고 다시 측정
+    assert SONNET not in stats['latency'].get('answer', {})
+
+
+def test_fast_stage_and_fallback_samples_do_not_switch():
+    router = StageModelRouter(SONNET, fallback_model=CLAUDE, p95_thresholds_ms={'answer': 1000}, min_samples=3)
+    for _ in range(5):
+        router.record('answer', SONNET, 200)
+        router.record('answer', CLAUDE, 9000)
+    assert router.select('answer') == SONNET
+
+    # 대체 모델이 없으면 전환하지 않음
+    router = StageModelRouter(SONNET, p95_thresholds_ms={'answer': 1}, min_samples=1)
+    router.record('answer', SONNET, 9000)
+    assert router.select('answer') == SONNET
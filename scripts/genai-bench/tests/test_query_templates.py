@@ -0,0 +1,88 @@
+"""query_templates 로컬 매칭 - 종류 단어 / 복수형 / 이름 슬롯"""
+
+import pytest
+
+from query_templates import DEFAULT_TEMPLATES, QueryTemplateRegistry, name_pattern
+
+
+@pytest.fixture
+def registry():
+    return QueryTemplateRegistry(DEFAULT_TEMPLATES)
+
+
+def matched(registry, question):
+    sql_info = registry.match(question)
+    if sql_info is None:
+        return None
+    return sql_info['template'], [p['value']['stringValue'] for p in sql_info['parameters']]
+
+
+@pytest.mark.parametrize('question, expected', [
+    ('dogs를 키우는 사람', ('owners_by_pet_type', ['%dog%'])),
+    ('cats를 키우는 주인', ('owners_by_pet_type', ['%cat%'])),
+    ('hamsters를 키우는 고객', ('owners_by_pet_type', ['%hamster%'])),
+    ('고양이를 키우는 사람', ('owners_by_pet_type', ['%cat%'])),
+    ('강아지를 키우고 있는 주인은 누구야?', ('owners_by_pet_type', ['%dog%'])),
+])
+def test_pet_type_plural_and_korean(registry, question, expected):
+    assert matched(registry, question) == expected
+
+
+@pytest.mark.parametrize('question, expected', [
+    ('강아지 주인은 누구야?', ('owners_by_pet_type', ['%dog%'])),
+    ('고양이의 주인은 누구야?', ('owners_by_pet_type', ['%cat%'])),
+    ('개 주인은 누구야?', ('owners_by_pet_type', ['%dog%'])),
+])
+def test_species_word_is_not_a_pet_name(registry, question, expected):
+    assert matched(registry, question) == expected
+
+
+@pytest.mark.parametrize('question, expected', [
+    ('춘식이의 주인은 누구야?', ('owner_of_pet', ['%춘식%'])),
+    ('Leo의 주인은 누구야?', ('owner_of_pet', ['%Leo%'])),
+    ('새롬의 주인은 누구야?', ('owner_of_pet', ['%새롬%'])),
+    ('who owns Leo', ('owner_of_pet', ['%Leo%'])),
+])
+def test_owner_of_pet_names(registry, question, expected):
+    assert matched(registry, question) == expected
+
+
+def test_generic_noun_falls_through(registry):
+    assert registry.match('반려동물의 주인은 누구야?') is None
+
+
+@pytest.mark.parametrize('value', ['고양이', '고양이를', '강아지', 'dogs', '반려동물'])
+def test_name_pattern_rejects_nouns(value):
+    with pytest.raises(ValueError):
+        name_pattern(value)
+
+
+def test_model_selected_template_rejects_species_name(registry):
+    assert registry.render('owner_of_pet', {'pet_name': '고양이'}) is None
+    assert registry.render('owner_of_pet', {'pet_name': '춘식이를'})['parameters'][0]['value'] == {'stringValue': '%춘식%'}
+
+
+@pytest.mark.parametrize('question', [
+    '그의 주소는 뭐야?',
+    '그녀의 반려동물 이름은?',
+    '누구의 주인은 누구야?',
+    'who owns it',
+])
+def test_pronouns_and_question_words_are_not_names(registry, question):
+    assert registry.match(question) is None
+
+
+@pytest.mark.parametrize('question', [
+    'Leo의 주인은 누구야? 그리고 Basil의 주인은?',
+    'Leo의 주인은 누구야? Basil의 주인은?',
+    'Leo, Basil의 주인은 누구야?',
+    'Leo의 주인은 누구고 또 Basil의 주인은 누구야?',
+    'who owns Leo and Basil',
+])
+def test_multi_clause_questions_fall_through(registry, question):
+    assert registry.match(question) is None
+    assert registry.get_stats()['multi_clause'] == 1
+
+
+def test_single_trailing_question_mark_still_matches(registry):
+    assert matched(registry, 'Leo의 주인은 누구야? ') == ('owner_of_pet', ['%Leo%'])
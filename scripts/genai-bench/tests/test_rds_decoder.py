@@ -0,0 +1,68 @@
+"""rds_decoder Data API 결과 변환 - typed / JSON 응답, dict / tuple / columns 형식, NULL, 메타데이터 불일치"""
+
+import json
+
+import pytest
+
+from rds_decoder import decode_response, decode_value, get_row_decoder
+
+METADATA = [
+    {'name': 'id', 'typeName': 'INT UNSIGNED'},
+    {'name': 'name', 'typeName': 'VARCHAR'},
+    {'name': 'weight', 'typeName': 'DOUBLE'},
+    {'name': 'COUNT(*)', 'typeName': 'BIGINT'},
+]
+RECORDS = [
+    [{'longValue': 1}, {'stringValue': 'Leo'}, {'doubleValue': 4.5}, {'longValue': 2}],
+    [{'longValue': 2}, {'isNull': True}, {'doubleValue': 3.0}, {'longValue': 0}],
+]
+TYPED_RESPONSE = {'columnMetadata': METADATA, 'records': RECORDS}
+
+
+def test_typed_records_as_dicts():
+    assert decode_response(TYPED_RESPONSE) == [
+        {'id': 1, 'name': 'Leo', 'weight': 4.5, 'COUNT(*)': 2},
+        {'id': 2, 'name': None, 'weight': 3.0, 'COUNT(*)': 0},
+    ]
+
+
+def test_typed_records_as_tuples_and_columns():
+    rows = decode_response(TYPED_RESPONSE, row_format='tuple')
+    assert rows[0] == (1, 'Leo', 4.5, 2)
+    assert (rows[0].id, rows[0].name) == (1, 'Leo')
+    assert decode_response(TYPED_RESPONSE, row_format='columns') == {
+        'id': [1, 2], 'name': ['Leo', None], 'weight': [4.5, 3.0], 'COUNT(*)': [2, 0]
+    }
+
+
+def test_value_in_unexpected_field_falls_back():
+    # DECIMAL 은 문자열, 메타데이터와 다른 필드로 온 값은 일반 변환
+    response = {'columnMetadata': [{'name': 'amount', 'typeName': 'BIGINT'}],
+                'records': [[{'stringValue': '12.50'}], [{'booleanValue': True}]]}
+    assert decode_response(response) == [{'amount': '12.50'}, {'amount': True}]
+    assert decode_value({'arrayValue': {}}) == "{'arrayValue': {}}"
+
+
+def test_records_wider_than_metadata_are_padded():
+    response = {'columnMetadata': [{'name': 'id', 'typeName': 'INT'}],
+                'records': [[{'longValue': 1}, {'stringValue': 'x'}], [{'longValue': 2}]]}
+    assert decode_response(response) == [{'id': 1, 'col_1': 'x'}, {'id': 2, 'col_1': None}]
+
+
+def test_json_records_in_all_formats():
+    response = {'formattedRecords': json.dumps([{'id': 1, 'name': 'Leo'}, {'id': 2, 'name': None}]),
+                'columnMetadata': [{'name': 'id'}, {'name': 'name'}]}
+    assert decode_response(response) == [{'id': 1, 'name': 'Leo'}, {'id': 2, 'name': None}]
+    assert decode_response(response, row_format='tuple')[1] == (2, None)
+    assert decode_response(response, row_format='columns') == {'id': [1, 2], 'name': ['Leo', None]}
+    assert decode_response({'formattedRecords': '[]'}, row_format='tuple') == []
+
+
+def test_decoder_is_reused_per_column_layout():
+    assert get_row_decoder(METADATA) is get_row_decoder([dict(column) for column in METADATA])
+    assert get_row_decoder(METADATA) is not get_row_decoder(METADATA[:2])
+
+
+def test_unknown_row_format_is_rejected():
+    with pytest.raises(ValueError):
+        decode_response(TYPED_RESPONSE, row_format='xml')
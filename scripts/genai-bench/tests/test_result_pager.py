@@ -0,0 +1,90 @@
+"""result_pager 페이지 조회 - LIMIT 분리, 페이지 이어 조회, 응답 크기 제한 시 페이지 절반 축소, 행 / 바이트 예산"""
+
+import re
+
+import pytest
+
+from result_pager import ResultPager, split_limit
+
+ROWS = [{'id': i, 'name': f'pet{i}'} for i in range(1, 26)]
+_PAGE_PATTERN = re.compile(r'LIMIT (\d+) OFFSET (\d+)$')
+
+
+def fake_fetch(max_page_rows=None, calls=None):
+    """LIMIT / OFFSET 을 해석해서 ROWS 를 잘라 주는 fetch_page (max_page_rows 보다 크면 응답 크기 제한 오류)"""
+    def fetch(sql):
+        size, offset = (int(v) for v in _PAGE_PATTERN.search(sql).groups())
+        if calls is not None:
+            calls.append((size, offset))
+        if max_page_rows is not None and size > max_page_rows:
+            raise RuntimeError('Database returned more than the allowed response size limit')
+        return ROWS[offset:offset + size]
+    return fetch
+
+
+@pytest.mark.parametrize('sql, expected', [
+    ("SELECT * FROM pets", ("SELECT * FROM pets", None, 0)),
+    ("SELECT * FROM pets LIMIT 10;", ("SELECT * FROM pets", 10, 0)),
+    ("SELECT * FROM pets LIMIT 10 OFFSET 5", ("SELECT * FROM pets", 10, 5)),
+    ("SELECT * FROM pets LIMIT 5, 10", ("SELECT * FROM pets", 10, 5)),
+])
+def test_split_limit(sql, expected):
+    assert split_limit(sql) == expected
+
+
+def test_pages_until_results_end_and_keeps_original_limit_offset():
+    calls = []
+    pager = ResultPager(fake_fetch(calls=calls), page_size=10)
+    assert list(pager.iter_rows("SELECT * FROM pets")) == ROWS
+    assert calls == [(10, 0), (10, 10), (10, 20)]
+
+    pager = ResultPager(fake_fetch(), page_size=10)
+    assert [row['id'] for row in pager.iter_rows("SELECT * FROM pets LIMIT 12 OFFSET 3")] == list(range(4, 16))
+    assert pager.stats['pages'] == 2
+
+
+def test_response_size_error_halves_page_and_resumes_at_same_offset():
+    calls = []
+    pager = ResultPager(fake_fetch(max_page_rows=4, calls=calls), page_size=16)
+    assert list(pager.iter_rows("SELECT * FROM pets")) == ROWS
+    assert calls[:3] == [(16, 0), (8, 0), (4, 0)]
+    assert (4, 4) in calls
+    assert pager.stats['size_limit_retries'] == 2
+    assert pager.stats['truncated'] is None
+
+
+def test_single_row_over_size_limit_returns_rows_so_far():
+    def fetch(sql):
+        # 네 번째 행(OFFSET 3)이 혼자서도 응답 크기 제한을 넘음
+        size, offset = (int(v) for v in _PAGE_PATTERN.search(sql).groups())
+        if offset <= 3 < offset + size:
+            raise RuntimeError('Database returned more than the allowed response size limit')
+        return ROWS[offset:offset + size]
+    pager = ResultPager(fetch, page_size=4)
+    assert [row['id'] for row in pager.iter_rows("SELECT * FROM pets")] == [1, 2, 3]
+    assert pager.stats['truncated'] == 'response_size_limit'
+
+
+def test_other_errors_propagate():
+    def fetch(sql):
+        raise RuntimeError('Communications link failure')
+    with pytest.raises(RuntimeError):
+        list(ResultPager(fetch).iter_rows("SELECT * FROM pets"))
+
+
+def test_row_and_byte_budgets_truncate():
+    pager = ResultPager(fake_fetch(), page_size=10, max_rows=12)
+    assert len(list(pager.iter_rows("SELECT * FROM pets"))) == 12
+    assert pager.stats['truncated'] == 'max_rows'
+
+    pager = ResultPager(fake_fetch(), page_size=10, max_bytes=30)
+    rows = list(pager.iter_rows("SELECT * FROM pets"))
+    assert 1 <= len(rows) < len(ROWS)
+    assert pager.stats['bytes'] <= 30 and pager.stats['truncated'] == 'max_bytes'
+
+
+def test_non_select_runs_once_within_budget():
+    calls = []
+    pager = ResultPager(lambda sql: calls.append(sql) or ROWS, max_rows=5)
+    assert len(list(pager.iter_rows("SHOW TABLES"))) == 5
+    assert calls == ["SHOW TABLES"]
@@ -0,0 +1,186 @@
+"""single_flight 동시 중복 질문 합치기 - 결과 / 예외 공유, 스트리밍 이벤트 공유"""
+
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight, SingleFlightAbandoned, SingleFlightTimeout
+
+
+def gated_events(gate, events, error=None):
+    """gate 가 열릴 때까지 첫 이벤트 뒤에서 멈추는 이벤트 생성기"""
+    def generate():
+        yield events[0]
+        gate.wait(5)
+        yield from events[1:]
+        if error is not None:
+            raise error
+    return generate
+
+
+def collect(iterator, into):
+    try:
+        into.extend(iterator)
+    except BaseException as e:
+        into.append(e)
+
+
+def start_do(flight, key, fn):
+    """다른 스레드에서 flight.do 호출 → (스레드, [결과 또는 예외])"""
+    received = []
+
+    def run():
+        try:
+            received.append(flight.do(key, fn))
+        except BaseException as e:
+            received.append(e)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, received
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_do_shares_leader_result():
+    flight = SingleFlight(timeout=5)
+    gate = threading.Event()
+    runs = []
+
+    def execute():
+        runs.append(1)
+        gate.wait(5)
+        return {'answer': 'ok'}
+
+    leader, leader_received = start_do(flight, 'q', execute)
+    wait_until(lambda: flight.get_stats()['in_flight'])
+    follower, received = start_do(flight, 'q', execute)
+    wait_until(lambda: flight.get_stats()['max_followers'] == 1)
+    gate.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert leader_received == [({'answer': 'ok'}, False)]
+    assert received == [({'answer': 'ok'}, True)]
+    assert len(runs) == 1
+    assert flight.get_stats()['coalesced'] == 1
+
+
+def test_do_propagates_leader_error_to_followers():
+    flight = SingleFlight(timeout=5)
+    gate = threading.Event()
+
+    def execute():
+        gate.wait(5)
+        raise ValueError('bedrock')
+
+    calls = [start_do(flight, 'q', execute)]
+    wait_until(lambda: flight.get_stats()['in_flight'])
+    calls += [start_do(flight, 'q', execute) for _ in range(2)]
+    wait_until(lambda: flight.get_stats()['max_followers'] == 2)
+    gate.set()
+    for thread, received in calls:
+        thread.join(5)
+        assert isinstance(received[0], ValueError) and str(received[0]) == 'bedrock'
+    stats = flight.get_stats()
+    assert (stats['executions'], stats['shared_errors'], stats['in_flight']) == (1, 2, 0)
+    # 실패한 실행은 남지 않으므로 다음 호출은 다시 실행
+    assert flight.do('q', lambda: 'retry') == ('retry', False)
+
+
+def test_do_follower_times_out_and_long_call_expires():
+    flight = SingleFlight(timeout=0.05)
+    gate = threading.Event()
+    leader, _ = start_do(flight, 'q', lambda: gate.wait(5))
+    wait_until(lambda: flight.get_stats()['in_flight'])
+    follower, received = start_do(flight, 'q', lambda: 'unused')
+    follower.join(5)
+    assert isinstance(received[0], SingleFlightTimeout)
+    # 기다리는 시간보다 오래 걸리는 실행에는 합치지 않고 따로 실행
+    assert flight.do('q', lambda: 'own') == ('own', False)
+    gate.set()
+    leader.join(5)
+    stats = flight.get_stats()
+    assert (stats['timeouts'], stats['expired']) == (1, 1)
+
+
+def test_stream_follower_replays_and_follows_leader_events():
+    flight = SingleFlight(timeout=5)
+    gate = threading.Event()
+    runs = []
+
+    def execute():
+        runs.append(1)
+        return gated_events(gate, ['meta', 'token', 'done'])()
+
+    leader, leader_shared = flight.stream('q', execute)
+    assert next(leader) == 'meta'
+    follower, follower_shared = flight.stream('q', execute)
+    received = []
+    thread = threading.Thread(target=collect, args=(follower, received))
+    thread.start()
+    gate.set()
+    assert list(leader) == ['token', 'done']
+    thread.join(5)
+
+    assert (leader_shared, follower_shared) == (False, True)
+    assert received == ['meta', 'token', 'done']
+    assert len(runs) == 1
+    stats = flight.get_stats()
+    assert (stats['executions'], stats['coalesced'], stats['in_flight']) == (1, 1, 0)
+
+
+def test_stream_follower_receives_leader_error():
+    flight = SingleFlight(timeout=5)
+    gate = threading.Event()
+    execute = gated_events(gate, ['meta', 'token'], error=ValueError('bedrock'))
+
+    leader, _ = flight.stream('q', execute)
+    next(leader)
+    follower, _ = flight.stream('q', execute)
+    received = []
+    thread = threading.Thread(target=collect, args=(follower, received))
+    thread.start()
+    gate.set()
+    with pytest.raises(ValueError):
+        list(leader)
+    thread.join(5)
+
+    assert received[:2] == ['meta', 'token']
+    assert isinstance(received[2], ValueError)
+    assert flight.get_stats()['shared_errors'] == 1
+
+
+def test_stream_follower_fails_when_leader_abandons():
+    flight = SingleFlight(timeout=5)
+    gate = threading.Event()
+    execute = gated_events(gate, ['meta', 'token'])
+
+    leader, _ = flight.stream('q', execute)
+    next(leader)
+    follower, _ = flight.stream('q', execute)
+    assert next(follower) == 'meta'
+    leader.close()
+    with pytest.raises(SingleFlightAbandoned):
+        next(follower)
+
+
+def test_stream_follower_times_out_waiting_for_next_event():
+    flight = SingleFlight(timeout=0.05)
+    gate = threading.Event()
+    execute = gated_events(gate, ['meta', 'token'])
+
+    leader, _ = flight.stream('q', execute)
+    next(leader)
+    follower, _ = flight.stream('q', execute)
+    assert next(follower) == 'meta'
+    with pytest.raises(SingleFlightTimeout):
+        next(follower)
+    gate.set()
+    assert list(leader) == ['token']
+    assert flight.get_stats()['timeouts'] == 1
@@ -0,0 +1,104 @@
+"""speculation 추측 실행 - 오류 답변 거부, 실행 중인 폐기 호출 상한, 호출별 EMF 손익 지표"""
+
+import json
+import os
+import threading
+import time
+
+from fake_aws import install_fake_boto3
+from speculation import SpeculativeExecutor
+
+install_fake_boto3({})
+os.environ.setdefault('CLIENT_EAGER_INIT', 'false')
+
+import lambda_function  # noqa: E402
+
+
+def test_unusable_speculative_answer_is_treated_as_miss():
+    executor = SpeculativeExecutor(max_workers=2)
+    result = executor.run(classify=lambda: {'type': 'GENERAL_ADVICE'},
+                          speculate=lambda: ('AI 서비스 오류: throttled', {}),
+                          accept=lambda analysis: True,
+                          usable=lambda answer: not answer.startswith('AI 서비스 오류'))
+    assert result == {'analysis': {'type': 'GENERAL_ADVICE'}, 'answer': None}
+    stats = executor.get_stats()
+    assert (stats['used'], stats['rejected']) == (0, 1)
+
+
+def test_speculation_skipped_while_discarded_calls_are_running():
+    executor = SpeculativeExecutor(max_workers=4, max_discarded=1)
+    release = threading.Event()
+    started = threading.Event()
+    speculated = []
+
+    def slow_speculate():
+        speculated.append(1)
+        started.set()
+        release.wait(5)
+        return 'answer', {'input_tokens': 10, 'output_tokens': 20}
+
+    def classify_after_start():
+        started.wait(5)
+        return {'type': 'DATABASE_QUERY'}
+
+    reject = lambda analysis: False  # noqa: E731
+    assert executor.run(classify_after_start, slow_speculate, reject)['answer'] is None
+    assert executor.get_stats()['discarded_running'] == 1
+
+    result = executor.run(lambda: {'type': 'GENERAL_ADVICE'}, slow_speculate, lambda analysis: True)
+    assert result['answer'] is None
+    assert len(speculated) == 1
+    assert executor.get_stats()['skipped'] == 1
+
+    release.set()
+    executor._executor.shutdown(wait=True)
+    stats = executor.get_stats()
+    assert (stats['discarded_running'], stats['discarded'], stats['wasted_output_tokens']) == (0, 1, 20)
+    assert stats['requests'] == 2
+    # 낭비 토큰은 한 번만 보고
+    assert executor.take_unreported() == {'input_tokens': 10, 'output_tokens': 20}
+    assert executor.take_unreported() == {'input_tokens': 0, 'output_tokens': 0}
+
+
+def emf_line(monkeypatch, question):
+    """지표 출력을 켜고 파이프라인 한 번 실행 → EMF 문서"""
+    lines = []
+    monkeypatch.setattr(lambda_function.metrics, 'enabled', True)
+    monkeypatch.setattr(lambda_function.metrics, 'emit', lines.append)
+    invocation = lambda_function.metrics.start('test')
+    lambda_function.run_genai_pipeline(question)
+    lambda_function.metrics.finish(invocation)
+    return json.loads(lines[0])
+
+
+def test_speculation_costs_reach_emf_line(monkeypatch):
+    executor = SpeculativeExecutor(max_workers=2)
+    monkeypatch.setenv('SPECULATIVE_ADVICE_ENABLED', 'true')
+    monkeypatch.setattr(lambda_function, 'speculative_executor', executor)
+    monkeypatch.setattr(lambda_function, 'get_intent_router', lambda: None)
+    monkeypatch.setattr(lambda_function, 'get_bedrock_client', lambda: None)
+    monkeypatch.setattr(lambda_function, 'speculate_general_advice',
+                        lambda question: ('추측 답변', {'input_tokens': 30, 'output_tokens': 40}))
+
+    monkeypatch.setattr(lambda_function, 'classify_question_with_bedrock', lambda question: {'type': 'GENERAL_ADVICE'})
+    document = emf_line(monkeypatch, '강아지 산책은 얼마나?')
+    assert 'speculative_latency_saved_ms' in document
+    assert 'speculative_wasted_input_tokens' not in document
+
+    speculated = threading.Event()
+    monkeypatch.setattr(lambda_function, 'speculate_general_advice',
+                        lambda question: speculated.set() or ('추측 답변', {'input_tokens': 30, 'output_tokens': 40}))
+    monkeypatch.setattr(lambda_function, 'classify_question_with_bedrock',
+                        lambda question: speculated.wait(5) and {'type': 'DATABASE_QUERY'})
+
+    def prepare_after_discard(question, analysis):
+        # 조회 / 답변 생성 동안 폐기한 추측 호출이 끝남
+        deadline = time.monotonic() + 5
+        while executor.get_stats()['discarded'] < 1:
+            assert time.monotonic() < deadline
+            time.sleep(0.005)
+        return {'rendered_answer': '조회 답변', 'context_data': '', 'is_general_advice': False,
+                'data_source': 'aurora_rds_data_api', 'question_type': 'DATABASE_QUERY'}
+    monkeypatch.setattr(lambda_function, 'prepare_genai_answer', prepare_after_discard)
+    document = emf_line(monkeypatch, 'Leo의 주인은 누구야?')
+    assert (document['speculative_wasted_input_tokens'], document['speculative_wasted_output_tokens']) == (30, 40)
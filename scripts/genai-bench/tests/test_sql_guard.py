@@ -0,0 +1,141 @@
+"""sql_guard 생성 SQL 검사 - 거부 사유, LIMIT / 앞 와일드카드 LIKE 변환과 스캔 범위 확인"""
+
+import pytest
+
+from sql_guard import SqlGuard, SqlGuardError, estimate_examined_rows, mask_literals
+
+
+def like_parameter(name, value):
+    return {'name': name, 'value': {'stringValue': value}}
+
+
+@pytest.mark.parametrize('sql, reason', [
+    ("SELECT * FROM owners; DELETE FROM owners", 'multiple_statements'),
+    ("SELECT * FROM owners -- 전체", 'comment'),
+    ("UPDATE owners SET city = 'x'", 'not_select'),
+    ("SELECT * FROM owners INTO OUTFILE '/tmp/x'", 'forbidden_keyword'),
+    ("REPLACE INTO owners (id) VALUES (1)", 'forbidden_keyword'),
+    ("SET autocommit = 0", 'forbidden_keyword'),
+    ("SELECT SLEEP(10) FROM owners", 'forbidden_function'),
+    ("SELECT * FROM mysql.user", 'unknown_table'),
+    ("SELECT * FROM owners CROSS JOIN pets", 'cartesian_join'),
+    ("SELECT * FROM owners o JOIN pets p", 'cartesian_join'),
+    ("SELECT * FROM owners o, pets p", 'cartesian_join'),
+])
+def test_rejects_unsafe_sql(sql, reason):
+    guard = SqlGuard()
+    with pytest.raises(SqlGuardError) as error:
+        guard.check(sql)
+    assert error.value.reason == reason
+    assert guard.get_stats()['rejections'] == {reason: 1}
+
+
+def test_keywords_inside_literals_are_ignored():
+    result = SqlGuard().check("SELECT * FROM owners WHERE city = 'DELETE; --' LIMIT 10")
+    assert result['rewrites'] == []
+    assert mask_literals("a = 'DELETE'") == "a = 'xxxxxx'"
+
+
+def test_replace_function_is_allowed():
+    result = SqlGuard().check("SELECT REPLACE(o.telephone, '-', '') FROM owners o WHERE o.id = 1")
+    assert result['rewrites'] == ['limit_added']
+
+
+@pytest.mark.parametrize('sql, expected, rewrites', [
+    ("SELECT * FROM owners", "SELECT * FROM owners LIMIT 200", ['limit_added']),
+    ("SELECT * FROM owners LIMIT 1000;", "SELECT * FROM owners LIMIT 200", ['limit_capped']),
+    ("SELECT * FROM owners LIMIT 50", "SELECT * FROM owners LIMIT 50", []),
+])
+def test_limit_rewrites(sql, expected, rewrites):
+    result = SqlGuard(max_limit=200).check(sql)
+    assert (result['sql'], result['rewrites']) == (expected, rewrites)
+
+
+def test_like_allow_keeps_query_and_counts_leading_wildcards():
+    guard = SqlGuard(max_limit=0, like_mode='allow')
+    sql = "SELECT * FROM pets p WHERE p.name LIKE '%Leo%'"
+    assert guard.check(sql)['sql'] == sql
+    assert guard.get_stats()['leading_wildcards'] == 1
+
+
+def explain_rows(rows, calls=None):
+    def explain(database, sql, parameters):
+        if calls is not None:
+            calls.append(sql)
+        return [{'id': 1, 'rows': rows}]
+    return explain
+
+
+def test_like_bounded_runs_indexed_columns_without_explain():
+    calls = []
+    guard = SqlGuard(explain=explain_rows(10, calls))
+    result = guard.check("SELECT * FROM pets p WHERE p.name LIKE '%Leo%'")
+    assert result['sql'].endswith('LIMIT 200')
+    assert calls == []
+    assert guard.get_stats()['scan_checks'] == 0
+
+
+def test_like_bounded_caps_unindexed_scan_by_explain_estimate():
+    calls = []
+    guard = SqlGuard(explain=explain_rows(50, calls), max_scan_rows=100)
+    for city in ('Madison', 'Monona'):
+        result = guard.check(f"SELECT * FROM owners o WHERE o.city LIKE '%{city}%'")
+        assert result['estimated_rows'] == 50
+    # 값만 다른 같은 형태는 EXPLAIN 예상 행 수 재사용
+    assert len(calls) == 1
+
+    guard = SqlGuard(explain=explain_rows(5000), max_scan_rows=100)
+    with pytest.raises(SqlGuardError) as error:
+        guard.check("SELECT * FROM owners o WHERE o.city LIKE :city", [like_parameter('city', '%Madison%')])
+    assert error.value.reason == 'leading_wildcard'
+
+
+def test_like_bounded_rejects_unindexed_scan_without_limit_or_explain():
+    sql = "SELECT * FROM owners o WHERE o.city LIKE '%Madison%'"
+    with pytest.raises(SqlGuardError) as error:
+        SqlGuard().check(sql)
+    assert error.value.reason == 'leading_wildcard'
+    with pytest.raises(SqlGuardError) as error:
+        SqlGuard(max_limit=0, explain=explain_rows(10)).check(sql)
+    assert error.value.reason == 'leading_wildcard'
+
+
+def test_like_prefix_rewrites_only_indexed_columns():
+    guard = SqlGuard(max_limit=0, like_mode='prefix')
+    result = guard.check("SELECT * FROM pets p JOIN owners o ON p.owner_id = o.id "
+                         "WHERE p.name LIKE '%Leo%' AND o.city LIKE '%Madison%'")
+    assert "p.name LIKE 'Leo%'" in result['sql']
+    assert "o.city LIKE '%Madison%'" in result['sql']
+    assert result['rewrites'] == ['like_prefix']
+
+
+def test_like_prefix_rewrites_data_api_parameters():
+    guard = SqlGuard(max_limit=0, like_mode='prefix')
+    result = guard.check("SELECT * FROM owners o WHERE o.last_name LIKE :name",
+                         [like_parameter('name', '%Davis%')])
+    assert result['parameters'] == [like_parameter('name', 'Davis%')]
+
+
+def test_like_reject_mode():
+    guard = SqlGuard(like_mode='reject')
+    with pytest.raises(SqlGuardError) as error:
+        guard.check("SELECT * FROM owners o WHERE o.last_name LIKE :name", [like_parameter('name', '%Davis')])
+    assert error.value.reason == 'leading_wildcard'
+
+
+def test_estimated_rows_limit():
+    plan = [{'id': 1, 'rows': 100}, {'id': 1, 'rows': 50}, {'id': 2, 'rows': 10}]
+    assert estimate_examined_rows(plan) == 5010
+    guard = SqlGuard(explain=lambda database, sql, parameters: plan, max_estimated_rows=1000)
+    with pytest.raises(SqlGuardError) as error:
+        guard.check("SELECT * FROM visits")
+    assert error.value.reason == 'estimated_rows'
+
+
+def test_explain_failure_skips_estimate():
+    def explain(database, sql, parameters):
+        raise RuntimeError('Data API 오류')
+
+    guard = SqlGuard(explain=explain, max_estimated_rows=1000)
+    assert guard.check("SELECT * FROM visits")['estimated_rows'] is None
+    assert guard.get_stats()['explain_errors'] == 1
@@ -0,0 +1,220 @@
+"""
+GenAI Lambda 답변 캐시
+정규화한 질문 + 모델 ID + 데이터 버전을 키로 완성된 답변을 저장하는 2단 캐시
+1단: 프로세스 메모리 LRU + TTL / 2단: /tmp SQLite 파일 (CacheStore 를 구현하면 공유 저장소로 교체 가능)
+데이터 버전이 바뀌면(테이블 변경) 이전 버전 항목을 모두 무효화
+"""
+
+import hashlib
+import importlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from batch_runner import normalize_question
+
+logger = logging.getLogger()
+
+DEFAULT_SQLITE_PATH = '/tmp/genai-answer-cache.sqlite3'
+
+
+def make_cache_key(question: str, model_id: str, data_version: str) -> str:
+    """정규화한 질문 + 모델 ID + 데이터 버전 → 캐시 키"""
+    raw = '\x1f'.join((normalize_question(question), model_id, data_version))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class CacheStore:
+    """2단 캐시 저장소 인터페이스 (공유 저장소는 이 클래스를 구현해서 ANSWER_CACHE_STORE 로 지정)"""
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(값, 만료 시각) 또는 None"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Dict[str, Any], data_version: str, expires_at: float) -> None:
+        raise NotImplementedError
+
+    def invalidate(self, keep_version: Optional[str] = None) -> int:
+        """keep_version 이 아닌 항목 삭제 (None 이면 전부) → 삭제 수"""
+        raise NotImplementedError
+
+
+class SQLiteCacheStore(CacheStore):
+    """로컬 SQLite 파일 저장소 (Lambda 에서는 /tmp, 실행 환경 단위로 유지)"""
+
+    _PURGE_EVERY = 100
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS answers ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, data_version TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        with self._lock:
+            row = self._conn.execute('SELECT value, expires_at FROM answers WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Dict[str, Any], data_version: str, expires_at: float) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO answers (key, value, data_version, expires_at) VALUES (?, ?, ?, ?)',
+                (key, payload, data_version, expires_at)
+            )
+            self._writes += 1
+            if self._writes % self._PURGE_EVERY == 0:
+                self._conn.execute('DELETE FROM answers WHERE expires_at < ?', (time.time(),))
+
+    def invalidate(self, keep_version: Optional[str] = None) -> int:
+        with self._lock:
+            if keep_version is None:
+                cursor = self._conn.execute('DELETE FROM answers')
+            else:
+                cursor = self._conn.execute('DELETE FROM answers WHERE data_version != ?', (keep_version,))
+        return cursor.rowcount
+
+
+def load_cache_store(spec: str, path: str = DEFAULT_SQLITE_PATH) -> Optional[CacheStore]:
+    """ANSWER_CACHE_STORE 값으로 2단 저장소 생성 (none / sqlite / 'module:ClassName')"""
+    spec = (spec or 'none').strip()
+    if spec.lower() == 'none':
+        return None
+    if spec.lower() == 'sqlite':
+        return SQLiteCacheStore(path)
+    module_name, _, class_name = spec.partition(':')
+    store_class = getattr(importlib.import_module(module_name), class_name)
+    return store_class()
+
+
+class AnswerCache:
+    """메모리 LRU(TTL) + 선택적 2단 저장소"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300.0, store: Optional[CacheStore] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self._entries: 'OrderedDict[str, Tuple[Dict[str, Any], float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0, 'store_hits': 0, 'misses': 0, 'sets': 0,
+            'evictions': 0, 'expirations': 0, 'invalidations': 0, 'store_errors': 0
+        }
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return entry[0]
+                del self._entries[key]
+                self._stats['expirations'] += 1
+
+        if self.store is not None:
+            try:
+                stored = self.store.get(key)
+            except Exception as e:
+                logger.warning("답변 캐시 저장소 조회 실패: %s", e)
+                self._count('store_errors')
+                stored = None
+            if stored is not None and stored[1] > now:
+                # 저장소 적중 항목은 메모리 계층으로 올림
+                self._put_memory(key, stored[0], stored[1])
+                self._count('store_hits')
+                return stored[0]
+
+        self._count('misses')
+        return None
+
+    def set(self, key: str, value: Dict[str, Any], data_version: str) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        self._put_memory(key, value, expires_at)
+        self._count('sets')
+        if self.store is not None:
+            try:
+                self.store.set(key, value, data_version, expires_at)
+            except Exception as e:
+                logger.warning("답변 캐시 저장소 저장 실패: %s", e)
+                self._count('store_errors')
+
+    def _put_memory(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, keep_version: Optional[str] = None) -> int:
+        """데이터 버전 변경 시 이전 항목 삭제 (메모리 계층은 버전을 따로 저장하지 않으므로 전부 비움)"""
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+        if self.store is not None:
+            try:
+                removed += self.store.invalidate(keep_version)
+            except Exception as e:
+                logger.warning("답변 캐시 저장소 무효화 실패: %s", e)
+                self._count('store_errors')
+        self._count('invalidations')
+        logger.info("답변 캐시 무효화: %s개 항목 삭제", removed)
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        hits = stats['memory_hits'] + stats['store_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+        stats['store'] = type(self.store).__name__ if self.store is not None else None
+        return stats
+
+
+class DataVersionTracker:
+    """데이터 버전 토큰 조회 (ttl 동안 재사용, 바뀌면 on_change 호출)"""
+
+    def __init__(self, fetch_version: Callable[[], Optional[str]], ttl_seconds: float = 30.0,
+                 on_change: Optional[Callable[[str], None]] = None):
+        self.fetch_version = fetch_version
+        self.ttl_seconds = ttl_seconds
+        self.on_change = on_change
+        self.version: Optional[str] = None
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[str]:
+        """현재 데이터 버전 (조회 실패 시 None - 캐시 사용 안 함)"""
+        with self._lock:
+            if self.version is not None and time.time() - self.checked_at < self.ttl_seconds:
+                return self.version
+            try:
+                version = self.fetch_version()
+            except Exception as e:
+                logger.warning("데이터 버전 조회 실패, 캐시 사용 안 함: %s", e)
+                return None
+            # 콜드 스타트 첫 조회도 변경으로 보고 저장소에 남은 이전 버전 항목 정리
+            changed = version is not None and version != self.version
+            self.version, self.checked_at = version, time.time()
+        if changed and self.on_change:
+            logger.info("데이터 버전 변경 감지: %s", version)
+            self.on_change(version)
+        return version
@@ -0,0 +1,247 @@
+"""
+GenAI Lambda 배치 질문 처리
+정규화한 질문 기준으로 중복을 제거하고 단계(분석 → SQL 실행 → 답변 생성)마다 제한된 스레드 풀에서 동시에 실행
+같은 SQL 텍스트(템플릿)를 쓰는 조회는 UNION ALL 쿼리 한 번으로 묶어서 Data API 호출 횟수를 줄임
+"""
+
+import contextvars
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from entity_index import normalize_name
+from result_pager import is_pageable, split_limit
+
+logger = logging.getLogger()
+
+# 묶은 쿼리 결과에서 어떤 항목의 행인지 구분하는 컬럼
+BATCH_ITEM_COLUMN = 'batch_item'
+
+# 묶을 수 있는 쿼리의 항목당 최대 LIMIT (묶은 결과를 페이지 없이 한 번에 조회하므로 작게 유지)
+MAX_COMBINED_ROWS_PER_ITEM = 50
+
+_TRAILING_PUNCTUATION = re.compile(r'[\s?？!！.。~]+$')
+_ORDER_BY_PATTERN = re.compile(r'\bORDER\s+BY\b', re.IGNORECASE)
+_GROUP_BY_PATTERN = re.compile(r'\bGROUP\s+BY\b', re.IGNORECASE)
+_SINGLE_COUNT_PATTERN = re.compile(r'^\s*SELECT\s+COUNT\(\s*\*\s*\)(?:\s+AS\s+\w+)?\s+FROM\b', re.IGNORECASE)
+
+
+def normalize_question(question: str) -> str:
+    """중복 판단용 질문 정규화 (NFC + 소문자 + 공백 정리 + 끝 문장부호 제거)"""
+    return _TRAILING_PUNCTUATION.sub('', normalize_name(question))
+
+
+def dedupe_questions(questions: List[str]) -> Tuple[List[str], List[int]]:
+    """정규화 기준 중복 제거 → (처리할 질문 목록, 입력 순서별 처리 질문 위치)"""
+    unique: List[str] = []
+    positions: Dict[str, int] = {}
+    mapping: List[int] = []
+    for question in questions:
+        key = normalize_question(question)
+        if key not in positions:
+            positions[key] = len(unique)
+            unique.append(question.strip())
+        mapping.append(positions[key])
+    return unique, mapping
+
+
+def is_combinable(sql: str) -> bool:
+    """UNION ALL 로 묶어도 결과가 같은 조회인지 확인
+
+    항목별 LIMIT 이 작고 정렬이 필요 없는 조회(또는 LIMIT 1)와 GROUP BY 없는 COUNT(*) 조회만 묶음
+    """
+    if not is_pageable(sql):
+        return False
+    if _SINGLE_COUNT_PATTERN.match(sql) and not _GROUP_BY_PATTERN.search(sql):
+        return True
+    _, limit, _ = split_limit(sql)
+    if limit is None or limit > MAX_COMBINED_ROWS_PER_ITEM:
+        return False
+    # 파생 테이블 안의 ORDER BY 는 바깥 결과 순서를 보장하지 않으므로 행 1개 조회만 허용
+    return limit == 1 or not _ORDER_BY_PATTERN.search(sql)
+
+
+def combine_queries(queries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """같은 SQL 텍스트의 조회 여러 개를 batch_item 컬럼이 붙은 UNION ALL 쿼리 하나로 결합"""
+    parts = []
+    parameters = []
+    for position, query in enumerate(queries):
+        sql = query['sql'].strip().rstrip(';')
+        for parameter in query.get('parameters') or []:
+            # Data API 파라미터 이름이 겹치지 않도록 항목 번호를 붙임
+            renamed = f"{parameter['name']}_{position}"
+            sql = re.sub(rf":{re.escape(parameter['name'])}\b", f":{renamed}", sql)
+            parameters.append(dict(parameter, name=renamed))
+        parts.append(f"SELECT {position} AS {BATCH_ITEM_COLUMN}, q{position}.* FROM ({sql}) AS q{position}")
+    return {
+        'database': queries[0].get('database', 'petclinic'),
+        'sql': ' UNION ALL '.join(parts),
+        'parameters': parameters or None
+    }
+
+
+def split_combined_rows(rows: List[Dict[str, Any]], count: int) -> List[List[Dict[str, Any]]]:
+    """UNION ALL 결과를 batch_item 기준으로 항목별 행 목록으로 분리"""
+    grouped: List[List[Dict[str, Any]]] = [[] for _ in range(count)]
+    for row in rows:
+        row = dict(row)
+        position = int(row.pop(BATCH_ITEM_COLUMN))
+        grouped[position].append(row)
+    return grouped
+
+
+def _query_key(sql_info: Dict[str, Any]) -> Tuple:
+    return (sql_info.get('database', 'petclinic'), sql_info['sql'].strip().rstrip(';'))
+
+
+def _parameter_key(sql_info: Dict[str, Any]) -> Tuple:
+    return tuple((p['name'], tuple(sorted(p['value'].items()))) for p in sql_info.get('parameters') or [])
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+class BatchRunner:
+    """배치 질문 실행기 (컨테이너 단위 스레드 풀 재사용)"""
+
+    def __init__(self, max_workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='genai-batch')
+        self._lock = threading.Lock()
+        self._stats = {
+            'batches': 0, 'questions': 0, 'unique_questions': 0,
+            'queries': 0, 'sql_calls': 0, 'combined_queries': 0, 'combine_fallbacks': 0
+        }
+
+    def _map(self, fn: Callable[[Any], Any], items: List[Any]) -> List[Tuple[Any, Optional[str], float]]:
+        """items 를 스레드 풀에서 동시에 처리 → 입력 순서대로 (결과, 오류, 소요 ms)"""
+        def _run(item):
+            started = time.perf_counter()
+            try:
+                return fn(item), None, _elapsed_ms(started)
+            except Exception as e:
+                logger.error("배치 항목 처리 실패: %s", e)
+                return None, str(e), _elapsed_ms(started)
+        # 요청 컨텍스트(현재 호출 지표 / 요청 로그 상태)를 작업 스레드로 전달
+        futures = [self._executor.submit(contextvars.copy_context().run, _run, item) for item in items]
+        return [future.result() for future in futures]
+
+    def run(self, questions: List[str],
+            analyze: Callable[[str], Dict[str, Any]],
+            fetch: Callable[[Dict[str, Any]], List[Dict]],
+            fetch_combined: Callable[[Dict[str, Any]], List[Dict]],
+            answer: Callable[[str, Dict[str, Any], Optional[List[Dict]]], Dict[str, Any]]) -> Dict[str, Any]:
+        """배치 질문 처리
+
+        analyze(질문) → {'analysis': 분류 결과, 'sql_info': 실행할 SQL 또는 None}
+        fetch(sql_info) → 행 목록 (항목 하나, 페이지 단위 조회)
+        fetch_combined(sql_info) → 행 목록 (묶은 쿼리 한 번 실행, 실패 시 예외)
+        answer(질문, 분석 결과, 행 목록 또는 None) → {'answer', 'data_source', 'question_type'}
+          행 목록 None: 실행할 SQL 이 없거나 조회 실패 (빈 결과 [] 와 구분)
+        """
+        started = time.perf_counter()
+        unique, mapping = dedupe_questions(questions)
+        timings: List[Dict[str, Any]] = [{} for _ in unique]
+
+        # 1단계: 분류 + SQL 결정 (질문별 동시 실행)
+        plans = []
+        for position, (plan, error, elapsed) in enumerate(self._map(analyze, unique)):
+            timings[position]['analyze_ms'] = elapsed
+            plans.append(plan or {'analysis': {'type': 'GENERAL_ADVICE'}, 'sql_info': None, 'error': error})
+
+        # 2단계: 같은 SQL 은 한 번만, 같은 SQL 텍스트는 UNION ALL 로 묶어서 실행
+        rows_by_item, query_stats = self._fetch_grouped(plans, fetch, fetch_combined, timings)
+
+        # 3단계: 답변 생성 (질문별 동시 실행)
+        answered = self._map(
+            lambda position: answer(unique[position], plans[position]['analysis'], rows_by_item.get(position)),
+            list(range(len(unique)))
+        )
+
+        results = []
+        for index, question in enumerate(questions):
+            position = mapping[index]
+            result, error, answer_ms = answered[position]
+            item = {'question': question}
+            if result is None:
+                item.update({'answer': None, 'error': error or plans[position].get('error')})
+            else:
+                item.update(result)
+            item['deduplicated'] = mapping.index(position) != index
+            item['timings'] = dict(timings[position], answer_ms=answer_ms)
+            item['timings']['total_ms'] = round(sum(v for k, v in item['timings'].items() if k.endswith('_ms')), 1)
+            results.append(item)
+
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['questions'] += len(questions)
+            self._stats['unique_questions'] += len(unique)
+            for key, value in query_stats.items():
+                self._stats[key] += value
+
+        total_ms = _elapsed_ms(started)
+        logger.info("배치 처리 완료: 질문 %d개 (중복 제거 후 %d개), SQL %s개 → Data API 호출 %s회, %sms",
+                    len(questions), len(unique), query_stats['queries'], query_stats['sql_calls'], total_ms)
+        return {
+            'results': results,
+            'summary': dict(query_stats, questions=len(questions), unique_questions=len(unique), total_ms=total_ms)
+        }
+
+    def _fetch_grouped(self, plans, fetch, fetch_combined,
+                       timings) -> Tuple[Dict[int, Optional[List[Dict]]], Dict[str, int]]:
+        # (database, SQL 텍스트) → {파라미터 → 항목 위치 목록}
+        groups: Dict[Tuple, Dict[Tuple, List[int]]] = {}
+        for position, plan in enumerate(plans):
+            sql_info = plan.get('sql_info')
+            if sql_info and sql_info.get('sql'):
+                groups.setdefault(_query_key(sql_info), {}).setdefault(_parameter_key(sql_info), []).append(position)
+
+        stats = {'queries': sum(len(p) for g in groups.values() for p in g.values()),
+                 'sql_calls': 0, 'combined_queries': 0, 'combine_fallbacks': 0}
+        # 실행 단위: [(대표 sql_info, 결과를 받을 항목 위치 목록), ...]
+        units: List[List[Tuple[Dict[str, Any], List[int]]]] = []
+        for (_, sql), by_parameters in groups.items():
+            members = [(plans[positions[0]]['sql_info'], positions) for positions in by_parameters.values()]
+            if len(members) > 1 and is_combinable(sql):
+                units.append(members)
+            else:
+                units.extend([member] for member in members)
+
+        def _run_unit(members):
+            if len(members) == 1:
+                return [fetch(members[0][0])], 1, False
+            try:
+                combined = combine_queries([sql_info for sql_info, _ in members])
+                return split_combined_rows(fetch_combined(combined), len(members)), 1, False
+            except Exception as e:
+                # 묶은 쿼리가 실패하면(응답 크기 제한 등) 항목별로 다시 조회
+                logger.warning("묶은 쿼리 실행 실패, 항목별 조회로 대체: %s", e)
+                return [fetch(sql_info) for sql_info, _ in members], 1 + len(members), True
+
+        rows_by_item: Dict[int, Optional[List[Dict]]] = {}
+        for members, (outcome, error, elapsed) in zip(units, self._map(_run_unit, units)):
+            if outcome is None:
+                # 조회 실패는 빈 결과가 아님 (answer 가 실패로 처리)
+                row_lists, calls, fell_back = [None for _ in members], 0, False
+            else:
+                row_lists, calls, fell_back = outcome
+            stats['sql_calls'] += calls
+            if len(members) > 1:
+                stats['combined_queries'] += 1
+                stats['combine_fallbacks'] += int(fell_back)
+            for (_, positions), rows in zip(members, row_lists):
+                for position in positions:
+                    rows_by_item[position] = rows
+                    timings[position]['sql_ms'] = elapsed
+                    timings[position]['sql_shared_with'] = sum(len(p) for _, p in members) - 1
+        return rows_by_item, stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """중복 제거 / SQL 묶음 통계"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['sql_calls_saved'] = stats['queries'] - stats['sql_calls']
+        return stats
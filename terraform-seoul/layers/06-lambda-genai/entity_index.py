@@ -0,0 +1,234 @@
+"""
+GenAI Lambda 엔티티 인덱스
+owners / pets / vets / types / specialties 이름을 컨테이너당 한 번 메모리에 적재하고
+한글 정규화 + 2-gram 역인덱스로 이름을 기본 키(id)로 변환
+LIKE '%이름%' 조건(리터럴 / Data API 파라미터)을 id IN (...) 조건으로 바꿔서 인덱스 조회로 실행
+적재 뒤에 추가된 행(id 가 적재 시점 최대 id 보다 큰 행)은 원래 LIKE 조건으로 함께 찾고, TTL 이 지난 인덱스로는 바꾸지 않음
+"""
+
+import logging
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger()
+
+# (테이블, 컬럼) → 적재 SQL
+ENTITY_SOURCES: Dict[Tuple[str, str], str] = {
+    ('owners', 'first_name'): "SELECT id, first_name AS value FROM owners ORDER BY id",
+    ('owners', 'last_name'): "SELECT id, last_name AS value FROM owners ORDER BY id",
+    ('pets', 'name'): "SELECT id, name AS value FROM pets ORDER BY id",
+    ('vets', 'first_name'): "SELECT id, first_name AS value FROM vets ORDER BY id",
+    ('vets', 'last_name'): "SELECT id, last_name AS value FROM vets ORDER BY id",
+    ('types', 'name'): "SELECT id, name AS value FROM types ORDER BY id",
+    ('specialties', 'name'): "SELECT id, name AS value FROM specialties ORDER BY id",
+}
+
+# 이름 뒤에 붙는 조사/호칭 (긴 것부터 제거)
+KOREAN_SUFFIXES = sorted([
+    '이라는', '라는', '이가', '이는', '이를', '이의', '이랑', '에게', '한테',
+    '의', '은', '는', '이', '가', '을', '를', '랑', '와', '과', '님', '씨'
+], key=len, reverse=True)
+
+# IN 목록이 이보다 길면 LIKE 조건을 그대로 유지
+MAX_IN_LIST = 100
+
+_TABLE_ALIAS_PATTERN = re.compile(
+    r'\b(?:FROM|JOIN)\s+(owners|pets|vets|types|specialties)(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|LEFT\b|INNER\b|ORDER\b|GROUP\b|LIMIT\b)(\w+))?',
+    re.IGNORECASE
+)
+_LIKE_PATTERN = re.compile(
+    r"\b(\w+)\.(name|first_name|last_name)\s+LIKE\s+(?:'%([^%_'\\]+)%'|:(\w+))",
+    re.IGNORECASE
+)
+# 파라미터 값 중 부분 일치('%값%')로 바꿀 수 있는 값
+_CONTAINS_VALUE_PATTERN = re.compile(r"^%([^%_\\]+)%$")
+
+
+def normalize_name(value: str) -> str:
+    """유니코드 NFC 정규화 + 소문자 + 연속 공백 정리 (MySQL 기본 collation처럼 대소문자 무시)"""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', str(value))).strip().lower()
+
+
+def strip_korean_suffix(token: str) -> str:
+    """'춘식이를' → '춘식' 처럼 이름 뒤 조사 제거"""
+    for suffix in KOREAN_SUFFIXES:
+        if len(token) > len(suffix) and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def _bigrams(text: str) -> Set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class ColumnIndex:
+    """한 컬럼의 값 → id 인덱스 (정확 일치 dict + 부분 일치용 2-gram 역인덱스)"""
+
+    __slots__ = ('values', 'ids', 'exact', 'grams', 'max_id')
+
+    def __init__(self, rows: List[Tuple[int, str]]):
+        self.values: List[str] = []
+        self.ids: List[int] = []
+        self.exact: Dict[str, List[int]] = {}
+        self.grams: Dict[str, List[int]] = {}
+        # 적재 시점 최대 id (이후 추가된 행은 원래 조건으로 찾음)
+        self.max_id = max((row_id for row_id, _ in rows), default=0)
+        for row_id, value in rows:
+            if value is None:
+                continue
+            normalized = normalize_name(value)
+            position = len(self.values)
+            self.values.append(normalized)
+            self.ids.append(row_id)
+            self.exact.setdefault(normalized, []).append(row_id)
+            for gram in _bigrams(normalized):
+                self.grams.setdefault(gram, []).append(position)
+
+    def lookup_exact(self, text: str) -> List[int]:
+        return list(self.exact.get(normalize_name(text), []))
+
+    def lookup_contains(self, text: str) -> List[int]:
+        """LIKE '%text%' 와 같은 의미의 부분 일치 검색"""
+        needle = normalize_name(text)
+        if not needle:
+            return []
+        if len(needle) < 2:
+            positions = range(len(self.values))
+        else:
+            candidate_sets = []
+            for gram in _bigrams(needle):
+                postings = self.grams.get(gram)
+                if not postings:
+                    return []
+                candidate_sets.append(postings)
+            candidate_sets.sort(key=len)
+            positions = set(candidate_sets[0])
+            for postings in candidate_sets[1:]:
+                positions.intersection_update(postings)
+        return sorted({self.ids[p] for p in positions if needle in self.values[p]})
+
+
+class EntityIndex:
+    """컨테이너 단위 엔티티 인덱스 (TTL이 지나면 백그라운드 스레드에서 갱신)"""
+
+    def __init__(self, loader: Callable[[str], List[Tuple[int, str]]], ttl_seconds: float = 300.0):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.columns: Dict[Tuple[str, str], ColumnIndex] = {}
+        self.loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._stats = {'loads': 0, 'load_failures': 0, 'last_load_ms': 0.0,
+                       'rewrites': 0, 'resolved_predicates': 0, 'unresolved_predicates': 0, 'stale_skips': 0}
+
+    def load(self) -> bool:
+        """모든 엔티티 컬럼을 다시 적재 (실패하면 기존 인덱스 유지)"""
+        started = time.perf_counter()
+        columns = {}
+        try:
+            for key, sql in ENTITY_SOURCES.items():
+                rows = self.loader(sql)
+                columns[key] = ColumnIndex(rows)
+        except Exception as e:
+            logger.error("엔티티 인덱스 적재 실패: %s", e)
+            with self._lock:
+                self._stats['load_failures'] += 1
+            return False
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.columns = columns
+            self.loaded_at = time.time()
+            self._stats['loads'] += 1
+            self._stats['last_load_ms'] = round(elapsed_ms, 2)
+        logger.info("엔티티 인덱스 적재 완료: %d개 값, %.1fms", sum(len(c.ids) for c in columns.values()), elapsed_ms)
+        return True
+
+    def ensure_fresh(self) -> bool:
+        """첫 호출은 동기 적재, 이후 TTL이 지나면 기존 인덱스로 응답하면서 백그라운드 갱신"""
+        if self.loaded_at is None:
+            return self.load()
+        if time.time() - self.loaded_at < self.ttl_seconds:
+            return True
+        with self._lock:
+            if self._refreshing:
+                return True
+            self._refreshing = True
+
+        def _refresh():
+            try:
+                self.load()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_refresh, name='entity-index-refresh', daemon=True).start()
+        return True
+
+    def lookup(self, table: str, column: str, text: str, contains: bool = True) -> Optional[List[int]]:
+        """값에 해당하는 id 목록 (인덱스에 없는 컬럼이면 None)"""
+        index = self.columns.get((table.lower(), column.lower()))
+        if index is None:
+            return None
+        return index.lookup_contains(text) if contains else index.lookup_exact(text)
+
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or time.time() - self.loaded_at >= self.ttl_seconds
+
+    def rewrite_sql(self, sql: str, parameters: Optional[List[Dict[str, Any]]] = None) -> str:
+        """alias.name LIKE '%값%' / LIKE :이름 조건을 alias.id IN (...) 으로 변환 (해석 못 한 조건은 유지)
+
+        적재 뒤 추가된 행은 (alias.id > 적재 시점 최대 id AND 원래 조건) 으로 함께 찾음 (기본 키 범위 조회)
+        TTL 이 지나 갱신 중인 인덱스로는 바꾸지 않음 (이름 변경 / 삭제가 반영되지 않았을 수 있음)
+        """
+        if not self.columns:
+            return sql
+        if self.is_stale():
+            if _LIKE_PATTERN.search(sql):
+                with self._lock:
+                    self._stats['stale_skips'] += 1
+            return sql
+        values = {p['name']: str(p['value'].get('stringValue', '')) for p in parameters or []
+                  if 'stringValue' in p.get('value', {})}
+        aliases = {}
+        for table, alias in _TABLE_ALIAS_PATTERN.findall(sql):
+            aliases[(alias or table).lower()] = table.lower()
+
+        resolved = 0
+        unresolved = 0
+
+        def _replace(match):
+            nonlocal resolved, unresolved
+            alias, column, literal, parameter = match.groups()
+            if parameter is not None:
+                contains = _CONTAINS_VALUE_PATTERN.match(values.get(parameter, ''))
+                literal = contains.group(1) if contains else None
+            table = aliases.get(alias.lower())
+            index = self.columns.get((table, column.lower())) if table and literal else None
+            ids = index.lookup_contains(literal) if index else None
+            if not ids or len(ids) > MAX_IN_LIST:
+                unresolved += 1
+                return match.group(0)
+            resolved += 1
+            return f"({alias}.id IN ({', '.join(str(i) for i in ids)}) OR ({alias}.id > {index.max_id} AND {match.group(0)}))"
+
+        rewritten = _LIKE_PATTERN.sub(_replace, sql)
+        with self._lock:
+            self._stats['resolved_predicates'] += resolved
+            self._stats['unresolved_predicates'] += unresolved
+            if resolved:
+                self._stats['rewrites'] += 1
+        if resolved:
+            logger.info("엔티티 인덱스 SQL 변환: LIKE 조건 %d개 → id IN 조건", resolved)
+        return rewritten
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['entities'] = sum(len(c.ids) for c in self.columns.values())
+        stats['age_seconds'] = round(time.time() - self.loaded_at, 1) if self.loaded_at else None
+        stats['ttl_seconds'] = self.ttl_seconds
+        return stats
@@ -0,0 +1,177 @@
+"""
+GenAI Lambda SQL 예시 저장소
+예시 질문을 문자 n-gram TF-IDF 벡터로 색인해 두고, 질문과 가까운 예시만 top-k / 토큰 예산 안에서 골라 SQL 생성 프롬프트에 포함
+예시를 늘려도 요청마다 보내는 프롬프트 길이는 top-k / 토큰 예산으로 묶임 (외부 임베딩 서비스 없이 로컬 계산)
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger()
+
+EXAMPLES_HEADER = '질문 유형별 SQL 예시 (반드시 이 패턴을 따르세요):'
+NOTES_MARKER = '주의사항:'
+
+# SQL_EXAMPLES 프롬프트의 예시 한 쌍 (질문 / SQL)
+_EXAMPLE_PATTERN = re.compile(r'질문: "(.+?)"\nSQL: "(.+?)"')
+_WORD_PATTERN = re.compile(r'\w+')
+_HANGUL_PATTERN = re.compile('[가-힣]')
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (한글 1자당 1토큰, 그 외 4자당 1토큰)"""
+    hangul = len(_HANGUL_PATTERN.findall(text))
+    return max(1, hangul + (len(text) - hangul + 3) // 4)
+
+
+def char_ngrams(text: str, sizes: Sequence[int] = (2, 3)) -> Counter:
+    """단어별 문자 n-gram 빈도 (단어 앞뒤 공백 포함 - 조사가 붙은 한국어 단어도 어간 n-gram 이 겹침)"""
+    counts: Counter = Counter()
+    for word in _WORD_PATTERN.findall(text.lower()):
+        padded = f' {word} '
+        for size in sizes:
+            for start in range(len(padded) - size + 1):
+                counts[padded[start:start + size]] += 1
+    return counts
+
+
+def sql_skeleton(sql: str) -> str:
+    """문자열 / 숫자 값을 뺀 SQL 형태 (같은 패턴 예시 중복 제거, 평가용 비교)
+
+    기본 행 제한(LIMIT 20)은 주의사항에서 따로 지시하므로 비교에서 제외
+    """
+    skeleton = re.sub(r"'[^']*'", '?', sql)
+    skeleton = re.sub(r'([=<>])\s*\d+', r'\1 ?', skeleton)
+    skeleton = ' '.join(skeleton.split()).upper()
+    return re.sub(r'\s+LIMIT 20$', '', skeleton)
+
+
+class SqlExample:
+    """질문 / SQL 예시 한 쌍"""
+
+    __slots__ = ('question', 'sql', 'skeleton', 'tokens')
+
+    def __init__(self, question: str, sql: str):
+        self.question = question
+        self.sql = sql
+        self.skeleton = sql_skeleton(sql)
+        self.tokens = estimate_tokens(self.render())
+
+    def render(self) -> str:
+        return f'질문: "{self.question}"\nSQL: "{self.sql}"'
+
+
+def parse_prompt_examples(text: str) -> Tuple[List[SqlExample], str]:
+    """SQL_EXAMPLES 프롬프트 → (예시 목록, 주의사항 부분)"""
+    examples = [SqlExample(question, sql) for question, sql in _EXAMPLE_PATTERN.findall(text)]
+    notes = text[text.index(NOTES_MARKER):].strip() if NOTES_MARKER in text else ''
+    return examples, notes
+
+
+def load_examples(path: str) -> List[SqlExample]:
+    """예시 라이브러리 파일 (jsonl: question / sql) 읽기 - 파일이 없으면 빈 목록"""
+    if not os.path.exists(path):
+        logger.warning("SQL 예시 파일 없음: %s", path)
+        return []
+    examples = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                examples.append(SqlExample(item['question'], item['sql']))
+    return examples
+
+
+class ExampleStore:
+    """문자 n-gram TF-IDF 코사인 유사도로 예시를 고르는 저장소 (생성 후 읽기 전용)"""
+
+    def __init__(self, examples: Iterable[SqlExample], notes: str = '', ngram_sizes: Sequence[int] = (2, 3)):
+        # 같은 질문은 처음 등록한 예시만 사용
+        unique: Dict[str, SqlExample] = {}
+        for example in examples:
+            unique.setdefault(example.question, example)
+        self.examples = list(unique.values())
+        self.notes = notes
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.total_tokens = sum(example.tokens for example in self.examples)
+
+        grams = [char_ngrams(example.question, self.ngram_sizes) for example in self.examples]
+        document_freq: Counter = Counter()
+        for counts in grams:
+            document_freq.update(counts.keys())
+        count = len(self.examples)
+        self._idf = {gram: math.log((1 + count) / (1 + freq)) + 1 for gram, freq in document_freq.items()}
+        self._vectors = [self._vectorize(counts) for counts in grams]
+
+        self._lock = threading.Lock()
+        self._stats = {'selections': 0, 'selected_examples': 0, 'selected_tokens': 0, 'select_ms': 0.0}
+
+    def _vectorize(self, counts: Counter) -> Dict[str, float]:
+        """n-gram 빈도 → L2 정규화한 TF-IDF 벡터 (예시에 없는 n-gram 은 무시)"""
+        vector = {gram: (1 + math.log(freq)) * self._idf[gram] for gram, freq in counts.items() if gram in self._idf}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {gram: weight / norm for gram, weight in vector.items()} if norm else {}
+
+    def rank(self, question: str) -> List[Tuple[float, SqlExample]]:
+        """질문과의 코사인 유사도 내림차순 (같으면 등록 순서)"""
+        query = self._vectorize(char_ngrams(question, self.ngram_sizes))
+        scored = []
+        for index, vector in enumerate(self._vectors):
+            score = sum(weight * vector.get(gram, 0.0) for gram, weight in query.items())
+            scored.append((score, index))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(round(score, 4), self.examples[index]) for score, index in scored]
+
+    def select(self, question: str, top_k: int = 4, token_budget: int = 0) -> List[SqlExample]:
+        """관련도 순으로 SQL 패턴이 겹치지 않는 예시를 top_k 개까지, 토큰 예산(0이면 제한 없음) 안에서 선택"""
+        started = time.perf_counter()
+        selected: List[SqlExample] = []
+        skeletons = set()
+        used_tokens = 0
+        for _, example in self.rank(question):
+            if len(selected) >= top_k:
+                break
+            if example.skeleton in skeletons:
+                continue
+            if token_budget and used_tokens + example.tokens > token_budget:
+                continue
+            selected.append(example)
+            skeletons.add(example.skeleton)
+            used_tokens += example.tokens
+
+        with self._lock:
+            self._stats['selections'] += 1
+            self._stats['selected_examples'] += len(selected)
+            self._stats['selected_tokens'] += used_tokens
+            self._stats['select_ms'] += (time.perf_counter() - started) * 1000
+        return selected
+
+    def render(self, examples: List[SqlExample]) -> str:
+        """선택한 예시 → 프롬프트 예시 섹션 (SQL_EXAMPLES 와 같은 형식)"""
+        body = '\n\n'.join(example.render() for example in examples)
+        return f'{EXAMPLES_HEADER}\n\n{body}'
+
+    def get_stats(self) -> Dict[str, Any]:
+        """예시 수 / 선택 통계"""
+        with self._lock:
+            stats = dict(self._stats)
+        selections = stats['selections']
+        stats['select_ms'] = round(stats['select_ms'], 3)
+        stats['avg_examples'] = round(stats['selected_examples'] / selections, 2) if selections else 0.0
+        stats['avg_tokens'] = round(stats['selected_tokens'] / selections, 1) if selections else 0.0
+        return dict(stats, examples=len(self.examples), library_tokens=self.total_tokens)
+
+
+def create_example_store(prompt_examples: str, library_path: Optional[str] = None) -> ExampleStore:
+    """SQL_EXAMPLES 프롬프트 예시 + 예시 라이브러리 파일로 저장소 생성"""
+    examples, notes = parse_prompt_examples(prompt_examples)
+    if library_path:
+        examples += load_examples(library_path)
+    return ExampleStore(examples, notes)
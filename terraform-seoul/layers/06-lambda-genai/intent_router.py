@@ -0,0 +1,180 @@
+"""
+GenAI Lambda 로컬 의도 분류기
+키워드/엔티티/패턴 규칙으로 질문 유형(DATABASE_QUERY / GENERAL_ADVICE)을 판단해서
+확실한 질문은 Bedrock 분류 호출 없이 바로 라우팅
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger()
+
+DATABASE_QUERY = 'DATABASE_QUERY'
+GENERAL_ADVICE = 'GENERAL_ADVICE'
+# 파이프라인이 처리하는 질문 유형 (등록한 분류기가 다른 유형을 반환하면 그 결과는 무시)
+QUESTION_TYPES = (DATABASE_QUERY, GENERAL_ADVICE)
+
+# 데이터베이스에 존재하는 반려동물 이름 (SQL 생성 프롬프트의 목록과 동일) + 프롬프트 예시 이름
+KNOWN_PET_NAMES = [
+    'Leo', 'Basil', 'Rosy', 'Jewel', 'Iggy', 'George', 'Samantha', 'Max',
+    'Lucky', 'Mulligan', 'Freddy', 'Sly', 'Coco', '춘식', '페페'
+]
+
+# (패턴, 가중치, 설명) - 가중치는 해당 패턴 하나만으로 그 유형이라고 믿을 수 있는 정도
+DATABASE_QUERY_PATTERNS: List[Tuple[str, float, str]] = [
+    (r'(주인|owner|보호자)(은|는|이|가)?\s*(누구|누가)|who\s+owns|owned\s+by', 0.95, '반려동물 주인 조회'),
+    (r'(검진|진료|방문)\s*(기록|이력|내역|일)', 0.9, '방문 기록 조회'),
+    (r'최근.*(검진|방문|진료)', 0.8, '최근 방문 조회'),
+    (r'(pet|펫|반려동물)\s*(name|이름)', 0.9, '반려동물 이름 조회'),
+    (r'(키우는|키우고\s*있는)\s*(사람|주인|고객)', 0.9, '반려동물을 키우는 주인 조회'),
+    (r'키우고\s*있(지|어|나|니)', 0.8, '주인-반려동물 관계 확인'),
+    (r'(이|가)?\s*없는\s*(owner|주인|고객)', 0.9, '반려동물이 없는 주인 조회'),
+    (r'(라는|이라는)\s*(이름의\s*)?(고객|사람|주인|반려동물|pet|펫)', 0.85, '특정 이름 조회'),
+    (r'(주소|전화번호|연락처|address|telephone)', 0.75, '주인 연락처 조회'),
+    (r'(고객|customer|owner)', 0.5, '고객 정보'),
+    (r'(전문|specialt).{0,10}(수의사|vet)|(수의사|vet).{0,10}(누구|목록|명단|이름|전문)', 0.9, '수의사 전문 분야 조회'),
+    (r'누구(야|인가|예요|에요|니|지)|누가\s*있', 0.6, '인물 조회 질문'),
+    (r'(몇\s*(명|마리|번)|목록|명단|리스트)', 0.6, '목록/개수 조회'),
+    (r'\d{1,2}\s*월에', 0.5, '기간 조건'),
+    (r'[A-Z][a-z]+(\s+[A-Z][a-z]+)?\s*(의|이|가|는|라는|이라는)', 0.6, '이름 엔티티'),
+]
+
+GENERAL_ADVICE_PATTERNS: List[Tuple[str, float, str]] = [
+    (r'기침|구토|설사|토해|토를|열이|아파|아프|가려|피부병|털이.{0,6}빠|식욕|무기력|절뚝|증상|숨을', 0.85, '건강 증상 상담'),
+    (r'예방\s*접종|접종|백신|구충|심장사상충', 0.8, '예방접종 상담'),
+    (r'먹으면\s*안|먹어도|먹여도|사료|음식|간식|급여', 0.8, '식단 상담'),
+    (r'팁|방법|어떻게|관리|훈련|산책|목욕|양치|스트레스', 0.6, '일반 관리 조언'),
+    (r'(해야|하면|해도)\s*(하나요|되나요|돼|될까|좋을까|할까)', 0.6, '조언 요청'),
+    (r'(해요|나요|가요|까요)\s*[?？]?\s*$', 0.4, '상담형 어미'),
+]
+
+
+class KeywordIntentRouter:
+    """키워드/패턴 가중치 기반 의도 분류기"""
+
+    name = 'keyword'
+
+    def __init__(self, known_entities: Optional[List[str]] = None):
+        self.db_patterns = [(re.compile(p, re.IGNORECASE), w, r) for p, w, r in DATABASE_QUERY_PATTERNS]
+        self.advice_patterns = [(re.compile(p, re.IGNORECASE), w, r) for p, w, r in GENERAL_ADVICE_PATTERNS]
+        entities = known_entities if known_entities is not None else KNOWN_PET_NAMES
+        self.entity_pattern = None
+        if entities:
+            alternatives = '|'.join(re.escape(name) for name in sorted(entities, key=len, reverse=True))
+            self.entity_pattern = re.compile(f'({alternatives})')
+
+    @staticmethod
+    def _combine(matches: List[Tuple[float, str]]) -> float:
+        """여러 근거를 noisy-OR로 합산 (근거가 많을수록 1에 가까워짐)"""
+        remaining = 1.0
+        for weight, _ in matches:
+            remaining *= (1.0 - weight)
+        return 1.0 - remaining
+
+    def route(self, question: str) -> Dict[str, Any]:
+        """질문 유형과 신뢰도 반환"""
+        db_matches = [(w, r) for p, w, r in self.db_patterns if p.search(question)]
+        advice_matches = [(w, r) for p, w, r in self.advice_patterns if p.search(question)]
+
+        if self.entity_pattern is not None and self.entity_pattern.search(question):
+            db_matches.append((0.7, '알려진 반려동물 이름'))
+
+        db_score = self._combine(db_matches)
+        advice_score = self._combine(advice_matches)
+
+        # 반대 유형의 근거가 있으면 그만큼 신뢰도를 낮춤
+        if db_score >= advice_score:
+            question_type, matches = DATABASE_QUERY, db_matches
+            confidence = db_score * (1.0 - advice_score)
+        else:
+            question_type, matches = GENERAL_ADVICE, advice_matches
+            confidence = advice_score * (1.0 - db_score)
+
+        reasons = ', '.join(r for _, r in matches) or '일치하는 패턴 없음'
+        return {
+            'type': question_type,
+            'reason': f"로컬 분류 ({reasons})",
+            'confidence': round(confidence, 4)
+        }
+
+
+class IntentRouter:
+    """등록된 로컬 분류기를 순서대로 실행하고 가장 확실한 결과를 선택"""
+
+    def __init__(self, routers: Optional[List[Any]] = None, min_confidence: float = 0.75):
+        self.routers = list(routers) if routers is not None else [KeywordIntentRouter()]
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'hits': 0,
+            'fallbacks': 0,
+            'invalid_decisions': 0,
+            'hits_by_type': {DATABASE_QUERY: 0, GENERAL_ADVICE: 0},
+            'total_latency_us': 0.0,
+            'max_latency_us': 0.0
+        }
+
+    def register(self, router: Any, first: bool = False) -> None:
+        """route(question) -> dict 를 제공하는 분류기 추가"""
+        if first:
+            self.routers.insert(0, router)
+        else:
+            self.routers.append(router)
+
+    def classify(self, question: str) -> Dict[str, Any]:
+        """모든 분류기 결과 중 신뢰도가 가장 높은 결과 반환 (router 이름 포함)"""
+        best = {'type': GENERAL_ADVICE, 'reason': '등록된 분류기 없음', 'confidence': 0.0, 'router': None}
+        for router in self.routers:
+            try:
+                decision = router.route(question)
+            except Exception as e:
+                logger.warning("로컬 분류기 오류 (%s): %s", getattr(router, 'name', router), e)
+                continue
+            if decision and decision.get('type') not in QUESTION_TYPES:
+                logger.warning("로컬 분류기 결과 무시 (%s): 알 수 없는 유형 %s",
+                               getattr(router, 'name', router), decision.get('type'))
+                with self._lock:
+                    self._stats['invalid_decisions'] += 1
+                continue
+            if decision and decision.get('confidence', 0.0) > best['confidence']:
+                best = dict(decision, router=getattr(router, 'name', type(router).__name__))
+        return best
+
+    def route(self, question: str) -> Optional[Dict[str, Any]]:
+        """신뢰도가 기준 이상이면 분류 결과, 아니면 None (LLM 분류기로 대체)"""
+        started = time.perf_counter()
+        decision = self.classify(question)
+        elapsed_us = (time.perf_counter() - started) * 1_000_000
+
+        hit = decision['confidence'] >= self.min_confidence
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['total_latency_us'] += elapsed_us
+            self._stats['max_latency_us'] = max(self._stats['max_latency_us'], elapsed_us)
+            if hit:
+                self._stats['hits'] += 1
+                self._stats['hits_by_type'][decision['type']] += 1
+            else:
+                self._stats['fallbacks'] += 1
+
+        logger.info(
+            "로컬 의도 분류: %s (신뢰도 %.2f, %s, %.0fus)",
+            decision['type'], decision['confidence'], '적중' if hit else 'LLM 대체', elapsed_us
+        )
+        return decision if hit else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """적중률과 분류 지연 시간 통계"""
+        with self._lock:
+            stats = dict(self._stats, hits_by_type=dict(self._stats['hits_by_type']))
+        requests = stats['requests']
+        stats['hit_rate'] = round(stats['hits'] / requests, 4) if requests else 0.0
+        stats['avg_latency_us'] = round(stats['total_latency_us'] / requests, 2) if requests else 0.0
+        stats['total_latency_us'] = round(stats['total_latency_us'], 2)
+        stats['max_latency_us'] = round(stats['max_latency_us'], 2)
+        stats['min_confidence'] = self.min_confidence
+        return stats
@@ -4,21 +4,133 @@ GenAI Lambda 함수 - Amazon Bedrock과 RDS Data API 통합
 RDS Data API를 사용하여 Aurora MySQL에 연결
 """
 
+import time
+
+# 초기화 시간 측정 시작 (모듈 import 포함)
+_init_started = time.perf_counter()
+
 import json
 import logging
 import os
 import boto3
-from typing import Dict, Any, Optional, List
-import traceback
+from typing import Dict, Any, Optional, List, Iterator, Tuple, Callable
+import threading
 from datetime import datetime
 
-# 로깅 설정
+from bedrock_stream import format_sse, iter_stream_text
+from entity_index import EntityIndex
+from intent_router import IntentRouter
+from query_templates import create_default_registry
+from rds_decoder import decode_response
+from result_pager import ResultPager
+from speculation import SpeculativeExecutor
+from batch_runner import BatchRunner, normalize_question
+from answer_cache import AnswerCache, DataVersionTracker, load_cache_store, make_cache_key
+from metrics import MetricsRecorder
+from structured_logging import configure_logging
+from bootstrap import InitProfiler, build_client_config
+from prompt_cache import PromptCacheStats, read_cache_usage
+from example_store import ExampleStore, create_example_store
+from sql_guard import INDEXED_COLUMNS, SqlGuard, SqlGuardError, parse_column_list
+from query_workload import WorkloadRecorder
+from local_replica import PETCLINIC_SCHEMA, LocalReplica
+from table_versions import build_table_version_sql, digest_versions, parse_table_versions
+from answer_renderer import AnswerRenderer
+from single_flight import SingleFlight, SingleFlightAbandoned, SingleFlightTimeout
+from bedrock_limiter import BedrockLimiter
+from hedging import DeadlineExceeded, HedgedCaller, RequestBudget, current_budget, set_request_budget
+from model_adapters import PIPELINE_STAGES, StageModelRouter, get_adapter, parse_stage_values
+
+# 초기화 단계별 시간 (INIT_BUDGET_MS 를 넘으면 경고 로그, GET /health 의 init 항목)
+init_profile = InitProfiler(started=_init_started)
+init_profile.mark('imports')
+
+# 로깅 설정 (LOG_FORMAT=json 이면 구조화 로그, 상세 로그는 요청 단위 샘플링 + 오류 시 버퍼 출력)
 logger = logging.getLogger()
-logger.setLevel(os.getenv('LOG_LEVEL', 'INFO'))
+request_logging = configure_logging(
+    logger,
+    level=os.getenv('LOG_LEVEL', 'INFO'),
+    log_format=os.getenv('LOG_FORMAT', 'text').lower(),
+    sample_rate=float(os.getenv('LOG_SAMPLE_RATE', '0')),
+    buffer_size=int(os.getenv('LOG_DEBUG_BUFFER_SIZE', '0')),
+    max_chars=int(os.getenv('LOG_MAX_MESSAGE_CHARS', '2000'))
+)
 
 # AWS 클라이언트 초기화 (전역 변수로 재사용)
 bedrock_client = None
 rds_data_client = None
+intent_router = None
+entity_index = None
+
+# 모델 ID별 Bedrock 동시 호출 한도 + 스로틀링 재시도 (BEDROCK_LIMITER_ENABLED=true 일 때 첫 호출 시 생성)
+bedrock_limiter = None
+
+# 파이프라인 단계별 기한 / 지연 헤지 실행기 (STAGE_DEADLINES_ENABLED 또는 HEDGE_ENABLED=true 일 때 첫 호출 시 생성)
+stage_caller = None
+hedge_bedrock_client = None
+
+# 단계별 Bedrock 모델 ID + 지연 기반 대체 모델 전환 (첫 호출 시 환경 변수로 생성)
+model_router = None
+
+# 생성 SQL 검사기 (SQL_GUARD_ENABLED=true 일 때 첫 사용 시 생성)
+sql_guard = None
+
+# 실행 SQL 지문별 통계 (SQL_WORKLOAD_ENABLED=true 일 때 첫 사용 시 생성, 인덱스 분석용)
+sql_workload = None
+
+# petclinic 메모리 SQLite 복제본 (LOCAL_REPLICA_ENABLED=true 일 때 초기화 단계에서 적재)
+local_replica = None
+LOCAL_REPLICA_ENABLED = os.getenv('LOCAL_REPLICA_ENABLED', 'false').lower() == 'true'
+
+# SQL 예시 저장소 (SQL_EXAMPLE_MODE=select 일 때 첫 사용 시 생성)
+sql_example_store = None
+SQL_EXAMPLE_LIBRARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql_examples.jsonl')
+query_template_registry = create_default_registry()
+speculative_executor = None
+answer_renderer = None
+batch_runner = None
+answer_cache = None
+data_version_tracker = None
+
+# 동시에 들어온 같은 질문은 파이프라인 한 번만 실행 (서버 모드 / 배치 스레드에서 효과, SINGLE_FLIGHT_ENABLED=false 로 끔)
+single_flight = None
+
+# 정적 system 프롬프트 호출의 프롬프트 캐시 읽기 / 쓰기 토큰 통계
+prompt_cache_stats = PromptCacheStats()
+
+# 현재 스레드의 마지막 Bedrock 호출 토큰 사용량 (추측 실행 낭비 토큰 계산용)
+bedrock_usage = threading.local()
+
+# 단계별 지표 (METRICS_ENABLED=true 면 호출마다 CloudWatch EMF JSON 한 줄 출력)
+metrics = MetricsRecorder(
+    namespace=os.getenv('METRICS_NAMESPACE', 'PetClinic/GenAI'),
+    service=os.getenv('METRICS_SERVICE') or os.getenv('AWS_LAMBDA_FUNCTION_NAME', 'genai-lambda'),
+    enabled=os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+)
+
+def get_client_config(service_name: str):
+    """서비스 클라이언트 botocore 설정 (keep-alive, 연결 풀, 타임아웃, adaptive 재시도)
+
+    재시도를 포함한 호출 하나가 CLIENT_CALL_BUDGET_SECONDS(함수 타임아웃 - 오류 응답 여유) 안에 끝나도록 시도 횟수를 줄임
+    Bedrock 호출 제한기를 쓰면 Bedrock 클라이언트는 재시도 / adaptive 속도 제한 없이 한 번만 시도
+    (스로틀링 재시도와 동시 호출 조정은 제한기가 담당, 두 재시도가 겹치면 시도 횟수가 곱해짐)
+    """
+    max_attempts = int(os.getenv('CLIENT_RETRY_MAX_ATTEMPTS', '3'))
+    retry_mode = os.getenv('CLIENT_RETRY_MODE', 'adaptive')
+    if service_name == 'bedrock-runtime':
+        read_timeout = os.getenv('BEDROCK_READ_TIMEOUT', '50')
+        if os.getenv('BEDROCK_LIMITER_ENABLED', 'false').lower() == 'true':
+            max_attempts, retry_mode = 1, 'standard'
+    else:
+        read_timeout = os.getenv('RDS_DATA_READ_TIMEOUT', '45')
+    return build_client_config(
+        max_pool_connections=int(os.getenv('CLIENT_MAX_POOL_CONNECTIONS', '16')),
+        connect_timeout=float(os.getenv('CLIENT_CONNECT_TIMEOUT', '2')),
+        read_timeout=float(read_timeout),
+        max_attempts=max_attempts,
+        retry_mode=retry_mode,
+        time_budget=float(os.getenv('CLIENT_CALL_BUDGET_SECONDS', '55'))
+    )
 
 def get_bedrock_client():
     """Bedrock 클라이언트 초기화"""
@@ -26,28 +138,114 @@ def get_bedrock_client():
     if bedrock_client is None:
         try:
             region = os.getenv('AWS_REGION', 'ap-northeast-2')
-            bedrock_client = boto3.client('bedrock-runtime', region_name=region)
-            logger.info(f"Bedrock 클라이언트 초기화 성공 (region: {region})")
+            bedrock_client = boto3.client('bedrock-runtime', region_name=region,
+                                          config=get_client_config('bedrock-runtime'))
+            logger.info("Bedrock 클라이언트 초기화 성공 (region: %s)", region)
         except Exception as e:
-            logger.error(f"Bedrock 클라이언트 초기화 실패: {str(e)}")
+            logger.error("Bedrock 클라이언트 초기화 실패: %s", e)
             raise
     return bedrock_client
 
+def record_limiter_event(name: str, value: float) -> None:
+    """Bedrock 호출 제한기 지표 기록 (동시 호출 수는 요청 안 최대값)"""
+    if name == 'in_flight':
+        metrics.maximum('bedrock_in_flight', value)
+    elif name.endswith('_ms'):
+        metrics.add(f'bedrock_{name}', value, 'Milliseconds')
+    else:
+        metrics.add(f'bedrock_{name}', value)
+
+def get_bedrock_limiter() -> Optional[BedrockLimiter]:
+    """Bedrock 호출 제한기 초기화 (BEDROCK_LIMITER_ENABLED=true일 때만 사용)"""
+    global bedrock_limiter
+    if os.getenv('BEDROCK_LIMITER_ENABLED', 'false').lower() != 'true':
+        return None
+    if bedrock_limiter is None:
+        bedrock_limiter = BedrockLimiter(
+            initial_limit=int(os.getenv('BEDROCK_LIMITER_INITIAL_LIMIT', '8')),
+            max_limit=int(os.getenv('BEDROCK_LIMITER_MAX_LIMIT', '64')),
+            deadline_seconds=float(os.getenv('BEDROCK_LIMITER_DEADLINE_SECONDS', '20')),
+            max_retries=int(os.getenv('BEDROCK_LIMITER_MAX_RETRIES', '4')),
+            observe=record_limiter_event
+        )
+    return bedrock_limiter
+
+def get_stage_caller() -> Optional[HedgedCaller]:
+    """단계별 기한 / 지연 헤지 실행기 초기화 (STAGE_DEADLINES_ENABLED 또는 HEDGE_ENABLED=true일 때만 사용)"""
+    global stage_caller
+    deadlines = os.getenv('STAGE_DEADLINES_ENABLED', 'false').lower() == 'true'
+    hedge = os.getenv('HEDGE_ENABLED', 'false').lower() == 'true'
+    if not (deadlines or hedge):
+        return None
+    if stage_caller is None:
+        stage_caller = HedgedCaller(
+            hedge=hedge,
+            hedge_percentile=float(os.getenv('HEDGE_PERCENTILE', '95')),
+            min_delay_ms=float(os.getenv('HEDGE_MIN_DELAY_MS', '200')),
+            default_delay_ms=float(os.getenv('HEDGE_DEFAULT_DELAY_MS', '3000')),
+            observe=lambda name, value: metrics.add(f'stage_{name}', value)
+        )
+        logger.info("단계 기한 / 헤지 실행기 초기화 (기한: %s, 헤지: %s)", deadlines, hedge)
+    return stage_caller
+
+def get_hedge_target(client, model_id: str) -> Tuple[Any, str]:
+    """헤지 호출 대상 (클라이언트, 모델 ID) - HEDGE_MODEL_ID / HEDGE_REGION 이 없으면 같은 모델 / 리전"""
+    global hedge_bedrock_client
+    hedge_model_id = os.getenv('HEDGE_MODEL_ID') or model_id
+    hedge_region = os.getenv('HEDGE_REGION', '')
+    # 기본 클라이언트 리전과 같으면 같은 클라이언트 사용
+    client_region = getattr(getattr(client, 'meta', None), 'region_name', None) or os.getenv('AWS_REGION', 'ap-northeast-2')
+    if not hedge_region or hedge_region == client_region:
+        return client, hedge_model_id
+    if hedge_bedrock_client is None:
+        hedge_bedrock_client = boto3.client('bedrock-runtime', region_name=hedge_region,
+                                            config=get_client_config('bedrock-runtime'))
+        logger.info("헤지용 Bedrock 클라이언트 초기화 (region: %s)", hedge_region)
+    return hedge_bedrock_client, hedge_model_id
+
+def get_model_router() -> StageModelRouter:
+    """단계별 모델 선택기 초기화 (BEDROCK_<단계>_MODEL_ID 가 없는 단계는 BEDROCK_MODEL_ID)"""
+    global model_router
+    if model_router is None:
+        model_router = StageModelRouter(
+            default_model=os.getenv('BEDROCK_MODEL_ID', 'anthropic.claude-3-haiku-20240307-v1:0'),
+            stage_models={stage: os.getenv(f'BEDROCK_{stage.upper()}_MODEL_ID', '') for stage in PIPELINE_STAGES},
+            fallback_model=os.getenv('MODEL_FALLBACK_ID', ''),
+            p95_thresholds_ms=parse_stage_values(os.getenv('MODEL_FALLBACK_P95_MS', '')),
+            cooldown_seconds=float(os.getenv('MODEL_FALLBACK_COOLDOWN_SECONDS', '60'))
+        )
+        logger.info("단계별 Bedrock 모델: %s", model_router.get_stats()['models'])
+    return model_router
+
+def get_stage_model_id(stage: str) -> str:
+    """이번 단계 호출에 쓸 Bedrock 모델 ID (지연 기준을 넘어 전환 중이면 MODEL_FALLBACK_ID)"""
+    router = get_model_router()
+    model_id = router.select(stage)
+    if model_id != router.primary(stage):
+        metrics.add('model_fallback_calls')
+    return model_id
+
 def get_rds_data_client():
     """RDS Data API 클라이언트 초기화"""
     global rds_data_client
     if rds_data_client is None:
         try:
             region = os.getenv('AWS_REGION', 'ap-northeast-2')
-            rds_data_client = boto3.client('rds-data', region_name=region)
-            logger.info(f"RDS Data API 클라이언트 초기화 성공 (region: {region})")
+            rds_data_client = boto3.client('rds-data', region_name=region,
+                                           config=get_client_config('rds-data'))
+            logger.info("RDS Data API 클라이언트 초기화 성공 (region: %s)", region)
         except Exception as e:
-            logger.error(f"RDS Data API 클라이언트 초기화 실패: {str(e)}")
+            logger.error("RDS Data API 클라이언트 초기화 실패: %s", e)
             raise
     return rds_data_client
 
-def execute_sql(database: str, sql: str, parameters: List = None) -> List[Dict]:
-    """RDS Data API를 사용하여 SQL 실행"""
+@metrics.timed('execute_sql')
+def execute_sql(database: str, sql: str, parameters: List = None, row_format: str = 'dict',
+                raise_errors: bool = False) -> List[Dict]:
+    """RDS Data API를 사용하여 SQL 실행 (row_format: dict / tuple / columns, rds_decoder 참고)
+
+    raise_errors=True 면 실패 시 빈 결과 대신 예외를 그대로 전달 (페이지 조회기에서 응답 크기 제한 처리용)
+    """
     try:
         client = get_rds_data_client()
 
@@ -56,9 +254,11 @@ def execute_sql(database: str, sql: str, parameters: List = None) -> List[Dict]:
         secret_arn = os.getenv('DB_SECRET_ARN')
 
         if not cluster_arn or not secret_arn:
+            if raise_errors:
+                raise RuntimeError("DB_CLUSTER_ARN 또는 DB_SECRET_ARN 환경 변수가 설정되지 않았습니다")
             logger.error("DB_CLUSTER_ARN 또는 DB_SECRET_ARN 환경 변수가 설정되지 않았습니다")
-            logger.error(f"DB_CLUSTER_ARN: {cluster_arn}")
-            logger.error(f"DB_SECRET_ARN: {secret_arn}")
+            logger.error("DB_CLUSTER_ARN: %s", cluster_arn)
+            logger.error("DB_SECRET_ARN: %s", secret_arn)
             return []
 
         # SQL 실행 파라미터 구성
@@ -73,58 +273,35 @@ def execute_sql(database: str, sql: str, parameters: List = None) -> List[Dict]:
         if parameters:
             execute_params['parameters'] = parameters
 
-        logger.info(f"SQL 실행: {sql[:100]}...")
-        logger.info(f"데이터베이스: {database}")
-        logger.info(f"클러스터 ARN: {cluster_arn}")
-        logger.info(f"시크릿 ARN: {secret_arn}")
+        # RDS_RECORDS_FORMAT=json 이면 Data API가 결과를 JSON 문자열(formattedRecords)로 반환
+        if os.getenv('RDS_RECORDS_FORMAT', 'typed').lower() == 'json':
+            execute_params['formatRecordsAs'] = 'JSON'
+
+        logger.debug("SQL 실행 (%s): %s", database, sql)
+        logger.debug("클러스터 ARN: %s / 시크릿 ARN: %s", cluster_arn, secret_arn)
 
         # SQL 실행
         response = client.execute_statement(**execute_params)
 
         # 결과 파싱
-        if 'records' not in response:
+        if 'records' not in response and 'formattedRecords' not in response:
             logger.info("쿼리 결과가 없습니다")
             return []
 
-        records = response['records']
-        column_metadata = response.get('columnMetadata', [])
-
-        # 컬럼 이름 추출
-        column_names = [col['name'] for col in column_metadata]
-        logger.info(f"컬럼 메타데이터: {column_names}")
-
-        # 결과를 딕셔너리 리스트로 변환
-        results = []
-        for record in records:
-            row = {}
-            for i, value in enumerate(record):
-                column_name = column_names[i] if i < len(column_names) else f'col_{i}'
-
-                # RDS Data API 응답 값 파싱
-                if 'stringValue' in value:
-                    row[column_name] = value['stringValue']
-                elif 'longValue' in value:
-                    row[column_name] = value['longValue']
-                elif 'doubleValue' in value:
-                    row[column_name] = value['doubleValue']
-                elif 'booleanValue' in value:
-                    row[column_name] = value['booleanValue']
-                elif 'isNull' in value and value['isNull']:
-                    row[column_name] = None
-                else:
-                    row[column_name] = str(value)
-
-            results.append(row)
+        # 컬럼 메타데이터로 컬럼별 변환 함수를 만들어 한 번에 변환
+        results = decode_response(response, row_format)
+        row_count = len(next(iter(results.values()), [])) if isinstance(results, dict) else len(results)
 
-        logger.info(f"SQL 실행 성공: {len(results)}개 결과")
-        logger.info(f"샘플 결과: {results[:2] if results else '없음'}")
+        metrics.add('sql_rows', row_count)
+        logger.info("SQL 실행 성공: %d개 결과", row_count)
+        logger.debug("컬럼 메타데이터: %s", response.get('columnMetadata', []))
+        logger.debug("샘플 결과: %s", results[:2] if isinstance(results, list) else results)
         return results
 
     except Exception as e:
-        logger.error(f"SQL 실행 오류: {str(e)}")
-        logger.error(f"오류 타입: {type(e).__name__}")
-        import traceback
-        logger.error(f"스택 트레이스: {traceback.format_exc()}")
+        if raise_errors:
+            raise
+        logger.error("SQL 실행 오류 (%s): %s", type(e).__name__, e, exc_info=True)
 
         # 데이터베이스 초기화 필요 여부 확인
         if "doesn't exist" in str(e) or "Table" in str(e) and "exist" in str(e):
@@ -133,86 +310,192 @@ def execute_sql(database: str, sql: str, parameters: List = None) -> List[Dict]:
 
         return []
 
-def invoke_bedrock_model(client, model_id: str, prompt: str, max_tokens: int = 500) -> str:
-    """Bedrock 모델 호출 헬퍼 함수 - 모델별 형식 자동 처리"""
-    logger.info(f"Bedrock 모델 호출: {model_id}")
-    
-    # 모델별로 다른 request body 형식 사용
-    if 'anthropic' in model_id.lower() or 'claude' in model_id.lower():
-        # Claude 모델용 형식
-        messages = [{"role": "user", "content": prompt}]
-        body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": max_tokens,
-            "messages": messages,
-            "temperature": 0.1
-        }
-    elif 'titan' in model_id.lower():
-        # Amazon Titan 모델용 형식
-        body = {
-            "inputText": prompt,
-            "textGenerationConfig": {
-                "maxTokenCount": max_tokens,
-                "temperature": 0.1,
-                "topP": 0.9
-            }
-        }
-    elif 'llama' in model_id.lower() or 'meta' in model_id.lower():
-        # Meta Llama 모델용 형식
-        body = {
-            "prompt": prompt,
-            "max_gen_len": max_tokens,
-            "temperature": 0.1,
-            "top_p": 0.9
-        }
-    else:
-        # 기본 형식 (Claude)
-        messages = [{"role": "user", "content": prompt}]
-        body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": max_tokens,
-            "messages": messages,
-            "temperature": 0.1
-        }
-    
-    response = client.invoke_model(
-        modelId=model_id,
-        body=json.dumps(body),
-        contentType='application/json'
+def get_local_replica() -> Optional[LocalReplica]:
+    """petclinic 읽기 복제본 초기화 (LOCAL_REPLICA_ENABLED=true일 때만 사용, 첫 호출에서 전체 적재)"""
+    global local_replica
+    if not LOCAL_REPLICA_ENABLED:
+        return None
+    if local_replica is None:
+        def on_refresh(kind: str, elapsed_ms: float, rows: int) -> None:
+            metrics.add(f'replica_{kind}_ms', elapsed_ms, 'Milliseconds')
+            metrics.add('replica_refresh_rows', rows)
+            metrics.add('replica_refreshes')
+
+        local_replica = LocalReplica(
+            fetch_rows=lambda sql, parameters: execute_sql('petclinic', sql, parameters, raise_errors=True),
+            fetch_versions=fetch_table_versions,
+            refresh_interval=float(os.getenv('LOCAL_REPLICA_REFRESH_INTERVAL', '60')),
+            full_reload_interval=float(os.getenv('LOCAL_REPLICA_FULL_RELOAD_INTERVAL', '900')),
+            max_staleness=float(os.getenv('LOCAL_REPLICA_MAX_STALENESS', '300')),
+            page_size=int(os.getenv('LOCAL_REPLICA_PAGE_SIZE', '1000')),
+            max_rows=int(os.getenv('LOCAL_REPLICA_MAX_ROWS', '100000')),
+            on_refresh=on_refresh
+        )
+        local_replica.ensure_fresh()
+    return local_replica
+
+def execute_select(database: str, sql: str, parameters: List = None, row_format: str = 'dict',
+                   raise_errors: bool = False) -> List[Dict]:
+    """조회 SQL 실행 (petclinic 복제본에서 처리할 수 있으면 로컬 실행, 아니면 execute_sql)"""
+    replica = get_local_replica() if database == 'petclinic' else None
+    if replica is not None:
+        with metrics.span('replica_query'):
+            results = replica.query(sql, parameters, row_format)
+        if results is not None:
+            row_count = len(next(iter(results.values()), [])) if isinstance(results, dict) else len(results)
+            metrics.add('replica_hits')
+            metrics.add('sql_rows', row_count)
+            metrics.maximum('replica_staleness_ms', replica.age_seconds() * 1000, 'Milliseconds')
+            logger.info("복제본 SQL 실행 성공: %d개 결과", row_count)
+            return results
+        metrics.add('replica_fallbacks')
+    return execute_sql(database, sql, parameters, row_format, raise_errors)
+
+def create_result_pager(database: str, parameters: List = None, row_format: str = 'dict',
+                        **budget) -> ResultPager:
+    """페이지 단위 SQL 조회기 생성 (기본 예산: RESULT_PAGE_SIZE / RESULT_MAX_ROWS / RESULT_MAX_BYTES, 0이면 제한 없음)"""
+    settings = {
+        'page_size': int(os.getenv('RESULT_PAGE_SIZE', '100')),
+        'max_rows': int(os.getenv('RESULT_MAX_ROWS', '200')) or None,
+        'max_bytes': int(os.getenv('RESULT_MAX_BYTES', '262144')) or None
+    }
+    settings.update(budget)
+    return ResultPager(
+        fetch_page=lambda page_sql: execute_select(database, page_sql, parameters, row_format, raise_errors=True),
+        **settings
     )
-    
-    response_body = json.loads(response['body'].read())
-    
-    # 모델별로 다른 response 파싱
-    if 'anthropic' in model_id.lower() or 'claude' in model_id.lower():
-        return response_body['content'][0]['text']
-    elif 'titan' in model_id.lower():
-        return response_body['results'][0]['outputText']
-    elif 'llama' in model_id.lower() or 'meta' in model_id.lower():
-        return response_body['generation']
-    else:
-        return response_body.get('content', [{}])[0].get('text', '')
 
-def analyze_question_type(question: str) -> Dict[str, Any]:
-    """질문을 분석해서 데이터베이스 조회가 필요한지 판단"""
-    try:
-        client = get_bedrock_client()
-        
-        prompt = f"""
-사용자 질문을 분석해서 다음 중 어떤 유형인지 판단해주세요:
+def is_prompt_cache_enabled(model_id: str) -> bool:
+    """PROMPT_CACHE_ENABLED=true 이고 모델이 프롬프트 캐시를 지원하면 True"""
+    return os.getenv('PROMPT_CACHE_ENABLED', 'true').lower() == 'true' and get_adapter(model_id).prompt_cache
 
-1. DATABASE_QUERY: 특정 고객, 반려동물, 수의사, 방문 기록 등 데이터베이스에서 조회해야 하는 질문
-2. GENERAL_ADVICE: 반려동물 건강, 수의학, 애완동물 관리에 대한 일반적인 상담
+def build_bedrock_request_body(model_id: str, prompt: str, max_tokens: int,
+                               system: Optional[str] = None) -> Dict[str, Any]:
+    """모델별 request body 구성 (일반 호출과 스트리밍 호출에서 공통 사용)
 
-사용자 질문: "{question}"
+    system: 질문과 무관한 정적 프롬프트 (Claude 는 system 블록 + 캐시 체크포인트, 그 외 모델은 프롬프트 앞에 붙임)
+    """
+    return get_adapter(model_id).build_body(prompt, max_tokens, system,
+                                            cache=bool(system) and is_prompt_cache_enabled(model_id))
 
-다음 JSON 형식으로 응답해주세요:
-{{
-    "type": "DATABASE_QUERY 또는 GENERAL_ADVICE",
-    "reason": "판단 근거"
-}}
+def invoke_bedrock_model(client, model_id: str, prompt: str, max_tokens: int = 500,
+                         system: Optional[str] = None) -> str:
+    """Bedrock 모델 호출 헬퍼 함수 - 모델별 형식은 어댑터가 처리 (system: 캐시할 정적 프롬프트)"""
+    logger.debug("Bedrock 모델 호출: %s", model_id)
+    body = build_bedrock_request_body(model_id, prompt, max_tokens, system)
+
+    def invoke():
+        return client.invoke_model(
+            modelId=model_id,
+            body=json.dumps(body),
+            contentType='application/json'
+        )
 
-DATABASE_QUERY 예시:
+    limiter = get_bedrock_limiter()
+    response = limiter.call(model_id, invoke) if limiter else invoke()
+
+    response_body = json.loads(response['body'].read())
+
+    # 토큰 사용량은 모델과 관계없이 응답 헤더로 전달됨
+    headers = response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+    usage = response_body.get('usage', {})
+    bedrock_usage.last = {
+        'input_tokens': int(headers.get('x-amzn-bedrock-input-token-count', usage.get('input_tokens', 0))),
+        'output_tokens': int(headers.get('x-amzn-bedrock-output-token-count', usage.get('output_tokens', 0)))
+    }
+    bedrock_usage.last.update(read_cache_usage(headers, usage))
+    record_bedrock_usage(bedrock_usage.last)
+    if system:
+        prompt_cache_stats.record(bedrock_usage.last, cached='system' in body and is_prompt_cache_enabled(model_id))
+    
+    return get_adapter(model_id).parse_response(response_body)
+
+def invoke_stage_model(stage: str, client, model_id: str, prompt: str, max_tokens: int = 500,
+                       system: Optional[str] = None) -> str:
+    """파이프라인 단계(classify / sql / plan / answer)의 Bedrock 호출 - 단계 기한과 지연 헤지 적용 (둘 다 끄면 바로 호출)
+
+    성공한 호출 지연은 단계별 모델 선택기에 기록 (대체 모델 전환 판단용)
+    """
+    started = time.perf_counter()
+    caller = get_stage_caller()
+    if caller is None:
+        text = invoke_bedrock_model(client, model_id, prompt, max_tokens, system)
+        get_model_router().record(stage, model_id, (time.perf_counter() - started) * 1000)
+        return text
+
+    def invoke(target_client, target_model_id: str) -> Callable[[], Tuple[str, Dict[str, int]]]:
+        def _run():
+            text = invoke_bedrock_model(target_client, target_model_id, prompt, max_tokens, system)
+            return text, bedrock_usage.last
+        return _run
+
+    budget = current_budget()
+    hedge = invoke(*get_hedge_target(client, model_id)) if caller.hedge else None
+    text, usage = caller.call(stage, invoke(client, model_id), hedge=hedge,
+                              timeout=budget.stage_timeout(stage) if budget else None)
+    # 작업 스레드에서 기록한 토큰 사용량을 호출 스레드로 전달 (추측 실행 낭비 토큰 집계용)
+    bedrock_usage.last = usage
+    get_model_router().record(stage, model_id, (time.perf_counter() - started) * 1000)
+    return text
+
+def record_bedrock_usage(usage: Dict[str, int]) -> None:
+    """Bedrock 호출 수 / 토큰 사용량 지표 기록"""
+    metrics.add('bedrock_calls')
+    metrics.add('bedrock_input_tokens', usage.get('input_tokens', 0))
+    metrics.add('bedrock_output_tokens', usage.get('output_tokens', 0))
+    metrics.add('bedrock_cache_read_tokens', usage.get('cache_read_tokens', 0))
+    metrics.add('bedrock_cache_write_tokens', usage.get('cache_write_tokens', 0))
+
+def invoke_bedrock_model_stream(client, model_id: str, prompt: str, max_tokens: int = 500) -> Iterator[str]:
+    """Bedrock 스트리밍 호출 - 생성되는 텍스트 조각을 순서대로 반환"""
+    logger.debug("Bedrock 모델 스트리밍 호출: %s", model_id)
+    body = build_bedrock_request_body(model_id, prompt, max_tokens)
+
+    def invoke():
+        return client.invoke_model_with_response_stream(
+            modelId=model_id,
+            body=json.dumps(body),
+            contentType='application/json'
+        )
+
+    # 제한기를 쓰면 스트림을 다 읽을 때까지 동시 호출 자리를 유지
+    limiter = get_bedrock_limiter()
+    response, release = limiter.open(model_id, invoke) if limiter else (invoke(), None)
+    try:
+        usage = {}
+        yield from iter_stream_text(model_id, response['body'], usage)
+    finally:
+        if release:
+            release()
+    record_bedrock_usage(usage)
+    if usage:
+        logger.info("Bedrock 스트리밍 완료: 입력 %s / 출력 %s 토큰", usage.get('input_tokens', 0), usage.get('output_tokens', 0))
+
+def get_entity_index() -> Optional[EntityIndex]:
+    """엔티티 인덱스 초기화 및 TTL 기반 갱신 (ENTITY_INDEX_ENABLED=true일 때만 사용)"""
+    global entity_index
+    if os.getenv('ENTITY_INDEX_ENABLED', 'false').lower() != 'true':
+        return None
+    if entity_index is None:
+        ttl_seconds = float(os.getenv('ENTITY_INDEX_TTL_SECONDS', '300'))
+        # 엔티티 목록은 예산 없이 전부 적재하되 Data API 응답 크기 제한을 넘지 않도록 페이지 단위로 조회
+        entity_index = EntityIndex(
+            loader=lambda sql: list(create_result_pager(
+                'petclinic', row_format='tuple', page_size=5000, max_rows=None, max_bytes=None
+            ).iter_rows(sql)),
+            ttl_seconds=ttl_seconds
+        )
+    entity_index.ensure_fresh()
+    return entity_index
+
+# =============================================================================
+# 프롬프트 구성 요소 (질문 분류, SQL 생성, 플래너 프롬프트에서 공통 사용)
+# =============================================================================
+
+QUESTION_TYPE_DEFINITIONS = """1. DATABASE_QUERY: 특정 고객, 반려동물, 수의사, 방문 기록 등 데이터베이스에서 조회해야 하는 질문
+2. GENERAL_ADVICE: 반려동물 건강, 수의학, 애완동물 관리에 대한 일반적인 상담"""
+
+QUESTION_TYPE_EXAMPLES = """DATABASE_QUERY 예시:
 - "춘식이를 키우고 있는 주인은 누구인가?" (특정 반려동물의 주인 조회)
 - "휘권이가 춘식이라는 pet을 키우고 있지?" (특정 주인과 반려동물 관계 확인)
 - "휘권의 pet 이름이 뭐야?" (특정 주인의 반려동물 이름 조회)
@@ -232,43 +515,10 @@ GENERAL_ADVICE 예시:
 - "강아지가 기침을 해요" (건강 문제 상담)
 - "고양이 예방접종은 언제 해야 하나요?" (예방접종 상담)
 - "반려동물 건강관리 팁 알려주세요" (일반 건강관리 조언)
-- "개가 먹으면 안 되는 음식은?" (식단 관련 상담)
-"""
-
-        # Bedrock 모델 ID 가져오기
-        region = os.getenv('AWS_REGION', 'ap-northeast-2')
-        model_id = os.getenv('BEDROCK_MODEL_ID', 'anthropic.claude-3-haiku-20240307-v1:0')
-        
-        logger.info(f"사용할 Bedrock 모델: {model_id} (리전: {region})")
-        
-        # 헬퍼 함수로 모델 호출
-        ai_response = invoke_bedrock_model(client, model_id, prompt, max_tokens=500)
-        
-        # JSON 응답 파싱
-        try:
-            json_start = ai_response.find('{')
-            json_end = ai_response.rfind('}') + 1
-            json_str = ai_response[json_start:json_end]
-            
-            analysis = json.loads(json_str)
-            logger.info(f"질문 유형 분석: {analysis.get('type', 'UNKNOWN')}")
-            return analysis
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"질문 분석 JSON 파싱 실패: {str(e)}")
-            return {"type": "GENERAL_ADVICE", "reason": "파싱 실패로 기본값 사용"}
-            
-    except Exception as e:
-        logger.error(f"질문 분석 실패: {str(e)}")
-        return {"type": "GENERAL_ADVICE", "reason": "분석 실패로 기본값 사용"}
+- "개가 먹으면 안 되는 음식은?" (식단 관련 상담)"""
 
-def generate_sql_from_question(question: str) -> Dict[str, Any]:
-    """AI를 사용해서 질문을 분석하고 적절한 SQL 쿼리 생성"""
-    try:
-        client = get_bedrock_client()
-        
-        # 데이터베이스 스키마 정보
-        schema_info = """
+# 데이터베이스 스키마 정보
+SCHEMA_INFO = """
 PetClinic 데이터베이스 스키마:
 
 petclinic 데이터베이스 (단일 데이터베이스):
@@ -281,29 +531,15 @@ petclinic 데이터베이스 (단일 데이터베이스):
 - visits 테이블: id, pet_id, visit_date, description
 """
 
-        prompt = f"""
-다음 데이터베이스 스키마를 참고해서 사용자 질문에 맞는 SQL 쿼리를 생성해주세요:
-
-{schema_info}
-
-사용자 질문: "{question}"
-
-다음 JSON 형식으로 응답해주세요:
-{{
-    "database": "사용할 데이터베이스 이름 (petclinic)",
-    "sql": "실행할 SQL 쿼리",
-    "description": "쿼리에 대한 간단한 설명"
-}}
-
-중요 지침:
+SQL_GUIDELINES = """중요 지침:
 - 반드시 아래 예시와 정확히 일치하는 패턴의 SQL 쿼리를 생성하세요
 - WHERE 조건을 정확히 사용하세요
 - 불필요한 JOIN은 피하세요
 - LIKE 연산자를 사용하여 부분 일치 검색을 지원하세요
 - 이름이 "First Last" 형식이면 first_name과 last_name 모두 사용하여 검색하세요
-- 데이터베이스에 실제 존재하는 데이터만 조회하도록 쿼리를 생성하세요
+- 데이터베이스에 실제 존재하는 데이터만 조회하도록 쿼리를 생성하세요"""
 
-질문 유형별 SQL 예시 (반드시 이 패턴을 따르세요):
+SQL_EXAMPLES = """질문 유형별 SQL 예시 (반드시 이 패턴을 따르세요):
 
 질문: "춘식이를 키우고 있는 주인은 누구인가?"
 SQL: "SELECT o.first_name, o.last_name FROM owners o JOIN pets p ON o.id = p.owner_id WHERE p.name LIKE '%춘식%'"
@@ -351,22 +587,182 @@ SQL: "SELECT DISTINCT o.first_name, o.last_name FROM owners o JOIN pets p ON o.i
 - LIMIT 20을 추가해서 결과를 제한하세요
 - 반려동물 이름을 물어보면 p.name (펫 이름)만 선택하세요
 - 주인 이름을 물어보면 o.first_name, o.last_name를 선택하세요
-- 이름 검색 시 LIKE '%{{name}}%' 패턴을 사용하여 부분 일치를 지원하세요
+- 이름 검색 시 LIKE '%{name}%' 패턴을 사용하여 부분 일치를 지원하세요
 - 이름이 두 단어 이상이면 공백으로 분리해서 first_name과 last_name으로 검색하세요
 - 존재 여부 확인 시 COUNT(*)를 사용하세요
 - 반려동물이 없는 주인 조회 시 LEFT JOIN과 IS NULL을 사용하세요
 - 데이터베이스에 실제 존재하는 반려동물 이름만 검색하세요 (Leo, Basil, Rosy, Jewel, Iggy, George, Samantha, Max, Lucky, Mulligan, Freddy, Sly)
-- 데이터베이스에 존재하지 않는 이름에 대해서는 쿼리를 생성하지 말고 빈 결과를 반환하세요
-"""
+- 데이터베이스에 존재하지 않는 이름에 대해서는 쿼리를 생성하지 말고 빈 결과를 반환하세요"""
+
+# 정적 system 프롬프트 (질문과 무관한 앞부분 - 프롬프트 캐시 대상, 질문은 user 메시지로 따로 전달)
+CLASSIFICATION_SYSTEM_PROMPT = f"""사용자 질문을 분석해서 다음 중 어떤 유형인지 판단해주세요:
+
+{QUESTION_TYPE_DEFINITIONS}
+
+다음 JSON 형식으로 응답해주세요:
+{{
+    "type": "DATABASE_QUERY 또는 GENERAL_ADVICE",
+    "reason": "판단 근거"
+}}
+
+{QUESTION_TYPE_EXAMPLES}"""
+
+# SQL 생성 지시 (스키마 / 응답 형식 / 지침) - 예시 선택 모드에서는 뒤에 주의사항만 붙이고 예시는 user 메시지로 전달
+SQL_SYSTEM_PROMPT_BASE = f"""다음 데이터베이스 스키마를 참고해서 사용자 질문에 맞는 SQL 쿼리를 생성해주세요:
+
+{SCHEMA_INFO}
+
+다음 JSON 형식으로 응답해주세요:
+{{
+    "database": "사용할 데이터베이스 이름 (petclinic)",
+    "sql": "실행할 SQL 쿼리",
+    "description": "쿼리에 대한 간단한 설명"
+}}
+
+{SQL_GUIDELINES}"""
+
+SQL_SYSTEM_PROMPT = f"""{SQL_SYSTEM_PROMPT_BASE}
+
+{SQL_EXAMPLES}"""
+
+PLANNER_SYSTEM_PROMPT = f"""사용자 질문을 분석해서 다음 중 어떤 유형인지 판단하고, DATABASE_QUERY이면 실행할 SQL 쿼리까지 함께 생성해주세요:
+
+{QUESTION_TYPE_DEFINITIONS}
+
+{QUESTION_TYPE_EXAMPLES}
+
+{SCHEMA_INFO}
+
+{SQL_GUIDELINES}
+
+{SQL_EXAMPLES}
+
+다음 JSON 형식으로만 응답해주세요:
+{{
+    "type": "DATABASE_QUERY 또는 GENERAL_ADVICE",
+    "reason": "판단 근거",
+    "database": "사용할 데이터베이스 이름 (petclinic)",
+    "sql": "DATABASE_QUERY이면 실행할 SQL 쿼리, GENERAL_ADVICE이면 빈 문자열",
+    "description": "쿼리에 대한 간단한 설명"
+}}"""
+
+def build_question_prompt(question: str) -> str:
+    """정적 system 프롬프트 뒤에 붙는 질문 부분 (user 메시지)"""
+    return f'사용자 질문: "{question}"'
+
+def get_query_template_mode() -> str:
+    """QUERY_TEMPLATE_MODE 환경 변수로 SQL 템플릿 사용 방식 선택 (off / local / llm)"""
+    mode = os.getenv('QUERY_TEMPLATE_MODE', 'local').strip().lower()
+    if mode not in ('off', 'local', 'llm'):
+        logger.warning("알 수 없는 QUERY_TEMPLATE_MODE: %s - local 모드 사용", mode)
+        return 'local'
+    return mode
+
+def get_sql_example_mode() -> str:
+    """SQL_EXAMPLE_MODE 환경 변수로 SQL 예시 포함 방식 선택 (all / select)"""
+    mode = os.getenv('SQL_EXAMPLE_MODE', 'select').strip().lower()
+    if mode not in ('all', 'select'):
+        logger.warning("알 수 없는 SQL_EXAMPLE_MODE: %s - all 모드 사용", mode)
+        return 'all'
+    return mode
+
+def get_sql_example_store() -> ExampleStore:
+    """SQL_EXAMPLES 프롬프트 예시 + sql_examples.jsonl 라이브러리로 예시 저장소 생성"""
+    global sql_example_store
+    if sql_example_store is None:
+        sql_example_store = create_example_store(SQL_EXAMPLES, SQL_EXAMPLE_LIBRARY_PATH)
+        logger.info("SQL 예시 저장소 생성: 예시 %d개 (%d 토큰)",
+                    len(sql_example_store.examples), sql_example_store.total_tokens)
+    return sql_example_store
+
+def build_sql_generation_prompt(question: str) -> Tuple[str, str]:
+    """SQL 생성 프롬프트 → (system, user 메시지)
+
+    select 모드면 질문과 가까운 예시만 SQL_EXAMPLE_TOP_K 개 / SQL_EXAMPLE_TOKEN_BUDGET 토큰 안에서 골라 user 메시지에 포함
+    """
+    if get_sql_example_mode() != 'select':
+        return SQL_SYSTEM_PROMPT, build_question_prompt(question)
+
+    store = get_sql_example_store()
+    examples = store.select(
+        question,
+        top_k=int(os.getenv('SQL_EXAMPLE_TOP_K', '4')),
+        token_budget=int(os.getenv('SQL_EXAMPLE_TOKEN_BUDGET', '400'))
+    )
+    metrics.add('sql_examples', len(examples))
+    metrics.add('sql_example_tokens', sum(example.tokens for example in examples))
+    logger.debug("선택한 SQL 예시: %s", [example.question for example in examples])
+    system = f"{SQL_SYSTEM_PROMPT_BASE}\n\n{store.notes}"
+    return system, f"{store.render(examples)}\n\n{build_question_prompt(question)}"
+
+def build_template_prompt_section() -> str:
+    """llm 모드에서 SQL 생성 프롬프트에 덧붙일 템플릿 목록"""
+    if get_query_template_mode() != 'llm':
+        return ''
+    return f"""
+
+SQL 템플릿 (질문이 아래 템플릿 중 하나에 해당하면 SQL을 직접 작성하지 말고 템플릿 이름과 슬롯 값만 반환하세요):
+{query_template_registry.catalog_text()}
+
+템플릿을 사용할 때의 JSON 형식:
+{{"database": "petclinic", "template": "템플릿 이름", "slots": {{"슬롯 이름": "질문에 나온 값"}}}}"""
+
+@metrics.timed('analyze_question_type')
+def analyze_question_type(question: str) -> Dict[str, Any]:
+    """질문을 분석해서 데이터베이스 조회가 필요한지 판단"""
+    try:
+        client = get_bedrock_client()
+        
+        prompt = build_question_prompt(question)
 
         # Bedrock 모델 ID 가져오기
         region = os.getenv('AWS_REGION', 'ap-northeast-2')
-        model_id = os.getenv('BEDROCK_MODEL_ID', 'anthropic.claude-3-haiku-20240307-v1:0')
+        model_id = get_stage_model_id('classify')
         
-        logger.info(f"사용할 Bedrock 모델: {model_id} (리전: {region})")
+        logger.debug("사용할 Bedrock 모델: %s (리전: %s)", model_id, region)
         
         # 헬퍼 함수로 모델 호출
-        ai_response = invoke_bedrock_model(client, model_id, prompt, max_tokens=1000)
+        ai_response = invoke_stage_model('classify', client, model_id, prompt, max_tokens=500,
+                                         system=CLASSIFICATION_SYSTEM_PROMPT)
+        
+        # JSON 응답 파싱
+        try:
+            json_start = ai_response.find('{')
+            json_end = ai_response.rfind('}') + 1
+            json_str = ai_response[json_start:json_end]
+            
+            analysis = json.loads(json_str)
+            logger.info("질문 유형 분석: %s", analysis.get('type', 'UNKNOWN'))
+            return analysis
+            
+        except json.JSONDecodeError as e:
+            logger.error("질문 분석 JSON 파싱 실패: %s", e)
+            return {"type": "GENERAL_ADVICE", "reason": "파싱 실패로 기본값 사용"}
+
+    except DeadlineExceeded as e:
+        return build_deadline_analysis('classify', e)
+            
+    except Exception as e:
+        logger.error("질문 분석 실패: %s", e)
+        return {"type": "GENERAL_ADVICE", "reason": "분석 실패로 기본값 사용"}
+
+@metrics.timed('generate_sql_from_question')
+def generate_sql_from_question(question: str) -> Dict[str, Any]:
+    """AI를 사용해서 질문을 분석하고 적절한 SQL 쿼리 생성"""
+    try:
+        client = get_bedrock_client()
+        
+        system, prompt = build_sql_generation_prompt(question)
+
+        # Bedrock 모델 ID 가져오기
+        region = os.getenv('AWS_REGION', 'ap-northeast-2')
+        model_id = get_stage_model_id('sql')
+        
+        logger.debug("사용할 Bedrock 모델: %s (리전: %s)", model_id, region)
+        
+        # 헬퍼 함수로 모델 호출 (템플릿 목록은 QUERY_TEMPLATE_MODE 별로 고정이므로 system 블록에 포함)
+        ai_response = invoke_stage_model('sql', client, model_id, prompt, max_tokens=1000,
+                                         system=system + build_template_prompt_section())
         
         # JSON 응답 파싱
         try:
@@ -376,15 +772,25 @@ SQL: "SELECT DISTINCT o.first_name, o.last_name FROM owners o JOIN pets p ON o.i
             json_str = ai_response[json_start:json_end]
             
             sql_info = json.loads(json_str)
-            logger.info(f"AI가 생성한 SQL: {sql_info.get('sql', '')[:100]}...")
+
+            # 모델이 템플릿을 선택한 경우 템플릿 SQL + 파라미터로 변환
+            if sql_info.get('template'):
+                rendered = query_template_registry.render(sql_info['template'], sql_info.get('slots', {}))
+                if rendered:
+                    logger.info("AI가 선택한 SQL 템플릿: %s %s", rendered['template'], rendered['slots'])
+                    return rendered
+                if not sql_info.get('sql'):
+                    return get_fallback_query(question)
+
+            logger.debug("AI가 생성한 SQL: %s", sql_info.get('sql', ''))
             return sql_info
             
         except json.JSONDecodeError as e:
-            logger.error(f"AI 응답 JSON 파싱 실패: {str(e)}")
+            logger.error("AI 응답 JSON 파싱 실패: %s", e)
             return get_fallback_query(question)
             
     except Exception as e:
-        logger.error(f"AI SQL 생성 실패: {str(e)}")
+        logger.error("AI SQL 생성 실패: %s", e)
         return get_fallback_query(question)
 
 def get_fallback_query(question: str) -> Dict[str, Any]:
@@ -410,61 +816,187 @@ def get_fallback_query(question: str) -> Dict[str, Any]:
         "description": "전체 고객 및 반려동물 정보"
     }
 
-def query_database_by_question(question: str) -> List[Dict]:
-    """AI가 생성한 SQL로 데이터베이스 쿼리 실행"""
+def get_pipeline_mode() -> str:
+    """GENAI_PIPELINE_MODE 환경 변수로 파이프라인 모드 선택 (classic / planner)"""
+    mode = os.getenv('GENAI_PIPELINE_MODE', 'classic').strip().lower()
+    if mode not in ('classic', 'planner'):
+        logger.warning("알 수 없는 GENAI_PIPELINE_MODE: %s - classic 모드 사용", mode)
+        return 'classic'
+    return mode
+
+@metrics.timed('plan_question')
+def plan_question(question: str) -> Dict[str, Any]:
+    """질문 유형 분류와 SQL 생성을 한 번의 Bedrock 호출로 처리 (planner 모드)"""
     try:
-        logger.info(f"데이터베이스 쿼리 시작: {question}")
+        client = get_bedrock_client()
 
-        # AI를 사용해서 SQL 생성
-        sql_info = generate_sql_from_question(question)
+        prompt = build_question_prompt(question)
 
-        database = sql_info.get('database', 'petclinic')
-        sql = sql_info.get('sql', '')
-        description = sql_info.get('description', '')
+        # Bedrock 모델 ID 가져오기
+        region = os.getenv('AWS_REGION', 'ap-northeast-2')
+        model_id = get_stage_model_id('plan')
 
-        logger.info(f"AI가 생성한 SQL 정보: {sql_info}")
+        logger.debug("플래너 모드 Bedrock 모델: %s (리전: %s)", model_id, region)
 
-        if not sql:
-            logger.error("생성된 SQL이 없습니다")
-            return []
+        # 분류 + SQL 생성을 한 번에 요청하므로 SQL 생성과 같은 토큰 한도 사용
+        ai_response = invoke_stage_model('plan', client, model_id, prompt, max_tokens=1000,
+                                         system=PLANNER_SYSTEM_PROMPT)
 
-        logger.info(f"실행할 쿼리: {description}")
-        logger.info(f"실행할 SQL: {sql}")
+        json_start = ai_response.find('{')
+        json_end = ai_response.rfind('}') + 1
+        plan = json.loads(ai_response[json_start:json_end])
 
-        # SQL 실행
-        results = execute_sql(database, sql)
+        if plan.get('type') not in ('DATABASE_QUERY', 'GENERAL_ADVICE'):
+            raise ValueError(f"알 수 없는 질문 유형: {plan.get('type')}")
 
-        logger.info(f"데이터베이스 쿼리 성공: {len(results)}개 결과")
-        return results
+        logger.info("플래너 분석 결과: %s", plan.get('type'))
+        logger.debug("플래너 SQL: %s", plan.get('sql', ''))
+        return plan
+
+    except DeadlineExceeded as e:
+        # 기한을 넘겼으면 분류 단계를 다시 호출하지 않음
+        return build_deadline_analysis('plan', e)
 
     except Exception as e:
-        logger.error(f"데이터베이스 쿼리 실행 오류: {str(e)}")
-        import traceback
-        logger.error(f"스택 트레이스: {traceback.format_exc()}")
-        return []
+        # 플래너 실패 시 기존 분류 단계로 대체 (SQL은 이후 단계에서 별도 생성)
+        logger.error("플래너 실행 실패, classic 분류로 대체: %s", e)
+        return analyze_question_type(question)
+
+def get_sql_guard() -> Optional[SqlGuard]:
+    """생성 SQL 검사기 초기화 (SQL_GUARD_ENABLED=true일 때만 사용)"""
+    global sql_guard
+    if os.getenv('SQL_GUARD_ENABLED', 'true').lower() != 'true':
+        return None
+    if sql_guard is None:
+        max_estimated_rows = int(os.getenv('SQL_GUARD_EXPLAIN_MAX_ROWS', '0'))
+        sql_guard = SqlGuard(
+            max_limit=int(os.getenv('SQL_GUARD_MAX_LIMIT', '200')),
+            like_mode=os.getenv('SQL_GUARD_LIKE_MODE', 'bounded').strip().lower(),
+            # 인덱스를 추가한 컬럼 (index_advisor.py 제안 적용 후) 도 접두 일치 변환 대상
+            indexed_columns=INDEXED_COLUMNS | parse_column_list(os.getenv('SQL_GUARD_EXTRA_INDEXED_COLUMNS', '')),
+            explain=explain_sql,
+            max_estimated_rows=max_estimated_rows,
+            max_scan_rows=int(os.getenv('SQL_GUARD_SCAN_MAX_ROWS', '10000'))
+        )
+    return sql_guard
+
+def explain_sql(database: str, sql: str, parameters: Optional[List] = None) -> List[Dict]:
+    """EXPLAIN 실행 계획 조회 (SQL_GUARD_EXPLAIN_MAX_ROWS / SQL_GUARD_SCAN_MAX_ROWS 예상 행 수 검사용)"""
+    with metrics.span('sql_explain'):
+        return execute_sql(database, f"EXPLAIN {sql}", parameters, raise_errors=True)
+
+def guard_question_sql(sql_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """실행 전 SQL 검사 / 변환 (SELECT 한 문장, 허용 테이블, 조인 조건, LIMIT) - 거부하면 None"""
+    guard = get_sql_guard()
+    if guard is None:
+        return sql_info
+    try:
+        checked = guard.check(sql_info['sql'], sql_info.get('parameters'), sql_info['database'])
+    except SqlGuardError as e:
+        metrics.add('sql_guard_rejected')
+        logger.warning("생성 SQL 실행 거부 (%s): %s", e.reason, e)
+        logger.debug("거부한 SQL: %s", sql_info['sql'])
+        return None
+    if checked['rewrites']:
+        metrics.add('sql_guard_rewritten')
+        logger.debug("SQL 검사 변환 %s: %s", checked['rewrites'], checked['sql'])
+    return dict(sql_info, sql=checked['sql'], parameters=checked['parameters'])
+
+def resolve_question_sql(question: str, sql_info: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """실행할 SQL 결정 (플래너 SQL → 템플릿 → Bedrock SQL 생성) 후 엔티티 인덱스 변환, SQL 검사 적용"""
+    # AI를 사용해서 SQL 생성 (플래너가 SQL을 만들지 못한 경우 포함)
+    if not sql_info or not sql_info.get('sql'):
+        # 알려진 질문 형태는 로컬 템플릿 매칭으로 SQL 생성 호출 생략
+        if get_query_template_mode() != 'off':
+            sql_info = query_template_registry.match(question)
+        if not sql_info or not sql_info.get('sql'):
+            sql_info = generate_sql_from_question(question)
+
+    logger.debug("AI가 생성한 SQL 정보: %s", sql_info)
+
+    if not sql_info.get('sql', ''):
+        logger.error("생성된 SQL이 없습니다")
+        return None
+
+    # 엔티티 인덱스로 이름 LIKE 조건(템플릿 파라미터 포함)을 기본 키 IN 조건으로 변환
+    sql = sql_info['sql']
+    index = get_entity_index()
+    if index:
+        sql = index.rewrite_sql(sql, sql_info.get('parameters'))
+
+    return guard_question_sql(dict(sql_info, database=sql_info.get('database', 'petclinic'), sql=sql))
+
+def get_sql_workload() -> Optional[WorkloadRecorder]:
+    """실행 SQL 워크로드 기록기 초기화 (SQL_WORKLOAD_ENABLED=true일 때만 사용)"""
+    global sql_workload
+    if os.getenv('SQL_WORKLOAD_ENABLED', 'true').lower() != 'true':
+        return None
+    if sql_workload is None:
+        sql_workload = WorkloadRecorder(
+            max_fingerprints=int(os.getenv('SQL_WORKLOAD_MAX_FINGERPRINTS', '200')),
+            log_interval=float(os.getenv('SQL_WORKLOAD_LOG_INTERVAL', '300'))
+        )
+    return sql_workload
+
+def record_sql_workload(sql_info: Dict[str, Any], elapsed_ms: float, rows: int, source: str,
+                        error: bool = False) -> None:
+    """실행한 SQL 을 지문별 통계에 기록 (SQL_WORKLOAD_LOG_INTERVAL 마다 SQL_WORKLOAD 한 줄 출력)"""
+    recorder = get_sql_workload()
+    if recorder is None:
+        return
+    recorder.record(sql_info['sql'], elapsed_ms, rows, source, error, sql_info.get('parameters'))
+    snapshot = recorder.take_due_snapshot()
+    if snapshot:
+        recorder.emit_snapshot(snapshot)
+
+def fetch_question_rows(sql_info: Dict[str, Any]) -> List[Dict]:
+    """결정된 SQL 실행 (행/바이트 예산까지만 페이지 단위로 조회, 템플릿은 Data API parameters 로 값 전달)"""
+    logger.debug("실행할 쿼리: %s / SQL: %s", sql_info.get('description', ''), sql_info['sql'])
+
+    pager = create_result_pager(sql_info['database'], sql_info.get('parameters'))
+    source = 'template' if sql_info.get('template') else 'generated'
+    started = time.perf_counter()
+    try:
+        results = list(pager.iter_rows(sql_info['sql']))
+    except Exception:
+        record_sql_workload(sql_info, (time.perf_counter() - started) * 1000, 0, source, error=True)
+        raise
+    record_sql_workload(sql_info, (time.perf_counter() - started) * 1000, len(results), source)
+    if pager.stats['truncated']:
+        logger.warning("조회 결과 예산 도달로 일부만 사용 (%s): %s",
+                       pager.stats['truncated'], pager.stats)
+    return results
 
+def query_database_by_question(question: str, sql_info: Optional[Dict[str, Any]] = None) -> List[Dict]:
+    """AI가 생성한 SQL로 데이터베이스 쿼리 실행 (planner 모드에서는 미리 생성된 SQL 사용)
 
+    SQL 을 결정하지 못했거나 조회가 실패하면 예외 - 빈 결과('정보 없음' 답변)와 구분해서 캐시하지 않도록 함
+    """
+    logger.info("데이터베이스 쿼리 시작: %s", question)
 
-def call_bedrock_ai(prompt: str, context_data: str = "", is_general_advice: bool = False) -> str:
-    """Bedrock AI 모델 호출"""
-    try:
-        client = get_bedrock_client()
-        # Bedrock 모델 ID 가져오기
-        region = os.getenv('AWS_REGION', 'ap-northeast-2')
-        model_id = os.getenv('BEDROCK_MODEL_ID', 'anthropic.claude-3-haiku-20240307-v1:0')
-        
-        logger.info(f"사용할 Bedrock 모델: {model_id} (리전: {region})")
-        
-        if is_general_advice:
-            # 일반적인 반려동물 상담
-            full_prompt = f"""당신은 PetClinic 애플리케이션의 AI 어시스턴트입니다. 반려동물 건강, 수의학, 애완동물 관리에 대한 도움을 제공합니다.
+    sql_info = resolve_question_sql(question, sql_info)
+    if not sql_info:
+        raise RuntimeError("실행할 SQL 을 결정하지 못했습니다")
+
+    results = fetch_question_rows(sql_info)
+
+    logger.info("데이터베이스 쿼리 성공: %d개 결과", len(results))
+    return results
+
+
+
+def build_answer_prompt(prompt: str, context_data: str = "", is_general_advice: bool = False) -> str:
+    """최종 답변 생성 프롬프트 구성 (일반 호출과 스트리밍 호출에서 공통 사용)"""
+    if is_general_advice:
+        # 일반적인 반려동물 상담
+        return f"""당신은 PetClinic 애플리케이션의 AI 어시스턴트입니다. 반려동물 건강, 수의학, 애완동물 관리에 대한 도움을 제공합니다.
 
 사용자 질문: {prompt}
 
 친근하고 전문적인 톤으로 답변해주세요. 반려동물의 건강과 복지에 대한 유용한 정보를 제공하되, 응급상황이나 심각한 증상의 경우 반드시 수의사와 상담하도록 안내해주세요."""
-        else:
-            # 데이터베이스 기반 답변
-            full_prompt = f"""당신은 PetClinic 데이터베이스의 정보를 바탕으로 질문에 답변하는 AI 어시스턴트입니다.
+    else:
+        # 데이터베이스 기반 답변
+        return f"""당신은 PetClinic 데이터베이스의 정보를 바탕으로 질문에 답변하는 AI 어시스턴트입니다.
 
 질문: {prompt}
 
@@ -491,20 +1023,71 @@ def call_bedrock_ai(prompt: str, context_data: str = "", is_general_advice: bool
 
 데이터베이스 결과를 보고 질문에 답변하세요:"""
 
+@metrics.timed('call_bedrock_ai')
+def call_bedrock_ai(prompt: str, context_data: str = "", is_general_advice: bool = False) -> str:
+    """Bedrock AI 모델 호출"""
+    try:
+        client = get_bedrock_client()
+        # Bedrock 모델 ID 가져오기
+        region = os.getenv('AWS_REGION', 'ap-northeast-2')
+        model_id = get_stage_model_id('answer')
+        
+        logger.debug("사용할 Bedrock 모델: %s (리전: %s)", model_id, region)
+        
+        full_prompt = build_answer_prompt(prompt, context_data, is_general_advice)
+
         # 헬퍼 함수로 모델 호출
-        ai_response = invoke_bedrock_model(client, model_id, full_prompt, max_tokens=1000)
+        ai_response = invoke_stage_model('answer', client, model_id, full_prompt, max_tokens=1000)
         logger.info("Bedrock AI 응답 생성 성공")
         return ai_response
+
+    except DeadlineExceeded as e:
+        logger.warning("답변 생성 기한 초과, 부분 답변 반환: %s", e)
+        metrics.add('partial_answers')
+        return build_partial_answer(context_data)
             
     except Exception as e:
-        logger.error(f"Bedrock AI 호출 실패: {str(e)}")
+        logger.error("Bedrock AI 호출 실패: %s", e)
         if "AccessDeniedException" in str(e) or "marketplace" in str(e).lower():
             return "AI 모델 접근 권한이 없습니다. AWS Bedrock 콘솔에서 모델 접근을 활성화해주세요."
         return f"AI 서비스 오류: {str(e)}"
 
+# 기한 초과 부분 답변 안내 문구 (캐시하지 않음)
+PARTIAL_ANSWER_NOTICE = "답변 생성 시간이 초과되어"
+
+def build_deadline_analysis(stage: str, error: Exception) -> Dict[str, Any]:
+    """분류 / 플래너 단계 기한 초과 → 일반 상담 답변을 새로 생성하지 않고 시간 초과 답변으로 처리하도록 표시"""
+    logger.warning("%s 단계 기한 초과, 시간 초과 답변 반환: %s", stage, error)
+    return {"type": "GENERAL_ADVICE", "reason": "분석 기한 초과", "deadline_exceeded": True}
+
+def build_partial_answer(context_data: str) -> str:
+    """답변 단계 기한 초과 시 부분 답변 - 조회 결과가 있으면 그대로 전달"""
+    if context_data:
+        return f"{PARTIAL_ANSWER_NOTICE} 조회 결과를 그대로 전달합니다.\n\n{context_data}"
+    return f"{PARTIAL_ANSWER_NOTICE} 답변을 드리지 못했습니다. 잠시 후 다시 시도해 주세요."
+
+@metrics.timed('stream_bedrock_ai')
+def stream_bedrock_ai(prompt: str, context_data: str = "", is_general_advice: bool = False) -> Iterator[str]:
+    """Bedrock AI 스트리밍 호출 - 답변 텍스트 조각을 생성되는 대로 반환"""
+    try:
+        client = get_bedrock_client()
+        model_id = get_stage_model_id('answer')
+        full_prompt = build_answer_prompt(prompt, context_data, is_general_advice)
+
+        yield from invoke_bedrock_model_stream(client, model_id, full_prompt, max_tokens=1000)
+        logger.info("Bedrock AI 스트리밍 응답 생성 성공")
+
+    except Exception as e:
+        logger.error("Bedrock AI 스트리밍 호출 실패: %s", e)
+        if "AccessDeniedException" in str(e) or "marketplace" in str(e).lower():
+            yield "AI 모델 접근 권한이 없습니다. AWS Bedrock 콘솔에서 모델 접근을 활성화해주세요."
+            return
+        yield f"AI 서비스 오류: {str(e)}"
+
+@metrics.timed('format_context_data')
 def format_context_data(results: List[Dict], question: str) -> str:
     """데이터베이스 결과를 컨텍스트 문자열로 변환"""
-    logger.info(f"컨텍스트 데이터 포맷팅 시작: {len(results)}개 결과")
+    logger.debug("컨텍스트 데이터 포맷팅 시작: %d개 결과", len(results))
 
     if not results:
         logger.warning("데이터베이스 결과가 없습니다")
@@ -558,9 +1141,9 @@ def format_context_data(results: List[Dict], question: str) -> str:
 
         formatted_row = f"- {' | '.join(row_info)}\n"
         context_data += formatted_row
-        logger.debug(f"포맷된 행: {formatted_row.strip()}")
+        logger.debug("포맷된 행: %s", row_info)
 
-    logger.info(f"컨텍스트 데이터 생성 완료: {len(context_data)}자")
+    logger.info("컨텍스트 데이터 생성 완료: %d자", len(context_data))
     return context_data
 
 def test_bedrock_models():
@@ -596,22 +1179,535 @@ def test_bedrock_models():
                     contentType='application/json'
                 )
                 available_models.append(model_id)
-                logger.info(f"✅ 사용 가능: {model_id}")
+                logger.info("✅ 사용 가능: %s", model_id)
             except Exception as e:
-                logger.warning(f"❌ 사용 불가: {model_id} - {str(e)[:100]}")
+                logger.warning("❌ 사용 불가: %s - %s", model_id, str(e)[:100])
         
         return available_models
     except Exception as e:
-        logger.error(f"모델 테스트 실패: {str(e)}")
+        logger.error("모델 테스트 실패: %s", e)
         return []
 
+def get_intent_router() -> Optional[IntentRouter]:
+    """로컬 의도 분류기 초기화 (INTENT_ROUTER_ENABLED=false면 비활성화)"""
+    global intent_router
+    if os.getenv('INTENT_ROUTER_ENABLED', 'true').lower() != 'true':
+        return None
+    if intent_router is None:
+        min_confidence = float(os.getenv('INTENT_ROUTER_MIN_CONFIDENCE', '0.75'))
+        intent_router = IntentRouter(min_confidence=min_confidence)
+        logger.info("로컬 의도 분류기 초기화 (최소 신뢰도: %s)", min_confidence)
+    return intent_router
+
+def get_speculative_executor() -> Optional[SpeculativeExecutor]:
+    """추측 실행기 초기화 (SPECULATIVE_ADVICE_ENABLED=true일 때만 사용)"""
+    global speculative_executor
+    if os.getenv('SPECULATIVE_ADVICE_ENABLED', 'false').lower() != 'true':
+        return None
+    if speculative_executor is None:
+        max_workers = int(os.getenv('SPECULATIVE_MAX_WORKERS', '4'))
+        max_discarded = int(os.getenv('SPECULATIVE_MAX_DISCARDED', '2'))
+        speculative_executor = SpeculativeExecutor(max_workers=max_workers, max_discarded=max_discarded)
+        logger.info("추측 실행기 초기화 (worker: %s, 실행 중 폐기 호출 상한: %s)", max_workers, max_discarded)
+    return speculative_executor
+
+def get_answer_renderer() -> Optional[AnswerRenderer]:
+    """규칙 기반 답변 생성기 초기화 (ANSWER_RENDERER_ENABLED=true일 때만 사용)"""
+    global answer_renderer
+    if os.getenv('ANSWER_RENDERER_ENABLED', 'false').lower() != 'true':
+        return None
+    if answer_renderer is None:
+        answer_renderer = AnswerRenderer(
+            max_rows=int(os.getenv('ANSWER_RENDERER_MAX_ROWS', '5')),
+            max_columns=int(os.getenv('ANSWER_RENDERER_MAX_COLUMNS', '4'))
+        )
+    return answer_renderer
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """동시 중복 질문 합치기 초기화 (SINGLE_FLIGHT_ENABLED=false 면 사용 안 함)"""
+    global single_flight
+    if os.getenv('SINGLE_FLIGHT_ENABLED', 'true').lower() != 'true':
+        return None
+    if single_flight is None:
+        single_flight = SingleFlight(timeout=float(os.getenv('SINGLE_FLIGHT_TIMEOUT', '30')))
+    return single_flight
+
+def render_database_answer(question: str, rows: Optional[List[Dict]]) -> Optional[str]:
+    """조회 결과 모양이 단순하면 최종 답변 Bedrock 호출 없이 규칙 기반 답변 (llm_bypass 지표 평균 = 생략 비율)"""
+    renderer = get_answer_renderer()
+    if renderer is None or rows is None:
+        return None
+    answer = renderer.render(question, rows)
+    metrics.add('llm_bypass', 1 if answer is not None else 0)
+    return answer
+
+def classify_question_with_bedrock(question: str) -> Dict[str, Any]:
+    """Bedrock으로 질문 유형 분석 (planner 모드는 분류와 SQL 생성을 한 번에 수행)"""
+    if get_pipeline_mode() == 'planner':
+        return plan_question(question)
+    return analyze_question_type(question)
+
+def record_speculation_metrics(executor: SpeculativeExecutor, saved_ms: float = 0.0) -> None:
+    """추측 실행 손익을 현재 호출 EMF 지표로 기록 (폐기 호출 토큰은 완료된 뒤 처음 기록하는 호출에 합산)"""
+    if saved_ms:
+        metrics.add('speculative_latency_saved_ms', saved_ms, 'Milliseconds')
+    wasted = executor.take_unreported()
+    if wasted['input_tokens'] or wasted['output_tokens']:
+        metrics.add('speculative_wasted_input_tokens', wasted['input_tokens'])
+        metrics.add('speculative_wasted_output_tokens', wasted['output_tokens'])
+
+def speculate_general_advice(question: str) -> Tuple[str, Dict[str, int]]:
+    """분류와 동시에 실행하는 일반 상담 답변 생성 (답변, 토큰 사용량)"""
+    bedrock_usage.last = None
+    answer = call_bedrock_ai(question, "", is_general_advice=True)
+    return answer, bedrock_usage.last or {}
+
+def analyze_question(question: str) -> Dict[str, Any]:
+    """로컬 의도 분류기로 먼저 판단하고, 확신이 없을 때만 Bedrock 분류 호출"""
+    router = get_intent_router()
+    question_analysis = router.route(question) if router else None
+
+    # 질문 유형 분석 (planner 모드는 분류와 SQL 생성을 한 번에 수행)
+    if question_analysis is None:
+        question_analysis = classify_question_with_bedrock(question)
+    return question_analysis
+
+def prepare_genai_answer(question: str, question_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """질문 유형 분석 → (데이터베이스 조회)까지 실행해서 답변 생성에 필요한 입력 구성"""
+    pipeline_mode = get_pipeline_mode()
+
+    if question_analysis is None:
+        question_analysis = analyze_question(question)
+    question_type = question_analysis.get('type', 'GENERAL_ADVICE')
+    rendered_answer = None
+
+    if question_analysis.get('deadline_exceeded'):
+        # 분류 기한 초과: 남은 시간에 답변 생성을 시작하지 않고 시간 초과 답변 (캐시하지 않음)
+        metrics.add('partial_answers')
+        context_data, is_general_advice = "", True
+        data_source = 'deadline_exceeded'
+        rendered_answer = build_partial_answer(context_data)
+    elif question_type == 'DATABASE_QUERY':
+        # 데이터베이스 조회가 필요한 질문
+        logger.info("데이터베이스 쿼리 유형으로 분류됨 (%s): %s", pipeline_mode, question)
+        try:
+            sql_info = question_analysis if pipeline_mode == 'planner' else None
+            db_results = query_database_by_question(question, sql_info)
+            logger.debug("데이터베이스 쿼리 결과: %d개", len(db_results))
+            rendered_answer = render_database_answer(question, db_results)
+            context_data = format_context_data(db_results, question) if rendered_answer is None else ""
+            logger.debug("컨텍스트 데이터 생성됨: %d자", len(context_data))
+            is_general_advice = False
+            data_source = 'aurora_rds_data_api'
+
+        except Exception as db_error:
+            # 조회 실패는 일반 상담 답변으로 대체 (캐시하지 않음)
+            logger.error("데이터베이스 조회 오류 (%s): %s", type(db_error).__name__, db_error, exc_info=True)
+            metrics.add('database_fallbacks')
+            context_data, is_general_advice = "", True
+            data_source = 'general_advice_fallback'
+    else:
+        # 일반적인 반려동물 상담
+        context_data, is_general_advice = "", True
+        data_source = 'general_advice'
+
+    return {
+        'context_data': context_data,
+        'is_general_advice': is_general_advice,
+        'data_source': data_source,
+        'question_type': question_type,
+        'rendered_answer': rendered_answer
+    }
+
+def get_answer_cache() -> Optional[AnswerCache]:
+    """답변 캐시 초기화 (ANSWER_CACHE_ENABLED=true일 때만 사용)"""
+    global answer_cache, data_version_tracker
+    if os.getenv('ANSWER_CACHE_ENABLED', 'false').lower() != 'true':
+        return None
+    if answer_cache is None:
+        try:
+            store = load_cache_store(os.getenv('ANSWER_CACHE_STORE', 'sqlite'),
+                                     os.getenv('ANSWER_CACHE_PATH', '/tmp/genai-answer-cache.sqlite3'))
+        except Exception as e:
+            logger.warning("답변 캐시 저장소 초기화 실패, 메모리 캐시만 사용: %s", e)
+            store = None
+        answer_cache = AnswerCache(
+            max_entries=int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', '256')),
+            ttl_seconds=float(os.getenv('ANSWER_CACHE_TTL_SECONDS', '300')),
+            store=store
+        )
+        data_version_tracker = DataVersionTracker(
+            fetch_data_version,
+            ttl_seconds=float(os.getenv('ANSWER_CACHE_VERSION_TTL_SECONDS', '30')),
+            on_change=lambda version: answer_cache.invalidate(keep_version=version)
+        )
+        logger.info("답변 캐시 초기화 (저장소: %s)", type(store).__name__ if store else '없음')
+    return answer_cache
+
+# petclinic 테이블별 행 수 + 내용 checksum (답변 캐시 데이터 버전, 복제본 갱신 대상 판단)
+TABLE_VERSION_SQL = build_table_version_sql(PETCLINIC_SCHEMA)
+
+def fetch_table_versions() -> Dict[str, str]:
+    """{테이블: '행 수:checksum'} - 쓰기(INSERT / UPDATE / DELETE)가 있으면 바로 바뀜"""
+    rows = execute_sql('petclinic', TABLE_VERSION_SQL, row_format='tuple', raise_errors=True)
+    return parse_table_versions(rows)
+
+def fetch_data_version() -> str:
+    """캐시 키에 넣을 데이터 버전 (ANSWER_CACHE_DATA_VERSION 고정값 또는 petclinic 테이블 버전 digest)"""
+    static_version = os.getenv('ANSWER_CACHE_DATA_VERSION', '')
+    if static_version:
+        return static_version
+    return digest_versions(fetch_table_versions())
+
+def get_answer_cache_key(question: str) -> Optional[Tuple[str, str]]:
+    """(캐시 키, 데이터 버전) - 캐시를 쓰지 않거나 데이터 버전을 모르면 None"""
+    if get_answer_cache() is None:
+        return None
+    data_version = data_version_tracker.current()
+    if data_version is None:
+        return None
+    # 단계 모델 조합이 바뀌면 다른 키 (모든 단계가 같은 모델이면 이전과 같은 키)
+    return make_cache_key(question, get_model_router().model_key(), data_version), data_version
+
+def is_error_answer(answer: str) -> bool:
+    """Bedrock 호출 실패 / 기한 초과 안내 문구인지 확인 (캐시하지 않음)"""
+    return answer.startswith(('AI 서비스 오류', 'AI 모델 접근 권한이 없습니다', PARTIAL_ANSWER_NOTICE))
+
+# 조회 실패 / 기한 초과로 대체한 답변 출처 (다음 요청에서 다시 조회하도록 캐시하지 않음)
+UNCACHED_DATA_SOURCES = ('general_advice_fallback', 'deadline_exceeded')
+
+def store_cached_answer(cache_key: Optional[Tuple[str, str]], result: Dict[str, Any]) -> None:
+    """정상 답변만 캐시에 저장"""
+    if (cache_key is None or not result.get('answer') or is_error_answer(result['answer'])
+            or result.get('data_source') in UNCACHED_DATA_SOURCES):
+        return
+    answer_cache.set(cache_key[0], {
+        'answer': result['answer'],
+        'data_source': result['data_source'],
+        'question_type': result['question_type']
+    }, cache_key[1])
+
+def lookup_cached_answer(cache_key: Optional[Tuple[str, str]]) -> Optional[Dict[str, Any]]:
+    """답변 캐시 조회 (적중 / 실패 지표 기록)"""
+    if cache_key is None:
+        return None
+    cached = answer_cache.get(cache_key[0])
+    metrics.add('answer_cache_hits' if cached is not None else 'answer_cache_misses')
+    return cached
+
+def run_cached_genai_pipeline(question: str) -> Dict[str, Any]:
+    """답변 캐시를 먼저 확인하고, 없으면 파이프라인 실행 후 저장 (같은 질문을 다른 요청이 처리 중이면 그 결과를 함께 받음)"""
+    cache_key = get_answer_cache_key(question)
+    cached = lookup_cached_answer(cache_key)
+    if cached is not None:
+        logger.info("답변 캐시 적중: %s", question)
+        return dict(cached, cached=True)
+
+    def execute() -> Dict[str, Any]:
+        result = run_genai_pipeline(question)
+        store_cached_answer(cache_key, result)
+        return result
+
+    flight = get_single_flight()
+    if flight is None:
+        return dict(execute(), cached=False)
+    try:
+        result, shared = flight.do(normalize_question(question), execute)
+    except SingleFlightTimeout:
+        # 앞선 요청이 timeout 안에 끝나지 않으면 직접 실행
+        logger.warning("진행 중인 같은 질문 대기 시간 초과, 직접 실행: %s", question)
+        metrics.add('single_flight_timeouts')
+        return dict(execute(), cached=False)
+    if shared:
+        logger.info("진행 중인 같은 질문 결과 공유: %s", question)
+        metrics.add('single_flight_coalesced')
+    return dict(result, cached=False)
+
+def stream_cached_genai_pipeline(question: str) -> Iterator[str]:
+    """스트리밍 버전 - 캐시 적중이면 저장된 답변을 토큰 이벤트 하나로 바로 반환
+    같은 질문을 다른 요청이 스트리밍 중이면 그 요청의 이벤트를 함께 받음 (meta / done 도 앞선 요청 값)
+    """
+    cache_key = get_answer_cache_key(question)
+    cached = lookup_cached_answer(cache_key)
+    if cached is None:
+        def execute() -> Iterator[str]:
+            return stream_genai_pipeline(question, on_complete=lambda result: store_cached_answer(cache_key, result))
+
+        flight = get_single_flight()
+        if flight is None:
+            yield from execute()
+            return
+        events, shared = flight.stream(normalize_question(question), execute)
+        if shared:
+            logger.info("진행 중인 같은 질문 스트림 공유: %s", question)
+            metrics.add('single_flight_coalesced')
+        sent = False
+        try:
+            for event in events:
+                sent = True
+                yield event
+        except (SingleFlightTimeout, SingleFlightAbandoned) as e:
+            # 아직 보낸 이벤트가 없으면 직접 실행, 보낸 뒤에는 이어 붙일 수 없으므로 그대로 실패
+            if sent:
+                raise
+            logger.warning("진행 중인 같은 질문 스트림을 받지 못해 직접 실행: %s (%s)", question, e)
+            metrics.add('single_flight_timeouts')
+            yield from execute()
+        return
+
+    logger.info("답변 캐시 적중 (스트리밍): %s", question)
+    yield format_sse('meta', {
+        'question': question,
+        'data_source': cached['data_source'],
+        'question_type': cached['question_type'],
+        'cached': True
+    })
+    yield format_sse('token', {'text': cached['answer']})
+    yield format_sse('done', {'first_token_ms': 0.0, 'total_ms': 0.0, 'answer_chars': len(cached['answer'])})
+
+def run_genai_pipeline(question: str) -> Dict[str, Any]:
+    """질문 유형 분석 → (데이터베이스 조회) → AI 답변 생성 파이프라인 실행"""
+    question_analysis = None
+
+    # 추측 실행: 로컬 분류로 결정되지 않은 질문은 Bedrock 분류와 일반 상담 답변을 동시에 시작
+    executor = get_speculative_executor()
+    if executor:
+        router = get_intent_router()
+        question_analysis = router.route(question) if router else None
+        if question_analysis is None:
+            get_bedrock_client()
+            speculation = executor.run(
+                classify=lambda: classify_question_with_bedrock(question),
+                speculate=lambda: speculate_general_advice(question),
+                accept=lambda analysis: analysis.get('type', 'GENERAL_ADVICE') != 'DATABASE_QUERY',
+                usable=lambda answer: not is_error_answer(answer)
+            )
+            if speculation['answer'] is not None:
+                record_speculation_metrics(executor, speculation['saved_ms'])
+                return {
+                    'answer': speculation['answer'],
+                    'data_source': 'general_advice',
+                    'question_type': speculation['analysis'].get('type', 'GENERAL_ADVICE')
+                }
+            question_analysis = speculation['analysis']
+
+    prepared = prepare_genai_answer(question, question_analysis)
+    ai_response = prepared['rendered_answer']
+    if ai_response is None:
+        ai_response = call_bedrock_ai(question, prepared['context_data'],
+                                      is_general_advice=prepared['is_general_advice'])
+    if executor:
+        # 답변 생성 동안 끝난 폐기 호출(대개 이 요청의 추측 답변) 토큰 기록
+        record_speculation_metrics(executor)
+
+    return {
+        'answer': ai_response,
+        'data_source': prepared['data_source'],
+        'question_type': prepared['question_type']
+    }
+
+def stream_genai_pipeline(question: str,
+                          on_complete: Optional[Callable[[Dict[str, Any]], None]] = None) -> Iterator[str]:
+    """run_genai_pipeline 스트리밍 버전 - SSE 이벤트(meta → token ... → done)를 생성되는 대로 반환"""
+    started = time.perf_counter()
+    prepared = prepare_genai_answer(question)
+    yield format_sse('meta', {
+        'question': question,
+        'data_source': prepared['data_source'],
+        'question_type': prepared['question_type']
+    })
+
+    first_token_ms = None
+    answer_chars = 0
+    chunks = []
+    if prepared['rendered_answer'] is not None:
+        texts = iter([prepared['rendered_answer']])
+    else:
+        texts = stream_bedrock_ai(question, prepared['context_data'], is_general_advice=prepared['is_general_advice'])
+    for text in texts:
+        if first_token_ms is None:
+            first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+        answer_chars += len(text)
+        chunks.append(text)
+        yield format_sse('token', {'text': text})
+
+    if on_complete:
+        on_complete({
+            'answer': ''.join(chunks),
+            'data_source': prepared['data_source'],
+            'question_type': prepared['question_type']
+        })
+
+    total_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info("스트리밍 답변 완료: 첫 토큰 %sms / 전체 %sms / %d자", first_token_ms, total_ms, answer_chars)
+    yield format_sse('done', {'first_token_ms': first_token_ms, 'total_ms': total_ms, 'answer_chars': answer_chars})
+
+def get_batch_runner() -> BatchRunner:
+    """배치 질문 실행기 초기화 (BATCH_MAX_WORKERS 로 동시 실행 수 제한)"""
+    global batch_runner
+    if batch_runner is None:
+        max_workers = int(os.getenv('BATCH_MAX_WORKERS', '4'))
+        batch_runner = BatchRunner(max_workers=max_workers)
+        logger.info("배치 실행기 초기화 (worker: %s)", max_workers)
+    return batch_runner
+
+def plan_batch_question(question: str) -> Dict[str, Any]:
+    """배치 1단계: 질문 유형 분석 + 실행할 SQL 결정 (답변 캐시 적중이면 이후 단계 생략)"""
+    cache_key = get_answer_cache_key(question)
+    cached = lookup_cached_answer(cache_key)
+    if cached is not None:
+        return {'analysis': {'type': cached['question_type'], 'cached': cached}, 'sql_info': None}
+
+    analysis = dict(analyze_question(question), cache_key=cache_key)
+    sql_info = None
+    if analysis.get('type', 'GENERAL_ADVICE') == 'DATABASE_QUERY':
+        try:
+            sql_info = resolve_question_sql(question, analysis if get_pipeline_mode() == 'planner' else None)
+        except Exception as e:
+            logger.error("배치 SQL 결정 실패: %s", e)
+    return {'analysis': analysis, 'sql_info': sql_info}
+
+def fetch_combined_rows(sql_info: Dict[str, Any]) -> List[Dict]:
+    """배치 2단계: UNION ALL 로 묶은 쿼리를 페이지 없이 한 번에 실행 (실패 시 예외)"""
+    started = time.perf_counter()
+    try:
+        rows = execute_select(sql_info['database'], sql_info['sql'], sql_info.get('parameters'), raise_errors=True)
+    except Exception:
+        record_sql_workload(sql_info, (time.perf_counter() - started) * 1000, 0, 'batch', error=True)
+        raise
+    record_sql_workload(sql_info, (time.perf_counter() - started) * 1000, len(rows), 'batch')
+    return rows
+
+def answer_batch_question(question: str, analysis: Dict[str, Any], rows: Optional[List[Dict]]) -> Dict[str, Any]:
+    """배치 3단계: 조회 결과로 답변 생성 (rows=None 은 SQL 결정 / 조회 실패 → 일반 상담 답변, 분류 기한 초과는 시간 초과 답변, 캐시하지 않음)"""
+    if analysis.get('cached'):
+        return dict(analysis['cached'], cached=True)
+
+    question_type = analysis.get('type', 'GENERAL_ADVICE')
+    if analysis.get('deadline_exceeded'):
+        # 분류 기한 초과: 답변 생성을 시작하지 않고 시간 초과 답변 (prepare_genai_answer 와 같음)
+        metrics.add('partial_answers')
+        answer = build_partial_answer("")
+        data_source = 'deadline_exceeded'
+    elif question_type == 'DATABASE_QUERY' and rows is None:
+        logger.error("배치 데이터베이스 조회 실패, 일반 상담 답변으로 대체: %s", question)
+        metrics.add('database_fallbacks')
+        answer = call_bedrock_ai(question, "", is_general_advice=True)
+        data_source = 'general_advice_fallback'
+    elif question_type == 'DATABASE_QUERY':
+        answer = render_database_answer(question, rows)
+        if answer is None:
+            context_data = format_context_data(rows, question)
+            answer = call_bedrock_ai(question, context_data, is_general_advice=False)
+        data_source = 'aurora_rds_data_api'
+    else:
+        answer = call_bedrock_ai(question, "", is_general_advice=True)
+        data_source = 'general_advice'
+    result = {'answer': answer, 'data_source': data_source, 'question_type': question_type}
+    store_cached_answer(analysis.get('cache_key'), result)
+    return dict(result, cached=False)
+
+def run_genai_batch(questions: List[str]) -> Dict[str, Any]:
+    """여러 질문을 한 번에 처리 (중복 제거, 단계별 동시 실행, 같은 형태의 SQL 묶음 실행)"""
+    return get_batch_runner().run(
+        questions,
+        analyze=plan_batch_question,
+        fetch=fetch_question_rows,
+        fetch_combined=fetch_combined_rows,
+        answer=answer_batch_question
+    )
+
+def get_batch_questions(body: Dict[str, Any]) -> Optional[List[str]]:
+    """본문 questions 배열 검증 (배치 요청이 아니면 None, 잘못된 요청이면 ValueError)"""
+    questions = body.get('questions')
+    if questions is None:
+        return None
+    if not isinstance(questions, list) or not questions:
+        raise ValueError('questions 파라미터는 비어 있지 않은 배열이어야 합니다.')
+    questions = [str(q).strip() for q in questions]
+    if not all(questions):
+        raise ValueError('questions 배열에 빈 질문이 있습니다.')
+    max_questions = int(os.getenv('BATCH_MAX_QUESTIONS', '20'))
+    if len(questions) > max_questions:
+        raise ValueError(f'한 번에 최대 {max_questions}개 질문까지 처리할 수 있습니다.')
+    return questions
+
+def is_stream_request(event: Dict[str, Any], body: Dict[str, Any]) -> bool:
+    """본문 stream=true 또는 Accept: text/event-stream 이면 스트리밍 응답 요청"""
+    if body.get('stream') is True or str(body.get('stream', '')).lower() == 'true':
+        return True
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    return 'text/event-stream' in (headers.get('accept') or '')
+
+def accepts_body_stream(event: Dict[str, Any]) -> bool:
+    """호출 측이 body 로 SSE 이벤트 iterator 를 받아서 나눠 보낼 수 있는지 (async_server 가 requestContext 에 표시)"""
+    return bool((event.get('requestContext') or {}).get('bodyStream'))
+
+def init_aws_clients() -> None:
+    """컨테이너 초기화 단계에서 클라이언트 생성 (실패하면 첫 사용 시 다시 시도)"""
+    for name, factory in (('bedrock_client', get_bedrock_client), ('rds_data_client', get_rds_data_client)):
+        with init_profile.phase(name):
+            try:
+                factory()
+            except Exception:
+                pass  # 오류 로그는 get_*_client 에서 남김
+
+# 컨테이너 초기화 단계에서 클라이언트 생성, 엔티티 인덱스 사전 적재 (첫 요청 지연 방지)
+if os.getenv('CLIENT_EAGER_INIT', 'true').lower() == 'true':
+    init_aws_clients()
+if LOCAL_REPLICA_ENABLED:
+    with init_profile.phase('local_replica'):
+        get_local_replica()
+if os.getenv('ENTITY_INDEX_ENABLED', 'false').lower() == 'true':
+    with init_profile.phase('entity_index'):
+        get_entity_index()
+if get_sql_example_mode() == 'select':
+    with init_profile.phase('sql_example_store'):
+        get_sql_example_store()
+init_profile.finish(budget_ms=float(os.getenv('INIT_BUDGET_MS', '1000')))
+
+@request_logging.instrument_handler
+@metrics.instrument_handler
 def lambda_handler(event, context):
     """Lambda 함수 메인 핸들러"""
     try:
-        logger.info(f"Lambda 함수 시작 - Request ID: {context.aws_request_id}")
+        logger.info("Lambda 함수 시작 - Request ID: %s", context.aws_request_id)
+        if os.getenv('STAGE_DEADLINES_ENABLED', 'false').lower() == 'true':
+            # 남은 실행 시간에서 응답 여유 시간을 뺀 요청 기한 (단계별 기한의 기준)
+            set_request_budget(RequestBudget(context.get_remaining_time_in_millis(),
+                                             reserve_ms=float(os.getenv('DEADLINE_RESERVE_MS', '1500'))))
+        if init_profile.take_cold_start():
+            metrics.set_property('cold_start', True)
+            metrics.add('init_ms', init_profile.total_ms or 0, 'Milliseconds')
+        
+        # 답변 캐시 무효화 (특수 이벤트)
+        if event.get('invalidate_answer_cache', False):
+            metrics.set_dimension('Route', 'invalidate_answer_cache')
+            cache = get_answer_cache()
+            removed = cache.invalidate() if cache else 0
+            return {
+                'statusCode': 200,
+                'body': {
+                    'invalidated': removed,
+                    'request_id': context.aws_request_id
+                }
+            }
+        
+        # 실행 SQL 워크로드 스냅샷 조회 (특수 이벤트, reset=true 면 조회 후 초기화)
+        if event.get('sql_workload', False):
+            metrics.set_dimension('Route', 'sql_workload')
+            recorder = get_sql_workload()
+            return {
+                'statusCode': 200,
+                'body': {
+                    'workload': recorder.snapshot(reset=bool(event.get('reset', False))) if recorder else None,
+                    'request_id': context.aws_request_id
+                }
+            }
         
         # 모델 테스트 모드 (특수 이벤트)
         if event.get('test_models', False):
+            metrics.set_dimension('Route', 'test_models')
             available_models = test_bedrock_models()
             return {
                 'statusCode': 200,
@@ -627,6 +1723,7 @@ def lambda_handler(event, context):
             path = event.get('path', '')
             
             if method == 'GET' and path == '/health':
+                metrics.set_dimension('Route', 'health')
                 return {
                     'statusCode': 200,
                     'headers': {
@@ -637,13 +1734,35 @@ def lambda_handler(event, context):
                         'status': 'healthy',
                         'service': 'genai-lambda',
                         'data_api_enabled': True,
+                        'intent_router': intent_router.get_stats() if intent_router else None,
+                        'entity_index': entity_index.get_stats() if entity_index else None,
+                        'query_templates': query_template_registry.get_stats(),
+                        'speculative_advice': speculative_executor.get_stats() if speculative_executor else None,
+                        'batch': batch_runner.get_stats() if batch_runner else None,
+                        'answer_renderer': answer_renderer.get_stats() if answer_renderer else None,
+                        'answer_cache': answer_cache.get_stats() if answer_cache else None,
+                        'single_flight': single_flight.get_stats() if single_flight else None,
+                        'bedrock_limiter': bedrock_limiter.get_stats() if bedrock_limiter else None,
+                        'stages': stage_caller.get_stats() if stage_caller else None,
+                        'models': get_model_router().get_stats(),
+                        'metrics': metrics.get_stats(),
+                        'logging': request_logging.get_stats(),
+                        'init': init_profile.get_stats(),
+                        'sql_guard': sql_guard.get_stats() if sql_guard else None,
+                        'sql_workload': sql_workload.get_stats() if sql_workload else None,
+                        'local_replica': local_replica.get_stats() if local_replica else None,
+                        'sql_examples': dict(sql_example_store.get_stats(), mode=get_sql_example_mode())
+                            if sql_example_store else {'mode': get_sql_example_mode()},
+                        'prompt_cache': prompt_cache_stats.get_stats(enabled=any(
+                            is_prompt_cache_enabled(get_model_router().primary(stage))
+                            for stage in ('classify', 'sql', 'plan'))),
                         'timestamp': context.aws_request_id
                     })
                 }
             
             elif method == 'POST' and '/genai' in path:
                 # POST 요청 본문 파싱
-                body = event.get('body', '{}')
+                body = event.get('body') or '{}'
                 
                 # Base64 디코딩 처리
                 if event.get('isBase64Encoded', False):
@@ -654,9 +1773,40 @@ def lambda_handler(event, context):
                     try:
                         body = json.loads(body)
                     except json.JSONDecodeError as e:
-                        logger.error(f"JSON 파싱 오류: {str(e)}")
+                        logger.error("JSON 파싱 오류: %s", e)
                         body = {}
                 
+                # 배치 요청 ({"questions": [...]})
+                try:
+                    questions = get_batch_questions(body)
+                except ValueError as e:
+                    return {
+                        'statusCode': 400,
+                        'headers': {
+                            'Content-Type': 'application/json',
+                            'Access-Control-Allow-Origin': '*'
+                        },
+                        'body': json.dumps({
+                            'error': 'Bad Request',
+                            'message': str(e)
+                        }, ensure_ascii=False)
+                    }
+                if questions is not None:
+                    metrics.set_dimension('Route', 'batch')
+                    batch = run_genai_batch(questions)
+                    return {
+                        'statusCode': 200,
+                        'headers': {
+                            'Content-Type': 'application/json',
+                            'Access-Control-Allow-Origin': '*'
+                        },
+                        'body': json.dumps({
+                            'results': batch['results'],
+                            'summary': batch['summary'],
+                            'timestamp': context.aws_request_id
+                        }, ensure_ascii=False)
+                    }
+                
                 question = body.get('question', '') or body.get('message', '')
                 
                 if not question:
@@ -672,32 +1822,24 @@ def lambda_handler(event, context):
                         })
                     }
                 
-                # 질문 유형 분석
-                question_analysis = analyze_question_type(question)
-                question_type = question_analysis.get('type', 'GENERAL_ADVICE')
+                # 스트리밍 요청은 SSE 형식으로 응답
+                # Lambda 프록시 통합은 본문을 모아서 전달, 서버 모드(async_server)는 이벤트를 생성되는 대로 전송
+                if is_stream_request(event, body):
+                    metrics.set_dimension('Route', 'genai_stream')
+                    events = stream_cached_genai_pipeline(question)
+                    return {
+                        'statusCode': 200,
+                        'headers': {
+                            'Content-Type': 'text/event-stream; charset=utf-8',
+                            'Cache-Control': 'no-cache',
+                            'Access-Control-Allow-Origin': '*'
+                        },
+                        'body': events if accepts_body_stream(event) else ''.join(events)
+                    }
                 
-                if question_type == 'DATABASE_QUERY':
-                    # 데이터베이스 조회가 필요한 질문
-                    logger.info(f"데이터베이스 쿼리 유형으로 분류됨: {question}")
-                    try:
-                        db_results = query_database_by_question(question)
-                        logger.info(f"데이터베이스 쿼리 결과: {len(db_results)}개")
-                        context_data = format_context_data(db_results, question)
-                        logger.info(f"컨텍스트 데이터 생성됨: {len(context_data)}자")
-                        ai_response = call_bedrock_ai(question, context_data, is_general_advice=False)
-                        data_source = 'aurora_rds_data_api'
-
-                    except Exception as db_error:
-                        logger.error(f"데이터베이스 조회 오류: {str(db_error)}")
-                        logger.error(f"오류 타입: {type(db_error).__name__}")
-                        import traceback
-                        logger.error(f"스택 트레이스: {traceback.format_exc()}")
-                        ai_response = call_bedrock_ai(question, "", is_general_advice=True)
-                        data_source = 'general_advice_fallback'
-                else:
-                    # 일반적인 반려동물 상담
-                    ai_response = call_bedrock_ai(question, "", is_general_advice=True)
-                    data_source = 'general_advice'
+                metrics.set_dimension('Route', 'genai')
+                result = run_cached_genai_pipeline(question)
+                metrics.set_property('question_type', result['question_type'])
                 
                 return {
                     'statusCode': 200,
@@ -707,14 +1849,38 @@ def lambda_handler(event, context):
                     },
                     'body': json.dumps({
                         'question': question,
-                        'answer': ai_response,
-                        'data_source': data_source,
-                        'question_type': question_type,
+                        'answer': result['answer'],
+                        'data_source': result['data_source'],
+                        'question_type': result['question_type'],
+                        'cached': result['cached'],
                         'timestamp': context.aws_request_id
                     }, ensure_ascii=False)
                 }
         
         # 직접 호출 (테스트용)
+        try:
+            questions = get_batch_questions(event)
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'body': {
+                    'error': 'Bad Request',
+                    'message': str(e),
+                    'request_id': context.aws_request_id
+                }
+            }
+        if questions is not None:
+            metrics.set_dimension('Route', 'direct_batch')
+            batch = run_genai_batch(questions)
+            return {
+                'statusCode': 200,
+                'body': {
+                    'results': batch['results'],
+                    'summary': batch['summary'],
+                    'request_id': context.aws_request_id
+                }
+            }
+        
         question = event.get('question', '') or event.get('message', '')
         
         if not question:
@@ -727,41 +1893,24 @@ def lambda_handler(event, context):
                 }
             }
         
-        # 질문 유형 분석
-        question_analysis = analyze_question_type(question)
-        question_type = question_analysis.get('type', 'GENERAL_ADVICE')
-        
-        if question_type == 'DATABASE_QUERY':
-            # 데이터베이스 조회가 필요한 질문
-            try:
-                db_results = query_database_by_question(question)
-                context_data = format_context_data(db_results, question)
-                ai_response = call_bedrock_ai(question, context_data, is_general_advice=False)
-                data_source = 'aurora_rds_data_api'
-                
-            except Exception as db_error:
-                logger.error(f"데이터베이스 조회 오류: {str(db_error)}")
-                ai_response = call_bedrock_ai(question, "", is_general_advice=True)
-                data_source = 'general_advice_fallback'
-        else:
-            # 일반적인 반려동물 상담
-            ai_response = call_bedrock_ai(question, "", is_general_advice=True)
-            data_source = 'general_advice'
+        metrics.set_dimension('Route', 'direct')
+        result = run_cached_genai_pipeline(question)
+        metrics.set_property('question_type', result['question_type'])
         
         return {
             'statusCode': 200,
             'body': {
                 'question': question,
-                'answer': ai_response,
-                'data_source': data_source,
-                'question_type': question_type,
+                'answer': result['answer'],
+                'data_source': result['data_source'],
+                'question_type': result['question_type'],
+                'cached': result['cached'],
                 'request_id': context.aws_request_id
             }
         }
         
     except Exception as e:
-        logger.error(f"Lambda 함수 실행 오류: {str(e)}")
-        logger.error(f"스택 트레이스: {traceback.format_exc()}")
+        logger.error("Lambda 함수 실행 오류: %s", e, exc_info=True)
         
         return {
             'statusCode': 500,
@@ -0,0 +1,360 @@
+"""
+GenAI Lambda 내장 읽기 복제본
+petclinic 7개 테이블을 메모리 SQLite 로 복사해 두고 생성 SELECT 를 로컬에서 실행 (Data API 왕복 / Aurora 재개 대기 생략)
+갱신: 원본 테이블 버전(행 수 + 내용 checksum, table_versions.py)과 복제본에서 같은 SQL 로 계산한 버전이 다른 테이블만
+id 최대값 이후 행을 추가로 가져오고, 그래도 버전이 다르면(수정 / 삭제) 그 테이블만 다시 읽음
+모든 테이블이 원본과 맞춰졌을 때만 synced_at 을 원본 버전 조회 시각으로 올림 (max_staleness 판단 기준)
+첫 적재 이후 갱신은 백그라운드 스레드에서 실행하고 그동안 요청은 기존 스냅샷으로 처리
+SQLite 로 같은 결과를 보장할 수 없는 MySQL 문법, 실행 오류, 허용 지연을 넘은 스냅샷이면 None 을 반환 (호출 측에서 Data API 로 실행)
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sql_guard import mask_literals
+from table_versions import build_table_version_sql, parse_table_versions
+
+logger = logging.getLogger()
+
+# petclinic_mysql.sql 과 같은 컬럼 순서 (SELECT * 결과 순서 유지)
+# 문자열 컬럼은 MySQL 기본 collation 처럼 대소문자 구분 없이 비교 / 정렬 (DATE 는 Data API 가 문자열로 전달)
+PETCLINIC_SCHEMA: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    'types': (('id', 'INTEGER PRIMARY KEY'), ('name', 'TEXT COLLATE NOCASE')),
+    'owners': (('id', 'INTEGER PRIMARY KEY'), ('first_name', 'TEXT COLLATE NOCASE'),
+               ('last_name', 'TEXT COLLATE NOCASE'), ('address', 'TEXT COLLATE NOCASE'),
+               ('city', 'TEXT COLLATE NOCASE'), ('telephone', 'TEXT COLLATE NOCASE')),
+    'pets': (('id', 'INTEGER PRIMARY KEY'), ('name', 'TEXT COLLATE NOCASE'), ('birth_date', 'TEXT'),
+             ('type_id', 'INTEGER'), ('owner_id', 'INTEGER')),
+    'visits': (('id', 'INTEGER PRIMARY KEY'), ('pet_id', 'INTEGER'), ('visit_date', 'TEXT'),
+               ('description', 'TEXT COLLATE NOCASE')),
+    'vets': (('id', 'INTEGER PRIMARY KEY'), ('first_name', 'TEXT COLLATE NOCASE'),
+             ('last_name', 'TEXT COLLATE NOCASE')),
+    'specialties': (('id', 'INTEGER PRIMARY KEY'), ('name', 'TEXT COLLATE NOCASE')),
+    'vet_specialties': (('vet_id', 'INTEGER'), ('specialty_id', 'INTEGER')),
+}
+
+# 복제본 테이블 버전 (원본 버전과 비교)
+LOCAL_VERSION_SQL = build_table_version_sql(PETCLINIC_SCHEMA)
+
+# 보조 인덱스 (petclinic_mysql.sql 의 INDEX / UNIQUE + InnoDB 외래 키 자동 인덱스)
+PETCLINIC_INDEXES = (
+    ('types', ('name',)), ('owners', ('last_name',)), ('pets', ('name',)), ('pets', ('owner_id',)),
+    ('pets', ('type_id',)), ('visits', ('pet_id',)), ('vets', ('last_name',)), ('specialties', ('name',)),
+    ('vet_specialties', ('vet_id', 'specialty_id')), ('vet_specialties', ('specialty_id',)),
+)
+
+# SQLite 에서 결과가 달라지거나 실행할 수 없는 MySQL 문법 (문자열 값은 가린 뒤 검사)
+# '/' 는 SQLite 정수 나눗셈, '||' 는 MySQL OR, 큰따옴표는 MySQL 문자열 / SQLite 식별자
+_UNSUPPORTED_PATTERN = re.compile(
+    r'/|\|\||"|\bINTERVAL\b|\bDATE_(?:ADD|SUB|FORMAT)\s*\(|\bDATEDIFF\s*\(|\bTIMESTAMPDIFF\s*\(|\bSTR_TO_DATE\s*\('
+    r'|\bR?LIKE\s+BINARY\b|\bREGEXP\b|\bRLIKE\b|\bDIV\b|\bFOR\s+UPDATE\b|\bLOCK\s+IN\b|\bSEPARATOR\b'
+    r'|\bSQL_CALC_FOUND_ROWS\b|\binformation_schema\b',
+    re.IGNORECASE
+)
+
+
+def _register_mysql_functions(conn: sqlite3.Connection) -> None:
+    """생성 SQL 에 자주 나오는 MySQL 함수"""
+    conn.create_function('CONCAT', -1, lambda *values: None if None in values else ''.join(str(v) for v in values),
+                         deterministic=True)
+    conn.create_function('YEAR', 1, lambda value: int(str(value)[:4]) if value else None, deterministic=True)
+    conn.create_function('MONTH', 1, lambda value: int(str(value)[5:7]) if value else None, deterministic=True)
+    conn.create_function('NOW', 0, lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    conn.create_function('CURDATE', 0, lambda: date.today().isoformat())
+    # 테이블 버전 계산 (table_versions.build_table_version_sql)
+    conn.create_function('CONCAT_WS', -1, lambda sep, *values: sep.join(str(v) for v in values if v is not None),
+                         deterministic=True)
+    conn.create_function('CRC32', 1, lambda value: None if value is None else zlib.crc32(str(value).encode('utf-8')),
+                         deterministic=True)
+    conn.create_aggregate('BIT_XOR', 1, _BitXor)
+
+
+class _BitXor:
+    """MySQL BIT_XOR 집계 (행이 없으면 0)"""
+
+    def __init__(self):
+        self.value = 0
+
+    def step(self, value):
+        if value is not None:
+            self.value ^= int(value)
+
+    def finalize(self):
+        return self.value
+
+
+class LocalReplica:
+    """petclinic 메모리 SQLite 복제본
+
+    fetch_rows(sql, parameters) → dict 행 목록 (원본 조회, 실패 시 예외)
+    fetch_versions() → {테이블: 버전} (table_versions.parse_table_versions 형식, 없으면 갱신은 새 id 행만 추가하고
+      원본과 일치하는지 알 수 없으므로 synced_at 은 전체 재적재 때만 올라감)
+    on_refresh(kind, elapsed_ms, rows) → 적재 / 갱신 결과 보고 (kind: load / refresh)
+    background_refresh: 첫 적재 이후 갱신을 백그라운드 스레드에서 실행 (False 면 조회 요청 안에서 실행)
+    """
+
+    def __init__(self, fetch_rows: Callable[[str, Optional[List]], List[Dict[str, Any]]],
+                 fetch_versions: Optional[Callable[[], Dict[str, Any]]] = None,
+                 refresh_interval: float = 60.0, full_reload_interval: float = 900.0, max_staleness: float = 300.0,
+                 page_size: int = 1000, max_rows: int = 100000,
+                 on_refresh: Optional[Callable[[str, float, int], None]] = None, background_refresh: bool = True):
+        self.fetch_rows = fetch_rows
+        self.fetch_versions = fetch_versions
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.max_staleness = max_staleness
+        self.page_size = max(1, page_size)
+        self.max_rows = max_rows
+        self.on_refresh = on_refresh
+        self.background_refresh = background_refresh
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._query_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_state_lock = threading.Lock()
+        self._high_water: Dict[str, int] = {}
+        self._refreshing = False
+        # synced_at: 원본과 일치를 확인한 원본 시각 (이 시각 이후 변경은 반영 안 됨), checked_at: 마지막 갱신 시도 시각
+        self.synced_at = 0.0
+        self.checked_at = 0.0
+        self.loaded_at = 0.0
+        self._stats = {'queries': 0, 'served': 0, 'unsupported': 0, 'errors': 0, 'stale': 0, 'not_loaded': 0,
+                       'loads': 0, 'refreshes': 0, 'refresh_errors': 0, 'refresh_rows': 0, 'table_reloads': 0,
+                       'unverified_refreshes': 0, 'background_refreshes': 0, 'load_ms': 0.0, 'refresh_ms': 0.0, 'rows': 0}
+
+    # ------------------------------------------------------------------
+    # 적재 / 갱신
+    # ------------------------------------------------------------------
+
+    def _fetch_table(self, table: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        """테이블 행을 페이지 단위로 조회 (id 가 있으면 after_id 이후만, Data API 응답 크기 제한 대비)"""
+        columns = ', '.join(name for name, _ in PETCLINIC_SCHEMA[table])
+        has_id = PETCLINIC_SCHEMA[table][0][0] == 'id'
+        rows: List[Dict[str, Any]] = []
+        while True:
+            if has_id:
+                last_id = rows[-1]['id'] if rows else after_id
+                page = self.fetch_rows(
+                    f"SELECT {columns} FROM {table} WHERE id > :after_id ORDER BY id LIMIT {self.page_size}",
+                    [{'name': 'after_id', 'value': {'longValue': int(last_id)}}]
+                )
+            else:
+                page = self.fetch_rows(
+                    f"SELECT {columns} FROM {table} ORDER BY {columns} LIMIT {self.page_size} OFFSET {len(rows)}",
+                    None
+                )
+            rows.extend(page)
+            if len(rows) > self.max_rows:
+                raise RuntimeError(f"복제본 행 수 제한 초과 ({table}: {len(rows)} > {self.max_rows})")
+            if len(page) < self.page_size:
+                return rows
+
+    def _insert(self, conn: sqlite3.Connection, table: str, rows: List[Dict[str, Any]]) -> None:
+        names = [name for name, _ in PETCLINIC_SCHEMA[table]]
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})",
+            [tuple(row.get(name) for name in names) for row in rows]
+        )
+        if names[0] == 'id' and rows:
+            self._high_water[table] = max(self._high_water.get(table, 0), max(int(row['id']) for row in rows))
+
+    def _get_versions(self) -> Optional[Dict[str, Any]]:
+        if self.fetch_versions is None:
+            return None
+        return self.fetch_versions() or None
+
+    def _local_versions(self) -> Dict[str, str]:
+        """복제본 테이블 버전 (_query_lock 안에서 호출)"""
+        return parse_table_versions(self._conn.execute(LOCAL_VERSION_SQL).fetchall())
+
+    def load(self) -> None:
+        """전체 테이블을 새 SQLite DB 로 읽어서 교체 (실패하면 기존 DB 유지, 예외 전달)"""
+        started = time.perf_counter()
+        with self._refresh_lock:
+            # 전체를 다시 읽으면 읽기 시작 시각까지의 변경은 모두 반영됨
+            synced_at = time.time()
+            conn = sqlite3.connect(':memory:', check_same_thread=False)
+            _register_mysql_functions(conn)
+            high_water, self._high_water = self._high_water, {}
+            total = 0
+            try:
+                for table, columns in PETCLINIC_SCHEMA.items():
+                    conn.execute(f"CREATE TABLE {table} ({', '.join(f'{n} {t}' for n, t in columns)})")
+                    rows = self._fetch_table(table)
+                    self._insert(conn, table, rows)
+                    total += len(rows)
+                    if total > self.max_rows:
+                        raise RuntimeError(f"복제본 행 수 제한 초과 ({total} > {self.max_rows})")
+                for table, columns in PETCLINIC_INDEXES:
+                    conn.execute(f"CREATE INDEX idx_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)})")
+                conn.execute('ANALYZE')
+            except Exception:
+                self._high_water = high_water
+                conn.close()
+                raise
+            with self._query_lock:
+                previous, self._conn = self._conn, conn
+            if previous is not None:
+                previous.close()
+            self.synced_at = self.checked_at = self.loaded_at = synced_at
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._stats['loads'] += 1
+            self._stats['rows'] = total
+            self._stats['load_ms'] += elapsed_ms
+        logger.info("복제본 적재 완료: %s행 (%.1fms)", total, elapsed_ms)
+        if self.on_refresh:
+            self.on_refresh('load', elapsed_ms, total)
+
+    def refresh(self) -> None:
+        """원본과 버전이 다른 테이블만 갱신 (새 id 행 추가 → 그래도 다르면 그 테이블만 다시 읽음)"""
+        started = time.perf_counter()
+        with self._refresh_lock:
+            # 원본 버전을 읽은 시각 - 모든 테이블이 이 버전과 맞으면 이 시각까지 반영된 스냅샷
+            version_at = time.time()
+            versions = self._get_versions()
+            with self._query_lock:
+                local = self._local_versions()
+            changed = [table for table in PETCLINIC_SCHEMA if versions is None or versions.get(table) != local.get(table)]
+
+            fetched = {table: self._fetch_table(table, self._high_water.get(table, 0))
+                       for table in changed if PETCLINIC_SCHEMA[table][0][0] == 'id'}
+            with self._query_lock:
+                with self._conn:
+                    for table, rows in fetched.items():
+                        self._insert(self._conn, table, rows)
+                local = self._local_versions()
+
+            reload_tables = {}
+            if versions is not None:
+                # 새 행만으로 맞춰지지 않은 테이블 (수정 / 삭제, id 없는 테이블)
+                reload_tables = {table: self._fetch_table(table) for table in changed
+                                 if versions.get(table) != local.get(table)}
+                with self._query_lock:
+                    with self._conn:
+                        for table, rows in reload_tables.items():
+                            self._conn.execute(f"DELETE FROM {table}")
+                            self._high_water.pop(table, None)
+                            self._insert(self._conn, table, rows)
+            with self._query_lock:
+                self._stats['rows'] = sum(int(version.split(':')[0]) for version in self._local_versions().values())
+
+            if versions is not None:
+                # 다시 읽은 테이블은 읽기 시작 시각(version_at 이후)까지의 변경이 모두 반영됨
+                self.synced_at = version_at
+            else:
+                self._stats['unverified_refreshes'] += 1
+            rows = sum(len(rows) for rows in fetched.values()) + sum(len(rows) for rows in reload_tables.values())
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._stats['refreshes'] += 1
+            self._stats['refresh_rows'] += rows
+            self._stats['table_reloads'] += len(reload_tables)
+            self._stats['refresh_ms'] += elapsed_ms
+        if rows:
+            logger.info("복제본 갱신: %d행 (다시 읽은 테이블: %s)", rows, ', '.join(reload_tables) or '없음')
+        if self.on_refresh:
+            self.on_refresh('refresh', elapsed_ms, rows)
+
+    def _sync(self) -> None:
+        """갱신 / 전체 재적재 (실패하면 기존 스냅샷 유지, 다음 주기에 다시 시도)"""
+        try:
+            if self._conn is None or (self.full_reload_interval
+                                      and time.time() - self.loaded_at >= self.full_reload_interval):
+                self.load()
+            else:
+                self.refresh()
+        except Exception as e:
+            self._stats['refresh_errors'] += 1
+            logger.warning("복제본 갱신 실패 (스냅샷 나이 %.0f초): %s", self.age_seconds(), e)
+
+    def _sync_in_background(self) -> None:
+        try:
+            self._sync()
+        finally:
+            with self._refresh_state_lock:
+                self._refreshing = False
+
+    def ensure_fresh(self) -> None:
+        """갱신 주기가 지났으면 갱신 시작 - 적재된 스냅샷이 있으면 백그라운드 스레드에서 갱신하고 바로 반환
+
+        Lambda 는 응답 후 실행 환경이 멈추므로 백그라운드 갱신은 다음 호출 때 이어서 진행될 수 있음
+        (그동안의 스냅샷 나이는 max_staleness 로 제한)
+        """
+        now = time.time()
+        if now - self.checked_at < self.refresh_interval:
+            return
+        self.checked_at = now
+        if self._conn is None or not self.background_refresh:
+            self._sync()
+            return
+        with self._refresh_state_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self._stats['background_refreshes'] += 1
+        threading.Thread(target=self._sync_in_background, name='genai-replica-refresh', daemon=True).start()
+
+    def age_seconds(self) -> float:
+        """스냅샷이 원본과 마지막으로 맞춰진 뒤 지난 시간 (초)"""
+        return time.time() - self.synced_at if self.synced_at else float('inf')
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def is_supported(self, sql: str) -> bool:
+        """SQLite 로 MySQL 과 같은 결과를 낼 수 있는 SELECT 인지 (문자열 값 제외하고 검사)"""
+        return _UNSUPPORTED_PATTERN.search(mask_literals(sql)) is None
+
+    def query(self, sql: str, parameters: Optional[List[Dict[str, Any]]] = None,
+              row_format: str = 'dict') -> Optional[Any]:
+        """복제본에서 SELECT 실행 → execute_sql 과 같은 형식의 결과 (처리할 수 없으면 None)"""
+        self._stats['queries'] += 1
+        self.ensure_fresh()
+        if self._conn is None:
+            self._stats['not_loaded'] += 1
+            return None
+        if self.max_staleness and self.age_seconds() > self.max_staleness:
+            self._stats['stale'] += 1
+            return None
+        if not self.is_supported(sql):
+            self._stats['unsupported'] += 1
+            return None
+
+        values = {}
+        for parameter in parameters or []:
+            field, value = next(iter(parameter['value'].items()))
+            values[parameter['name']] = None if field == 'isNull' else value
+        try:
+            with self._query_lock:
+                cursor = self._conn.execute(sql.strip().rstrip(';'), values)
+                names = [column[0] for column in cursor.description or []]
+                rows = cursor.fetchall()
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.info("복제본 실행 실패, Data API 로 실행: %s: %s", type(e).__name__, e)
+            return None
+        self._stats['served'] += 1
+
+        if row_format == 'dict':
+            return [dict(zip(names, row)) for row in rows]
+        if row_format == 'tuple':
+            row_type = namedtuple('Row', names, rename=True)
+            return [tuple.__new__(row_type, row) for row in rows]
+        return {name: [row[i] for row in rows] for i, name in enumerate(names)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats['load_ms'] = round(stats['load_ms'], 3)
+        stats['refresh_ms'] = round(stats['refresh_ms'], 3)
+        age = self.age_seconds()
+        return dict(stats, loaded=self._conn is not None, refreshing=self._refreshing, age_seconds=round(age, 1) if self.synced_at else None,
+                    bounds={'refresh_interval': self.refresh_interval,
+                            'full_reload_interval': self.full_reload_interval,
+                            'max_staleness': self.max_staleness})
@@ -12,6 +12,17 @@ locals {
     Component = "serverless-ai"
     Purpose   = "genai-service-replacement"
   })
+
+  # 응답 스트리밍: Lambda Web Adapter 가 run.sh 로 async_server 를 띄우고 함수 URL 요청을 전달
+  web_adapter_layer_arn = var.lambda_web_adapter_layer_arn != "" ? var.lambda_web_adapter_layer_arn : "arn:aws:lambda:${data.aws_region.current.name}:753240598075:layer:LambdaAdapterLayerX86:24"
+  streaming_environment = var.response_streaming_enabled ? {
+    AWS_LAMBDA_EXEC_WRAPPER      = "/opt/bootstrap"
+    AWS_LWA_INVOKE_MODE          = "response_stream"
+    AWS_LWA_PORT                 = "8080"
+    AWS_LWA_READINESS_CHECK_PATH = "/health"
+    SERVER_MAX_WORKERS           = "4"
+    SERVER_REQUEST_TIMEOUT       = "55"
+  } : {}
 }
 
 # =============================================================================
@@ -208,11 +219,143 @@ resource "aws_security_group_rule" "lambda_dns_tcp_outbound" {
 data "archive_file" "lambda_zip" {
   type        = "zip"
   output_path = "${path.module}/lambda_function.zip"
+  # run.sh 실행 권한 (Lambda Web Adapter 진입점)
+  output_file_mode = "0755"
 
   source {
     content  = file("${path.module}/lambda_function.py")
     filename = "lambda_function.py"
   }
+
+  source {
+    content  = file("${path.module}/intent_router.py")
+    filename = "intent_router.py"
+  }
+
+  source {
+    content  = file("${path.module}/entity_index.py")
+    filename = "entity_index.py"
+  }
+
+  source {
+    content  = file("${path.module}/query_templates.py")
+    filename = "query_templates.py"
+  }
+
+  source {
+    content  = file("${path.module}/bedrock_stream.py")
+    filename = "bedrock_stream.py"
+  }
+
+  source {
+    content  = file("${path.module}/speculation.py")
+    filename = "speculation.py"
+  }
+
+  source {
+    content  = file("${path.module}/rds_decoder.py")
+    filename = "rds_decoder.py"
+  }
+
+  source {
+    content  = file("${path.module}/result_pager.py")
+    filename = "result_pager.py"
+  }
+
+  source {
+    content  = file("${path.module}/batch_runner.py")
+    filename = "batch_runner.py"
+  }
+
+  source {
+    content  = file("${path.module}/answer_cache.py")
+    filename = "answer_cache.py"
+  }
+
+  source {
+    content  = file("${path.module}/metrics.py")
+    filename = "metrics.py"
+  }
+
+  source {
+    content  = file("${path.module}/structured_logging.py")
+    filename = "structured_logging.py"
+  }
+
+  source {
+    content  = file("${path.module}/bootstrap.py")
+    filename = "bootstrap.py"
+  }
+
+  source {
+    content  = file("${path.module}/prompt_cache.py")
+    filename = "prompt_cache.py"
+  }
+
+  source {
+    content  = file("${path.module}/example_store.py")
+    filename = "example_store.py"
+  }
+
+  source {
+    content  = file("${path.module}/sql_examples.jsonl")
+    filename = "sql_examples.jsonl"
+  }
+
+  source {
+    content  = file("${path.module}/sql_guard.py")
+    filename = "sql_guard.py"
+  }
+
+  source {
+    content  = file("${path.module}/query_workload.py")
+    filename = "query_workload.py"
+  }
+
+  source {
+    content  = file("${path.module}/local_replica.py")
+    filename = "local_replica.py"
+  }
+
+  source {
+    content  = file("${path.module}/answer_renderer.py")
+    filename = "answer_renderer.py"
+  }
+
+  source {
+    content  = file("${path.module}/single_flight.py")
+    filename = "single_flight.py"
+  }
+
+  source {
+    content  = file("${path.module}/bedrock_limiter.py")
+    filename = "bedrock_limiter.py"
+  }
+
+  source {
+    content  = file("${path.module}/hedging.py")
+    filename = "hedging.py"
+  }
+
+  source {
+    content  = file("${path.module}/model_adapters.py")
+    filename = "model_adapters.py"
+  }
+
+  source {
+    content  = file("${path.module}/table_versions.py")
+    filename = "table_versions.py"
+  }
+
+  source {
+    content  = file("${path.module}/async_server.py")
+    filename = "async_server.py"
+  }
+
+  source {
+    content  = file("${path.module}/run.sh")
+    filename = "run.sh"
+  }
 }
 
 # Lambda 함수 (완전한 기능)
@@ -220,10 +363,11 @@ resource "aws_lambda_function" "genai_function" {
   filename      = data.archive_file.lambda_zip.output_path
   function_name = "${var.name_prefix}-genai-function"
   role          = aws_iam_role.lambda_execution_role.arn
-  handler       = "lambda_function.lambda_handler"
+  handler       = var.response_streaming_enabled ? "run.sh" : "lambda_function.lambda_handler"
   runtime       = "python3.11"
   timeout       = 60
   memory_size   = 512
+  layers        = var.response_streaming_enabled ? [local.web_adapter_layer_arn] : []
 
   # VPC 설정 - Aurora 데이터베이스에 접근하기 위해 필요
   vpc_config {
@@ -234,12 +378,92 @@ resource "aws_lambda_function" "genai_function" {
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
 
   environment {
-    variables = {
-      BEDROCK_MODEL_ID = var.bedrock_model_id
-      LOG_LEVEL        = "INFO"
-      DB_CLUSTER_ARN   = data.terraform_remote_state.database.outputs.cluster_arn
-      DB_SECRET_ARN    = data.terraform_remote_state.database.outputs.master_user_secret_name
-    }
+    variables = merge({
+      BEDROCK_MODEL_ID                   = var.bedrock_model_id
+      LOG_LEVEL                          = "INFO"
+      DB_CLUSTER_ARN                     = data.terraform_remote_state.database.outputs.cluster_arn
+      DB_SECRET_ARN                      = data.terraform_remote_state.database.outputs.master_user_secret_name
+      GENAI_PIPELINE_MODE                = var.genai_pipeline_mode
+      INTENT_ROUTER_ENABLED              = tostring(var.intent_router_enabled)
+      INTENT_ROUTER_MIN_CONFIDENCE       = tostring(var.intent_router_min_confidence)
+      ENTITY_INDEX_ENABLED               = tostring(var.entity_index_enabled)
+      ENTITY_INDEX_TTL_SECONDS           = tostring(var.entity_index_ttl_seconds)
+      QUERY_TEMPLATE_MODE                = var.query_template_mode
+      SPECULATIVE_ADVICE_ENABLED         = tostring(var.speculative_advice_enabled)
+      SPECULATIVE_MAX_WORKERS            = tostring(var.speculative_max_workers)
+      SPECULATIVE_MAX_DISCARDED          = tostring(var.speculative_max_discarded)
+      RDS_RECORDS_FORMAT                 = var.rds_records_format
+      RESULT_PAGE_SIZE                   = tostring(var.result_page_size)
+      RESULT_MAX_ROWS                    = tostring(var.result_max_rows)
+      RESULT_MAX_BYTES                   = tostring(var.result_max_bytes)
+      BATCH_MAX_WORKERS                  = tostring(var.batch_max_workers)
+      BATCH_MAX_QUESTIONS                = tostring(var.batch_max_questions)
+      ANSWER_CACHE_ENABLED               = tostring(var.answer_cache_enabled)
+      ANSWER_CACHE_TTL_SECONDS           = tostring(var.answer_cache_ttl_seconds)
+      ANSWER_CACHE_MAX_ENTRIES           = tostring(var.answer_cache_max_entries)
+      ANSWER_CACHE_STORE                 = var.answer_cache_store
+      ANSWER_CACHE_DATA_VERSION          = var.answer_cache_data_version
+      ANSWER_CACHE_VERSION_TTL_SECONDS   = tostring(var.answer_cache_version_ttl_seconds)
+      METRICS_ENABLED                    = tostring(var.metrics_enabled)
+      METRICS_NAMESPACE                  = var.metrics_namespace
+      LOG_FORMAT                         = var.log_format
+      LOG_SAMPLE_RATE                    = tostring(var.log_sample_rate)
+      LOG_DEBUG_BUFFER_SIZE              = tostring(var.log_debug_buffer_size)
+      LOG_MAX_MESSAGE_CHARS              = tostring(var.log_max_message_chars)
+      CLIENT_EAGER_INIT                  = tostring(var.client_eager_init)
+      CLIENT_MAX_POOL_CONNECTIONS        = tostring(var.client_max_pool_connections)
+      CLIENT_CONNECT_TIMEOUT             = tostring(var.client_connect_timeout)
+      BEDROCK_READ_TIMEOUT               = tostring(var.bedrock_read_timeout)
+      RDS_DATA_READ_TIMEOUT              = tostring(var.rds_data_read_timeout)
+      CLIENT_RETRY_MAX_ATTEMPTS          = tostring(var.client_retry_max_attempts)
+      CLIENT_RETRY_MODE                  = var.client_retry_mode
+      INIT_BUDGET_MS                     = tostring(var.init_budget_ms)
+      PROMPT_CACHE_ENABLED               = tostring(var.prompt_cache_enabled)
+      SQL_EXAMPLE_MODE                   = var.sql_example_mode
+      SQL_EXAMPLE_TOP_K                  = tostring(var.sql_example_top_k)
+      SQL_EXAMPLE_TOKEN_BUDGET           = tostring(var.sql_example_token_budget)
+      SQL_GUARD_ENABLED                  = tostring(var.sql_guard_enabled)
+      SQL_GUARD_MAX_LIMIT                = tostring(var.sql_guard_max_limit)
+      SQL_GUARD_LIKE_MODE                = var.sql_guard_like_mode
+      SQL_GUARD_EXPLAIN_MAX_ROWS         = tostring(var.sql_guard_explain_max_rows)
+      SQL_GUARD_SCAN_MAX_ROWS            = tostring(var.sql_guard_scan_max_rows)
+      SQL_WORKLOAD_ENABLED               = tostring(var.sql_workload_enabled)
+      SQL_WORKLOAD_MAX_FINGERPRINTS      = tostring(var.sql_workload_max_fingerprints)
+      SQL_WORKLOAD_LOG_INTERVAL          = tostring(var.sql_workload_log_interval)
+      SQL_GUARD_EXTRA_INDEXED_COLUMNS    = var.sql_guard_extra_indexed_columns
+      LOCAL_REPLICA_ENABLED              = tostring(var.local_replica_enabled)
+      LOCAL_REPLICA_REFRESH_INTERVAL     = tostring(var.local_replica_refresh_interval)
+      LOCAL_REPLICA_FULL_RELOAD_INTERVAL = tostring(var.local_replica_full_reload_interval)
+      LOCAL_REPLICA_MAX_STALENESS        = tostring(var.local_replica_max_staleness)
+      LOCAL_REPLICA_PAGE_SIZE            = tostring(var.local_replica_page_size)
+      LOCAL_REPLICA_MAX_ROWS             = tostring(var.local_replica_max_rows)
+      ANSWER_RENDERER_ENABLED            = tostring(var.answer_renderer_enabled)
+      ANSWER_RENDERER_MAX_ROWS           = tostring(var.answer_renderer_max_rows)
+      ANSWER_RENDERER_MAX_COLUMNS        = tostring(var.answer_renderer_max_columns)
+      SINGLE_FLIGHT_ENABLED              = tostring(var.single_flight_enabled)
+      SINGLE_FLIGHT_TIMEOUT              = tostring(var.single_flight_timeout)
+      BEDROCK_LIMITER_ENABLED            = tostring(var.bedrock_limiter_enabled)
+      BEDROCK_LIMITER_INITIAL_LIMIT      = tostring(var.bedrock_limiter_initial_limit)
+      BEDROCK_LIMITER_MAX_LIMIT          = tostring(var.bedrock_limiter_max_limit)
+      BEDROCK_LIMITER_DEADLINE_SECONDS   = tostring(var.bedrock_limiter_deadline_seconds)
+      BEDROCK_LIMITER_MAX_RETRIES        = tostring(var.bedrock_limiter_max_retries)
+      STAGE_DEADLINES_ENABLED            = tostring(var.stage_deadlines_enabled)
+      DEADLINE_RESERVE_MS                = tostring(var.deadline_reserve_ms)
+      HEDGE_ENABLED                      = tostring(var.hedge_enabled)
+      HEDGE_PERCENTILE                   = tostring(var.hedge_percentile)
+      HEDGE_MIN_DELAY_MS                 = tostring(var.hedge_min_delay_ms)
+      HEDGE_DEFAULT_DELAY_MS             = tostring(var.hedge_default_delay_ms)
+      HEDGE_MODEL_ID                     = var.hedge_model_id
+      HEDGE_REGION                       = var.hedge_region
+      BEDROCK_CLASSIFY_MODEL_ID          = var.bedrock_classify_model_id
+      BEDROCK_SQL_MODEL_ID               = var.bedrock_sql_model_id
+      BEDROCK_PLAN_MODEL_ID              = var.bedrock_plan_model_id
+      BEDROCK_ANSWER_MODEL_ID            = var.bedrock_answer_model_id
+      MODEL_FALLBACK_ID                  = var.model_fallback_id
+      MODEL_FALLBACK_P95_MS              = var.model_fallback_p95_ms
+      MODEL_FALLBACK_COOLDOWN_SECONDS    = tostring(var.model_fallback_cooldown_seconds)
+      CLIENT_CALL_BUDGET_SECONDS         = tostring(var.client_call_budget_seconds)
+    }, local.streaming_environment)
   }
 
   depends_on = [
@@ -255,3 +479,11 @@ resource "aws_lambda_function" "genai_function" {
     Service = "lambda-genai"
   })
 }
+
+# 응답 스트리밍 함수 URL (스트리밍 요청의 SSE 이벤트를 생성되는 대로 전달)
+resource "aws_lambda_function_url" "genai_stream" {
+  count              = var.response_streaming_enabled ? 1 : 0
+  function_name      = aws_lambda_function.genai_function.function_name
+  authorization_type = var.function_url_auth_type
+  invoke_mode        = "RESPONSE_STREAM"
+}
@@ -0,0 +1,191 @@
+"""
+GenAI Lambda 단계별 지표 수집
+span(컨텍스트 매니저) / timed(데코레이터)로 단계 소요 시간, add 로 토큰 수 / 행 수 / 캐시 결과를 모아
+호출마다 CloudWatch Embedded Metric Format(EMF) JSON 한 줄로 출력 (추적 에이전트 없이 대시보드/알람 구성)
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+UNIT_MILLISECONDS = 'Milliseconds'
+UNIT_COUNT = 'Count'
+
+# EMF 지표 정의 하나에 넣을 수 있는 최대 지표 수
+_MAX_METRICS_PER_DIRECTIVE = 100
+
+logger = logging.getLogger()
+
+
+class Invocation:
+    """호출 하나에서 모은 지표 / 차원 / 속성"""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.metrics: Dict[str, float] = {}
+        self.units: Dict[str, str] = {}
+        self.dimensions: Dict[str, str] = {}
+        self.properties: Dict[str, Any] = {}
+
+    def add(self, name: str, value: float, unit: str) -> None:
+        self.metrics[name] = self.metrics.get(name, 0) + value
+        self.units[name] = unit
+
+
+class MetricsRecorder:
+    """단계별 지표 수집기 (현재 호출은 contextvars 로 보관해서 서버 모드의 동시 요청끼리 섞이지 않음)
+
+    추측 실행 / 배치 스레드는 contextvars.copy_context() 로 작업을 제출하므로 그 스레드에서 기록한 지표도 현재 호출에 합산
+    """
+
+    def __init__(self, namespace: str = 'PetClinic/GenAI', service: str = 'genai-lambda', enabled: bool = False,
+                 emit: Optional[Callable[[str], None]] = None):
+        self.namespace = namespace
+        self.service = service
+        self.enabled = enabled
+        self.emit = emit or (lambda line: (sys.stdout.write(line + '\n'), sys.stdout.flush()))
+        self._current_var: contextvars.ContextVar = contextvars.ContextVar(f'metrics_{id(self)}', default=None)
+        self._lock = threading.Lock()
+        self._stats = {'invocations': 0, 'emitted': 0, 'emit_errors': 0}
+
+    @property
+    def _current(self) -> Optional[Invocation]:
+        return self._current_var.get()
+
+    def start(self, request_id: str) -> Invocation:
+        invocation = Invocation(request_id)
+        invocation.dimensions = {'Service': self.service, 'Route': 'other'}
+        self._current_var.set(invocation)
+        return invocation
+
+    def finish(self, invocation: Invocation) -> Optional[Dict[str, Any]]:
+        """호출 종료 - 전체 소요 시간을 더하고 EMF 한 줄 출력"""
+        if self._current is invocation:
+            self._current_var.set(None)
+        invocation.add('total_ms', (time.perf_counter() - invocation.started) * 1000, UNIT_MILLISECONDS)
+        with self._lock:
+            self._stats['invocations'] += 1
+        if not self.enabled:
+            return None
+        document = self.to_emf(invocation)
+        try:
+            self.emit(json.dumps(document, ensure_ascii=False, default=str))
+            self._stats['emitted'] += 1
+        except Exception as e:
+            # 지표 출력 실패가 응답에 영향을 주지 않도록 함
+            logger.warning("지표 출력 실패: %s", e)
+            self._stats['emit_errors'] += 1
+        return document
+
+    def instrument_handler(self, handler: Callable) -> Callable:
+        """lambda_handler 데코레이터 - 호출 시작/종료와 statusCode 기록"""
+        @functools.wraps(handler)
+        def _wrapped(event, context):
+            invocation = self.start(getattr(context, 'aws_request_id', 'unknown'))
+            deferred = False
+            try:
+                response = handler(event, context)
+                if isinstance(response, dict):
+                    invocation.properties['statusCode'] = response.get('statusCode')
+                    if isinstance(response.get('body'), Iterator):
+                        # 본문을 나눠 보내는 응답은 본문을 다 보낸 뒤 호출 종료
+                        response['body'] = self._finish_after(response['body'], invocation)
+                        deferred = True
+                return response
+            finally:
+                if not deferred:
+                    self.finish(invocation)
+        return _wrapped
+
+    def _finish_after(self, body: Iterator, invocation: Invocation) -> Iterator:
+        try:
+            yield from body
+        finally:
+            self.finish(invocation)
+
+    def add(self, name: str, value: float = 1, unit: str = UNIT_COUNT) -> None:
+        """현재 호출 지표에 값 더하기 (호출 밖이면 무시)"""
+        invocation = self._current
+        if invocation is None:
+            return
+        with self._lock:
+            invocation.add(name, value, unit)
+
+    def maximum(self, name: str, value: float, unit: str = UNIT_COUNT) -> None:
+        """현재 호출 지표를 더 큰 값으로 갱신 (합이 아니라 호출 안 최대값이 의미 있는 지표)"""
+        invocation = self._current
+        if invocation is None:
+            return
+        with self._lock:
+            invocation.metrics[name] = max(invocation.metrics.get(name, value), value)
+            invocation.units[name] = unit
+
+    def set_dimension(self, name: str, value: str) -> None:
+        invocation = self._current
+        if invocation is not None:
+            invocation.dimensions[name] = str(value)
+
+    def set_property(self, name: str, value: Any) -> None:
+        """지표가 아닌 검색용 속성 (CloudWatch Logs Insights 에서 조회)"""
+        invocation = self._current
+        if invocation is not None:
+            invocation.properties[name] = value
+
+    @contextmanager
+    def span(self, name: str):
+        """with metrics.span('execute_sql'): ... → {name}_ms 에 소요 시간 합산, {name}_calls 증가"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(f'{name}_ms', (time.perf_counter() - started) * 1000, UNIT_MILLISECONDS)
+            self.add(f'{name}_calls', 1)
+
+    def timed(self, name: str) -> Callable:
+        """함수 데코레이터 버전 span (제너레이터 함수는 끝까지 소비한 시간 기록)"""
+        def _decorator(fn):
+            if inspect.isgeneratorfunction(fn):
+                @functools.wraps(fn)
+                def _generator(*args, **kwargs):
+                    with self.span(name):
+                        yield from fn(*args, **kwargs)
+                return _generator
+
+            @functools.wraps(fn)
+            def _wrapped(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return _wrapped
+        return _decorator
+
+    def to_emf(self, invocation: Invocation) -> Dict[str, Any]:
+        """EMF 문서 구성 (차원 세트: [Service], [Service, Route])"""
+        names = sorted(invocation.metrics)
+        directives: List[Dict[str, Any]] = []
+        for offset in range(0, len(names), _MAX_METRICS_PER_DIRECTIVE):
+            directives.append({
+                'Namespace': self.namespace,
+                'Dimensions': [['Service'], ['Service', 'Route']],
+                'Metrics': [{'Name': name, 'Unit': invocation.units[name]}
+                            for name in names[offset:offset + _MAX_METRICS_PER_DIRECTIVE]]
+            })
+        document: Dict[str, Any] = {
+            '_aws': {'Timestamp': int(time.time() * 1000), 'CloudWatchMetrics': directives},
+            'requestId': invocation.request_id,
+        }
+        document.update(invocation.properties)
+        document.update(invocation.dimensions)
+        document.update({name: round(value, 3) for name, value in invocation.metrics.items()})
+        return document
+
+    def get_stats(self) -> Dict[str, Any]:
+        """지표 출력 설정 / 통계"""
+        return dict(self._stats, enabled=self.enabled, namespace=self.namespace)
@@ -23,4 +23,9 @@ output "lambda_execution_role_arn" {
 output "lambda_security_group_id" {
   description = "Lambda 함수 보안 그룹 ID"
   value       = aws_security_group.lambda_sg.id
-}
\ No newline at end of file
+}
+
+output "genai_stream_url" {
+  description = "응답 스트리밍 함수 URL (response_streaming_enabled = true 일 때)"
+  value       = var.response_streaming_enabled ? aws_lambda_function_url.genai_stream[0].function_url : null
+}
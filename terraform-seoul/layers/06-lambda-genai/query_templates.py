@@ -0,0 +1,265 @@
+"""
+GenAI Lambda 파라미터화된 SQL 템플릿 레지스트리
+자주 나오는 질문 형태(주인 조회, 반려동물 이름, 최근 방문 등)를 이름 있는 SQL 템플릿으로 등록하고
+로컬 패턴 매칭 또는 모델이 고른 템플릿 이름 + 슬롯 값으로 RDS Data API parameters 를 구성
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from entity_index import KOREAN_SUFFIXES, strip_korean_suffix
+
+logger = logging.getLogger()
+
+# 한국어/영어 표현 → 데이터베이스 값
+PET_TYPE_VALUES = {
+    '고양이': 'cat', '강아지': 'dog', '개': 'dog', '새': 'bird', '도마뱀': 'lizard',
+    '뱀': 'snake', '햄스터': 'hamster', 'cat': 'cat', 'dog': 'dog', 'bird': 'bird',
+    'lizard': 'lizard', 'snake': 'snake', 'hamster': 'hamster', 'cats': 'cat', 'dogs': 'dog',
+    'birds': 'bird', 'lizards': 'lizard', 'snakes': 'snake', 'hamsters': 'hamster'
+}
+SPECIALTY_VALUES = {
+    '외과': 'surgery', '방사선': 'radiology', '치과': 'dentistry',
+    'surgery': 'surgery', 'radiology': 'radiology', 'dentistry': 'dentistry'
+}
+
+# 이름 슬롯에 올 수 없는 일반 명사 (종류 / 반려동물을 가리키는 말) - 조사가 붙은 형태도 거부
+NON_NAME_WORDS = frozenset(PET_TYPE_VALUES) | {'반려동물', '애완동물', '동물', '펫', 'pet', 'pets'}
+
+# 이름 슬롯에 올 수 없는 대명사 / 의문사 - 그대로 일치할 때만 거부 ('제이', '이레' 같은 이름은 허용)
+PRONOUN_WORDS = frozenset({
+    '그', '그녀', '그분', '그들', '걔', '얘', '쟤', '제', '저', '저희', '내', '나', '너', '네', '당신', '우리', '본인', '자기',
+    '누구', '누가', '어느', '어떤', '무슨', '이', '이것', '그것', '저것', '이분', '저분',
+    'he', 'she', 'his', 'her', 'they', 'their', 'my', 'your', 'our', 'who', 'whose', 'which', 'what', 'it', 'its',
+    'this', 'that',
+})
+
+# 질문이 여러 문장 / 절이면 템플릿 하나로 답할 수 없음 (앞부분만 매칭하고 나머지를 버리지 않도록 SQL 생성으로 넘김)
+_MULTI_CLAUSE_PATTERN = re.compile(r'[?？!.;]\s*\S|[,，]|\b(?:그리고|또한|또|and|also)\b', re.IGNORECASE)
+
+
+def name_pattern(value: str) -> str:
+    """이름 슬롯 값 → LIKE 패턴 (조사 제거, 종류 / 일반 명사 / 대명사면 ValueError)"""
+    value = value.strip()
+    # 조사를 자르기 전에 확인 ('고양이를' 을 '고양' 으로 자르지 않음)
+    lowered = value.lower()
+    if lowered in PRONOUN_WORDS:
+        raise ValueError(f"이름이 아닌 대명사 / 의문사: {value}")
+    if any(lowered == word or (lowered.startswith(word) and lowered[len(word):] in KOREAN_SUFFIXES)
+           for word in NON_NAME_WORDS):
+        raise ValueError(f"이름이 아닌 단어: {value}")
+    return f"%{strip_korean_suffix(value)}%"
+
+
+# 슬롯 종류별 값 변환 (LIKE 부분 일치 패턴 또는 코드 값)
+SLOT_CONVERTERS = {
+    'name': name_pattern,
+    'pet_type': lambda value: f"%{PET_TYPE_VALUES.get(value.strip().lower(), value.strip())}%",
+    'specialty': lambda value: f"%{SPECIALTY_VALUES.get(value.strip().lower(), value.strip())}%",
+}
+
+
+class QueryTemplate:
+    """이름 있는 파라미터화 SQL 템플릿"""
+
+    __slots__ = ('name', 'description', 'sql', 'slots', 'patterns')
+
+    def __init__(self, name: str, description: str, sql: str, slots: Dict[str, str], patterns: List[str]):
+        self.name = name
+        self.description = description
+        self.sql = sql
+        self.slots = slots
+        self.patterns = [re.compile(p, re.IGNORECASE) for p in patterns]
+
+    def render(self, slot_values: Dict[str, Any]) -> Dict[str, Any]:
+        """슬롯 값으로 Data API 파라미터를 구성 (SQL 텍스트는 그대로 유지)"""
+        missing = [slot for slot in self.slots if not slot_values.get(slot)]
+        if missing:
+            raise ValueError(f"템플릿 {self.name} 슬롯 누락: {', '.join(missing)}")
+
+        parameters = []
+        for slot, kind in self.slots.items():
+            value = SLOT_CONVERTERS[kind](str(slot_values[slot]))
+            parameters.append({'name': slot, 'value': {'stringValue': value}})
+
+        return {
+            'database': 'petclinic',
+            'sql': self.sql,
+            'parameters': parameters,
+            'description': self.description,
+            'template': self.name,
+            'slots': {slot: str(slot_values[slot]) for slot in self.slots}
+        }
+
+
+class QueryTemplateRegistry:
+    """템플릿 등록/조회/로컬 매칭"""
+
+    def __init__(self, templates: Optional[List[QueryTemplate]] = None):
+        self.templates: Dict[str, QueryTemplate] = {}
+        self._lock = threading.Lock()
+        self._stats = {'local_matches': 0, 'local_misses': 0, 'model_selections': 0,
+                       'render_failures': 0, 'multi_clause': 0, 'by_template': {}}
+        for template in templates or []:
+            self.register(template)
+
+    def register(self, template: QueryTemplate) -> None:
+        self.templates[template.name] = template
+
+    def _count(self, key: str, template_name: Optional[str] = None) -> None:
+        with self._lock:
+            self._stats[key] += 1
+            if template_name:
+                self._stats['by_template'][template_name] = self._stats['by_template'].get(template_name, 0) + 1
+
+    def match(self, question: str) -> Optional[Dict[str, Any]]:
+        """등록 순서대로 패턴을 확인해서 처음 일치한 템플릿으로 SQL 정보 생성 (여러 문장 / 절 질문은 None)"""
+        text = question.strip()
+        if _MULTI_CLAUSE_PATTERN.search(text):
+            self._count('multi_clause')
+            self._count('local_misses')
+            return None
+        for template in self.templates.values():
+            for pattern in template.patterns:
+                matched = pattern.search(text)
+                if not matched:
+                    continue
+                try:
+                    sql_info = template.render(matched.groupdict())
+                except (ValueError, KeyError):
+                    continue
+                self._count('local_matches', template.name)
+                logger.info("SQL 템플릿 로컬 매칭: %s %s", template.name, sql_info['slots'])
+                return sql_info
+        self._count('local_misses')
+        return None
+
+    def render(self, name: str, slot_values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """모델이 선택한 템플릿 이름 + 슬롯 값으로 SQL 정보 생성 (실패 시 None)"""
+        template = self.templates.get(name)
+        if template is None:
+            logger.warning("알 수 없는 SQL 템플릿: %s", name)
+            self._count('render_failures')
+            return None
+        try:
+            sql_info = template.render(slot_values or {})
+        except (ValueError, KeyError) as e:
+            logger.warning("SQL 템플릿 렌더링 실패: %s", e)
+            self._count('render_failures')
+            return None
+        self._count('model_selections', name)
+        return sql_info
+
+    def catalog_text(self) -> str:
+        """SQL 생성 프롬프트에 넣을 템플릿 목록"""
+        lines = []
+        for template in self.templates.values():
+            slots = ', '.join(template.slots) if template.slots else ''
+            lines.append(f"- {template.name}({slots}): {template.description}")
+        return '\n'.join(lines)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, by_template=dict(self._stats['by_template']))
+
+
+# 이름 슬롯에 들어갈 토큰 (공백 없는 한 단어)
+_NAME = r'[A-Za-z가-힣]+?'
+
+# 종류 슬롯에 들어갈 표현 (PET_TYPE_VALUES 키)
+_PET_TYPE = r'고양이|강아지|개|새|도마뱀|뱀|햄스터|cats?|dogs?|birds?|lizards?|snakes?|hamsters?'
+
+# 등록 순서대로 매칭 (종류 이름이 반려동물 이름으로 잡히지 않도록 owners_by_pet_type 을 먼저 확인)
+# 이름 슬롯에 종류 / 일반 명사가 잡히면 name_pattern 이 거부해서 다음 템플릿으로 넘어감
+DEFAULT_TEMPLATES = [
+    QueryTemplate(
+        'owners_by_pet_type', '특정 종류의 반려동물을 키우는 주인 조회',
+        "SELECT DISTINCT o.first_name, o.last_name FROM owners o JOIN pets p ON o.id = p.owner_id "
+        "JOIN types t ON p.type_id = t.id WHERE t.name LIKE :type_name LIMIT 20",
+        {'type_name': 'pet_type'},
+        [
+            rf'^(?P<type_name>{_PET_TYPE})[를을]?\s*키우(?:고\s*있는|는)\s*(?:사람|주인|고객|owner)',
+            rf'^(?P<type_name>{_PET_TYPE})의?\s*(?:주인|보호자|owner)[은는이가]?\s*(?:누구|누가)',
+        ]
+    ),
+    QueryTemplate(
+        'owner_has_pet', '특정 주인이 특정 반려동물을 키우는지 확인',
+        "SELECT COUNT(*) as count FROM owners o JOIN pets p ON o.id = p.owner_id "
+        "WHERE o.first_name LIKE :owner_name AND p.name LIKE :pet_name",
+        {'owner_name': 'name', 'pet_name': 'name'},
+        [rf'^(?P<owner_name>{_NAME})(?:이가|가)?\s+(?P<pet_name>{_NAME})(?:이라는|라는)\s*(?:pet|펫|반려동물)[을를]?\s*키우고\s*있']
+    ),
+    QueryTemplate(
+        'owner_of_pet', '특정 반려동물의 주인 조회',
+        "SELECT o.first_name, o.last_name FROM owners o JOIN pets p ON o.id = p.owner_id "
+        "WHERE p.name LIKE :pet_name LIMIT 20",
+        {'pet_name': 'name'},
+        [
+            rf'^(?P<pet_name>{_NAME})(?:이를|를|을)?\s*키우(?:고\s*있는|는)\s*(?:주인|사람|owner)[은는이가]?\s*(?:누구|누가)',
+            rf'^(?P<pet_name>{_NAME})(?:이라는|라는)\s*(?:반려동물|pet|펫)[을를]?\s*키우는\s*(?:사람|주인|owner)',
+            rf'^(?P<pet_name>{_NAME})의?\s*(?:주인|owner|보호자)[은는이가]?\s*(?:누구|누가)',
+            r'^who\s+owns\s+(?P<pet_name>[A-Za-z]+)',
+        ]
+    ),
+    QueryTemplate(
+        'pets_of_owner_full_name', '특정 주인(이름 + 성)의 반려동물 이름 조회',
+        "SELECT p.name as pet_name FROM pets p JOIN owners o ON p.owner_id = o.id "
+        "WHERE o.first_name LIKE :first_name AND o.last_name LIKE :last_name LIMIT 20",
+        {'first_name': 'name', 'last_name': 'name'},
+        [r'^(?P<first_name>[A-Za-z]+)\s+(?P<last_name>[A-Za-z]+)의?\s*(?:pet|펫|반려동물)\s*(?:name|이름)']
+    ),
+    QueryTemplate(
+        'pets_of_owner', '특정 주인의 반려동물 이름 조회',
+        "SELECT p.name as pet_name FROM pets p JOIN owners o ON p.owner_id = o.id "
+        "WHERE o.first_name LIKE :first_name LIMIT 20",
+        {'first_name': 'name'},
+        [rf'^(?P<first_name>{_NAME})의?\s*(?:pet|펫|반려동물)\s*(?:name|이름)']
+    ),
+    QueryTemplate(
+        'owner_address', '특정 주인의 주소/연락처 조회',
+        "SELECT o.address, o.city, o.telephone FROM owners o "
+        "WHERE o.first_name LIKE :first_name LIMIT 20",
+        {'first_name': 'name'},
+        [rf'^(?P<first_name>{_NAME})의?\s*(?:주소|연락처|전화번호|address|telephone)']
+    ),
+    QueryTemplate(
+        'latest_visit_of_pet', '특정 반려동물의 가장 최근 방문 조회',
+        "SELECT v.visit_date, v.description FROM visits v JOIN pets p ON v.pet_id = p.id "
+        "WHERE p.name LIKE :pet_name ORDER BY v.visit_date DESC LIMIT 1",
+        {'pet_name': 'name'},
+        [rf'^(?P<pet_name>{_NAME})(?:의|는|은|가|이)?\s*가장\s*최근.*(?:검진|진료|방문)']
+    ),
+    QueryTemplate(
+        'visits_of_pet', '특정 반려동물의 방문(검진) 기록 조회',
+        "SELECT v.visit_date, v.description FROM visits v JOIN pets p ON v.pet_id = p.id "
+        "WHERE p.name LIKE :pet_name ORDER BY v.visit_date DESC LIMIT 20",
+        {'pet_name': 'name'},
+        [rf'^(?P<pet_name>{_NAME})의?\s*(?:검진|진료|방문)\s*(?:기록|이력|내역)']
+    ),
+    QueryTemplate(
+        'owners_without_pets', '반려동물이 없는 주인 조회',
+        "SELECT o.first_name, o.last_name FROM owners o LEFT JOIN pets p ON o.id = p.owner_id "
+        "WHERE p.id IS NULL LIMIT 20",
+        {},
+        [r'^(?:pet|펫|반려동물)[이가]?\s*없는\s*(?:owner|주인|고객)']
+    ),
+    QueryTemplate(
+        'vets_by_specialty', '특정 전문 분야 수의사 조회',
+        "SELECT DISTINCT v.first_name, v.last_name FROM vets v JOIN vet_specialties vs ON v.id = vs.vet_id "
+        "JOIN specialties s ON vs.specialty_id = s.id WHERE s.name LIKE :specialty LIMIT 20",
+        {'specialty': 'specialty'},
+        [r'^(?P<specialty>외과|방사선|치과|surgery|radiology|dentistry)\s*(?:전문)?\s*(?:수의사|vets?)']
+    ),
+    QueryTemplate(
+        'owner_exists', '특정 고객(이름 + 성) 존재 여부 확인',
+        "SELECT COUNT(*) as count FROM owners o WHERE o.first_name LIKE :first_name AND o.last_name LIKE :last_name",
+        {'first_name': 'name', 'last_name': 'name'},
+        [r'^(?P<first_name>[A-Za-z]+)\s+(?P<last_name>[A-Za-z]+?)(?:이라는|라는)\s*(?:고객|사람|owner)[이가]?\s*있']
+    ),
+]
+
+
+def create_default_registry() -> QueryTemplateRegistry:
+    return QueryTemplateRegistry(DEFAULT_TEMPLATES)
@@ -0,0 +1,4 @@
+#!/bin/sh
+# Lambda Web Adapter 진입점 (response_streaming_enabled = true)
+# 어댑터가 함수 URL 요청을 async_server 로 전달하고 응답 본문을 받는 대로 스트리밍
+exec python3 async_server.py --host 127.0.0.1 --port "${AWS_LWA_PORT:-8080}"
@@ -0,0 +1,36 @@
+"""
+GenAI Lambda petclinic 테이블별 데이터 버전
+테이블마다 행 수 + 행 내용 CRC32 의 BIT_XOR(CHECKSUM TABLE 과 같은 방식)을 SELECT 한 번으로 계산
+INSERT / UPDATE / DELETE 가 바로 버전에 반영됨 (information_schema.tables.update_time 은 Aurora MySQL 3 에서
+information_schema_stats_expiry 기본값 86400초 동안 캐시되어 쓰기 후에도 바뀌지 않음)
+테이블 전체를 읽으므로 petclinic 처럼 작은 스키마용 - 호출 측에서 TTL / 갱신 주기로 조회 빈도를 제한
+같은 SQL 을 SQLite 복제본에서 실행하면 원본과 같은 값이 나오므로 복제본이 원본과 일치하는지 확인하는 데도 사용
+"""
+
+import hashlib
+import json
+from typing import Dict, Iterable, Sequence, Tuple
+
+
+def build_table_version_sql(schema: Dict[str, Sequence[Tuple[str, str]]]) -> str:
+    """{테이블: ((컬럼, 타입), ...)} → (table_name, row_count, checksum) 행을 반환하는 SELECT
+
+    값은 문자열로 바꿔서 연결 (MySQL 과 SQLite 복제본에서 같은 값), BIT_XOR 로 행 순서와 무관한 값 계산
+    """
+    parts = []
+    for table, columns in schema.items():
+        row = ', '.join(f"IFNULL(CAST({name} AS CHAR), 'NULL')" for name, _ in columns)
+        parts.append(f"SELECT '{table}' AS table_name, COUNT(*) AS row_count, "
+                     f"COALESCE(BIT_XOR(CRC32(CONCAT_WS('#', {row}))), 0) AS checksum FROM {table}")
+    return ' UNION ALL '.join(parts)
+
+
+def parse_table_versions(rows: Iterable[Sequence]) -> Dict[str, str]:
+    """(table_name, row_count, checksum) 행 → {테이블: '행 수:checksum'}"""
+    return {str(row[0]): f"{int(row[1])}:{int(row[2])}" for row in rows}
+
+
+def digest_versions(versions: Dict[str, str]) -> str:
+    """테이블별 버전 → 스키마 전체 버전 (16자리 hex)"""
+    payload = json.dumps(sorted(versions.items())).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()[:16]
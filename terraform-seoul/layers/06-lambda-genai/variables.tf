@@ -51,6 +51,548 @@ variable "bedrock_model_id" {
   default     = "anthropic.claude-3-haiku-20240307-v1:0"
 }
 
+# GenAI 파이프라인 설정
+variable "genai_pipeline_mode" {
+  description = "GenAI 파이프라인 모드 (classic: 질문 분류와 SQL 생성을 개별 호출, planner: 한 번의 Bedrock 호출로 처리)"
+  type        = string
+  default     = "classic"
+
+  validation {
+    condition     = contains(["classic", "planner"], var.genai_pipeline_mode)
+    error_message = "genai_pipeline_mode는 classic 또는 planner 중 하나여야 합니다."
+  }
+}
+
+# 로컬 의도 분류기 설정
+variable "intent_router_enabled" {
+  description = "Bedrock 분류 호출 전에 로컬 키워드/패턴 의도 분류기를 실행할지 여부"
+  type        = bool
+  default     = true
+}
+
+variable "intent_router_min_confidence" {
+  description = "로컬 의도 분류 결과를 그대로 사용할 최소 신뢰도 (미만이면 Bedrock 분류로 대체)"
+  type        = number
+  default     = 0.75
+
+  validation {
+    condition     = var.intent_router_min_confidence > 0 && var.intent_router_min_confidence <= 1
+    error_message = "intent_router_min_confidence는 0보다 크고 1 이하여야 합니다."
+  }
+}
+
+# 엔티티 인덱스 설정
+variable "entity_index_enabled" {
+  description = "owners/pets/vets/types/specialties 이름을 메모리에 적재해서 LIKE 조건을 id IN 조건으로 변환할지 여부"
+  type        = bool
+  default     = false
+}
+
+variable "entity_index_ttl_seconds" {
+  description = "엔티티 인덱스 갱신 주기 (초, 만료 후 첫 요청에서 백그라운드 갱신)"
+  type        = number
+  default     = 300
+}
+
+# SQL 템플릿 설정
+variable "query_template_mode" {
+  description = "SQL 템플릿 사용 방식 (off: 사용 안 함, local: 로컬 패턴 매칭 후 실패 시 AI SQL 생성, llm: local + AI가 템플릿 이름/슬롯만 선택하도록 프롬프트 확장)"
+  type        = string
+  default     = "local"
+
+  validation {
+    condition     = contains(["off", "local", "llm"], var.query_template_mode)
+    error_message = "query_template_mode는 off, local, llm 중 하나여야 합니다."
+  }
+}
+
+# 추측 실행 설정
+variable "speculative_advice_enabled" {
+  description = "로컬 분류로 결정되지 않은 질문에서 Bedrock 분류와 일반 상담 답변 생성을 동시에 시작할지 여부 (데이터베이스 질문이면 추측 답변은 폐기)"
+  type        = bool
+  default     = false
+}
+
+variable "speculative_max_workers" {
+  description = "추측 실행 스레드 풀 크기"
+  type        = number
+  default     = 4
+}
+
+variable "speculative_max_discarded" {
+  description = "폐기했지만 아직 실행 중인 추측 답변 호출 상한 (넘으면 새 요청은 추측 없이 분류만 실행)"
+  type        = number
+  default     = 2
+}
+
+# RDS Data API 결과 형식 설정
+variable "rds_records_format" {
+  description = "RDS Data API 결과 형식 (typed: 값별 타입 필드 records, json: formatRecordsAs=JSON 문자열)"
+  type        = string
+  default     = "typed"
+
+  validation {
+    condition     = contains(["typed", "json"], var.rds_records_format)
+    error_message = "rds_records_format은 typed 또는 json이어야 합니다."
+  }
+}
+
+# 조회 결과 예산 설정
+variable "result_page_size" {
+  description = "SQL 결과 페이지 크기 (LIMIT/OFFSET 단위, Data API 응답 크기 제한 초과 시 자동으로 줄임)"
+  type        = number
+  default     = 100
+}
+
+variable "result_max_rows" {
+  description = "질문 하나에서 조회할 최대 행 수 (0이면 제한 없음)"
+  type        = number
+  default     = 200
+}
+
+variable "result_max_bytes" {
+  description = "질문 하나에서 조회할 최대 결과 크기 (바이트, 값 문자열 길이 기준, 0이면 제한 없음)"
+  type        = number
+  default     = 262144
+}
+
+# 배치 질문 설정
+variable "batch_max_workers" {
+  description = "배치 질문 처리 스레드 풀 크기 (단계별 동시 실행 수)"
+  type        = number
+  default     = 4
+}
+
+variable "batch_max_questions" {
+  description = "배치 요청 하나에 넣을 수 있는 최대 질문 수"
+  type        = number
+  default     = 20
+}
+
+# 답변 캐시 설정
+variable "answer_cache_enabled" {
+  description = "정규화한 질문 + 모델 ID + 데이터 버전 기준 답변 캐시 사용 여부"
+  type        = bool
+  default     = false
+}
+
+variable "answer_cache_ttl_seconds" {
+  description = "답변 캐시 항목 유지 시간 (초)"
+  type        = number
+  default     = 300
+}
+
+variable "answer_cache_max_entries" {
+  description = "메모리 답변 캐시 최대 항목 수 (넘으면 오래 사용하지 않은 항목부터 제거)"
+  type        = number
+  default     = 256
+}
+
+variable "answer_cache_store" {
+  description = "답변 캐시 2단 저장소 (sqlite: /tmp SQLite 파일, none: 메모리만, 'module:ClassName': 공유 저장소 구현)"
+  type        = string
+  default     = "sqlite"
+}
+
+variable "answer_cache_data_version" {
+  description = "답변 캐시 데이터 버전 고정값 (비어 있으면 petclinic 테이블 변경 시각으로 계산)"
+  type        = string
+  default     = ""
+}
+
+variable "answer_cache_version_ttl_seconds" {
+  description = "데이터 버전(테이블 변경 시각) 재조회 주기 (초)"
+  type        = number
+  default     = 30
+}
+
+variable "metrics_enabled" {
+  description = "단계별 소요 시간 / 토큰 / 행 수 / 캐시 결과를 호출마다 CloudWatch EMF 로그 한 줄로 출력할지 여부"
+  type        = bool
+  default     = false
+}
+
+variable "metrics_namespace" {
+  description = "EMF 지표 CloudWatch 네임스페이스"
+  type        = string
+  default     = "PetClinic/GenAI"
+}
+
+variable "log_format" {
+  description = "Lambda 로그 형식 (text: 기존 텍스트, json: 한 줄 JSON 구조화 로그)"
+  type        = string
+  default     = "text"
+}
+
+variable "log_sample_rate" {
+  description = "상세(DEBUG) 로그를 모두 출력할 요청 비율 (0~1)"
+  type        = number
+  default     = 0
+}
+
+variable "log_debug_buffer_size" {
+  description = "요청마다 보관했다가 오류가 난 요청에서만 출력할 상세 로그 최대 수 (0이면 사용 안 함, 켜면 모든 요청에서 DEBUG 레코드를 만들어 호출당 CPU 시간이 늘어남)"
+  type        = number
+  default     = 0
+}
+
+variable "log_max_message_chars" {
+  description = "로그 한 건의 최대 길이 (SQL / 결과 / 스택 트레이스 포함, 0이면 제한 없음)"
+  type        = number
+  default     = 2000
+}
+
+variable "client_eager_init" {
+  description = "Bedrock / RDS Data API 클라이언트를 초기화(INIT) 단계에서 미리 생성할지 여부"
+  type        = bool
+  default     = true
+}
+
+variable "client_max_pool_connections" {
+  description = "AWS 클라이언트별 최대 HTTP 연결 수 (배치 / 추측 실행 동시 호출 수보다 크게)"
+  type        = number
+  default     = 16
+}
+
+variable "client_connect_timeout" {
+  description = "AWS 클라이언트 연결 타임아웃 (초)"
+  type        = number
+  default     = 2
+}
+
+variable "bedrock_read_timeout" {
+  description = "Bedrock 응답 읽기 타임아웃 (초, Lambda 타임아웃보다 짧게)"
+  type        = number
+  default     = 50
+}
+
+variable "rds_data_read_timeout" {
+  description = "RDS Data API 응답 읽기 타임아웃 (초)"
+  type        = number
+  default     = 45
+}
+
+variable "client_retry_max_attempts" {
+  description = "AWS 클라이언트 최대 시도 횟수 (첫 시도 포함)"
+  type        = number
+  default     = 3
+}
+
+variable "client_retry_mode" {
+  description = "AWS 클라이언트 재시도 모드 (adaptive: 스로틀링 시 클라이언트 측 속도 제한, standard, legacy)"
+  type        = string
+  default     = "adaptive"
+}
+
+variable "client_call_budget_seconds" {
+  description = "재시도를 포함한 AWS 클라이언트 호출 하나의 최대 시간 (초, Lambda 타임아웃 60초 - 오류 응답 여유), 시도 횟수 x (연결 + 읽기 타임아웃)이 넘지 않도록 시도 횟수를 줄임 (0이면 적용 안 함)"
+  type        = number
+  default     = 55
+}
+
+variable "init_budget_ms" {
+  description = "초기화(INIT) 단계 시간 예산 (ms, 넘으면 경고 로그, 0이면 확인 안 함)"
+  type        = number
+  default     = 1000
+}
+
+variable "prompt_cache_enabled" {
+  description = "프롬프트 캐시를 지원하는 Claude 모델에서 분류 / SQL 생성 프롬프트의 정적 system 블록에 캐시 체크포인트를 붙일지 여부"
+  type        = bool
+  default     = true
+}
+
+variable "sql_example_mode" {
+  description = "SQL 생성 프롬프트 예시 포함 방식 (all: SQL_EXAMPLES 전체, select: 질문과 가까운 예시만 선택)"
+  type        = string
+  default     = "select"
+
+  validation {
+    condition     = contains(["all", "select"], var.sql_example_mode)
+    error_message = "sql_example_mode는 all 또는 select 중 하나여야 합니다."
+  }
+}
+
+variable "sql_example_top_k" {
+  description = "select 모드에서 프롬프트에 넣을 최대 예시 수"
+  type        = number
+  default     = 4
+}
+
+variable "sql_example_token_budget" {
+  description = "select 모드에서 프롬프트에 넣을 예시의 최대 토큰 수 (추정치, 0이면 제한 없음)"
+  type        = number
+  default     = 400
+}
+
+variable "sql_guard_enabled" {
+  description = "생성 SQL 실행 전 검사 / 변환(SELECT 한 문장, 허용 테이블, 조인 조건, LIMIT)을 적용할지 여부"
+  type        = bool
+  default     = true
+}
+
+variable "sql_guard_max_limit" {
+  description = "생성 SQL 최대 LIMIT (없으면 붙이고 크면 줄임, 0이면 적용 안 함)"
+  type        = number
+  default     = 200
+}
+
+variable "sql_guard_like_mode" {
+  description = "앞 와일드카드 LIKE('%값%') 처리 (bounded: 인덱스 없는 컬럼은 LIMIT 과 EXPLAIN 예상 행 수 기준 안에서만 실행, allow: 그대로 두고 건수만 기록, prefix: 인덱스 컬럼이면 '값%'로 변환 - 중간 일치 결과가 달라짐, reject: 거부)"
+  type        = string
+  default     = "bounded"
+
+  validation {
+    condition     = contains(["allow", "bounded", "prefix", "reject"], var.sql_guard_like_mode)
+    error_message = "sql_guard_like_mode는 allow, bounded, prefix, reject 중 하나여야 합니다."
+  }
+}
+
+variable "sql_guard_explain_max_rows" {
+  description = "EXPLAIN 예상 조회 행 수가 이 값을 넘는 생성 SQL 은 실행하지 않음 (0이면 적용 안 함)"
+  type        = number
+  default     = 0
+}
+
+variable "sql_guard_scan_max_rows" {
+  description = "sql_guard_like_mode=bounded 에서 인덱스 없는 컬럼의 앞 와일드카드 LIKE 를 실행할 최대 EXPLAIN 예상 조회 행 수"
+  type        = number
+  default     = 10000
+
+  validation {
+    condition     = var.sql_guard_scan_max_rows > 0
+    error_message = "sql_guard_scan_max_rows는 0보다 커야 합니다."
+  }
+}
+
+variable "sql_workload_enabled" {
+  description = "실행 SQL 을 값을 뺀 지문별로 실행 횟수 / 지연 시간 / 조회 행 수를 기록할지 여부 (index_advisor.py 분석용)"
+  type        = bool
+  default     = true
+}
+
+variable "sql_workload_max_fingerprints" {
+  description = "컨테이너당 기록할 최대 SQL 지문 수 (넘는 새 지문은 버림)"
+  type        = number
+  default     = 200
+}
+
+variable "sql_workload_log_interval" {
+  description = "SQL 워크로드 스냅샷을 SQL_WORKLOAD 로그 한 줄로 내보내는 간격 (초, 0이면 내보내지 않음)"
+  type        = number
+  default     = 300
+}
+
+variable "sql_guard_extra_indexed_columns" {
+  description = "SQL 검사기가 인덱스 컬럼으로 취급할 추가 컬럼 (테이블.컬럼 쉼표 구분, 인덱스를 추가한 뒤 설정)"
+  type        = string
+  default     = ""
+}
+
+variable "local_replica_enabled" {
+  description = "petclinic 테이블을 Lambda 메모리 SQLite 로 복사해 두고 생성 SELECT 를 로컬에서 실행할지 여부 (처리할 수 없는 SQL 은 Data API 로 실행)"
+  type        = bool
+  default     = false
+}
+
+variable "local_replica_refresh_interval" {
+  description = "복제본 변경 확인 주기 (초, 원본과 버전이 다른 테이블만 백그라운드에서 갱신)"
+  type        = number
+  default     = 60
+}
+
+variable "local_replica_full_reload_interval" {
+  description = "복제본 전체 재적재 주기 (초, 0이면 재적재하지 않음)"
+  type        = number
+  default     = 900
+}
+
+variable "local_replica_max_staleness" {
+  description = "복제본 허용 지연 (초, 원본과 일치를 마지막으로 확인한 뒤 이 시간이 지나면 Data API 로 실행, 0이면 제한 없음)"
+  type        = number
+  default     = 300
+}
+
+variable "local_replica_page_size" {
+  description = "복제본 적재 시 한 번에 가져올 행 수"
+  type        = number
+  default     = 1000
+}
+
+variable "local_replica_max_rows" {
+  description = "복제본 최대 행 수 (넘으면 적재를 포기하고 Data API 로 실행)"
+  type        = number
+  default     = 100000
+}
+
+variable "answer_renderer_enabled" {
+  description = "조회 결과 모양이 단순하면(없음 / 개수 / 한 행 / 짧은 목록) 최종 답변 Bedrock 호출 없이 규칙 기반 문장으로 답변할지 여부"
+  type        = bool
+  default     = false
+}
+
+variable "answer_renderer_max_rows" {
+  description = "규칙 기반 답변으로 처리할 최대 결과 행 수 (넘으면 모델이 답변)"
+  type        = number
+  default     = 5
+}
+
+variable "answer_renderer_max_columns" {
+  description = "규칙 기반 답변으로 처리할 최대 결과 컬럼 수 (넘으면 모델이 답변)"
+  type        = number
+  default     = 4
+}
+
+variable "single_flight_enabled" {
+  description = "동시에 들어온 같은 질문(정규화 기준)을 파이프라인 한 번으로 합칠지 여부 (한 컨테이너가 여러 요청을 동시에 처리하는 서버 모드에서 효과)"
+  type        = bool
+  default     = true
+}
+
+variable "single_flight_timeout" {
+  description = "같은 질문을 처리 중인 요청의 결과를 기다리는 최대 시간 (초, 넘으면 직접 실행)"
+  type        = number
+  default     = 30
+}
+
+variable "bedrock_limiter_enabled" {
+  description = "모델 ID별 Bedrock 동시 호출 한도(AIMD)와 스로틀링 응답 백오프 재시도를 사용할지 여부 (켜면 Bedrock 클라이언트의 botocore 재시도는 1회로 고정)"
+  type        = bool
+  default     = false
+}
+
+variable "bedrock_limiter_initial_limit" {
+  description = "모델별 Bedrock 동시 호출 시작 한도 (성공하면 늘리고 스로틀링이면 절반으로 줄임)"
+  type        = number
+  default     = 8
+}
+
+variable "bedrock_limiter_max_limit" {
+  description = "모델별 Bedrock 동시 호출 최대 한도"
+  type        = number
+  default     = 64
+}
+
+variable "bedrock_limiter_deadline_seconds" {
+  description = "Bedrock 호출 하나의 대기열 대기와 스로틀링 재시도를 합친 최대 시간 (초)"
+  type        = number
+  default     = 20
+}
+
+variable "bedrock_limiter_max_retries" {
+  description = "스로틀링 응답 최대 재시도 횟수"
+  type        = number
+  default     = 4
+}
+
+variable "stage_deadlines_enabled" {
+  description = "남은 실행 시간(context.get_remaining_time_in_millis)으로 파이프라인 단계별 Bedrock 호출 기한을 정할지 여부 (답변 단계 기한 초과 시 부분 답변)"
+  type        = bool
+  default     = false
+}
+
+variable "deadline_reserve_ms" {
+  description = "요청 기한 계산 시 남은 실행 시간에서 빼 두는 응답 여유 시간 (ms)"
+  type        = number
+  default     = 1500
+}
+
+variable "hedge_enabled" {
+  description = "단계별 최근 지연 시간 백분위만큼 기다려도 Bedrock 응답이 없으면 같은 요청을 한 번 더 보내고 먼저 온 응답을 사용할지 여부"
+  type        = bool
+  default     = false
+}
+
+variable "hedge_percentile" {
+  description = "헤지 호출을 시작할 지연 시간 백분위 (단계별 최근 200회 기준)"
+  type        = number
+  default     = 95
+}
+
+variable "hedge_min_delay_ms" {
+  description = "헤지 호출 시작 전 최소 대기 시간 (ms)"
+  type        = number
+  default     = 200
+}
+
+variable "hedge_default_delay_ms" {
+  description = "지연 시간 표본이 20회 미만일 때 헤지 호출 시작 전 대기 시간 (ms)"
+  type        = number
+  default     = 3000
+}
+
+variable "hedge_model_id" {
+  description = "헤지 호출에 사용할 Bedrock 모델 ID (비우면 bedrock_model_id 와 같은 모델)"
+  type        = string
+  default     = ""
+}
+
+variable "hedge_region" {
+  description = "헤지 호출에 사용할 Bedrock 리전 (비우면 같은 리전, 해당 리전에서 모델 접근이 활성화되어 있어야 함)"
+  type        = string
+  default     = ""
+}
+
+variable "bedrock_classify_model_id" {
+  description = "질문 분류 단계에 사용할 Bedrock 모델 ID (비우면 bedrock_model_id, 작고 빠른 모델 권장)"
+  type        = string
+  default     = ""
+}
+
+variable "bedrock_sql_model_id" {
+  description = "SQL 생성 단계에 사용할 Bedrock 모델 ID (비우면 bedrock_model_id)"
+  type        = string
+  default     = ""
+}
+
+variable "bedrock_plan_model_id" {
+  description = "플래너 모드(분류 + SQL 생성 한 번에)에 사용할 Bedrock 모델 ID (비우면 bedrock_sql_model_id → bedrock_model_id)"
+  type        = string
+  default     = ""
+}
+
+variable "bedrock_answer_model_id" {
+  description = "최종 답변 생성 단계에 사용할 Bedrock 모델 ID (비우면 bedrock_model_id)"
+  type        = string
+  default     = ""
+}
+
+variable "model_fallback_id" {
+  description = "단계 모델의 최근 지연 p95 가 기준을 넘으면 일정 시간 대신 사용할 Bedrock 모델 ID (비우면 전환하지 않음)"
+  type        = string
+  default     = ""
+}
+
+variable "model_fallback_p95_ms" {
+  description = "대체 모델로 전환하는 단계별 지연 p95 기준 (ms, 예: classify=2000,answer=8000, 비우면 기본값 classify=3000,sql=5000,plan=6000,answer=12000)"
+  type        = string
+  default     = ""
+}
+
+variable "model_fallback_cooldown_seconds" {
+  description = "대체 모델로 전환한 뒤 단계 모델을 다시 시도하기까지의 시간 (초)"
+  type        = number
+  default     = 60
+}
+
+variable "response_streaming_enabled" {
+  description = "true면 Lambda Web Adapter 로 async_server 를 실행하고 응답 스트리밍(RESPONSE_STREAM) 함수 URL 을 생성 (stream=true 요청의 SSE 이벤트를 생성되는 대로 전달, API Gateway 프록시 통합 대신 함수 URL 사용)"
+  type        = bool
+  default     = false
+}
+
+variable "lambda_web_adapter_layer_arn" {
+  description = "Lambda Web Adapter 레이어 ARN (비우면 현재 리전의 공개 레이어 LambdaAdapterLayerX86:24)"
+  type        = string
+  default     = ""
+}
+
+variable "function_url_auth_type" {
+  description = "응답 스트리밍 함수 URL 인증 방식 (AWS_IAM 또는 NONE)"
+  type        = string
+  default     = "AWS_IAM"
+}
+
 # 데이터베이스 설정
 variable "db_user" {
   description = "데이터베이스 사용자명"
@@ -0,0 +1,156 @@
+"""
+GenAI Lambda 규칙 기반 답변 생성기
+조회 결과 모양이 단순하면(없음 / 개수 / 한 행 / 짧은 목록) 최종 답변 Bedrock 호출 없이 템플릿 문장으로 바로 답변
+조언 / 설명을 함께 요청한 질문, 모르는 컬럼, 긴 값, 많은 행은 None 을 반환해서 모델이 답변
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from intent_router import GENERAL_ADVICE_PATTERNS
+
+logger = logging.getLogger()
+
+# 컬럼 → (한국어, 영어) 표시 이름 (format_context_data 와 같은 컬럼 해석)
+COLUMN_LABELS: Dict[str, Tuple[str, str]] = {
+    'name': ('이름', 'name'),
+    'owner_name': ('주인', 'owner'),
+    'owner': ('주인', 'owner'),
+    'pet_name': ('반려동물 이름', 'pet name'),
+    'pet_type': ('반려동물 종류', 'pet type'),
+    'type': ('종류', 'type'),
+    'type_name': ('종류', 'type'),
+    'birth_date': ('생일', 'birth date'),
+    'address': ('주소', 'address'),
+    'city': ('도시', 'city'),
+    'telephone': ('전화번호', 'telephone'),
+    'visit_date': ('방문일', 'visit date'),
+    'description': ('내용', 'description'),
+    'specialty': ('전문 분야', 'specialty'),
+    'specialty_name': ('전문 분야', 'specialty'),
+    'vet_name': ('수의사', 'vet'),
+}
+
+# 개수 컬럼 (COUNT(*) as count 등)
+_COUNT_COLUMN = re.compile(r'^(count|cnt|total|num_\w+|\w+_count|count\(.*\))$', re.IGNORECASE)
+
+# 조회 결과만으로 답할 수 없는 요청 (조언 / 설명 / 비교) - 일반 상담 패턴(상담형 어미 같은 약한 근거 제외) + 추가 표현
+_NEEDS_MODEL = [re.compile(p, re.IGNORECASE) for p, weight, _ in GENERAL_ADVICE_PATTERNS if weight >= 0.6] + [
+    re.compile(r'조언|추천|분석|설명|요약|비교|왜|괜찮|advice|recommend|suggest|explain|summar|compare|why|should',
+               re.IGNORECASE)
+]
+
+_EXISTENCE_QUESTION = re.compile(r'있(어|나|니|나요|어요|습니까|는지|을까)|존재|is\s+there|are\s+there|exist',
+                                 re.IGNORECASE)
+_COUNT_UNIT = re.compile(r'몇\s*(명|마리|번|건|개|곳|회)')
+_COUNT_QUESTION = re.compile(r'몇|how\s+many|number\s+of', re.IGNORECASE)
+_HANGUL = re.compile(r'[가-힣]')
+
+
+def _is_korean(question: str) -> bool:
+    return _HANGUL.search(question) is not None
+
+
+def _label(column: str, korean: bool) -> Optional[str]:
+    labels = COLUMN_LABELS.get(column.lower())
+    if labels is None:
+        return None
+    return labels[0] if korean else labels[1]
+
+
+class AnswerRenderer:
+    """조회 결과 모양별 템플릿 답변 (max_rows 행 / max_columns 컬럼 / max_value_chars 자를 넘으면 모델에 맡김)"""
+
+    def __init__(self, max_rows: int = 5, max_columns: int = 4, max_value_chars: int = 200):
+        self.max_rows = max_rows
+        self.max_columns = max_columns
+        self.max_value_chars = max_value_chars
+        self._lock = threading.Lock()
+        self._stats = {'checked': 0, 'rendered': 0, 'by_shape': {}, 'deferred': {}}
+
+    def _fields(self, row: Dict[str, Any], korean: bool) -> Optional[List[Tuple[str, str]]]:
+        """행 → (표시 이름, 값) 목록 (first_name + last_name 은 이름 하나로, 모르는 컬럼이면 None)"""
+        fields = []
+        columns = [column for column in row if column.lower() not in ('first_name', 'last_name')]
+        if 'first_name' in row or 'last_name' in row:
+            full_name = ' '.join(str(row[key]) for key in ('first_name', 'last_name') if row.get(key) is not None)
+            if full_name:
+                fields.append(('이름' if korean else 'name', full_name))
+        for column in columns:
+            label = _label(column, korean)
+            if label is None:
+                return None
+            if row[column] is not None:
+                fields.append((label, str(row[column])))
+        return fields
+
+    def _shape(self, question: str, rows: List[Dict[str, Any]]) -> Tuple[str, Optional[str]]:
+        """(모양 또는 미처리 사유, 답변)"""
+        korean = _is_korean(question)
+        if any(pattern.search(question) for pattern in _NEEDS_MODEL):
+            return 'needs_model', None
+
+        if not rows:
+            return 'empty', ('조회 결과 해당하는 정보를 찾을 수 없습니다.' if korean
+                             else 'No matching records were found.')
+
+        columns = list(rows[0])
+        if len(rows) == 1 and len(columns) == 1 and _COUNT_COLUMN.match(columns[0]):
+            value = rows[0][columns[0]]
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return 'unknown_value', None
+            count = int(value)
+            if _EXISTENCE_QUESTION.search(question) and not _COUNT_QUESTION.search(question):
+                if korean:
+                    answer = f'네, 조회 결과 {count}건 있습니다.' if count else '아니요, 조회 결과 해당하는 정보가 없습니다.'
+                else:
+                    answer = (f'Yes, {count} matching record{"s" if count != 1 else ""} found.' if count
+                              else 'No, no matching records were found.')
+                return 'count', answer
+            unit_match = _COUNT_UNIT.search(question)
+            unit = unit_match.group(1) if unit_match else '건'
+            return 'count', (f'조회 결과 {count}{unit}입니다.' if korean else f'The count is {count}.')
+
+        if len(rows) > self.max_rows:
+            return 'too_many_rows', None
+        if len(columns) > self.max_columns:
+            return 'too_many_columns', None
+
+        lines = []
+        for row in rows:
+            fields = self._fields(row, korean)
+            if fields is None:
+                return 'unknown_column', None
+            if any(len(value) > self.max_value_chars for _, value in fields):
+                return 'long_value', None
+            if fields:
+                lines.append(' | '.join(f'{label}: {value}' for label, value in fields))
+        if not lines:
+            return 'unknown_value', None
+
+        if len(lines) == 1:
+            header = '조회 결과입니다.' if korean else 'Here is the result.'
+            return 'single_row', f'{header}\n- {lines[0]}'
+        header = f'조회 결과 {len(lines)}건입니다.' if korean else f'Found {len(lines)} records.'
+        return 'short_list', header + ''.join(f'\n{i}. {line}' for i, line in enumerate(lines, 1))
+
+    def render(self, question: str, rows: List[Dict[str, Any]]) -> Optional[str]:
+        """템플릿 답변 (모델이 답해야 하면 None)"""
+        shape, answer = self._shape(question, rows)
+        with self._lock:
+            self._stats['checked'] += 1
+            if answer is not None:
+                self._stats['rendered'] += 1
+                self._stats['by_shape'][shape] = self._stats['by_shape'].get(shape, 0) + 1
+            else:
+                self._stats['deferred'][shape] = self._stats['deferred'].get(shape, 0) + 1
+        logger.debug("규칙 답변 %s: %s", 'rendered' if answer is not None else 'deferred', shape)
+        return answer
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {key: dict(value) if isinstance(value, dict) else value for key, value in self._stats.items()}
+        stats['bypass_rate'] = round(stats['rendered'] / stats['checked'], 4) if stats['checked'] else 0.0
+        return stats
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+GenAI 비동기 HTTP 서버 (ECS 등 오래 실행되는 컨테이너용)
+lambda_function.lambda_handler 를 그대로 감싸서 같은 경로(GET /health, POST /genai)를 제공
+asyncio 로 연결을 받고 요청 처리(boto3 호출)는 공유 스레드 풀에서 실행해서
+한 프로세스가 여러 요청을 동시에 처리하면서 클라이언트 / 연결 풀 / 캐시 / 엔티티 인덱스를 요청끼리 공유
+스트리밍 요청(stream=true)은 SSE 이벤트를 생성되는 대로 chunked 전송 (Lambda Web Adapter 응답 스트리밍에서도 사용)
+
+사용법:
+    python3 async_server.py [--host 0.0.0.0] [--port 8080] [--max-workers 32]
+"""
+
+import argparse
+import asyncio
+import base64
+import contextvars
+import json
+import logging
+import os
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger()
+
+# 요청당 최대 헤더 수
+_MAX_HEADERS = 100
+_CORS_HEADERS = {'Access-Control-Allow-Origin': '*'}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ServerContext:
+    """Lambda context 와 같은 속성 (요청 ID, 남은 시간)"""
+
+    def __init__(self, request_id: str, deadline: float):
+        self.aws_request_id = request_id
+        self._deadline = deadline
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def is_routed(method: str, path: str) -> bool:
+    """lambda_handler 가 처리하는 HTTP 경로인지 (GET /health, POST */genai*)"""
+    return (method == 'GET' and path == '/health') or (method == 'POST' and '/genai' in path)
+
+
+def build_event(method: str, target: str, headers: Dict[str, str], body: bytes, request_id: str) -> Dict[str, Any]:
+    """HTTP 요청 → API Gateway 프록시 통합 이벤트"""
+    url = urlsplit(target)
+    try:
+        text = body.decode('utf-8') if body else None
+    except UnicodeDecodeError:
+        raise HttpError(400, '요청 본문은 UTF-8 이어야 합니다')
+    return {
+        'httpMethod': method,
+        'path': url.path,
+        'headers': headers,
+        'queryStringParameters': dict(parse_qsl(url.query)) or None,
+        'body': text,
+        'isBase64Encoded': False,
+        # 스트리밍 응답 본문을 iterator 로 받아서 나눠 보냄 (lambda_function.accepts_body_stream)
+        'requestContext': {'requestId': request_id, 'httpMethod': method, 'path': url.path, 'bodyStream': True},
+    }
+
+
+def encode_head(status: int, headers: Dict[str, str], keep_alive: bool, framing: str) -> bytes:
+    """HTTP/1.1 상태 줄 + 헤더 바이트 (framing: 'Content-Length: n' 또는 'Transfer-Encoding: chunked' 헤더 줄)"""
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ''
+    lines = [f'HTTP/1.1 {status} {reason}']
+    for name, value in headers.items():
+        if name.lower() not in ('content-length', 'connection', 'transfer-encoding'):
+            lines.append(f'{name}: {value}')
+    if framing:
+        lines.append(framing)
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+def encode_response(status: int, headers: Dict[str, str], body: bytes, keep_alive: bool) -> bytes:
+    """HTTP/1.1 응답 바이트"""
+    return encode_head(status, headers, keep_alive, f'Content-Length: {len(body)}') + body
+
+
+def encode_chunk(data: bytes) -> bytes:
+    """chunked 전송 조각 하나 (빈 바이트는 마지막 조각)"""
+    return f'{len(data):x}\r\n'.encode('latin-1') + data + b'\r\n'
+
+
+def json_error(status: int, message: str) -> Tuple[int, Dict[str, str], bytes]:
+    body = json.dumps({'error': HTTPStatus(status).phrase, 'message': message}, ensure_ascii=False)
+    return status, dict(_CORS_HEADERS, **{'Content-Type': 'application/json'}), body.encode('utf-8')
+
+
+class StreamBody:
+    """lambda_handler 가 iterator 로 돌려준 응답 본문 - 요청 컨텍스트에서 한 조각씩 실행
+
+    next_chunk 는 스레드 풀에서 실행, 실행 중에 close 하면 그 조각이 끝난 뒤 닫음 (제너레이터 finally 실행)
+    """
+
+    def __init__(self, chunks: Iterator, context: contextvars.Context, deadline: float):
+        self.deadline = deadline
+        self._chunks = chunks
+        self._context = context
+        self._lock = threading.Lock()
+        self._running = False
+        self._closed = False
+
+    def next_chunk(self) -> Optional[str]:
+        """다음 조각 (끝났거나 닫혔으면 None)"""
+        with self._lock:
+            if self._closed:
+                return None
+            self._running = True
+        try:
+            return self._context.run(next, self._chunks, None)
+        finally:
+            with self._lock:
+                self._running = False
+                closed = self._closed
+            if closed:
+                self._close_chunks()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._running:
+                return
+        self._close_chunks()
+
+    def _close_chunks(self) -> None:
+        # 제너레이터가 아닌 iterator(list_iterator 등)는 close 가 없음
+        close = getattr(self._chunks, 'close', None)
+        if close is not None:
+            self._context.run(close)
+
+
+class GenAIServer:
+    """lambda_handler 를 감싼 asyncio HTTP/1.1 서버
+
+    max_workers: 동시에 실행하는 요청 수 (스레드 풀 크기), max_pending: 대기 포함 최대 요청 수 (넘으면 503)
+    request_timeout: 요청 처리 제한 시간 (넘으면 504, context.get_remaining_time_in_millis 에도 반영)
+      스트리밍 응답은 헤더를 보낸 뒤 시간이 지나면 마지막 조각 없이 연결을 끊음
+    header_timeout: 요청 줄 / 헤더 / 본문을 받는 제한 시간 (첫 요청은 연결부터, keep-alive 요청은 요청 줄 도착부터)
+      넘으면 408 로 연결을 닫음 (요청을 천천히 보내는 클라이언트가 연결을 계속 잡고 있지 않도록)
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any], Any], Dict[str, Any]], max_workers: int = 32,
+                 max_pending: int = 256, request_timeout: float = 60.0, max_body_bytes: int = 1048576,
+                 keepalive_timeout: float = 5.0, header_timeout: float = 10.0, shutdown_grace: float = 20.0):
+        self.handler = handler
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.request_timeout = request_timeout
+        self.max_body_bytes = max_body_bytes
+        self.keepalive_timeout = keepalive_timeout
+        self.header_timeout = header_timeout
+        self.shutdown_grace = shutdown_grace
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='genai-server')
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: set = set()
+        self._closing = False
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stats = {'connections': 0, 'requests': 0, 'rejected': 0, 'timeouts': 0, 'read_timeouts': 0,
+                       'errors': 0, 'max_pending': 0, 'total_ms': 0.0, 'by_status': {}}
+        self.started_at = time.time()
+
+    # ------------------------------------------------------------------
+    # 요청 처리
+    # ------------------------------------------------------------------
+
+    async def _read_request(self, reader: asyncio.StreamReader,
+                            first: bool) -> Optional[Tuple[str, str, str, Dict[str, str], bytes]]:
+        """(메서드, 대상, 버전, 헤더, 본문) - 연결이 끝났거나 유휴 시간이 지나면 None"""
+        loop = asyncio.get_running_loop()
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.header_timeout if first else self.keepalive_timeout)
+        except asyncio.TimeoutError:
+            if first:
+                with self._lock:
+                    self._stats['read_timeouts'] += 1
+            return None
+        if not line.strip():
+            return None
+        deadline = loop.time() + self.header_timeout
+        parts = line.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/1.'):
+            raise HttpError(400, '잘못된 요청 줄입니다')
+        method, target, version = parts
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await self._read_until(reader.readline(), deadline)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= _MAX_HEADERS:
+                raise HttpError(431, '헤더가 너무 많습니다')
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip()] = value.strip()
+
+        lowered = {name.lower(): value for name, value in headers.items()}
+        if 'chunked' in lowered.get('transfer-encoding', '').lower():
+            raise HttpError(411, 'Content-Length 가 필요합니다')
+        try:
+            length = int(lowered.get('content-length', '0'))
+        except ValueError:
+            raise HttpError(400, '잘못된 Content-Length 입니다')
+        if length > self.max_body_bytes:
+            raise HttpError(413, f'요청 본문이 {self.max_body_bytes}바이트를 넘습니다')
+        body = await self._read_until(reader.readexactly(length), deadline) if length else b''
+        return method.upper(), target, version, headers, body
+
+    async def _read_until(self, read: Awaitable[bytes], deadline: float) -> bytes:
+        """deadline(이벤트 루프 시간)까지 읽기 - 넘으면 408"""
+        try:
+            return await asyncio.wait_for(read, max(0.0, deadline - asyncio.get_running_loop().time()))
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._stats['read_timeouts'] += 1
+            raise HttpError(408, f'요청을 {self.header_timeout:g}초 안에 받지 못했습니다')
+
+    def _invoke(self, event: Dict[str, Any], context: ServerContext) -> Tuple[Dict[str, Any], contextvars.Context]:
+        # 요청마다 빈 컨텍스트에서 실행 (현재 호출 지표 / 요청 로그 상태가 요청끼리 섞이지 않음)
+        # 스트리밍 본문도 같은 컨텍스트에서 실행하도록 컨텍스트를 함께 반환
+        request_context = contextvars.Context()
+        return request_context.run(self.handler, event, context), request_context
+
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str],
+                        body: bytes) -> Tuple[int, Dict[str, str], Union[bytes, StreamBody]]:
+        path = urlsplit(target).path
+        if not is_routed(method, path):
+            return json_error(404, f'{method} {path} 경로가 없습니다')
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats['rejected'] += 1
+                return json_error(503, '처리 중인 요청이 너무 많습니다')
+            self._pending += 1
+            self._stats['max_pending'] = max(self._stats['max_pending'], self._pending)
+        streaming = False
+        try:
+            lowered = {name.lower(): value for name, value in headers.items()}
+            request_id = lowered.get('x-request-id') or str(uuid.uuid4())
+            event = build_event(method, target, headers, body, request_id)
+            deadline = time.monotonic() + self.request_timeout
+            context = ServerContext(request_id, deadline)
+            loop = asyncio.get_running_loop()
+            try:
+                response, request_context = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, self._invoke, event, context), self.request_timeout
+                )
+            except asyncio.TimeoutError:
+                # 스레드의 작업은 끝까지 실행되지만 응답은 기다리지 않음
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                return json_error(504, f'{self.request_timeout:g}초 안에 처리하지 못했습니다')
+            status = int(response.get('statusCode') or 200)
+            response_headers = dict(response.get('headers') or {})
+            response_body = response.get('body', '')
+            if isinstance(response_body, Iterator):
+                # 처리 중 요청 수는 본문을 다 보낸 뒤 줄임 (_write_stream)
+                streaming = True
+                return status, response_headers, StreamBody(response_body, request_context, deadline)
+        finally:
+            if not streaming:
+                with self._lock:
+                    self._pending -= 1
+
+        if not isinstance(response_body, str):
+            response_body = json.dumps(response_body, ensure_ascii=False, default=str)
+            response_headers.setdefault('Content-Type', 'application/json')
+        if method == 'GET' and path == '/health' and status == 200:
+            health = json.loads(response_body)
+            health['server'] = self.get_stats()
+            response_body = json.dumps(health)
+        data = (base64.b64decode(response_body) if response.get('isBase64Encoded')
+                else response_body.encode('utf-8'))
+        return status, response_headers, data
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, status: int, headers: Dict[str, str],
+                            stream: StreamBody, version: str, keep_alive: bool) -> bool:
+        """스트리밍 본문을 조각마다 바로 전송 → 연결 유지 여부
+
+        HTTP/1.1 은 chunked 전송, HTTP/1.0 은 연결 종료로 본문 끝을 알림
+        헤더를 보낸 뒤에는 상태 코드를 바꿀 수 없으므로 시간 초과 / 오류면 마지막 조각 없이 연결을 끊음
+        """
+        chunked = version == 'HTTP/1.1'
+        keep_alive = keep_alive and chunked
+        loop = asyncio.get_running_loop()
+        try:
+            writer.write(encode_head(status, headers, keep_alive, 'Transfer-Encoding: chunked' if chunked else ''))
+            await writer.drain()
+            while True:
+                remaining = stream.deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                text = await asyncio.wait_for(loop.run_in_executor(self._executor, stream.next_chunk), remaining)
+                if text is None:
+                    break
+                data = text.encode('utf-8')
+                if data:
+                    writer.write(encode_chunk(data) if chunked else data)
+                    await writer.drain()
+            if chunked:
+                writer.write(encode_chunk(b''))
+                await writer.drain()
+            return keep_alive
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._stats['timeouts'] += 1
+            return False
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            logger.error("스트리밍 응답 오류 (%s): %s", type(e).__name__, e, exc_info=True)
+            with self._lock:
+                self._stats['errors'] += 1
+            return False
+        finally:
+            stream.close()
+            with self._lock:
+                self._pending -= 1
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        with self._lock:
+            self._stats['connections'] += 1
+        first = True
+        try:
+            while not self._closing:
+                started = time.perf_counter()
+                try:
+                    request = await self._read_request(reader, first)
+                    if request is None:
+                        break
+                    method, target, version, headers, body = request
+                    connection = {name.lower(): value for name, value in headers.items()}.get('connection', '').lower()
+                    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                    status, response_headers, data = await self._dispatch(method, target, headers, body)
+                except HttpError as e:
+                    status, response_headers, data = json_error(e.status, str(e))
+                    method = target = '-'
+                    keep_alive = False
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    logger.error("서버 요청 처리 오류 (%s): %s", type(e).__name__, e, exc_info=True)
+                    status, response_headers, data = json_error(500, '요청을 처리하지 못했습니다')
+                    method = target = '-'
+                    keep_alive = False
+                    with self._lock:
+                        self._stats['errors'] += 1
+
+                keep_alive = keep_alive and not self._closing
+                if isinstance(data, StreamBody):
+                    keep_alive = await self._write_stream(writer, status, response_headers, data, version, keep_alive)
+                else:
+                    writer.write(encode_response(status, response_headers, data, keep_alive))
+                    await writer.drain()
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                with self._lock:
+                    self._stats['requests'] += 1
+                    self._stats['total_ms'] += elapsed_ms
+                    self._stats['by_status'][str(status)] = self._stats['by_status'].get(str(status), 0) + 1
+                logger.debug("%s %s → %d (%.1fms)", method, target, status, elapsed_ms)
+                first = False
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    # ------------------------------------------------------------------
+    # 시작 / 종료
+    # ------------------------------------------------------------------
+
+    async def start(self, host: str = '0.0.0.0', port: int = 8080) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        sockets = ', '.join(str(sock.getsockname()) for sock in self._server.sockets or [])
+        logger.info("GenAI 서버 시작: %s (worker: %s, 최대 대기: %s)", sockets, self.max_workers,
+                    self.max_pending)
+
+    @property
+    def port(self) -> Optional[int]:
+        sockets = self._server.sockets if self._server else None
+        return sockets[0].getsockname()[1] if sockets else None
+
+    async def shutdown(self) -> None:
+        """새 연결을 받지 않고 처리 중인 요청을 shutdown_grace 초까지 기다린 뒤 종료 (ECS SIGTERM 대응)"""
+        self._closing = True
+        if self._server is not None:
+            self._server.close()
+        deadline = time.monotonic() + self.shutdown_grace
+        while self._pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        for task in list(self._connections):
+            task.cancel()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+        logger.info("GenAI 서버 종료 (처리 중이던 요청: %s)", self._pending)
+
+    async def serve_forever(self, host: str = '0.0.0.0', port: int = 8080) -> None:
+        await self.start(host, port)
+        stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, stopped.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        await stopped.wait()
+        await self.shutdown()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats, by_status=dict(self._stats['by_status']))
+            stats['pending'] = self._pending
+        stats['total_ms'] = round(stats['total_ms'], 3)
+        stats['avg_ms'] = round(stats['total_ms'] / stats['requests'], 3) if stats['requests'] else 0.0
+        stats['uptime_seconds'] = round(time.time() - self.started_at, 1)
+        return dict(stats, max_workers=self.max_workers, max_pending_limit=self.max_pending,
+                    request_timeout=self.request_timeout)
+
+
+def configure_environment(max_workers: int) -> None:
+    """lambda_function import 전에 서버 모드 기본값 설정 (이미 설정된 값은 유지)"""
+    # 동시에 실행하는 요청 수만큼 botocore 연결 풀 확보
+    os.environ.setdefault('CLIENT_MAX_POOL_CONNECTIONS', str(max_workers))
+    os.environ.setdefault('METRICS_SERVICE', 'genai-server')
+
+
+def create_server(max_workers: Optional[int] = None) -> GenAIServer:
+    """환경 변수 설정으로 서버 생성 (lambda_function 을 import 하면서 클라이언트 / 사전 적재 초기화)"""
+    max_workers = max_workers or int(os.getenv('SERVER_MAX_WORKERS', '32'))
+    configure_environment(max_workers)
+    import lambda_function
+    return GenAIServer(
+        lambda_function.lambda_handler,
+        max_workers=max_workers,
+        max_pending=int(os.getenv('SERVER_MAX_PENDING', '256')),
+        request_timeout=float(os.getenv('SERVER_REQUEST_TIMEOUT', '60')),
+        max_body_bytes=int(os.getenv('SERVER_MAX_BODY_BYTES', '1048576')),
+        keepalive_timeout=float(os.getenv('SERVER_KEEPALIVE_TIMEOUT', '5')),
+        header_timeout=float(os.getenv('SERVER_HEADER_TIMEOUT', '10')),
+        shutdown_grace=float(os.getenv('SERVER_SHUTDOWN_GRACE', '20'))
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='GenAI 비동기 HTTP 서버')
+    parser.add_argument('--host', default=os.getenv('SERVER_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('SERVER_PORT', '8080')))
+    parser.add_argument('--max-workers', type=int, default=None, help='동시 처리 요청 수 (기본: SERVER_MAX_WORKERS)')
+    args = parser.parse_args()
+
+    if not logging.getLogger().handlers:
+        logging.basicConfig(format='%(asctime)s %(levelname)s %(message)s')
+    server = create_server(args.max_workers)
+    asyncio.run(server.serve_forever(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
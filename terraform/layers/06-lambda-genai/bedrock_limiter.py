@@ -0,0 +1,198 @@
+"""
+GenAI Lambda Bedrock 호출 동시성 제한 / 스로틀링 재시도
+- 모델 ID별 AIMD 동시 호출 한도: 성공하면 한도만큼 성공할 때마다 +1, 스로틀링 응답이면 절반으로 줄임
+- 한도가 차면 대기열에서 기다리고, 호출 기한(deadline)을 넘으면 BedrockLimiterTimeout
+- 스로틀링 응답은 지터를 준 지수 백오프(Retry-After 헤더가 있으면 그 이상)로 기한 안에서 재시도
+한 프로세스가 여러 요청을 동시에 처리하면(서버 모드) 버스트를 한도 안으로 줄여서 오류 대신 지속 가능한 처리량을 유지
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger()
+
+# 호출량 초과로 보고 한도를 줄이고 재시도하는 오류 코드
+THROTTLING_ERROR_CODES = ('ThrottlingException', 'TooManyRequestsException', 'ServiceUnavailableException',
+                          'ModelNotReadyException')
+
+
+class BedrockLimiterTimeout(TimeoutError):
+    """호출 기한 안에 동시 호출 자리를 얻지 못함"""
+
+
+def throttling_error_code(error: BaseException) -> Optional[str]:
+    """스로틀링 오류 코드 (botocore ClientError 응답 코드, 없으면 메시지에서 확인) - 아니면 None"""
+    response = getattr(error, 'response', None) or {}
+    code = (response.get('Error') or {}).get('Code')
+    if code in THROTTLING_ERROR_CODES:
+        return code
+    text = str(error)
+    return next((name for name in THROTTLING_ERROR_CODES if name in text), None)
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """스로틀링 응답의 Retry-After 헤더 (초)"""
+    response = getattr(error, 'response', None) or {}
+    headers = (response.get('ResponseMetadata') or {}).get('HTTPHeaders') or {}
+    try:
+        return max(0.0, float(headers['retry-after']))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimit:
+    """모델 하나의 AIMD 동시 호출 한도와 대기열"""
+
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 64, decrease_factor: float = 0.5):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._stats = {'calls': 0, 'throttles': 0, 'retries': 0, 'timeouts': 0, 'queued': 0, 'queue_wait_ms': 0.0,
+                       'max_queue_wait_ms': 0.0, 'max_in_flight': 0, 'decreases': 0}
+
+    def acquire(self, deadline: float) -> Tuple[float, float, int]:
+        """자리 하나 확보 → (시작 시각, 대기 ms, 확보 후 동시 호출 수), deadline(time.monotonic 기준)을 넘으면 예외"""
+        requested = time.monotonic()
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                self._stats['queued'] += 1
+            while self.in_flight >= int(self.limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise BedrockLimiterTimeout(
+                        f"Bedrock 동시 호출 대기 시간 초과 (한도 {int(self.limit)}, 진행 중 {self.in_flight})")
+                self._cond.wait(remaining)
+            self.in_flight += 1
+            started = time.monotonic()
+            wait_ms = (started - requested) * 1000
+            self._stats['calls'] += 1
+            self._stats['queue_wait_ms'] += wait_ms
+            self._stats['max_queue_wait_ms'] = max(self._stats['max_queue_wait_ms'], wait_ms)
+            self._stats['max_in_flight'] = max(self._stats['max_in_flight'], self.in_flight)
+            return started, wait_ms, self.in_flight
+
+    def release(self, started: float, throttled: bool = False) -> None:
+        """자리 반환 - 성공이면 한도 증가, 스로틀링이면 감소 (직전 감소 이후 시작한 호출만 반영해서 버스트 한 번에 한 번만 줄임)"""
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self._stats['throttles'] += 1
+                if started >= self._last_decrease:
+                    self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+                    self._last_decrease = time.monotonic()
+                    self._stats['decreases'] += 1
+                    logger.warning("Bedrock 스로틀링, 동시 호출 한도 %d 로 감소", int(self.limit))
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def record_retry(self) -> None:
+        with self._cond:
+            self._stats['retries'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats, limit=round(self.limit, 2), in_flight=self.in_flight)
+        stats['throttle_rate'] = round(stats['throttles'] / stats['calls'], 4) if stats['calls'] else 0.0
+        stats['queue_wait_ms'] = round(stats['queue_wait_ms'], 3)
+        stats['max_queue_wait_ms'] = round(stats['max_queue_wait_ms'], 3)
+        return stats
+
+
+class BedrockLimiter:
+    """모델 ID별 AdaptiveLimit 로 Bedrock 호출 실행 (대기열 + 스로틀링 재시도)
+
+    deadline_seconds: 대기열 대기와 재시도를 합친 호출 하나의 최대 시간
+    observe(name, value): 호출별 지표 콜백 (queue_wait_ms / in_flight / throttles / retry_delay_ms / timeouts)
+    """
+
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 64, deadline_seconds: float = 20.0,
+                 max_retries: int = 4, base_delay: float = 0.25, max_delay: float = 4.0,
+                 observe: Optional[Callable[[str, float], None]] = None):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.deadline_seconds = deadline_seconds
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.observe = observe or (lambda name, value: None)
+        self._lock = threading.Lock()
+        self._limits: Dict[str, AdaptiveLimit] = {}
+
+    def _limit(self, model_id: str) -> AdaptiveLimit:
+        with self._lock:
+            limit = self._limits.get(model_id)
+            if limit is None:
+                limit = self._limits[model_id] = AdaptiveLimit(self.initial_limit, self.min_limit, self.max_limit)
+            return limit
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        """full jitter 지수 백오프 (Retry-After 가 더 길면 그 값)"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        retry_after = retry_after_seconds(error)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def open(self, model_id: str, fn: Callable[[], Any]) -> Tuple[Any, Callable[[], None]]:
+        """fn 실행 후 자리를 유지한 채 (결과, 자리 반환 함수) - 스트리밍 응답처럼 결과를 다 읽을 때까지 자리를 잡아 둘 때 사용"""
+        limit = self._limit(model_id)
+        deadline = time.monotonic() + self.deadline_seconds
+        attempt = 0
+        while True:
+            try:
+                started, wait_ms, in_flight = limit.acquire(deadline)
+            except BedrockLimiterTimeout:
+                self.observe('timeouts', 1)
+                raise
+            self.observe('queue_wait_ms', wait_ms)
+            self.observe('in_flight', in_flight)
+            try:
+                result = fn()
+            except Exception as e:
+                code = throttling_error_code(e)
+                limit.release(started, throttled=code is not None)
+                if code is None:
+                    raise
+                self.observe('throttles', 1)
+                delay = self._backoff(attempt, e)
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    raise
+                attempt += 1
+                limit.record_retry()
+                self.observe('retry_delay_ms', delay * 1000)
+                logger.info("Bedrock %s, %.0fms 후 재시도 (%d/%d)", code, delay * 1000, attempt, self.max_retries)
+                time.sleep(delay)
+                continue
+
+            released = []
+
+            def release() -> None:
+                if not released:
+                    released.append(True)
+                    limit.release(started)
+            return result, release
+
+    def call(self, model_id: str, fn: Callable[[], Any]) -> Any:
+        """fn 실행 (응답을 받으면 바로 자리 반환)"""
+        result, release = self.open(model_id, fn)
+        release()
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            limits = dict(self._limits)
+        return {
+            'models': {model_id: limit.get_stats() for model_id, limit in limits.items()},
+            'initial_limit': self.initial_limit,
+            'max_limit': self.max_limit,
+            'deadline_seconds': self.deadline_seconds,
+            'max_retries': self.max_retries,
+        }
@@ -0,0 +1,57 @@
+"""
+GenAI Lambda Bedrock 응답 스트리밍 유틸리티
+invoke_model_with_response_stream 이벤트 스트림에서 모델별 텍스트 조각을 추출하고
+SSE(text/event-stream) 이벤트 형식으로 변환
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from model_adapters import get_adapter
+
+logger = logging.getLogger()
+
+# 이벤트 스트림 중간에 올 수 있는 오류 이벤트
+STREAM_ERROR_KEYS = (
+    'internalServerException', 'modelStreamErrorException', 'validationException',
+    'throttlingException', 'modelTimeoutException', 'serviceUnavailableException'
+)
+
+
+class BedrockStreamError(Exception):
+    """응답 스트림 중간에 전달된 Bedrock 오류"""
+
+
+def extract_chunk_text(model_id: str, payload: Dict[str, Any]) -> str:
+    """스트림 청크 하나에서 모델별 텍스트 조각 추출 (텍스트가 없는 이벤트는 빈 문자열)"""
+    return get_adapter(model_id).extract_chunk_text(payload)
+
+
+def iter_stream_text(model_id: str, event_stream: Iterable[Dict[str, Any]],
+                     usage: Optional[Dict[str, int]] = None) -> Iterator[str]:
+    """이벤트 스트림을 텍스트 조각으로 변환 (usage 가 주어지면 토큰 사용량 기록)"""
+    adapter = get_adapter(model_id)
+    for event in event_stream:
+        for key in STREAM_ERROR_KEYS:
+            if key in event:
+                raise BedrockStreamError(f"{key}: {event[key].get('message', '')}")
+
+        chunk = event.get('chunk')
+        if not chunk:
+            continue
+        payload = json.loads(chunk['bytes'])
+
+        metrics = payload.get('amazon-bedrock-invocationMetrics')
+        if metrics and usage is not None:
+            usage['input_tokens'] = metrics.get('inputTokenCount', 0)
+            usage['output_tokens'] = metrics.get('outputTokenCount', 0)
+
+        text = adapter.extract_chunk_text(payload)
+        if text:
+            yield text
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """SSE 이벤트 한 개 (event + JSON data + 빈 줄)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
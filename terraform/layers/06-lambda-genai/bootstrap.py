@@ -0,0 +1,98 @@
+"""
+GenAI Lambda 초기화(INIT) 단계 도구
+- botocore Config: keep-alive / 연결 풀 크기 / 연결·읽기 타임아웃 / adaptive 재시도를 명시적으로 설정
+  시도 횟수 x (연결 + 읽기 타임아웃)이 호출 시간 예산(함수 타임아웃 - 여유)을 넘지 않도록 시도 횟수를 줄임
+- InitProfiler: 모듈 import 부터 클라이언트 생성, 사전 적재까지 단계별 초기화 시간 측정과 예산 초과 경고
+클라이언트를 모듈 import 시점에 만들어 두면 SnapStart / 프로비저닝된 동시성에서 초기화 비용이 요청 경로에서 빠짐
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from botocore.config import Config
+
+logger = logging.getLogger()
+
+
+def fit_retry_budget(connect_timeout: float, read_timeout: float, max_attempts: int,
+                     time_budget: float) -> Tuple[float, int]:
+    """(읽기 타임아웃, 시도 횟수) - 모든 시도가 타임아웃까지 걸려도 time_budget(초) 안에 끝나는 값 (0이면 그대로)
+
+    시도 하나가 예산을 넘으면 시도 1번에 읽기 타임아웃을 예산에 맞춤 (재시도 사이 대기 시간은 무시)
+    """
+    if time_budget <= 0:
+        return read_timeout, max_attempts
+    per_attempt = connect_timeout + read_timeout
+    if per_attempt > time_budget:
+        return max(1.0, time_budget - connect_timeout), 1
+    return read_timeout, max(1, min(max_attempts, int(time_budget // per_attempt)))
+
+
+def build_client_config(max_pool_connections: int = 16, connect_timeout: float = 2.0, read_timeout: float = 50.0,
+                        max_attempts: int = 3, retry_mode: str = 'adaptive', time_budget: float = 0) -> Config:
+    """서비스 클라이언트용 botocore Config (TCP keep-alive 사용, time_budget: fit_retry_budget)"""
+    fitted_read_timeout, fitted_attempts = fit_retry_budget(connect_timeout, read_timeout, max_attempts, time_budget)
+    if (fitted_read_timeout, fitted_attempts) != (read_timeout, max_attempts):
+        logger.info("클라이언트 호출 시간 예산 %.0f초: 읽기 타임아웃 %.0f초 → %.0f초, 최대 시도 %d → %d",
+                    time_budget, read_timeout, fitted_read_timeout, max_attempts, fitted_attempts)
+    read_timeout, max_attempts = fitted_read_timeout, fitted_attempts
+    return Config(
+        max_pool_connections=max_pool_connections,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        retries={'max_attempts': max_attempts, 'mode': retry_mode},
+        tcp_keepalive=True,
+    )
+
+
+class InitProfiler:
+    """초기화 단계별 소요 시간 (mark 는 직전 mark 이후 시간, phase 는 with 블록 시간)"""
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.total_ms: Optional[float] = None
+        self.budget_ms: Optional[float] = None
+        self._last = self.started
+        self._cold_start_pending = True
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.phases[name] = round(self.phases.get(name, 0.0) + (now - self._last) * 1000, 2)
+        self._last = now
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self.phases[name] = round(self.phases.get(name, 0.0) + (now - started) * 1000, 2)
+            self._last = now
+
+    def finish(self, budget_ms: float = 0) -> float:
+        """초기화 종료 - 단계별 시간 로그, 예산(ms, 0이면 확인 안 함)을 넘으면 경고"""
+        self.total_ms = round((time.perf_counter() - self.started) * 1000, 2)
+        self.budget_ms = budget_ms or None
+        breakdown = ', '.join(f'{name} {ms:.1f}ms' for name, ms in self.phases.items())
+        if self.budget_ms and self.total_ms > self.budget_ms:
+            logger.warning("초기화 시간 예산 초과: %.1fms > %.0fms (%s)", self.total_ms, self.budget_ms, breakdown)
+        else:
+            logger.info("초기화 완료: %.1fms (%s)", self.total_ms, breakdown)
+        return self.total_ms
+
+    def take_cold_start(self) -> bool:
+        """컨테이너의 첫 호출이면 True (한 번만)"""
+        pending, self._cold_start_pending = self._cold_start_pending, False
+        return pending
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'total_ms': self.total_ms,
+            'budget_ms': self.budget_ms,
+            'over_budget': bool(self.budget_ms and self.total_ms and self.total_ms > self.budget_ms),
+            'phases': dict(self.phases),
+        }
@@ -0,0 +1,175 @@
+"""
+GenAI Lambda 단계별 기한(deadline)과 지연 헤지(hedged request)
+- RequestBudget: context.get_remaining_time_in_millis() 에서 응답 여유 시간을 뺀 요청 기한, 단계마다 남은 시간의 일정 비율을 단계 기한으로 사용
+- HedgedCaller: 모델 호출을 작업 스레드에서 실행하고 단계별 최근 지연 시간 백분위(p95 등)만큼 기다려도 끝나지 않으면
+  같은(또는 대체) 모델로 같은 요청을 한 번 더 보내서 먼저 끝난 응답 사용, 단계 기한을 넘으면 DeadlineExceeded
+느린 호출 하나가 요청 전체를 Lambda 제한 시간까지 붙잡지 않도록 하는 꼬리 지연(p99) 대책 (헤지 호출만큼 토큰 비용 증가)
+"""
+
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger()
+
+# 단계 시작 시점의 남은 요청 시간 중 단계 기한으로 쓰는 비율 (답변 단계는 남은 시간 전부)
+DEFAULT_STAGE_SHARES = {'classify': 0.3, 'plan': 0.5, 'sql': 0.5, 'answer': 1.0}
+
+_current_budget: contextvars.ContextVar = contextvars.ContextVar('genai_request_budget', default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """단계 기한 안에 모델 응답을 받지 못함"""
+
+
+class RequestBudget:
+    """요청 하나의 기한 (time.monotonic 기준)"""
+
+    def __init__(self, remaining_ms: float, reserve_ms: float = 1500.0,
+                 stage_shares: Optional[Dict[str, float]] = None):
+        self.deadline = time.monotonic() + max(0.0, remaining_ms - reserve_ms) / 1000
+        self.stage_shares = dict(DEFAULT_STAGE_SHARES, **(stage_shares or {}))
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def stage_timeout(self, stage: str) -> float:
+        """단계 기한 (초) - 남은 요청 시간 x 단계 비율"""
+        return self.remaining() * self.stage_shares.get(stage, 1.0)
+
+
+def set_request_budget(budget: Optional[RequestBudget]) -> None:
+    """현재 요청(컨텍스트)의 기한 설정 - 작업 스레드는 copy_context 로 이어받음"""
+    _current_budget.set(budget)
+
+
+def current_budget() -> Optional[RequestBudget]:
+    return _current_budget.get()
+
+
+def _percentile(values, pct: float) -> float:
+    """nearest-rank 백분위"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+class HedgedCaller:
+    """단계별 지연 시간 기록 + 헤지 / 기한 적용 호출기 (컨테이너 단위 스레드 풀 재사용)
+
+    hedge_percentile: 헤지 지연 = 단계의 최근 primary 호출 지연 백분위 (표본이 min_samples 개 미만이면 default_delay_ms)
+    observe(name, value): 호출별 지표 콜백 (hedged / hedge_wins / deadline_exceeded)
+    """
+
+    def __init__(self, hedge: bool = True, hedge_percentile: float = 95.0, min_delay_ms: float = 200.0,
+                 default_delay_ms: float = 3000.0, min_samples: int = 20, window: int = 200, max_workers: int = 64,
+                 observe: Optional[Callable[[str, float], None]] = None):
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_delay_ms = min_delay_ms
+        self.default_delay_ms = default_delay_ms
+        self.min_samples = min_samples
+        self.window = window
+        self.observe = observe or (lambda name, value: None)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='genai-hedge')
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, stage: str, name: str) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(stage, {'calls': 0, 'hedged': 0, 'hedge_wins': 0, 'errors': 0,
+                                                    'deadline_exceeded': 0})
+            stats[name] += 1
+
+    def _record_latency(self, stage: str, started: float, future) -> None:
+        """primary 호출 지연 기록 (헤지 승패와 관계없이 끝까지 걸린 시간, 실패는 제외)"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            window = self._latencies.setdefault(stage, deque(maxlen=self.window))
+            window.append((time.monotonic() - started) * 1000)
+
+    def hedge_delay_ms(self, stage: str) -> float:
+        with self._lock:
+            window = list(self._latencies.get(stage, ()))
+        if len(window) < self.min_samples:
+            return max(self.min_delay_ms, self.default_delay_ms)
+        return max(self.min_delay_ms, _percentile(window, self.hedge_percentile))
+
+    def _submit(self, fn: Callable[[], Any]):
+        # 요청 컨텍스트(현재 호출 지표 / 요청 로그 상태 / 기한)를 작업 스레드로 전달
+        return self._executor.submit(contextvars.copy_context().run, fn)
+
+    def call(self, stage: str, primary: Callable[[], Any], hedge: Optional[Callable[[], Any]] = None,
+             timeout: Optional[float] = None) -> Any:
+        """primary 실행 → 헤지 지연이 지나면 hedge 도 실행 → 먼저 성공한 결과 (timeout 초를 넘으면 DeadlineExceeded)
+
+        끝나지 않은 호출은 중단할 수 없으므로 결과만 버림 (Bedrock 요청은 백그라운드에서 끝까지 진행)
+        """
+        self._count(stage, 'calls')
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+        if deadline is not None and timeout <= 0:
+            self._count(stage, 'deadline_exceeded')
+            self.observe('deadline_exceeded', 1)
+            raise DeadlineExceeded(f"{stage} 단계 기한 초과 (남은 요청 시간 없음)")
+
+        primary_future = self._submit(primary)
+        primary_future.add_done_callback(lambda future: self._record_latency(stage, started, future))
+        pending = {primary_future}
+        hedge_future = None
+        hedge_at = started + self.hedge_delay_ms(stage) / 1000 if self.hedge and hedge is not None else None
+        errors = []
+
+        while pending:
+            wake_times = [t for t in (deadline, hedge_at if hedge_future is None else None) if t is not None]
+            remaining = max(0.0, min(wake_times) - time.monotonic()) if wake_times else None
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                if future is hedge_future:
+                    self._count(stage, 'hedge_wins')
+                    self.observe('hedge_wins', 1)
+                    logger.info("%s 단계 헤지 호출이 먼저 응답 (%.0fms)", stage, (time.monotonic() - started) * 1000)
+                for other in pending:
+                    other.cancel()
+                return result
+
+            now = time.monotonic()
+            if pending and deadline is not None and now >= deadline:
+                for future in pending:
+                    future.cancel()
+                self._count(stage, 'deadline_exceeded')
+                self.observe('deadline_exceeded', 1)
+                raise DeadlineExceeded(f"{stage} 단계 기한 초과 ({timeout * 1000:.0f}ms)")
+            if pending and hedge_future is None and hedge_at is not None and now >= hedge_at:
+                hedge_future = self._submit(hedge)
+                pending.add(hedge_future)
+                self._count(stage, 'hedged')
+                self.observe('hedged', 1)
+                logger.info("%s 단계 응답 지연 %.0fms, 헤지 호출 시작", stage, (now - started) * 1000)
+
+        # 시작한 호출이 모두 실패 (헤지 전에 primary 가 실패하면 헤지하지 않음)
+        self._count(stage, 'errors')
+        raise errors[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {stage: dict(stats) for stage, stats in self._stats.items()}
+            windows = {stage: list(window) for stage, window in self._latencies.items()}
+        for stage, stats in stages.items():
+            window = windows.get(stage, [])
+            stats['hedge_rate'] = round(stats['hedged'] / stats['calls'], 4) if stats['calls'] else 0.0
+            stats['p50_ms'] = round(_percentile(window, 50), 1) if window else None
+            stats['p99_ms'] = round(_percentile(window, 99), 1) if window else None
+            stats['hedge_delay_ms'] = round(self.hedge_delay_ms(stage), 1) if self.hedge else None
+        return {'stages': stages, 'hedge': self.hedge, 'hedge_percentile': self.hedge_percentile}
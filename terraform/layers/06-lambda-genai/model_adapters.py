@@ -0,0 +1,248 @@
+"""
+GenAI Lambda 모델 계열별 어댑터와 단계별 모델 선택
+- ModelAdapter: 모델 계열(Claude / Titan / Llama)별 request body 구성, 응답 / 스트림 청크 텍스트 추출
+  모델 ID 문자열 판별은 모델 ID마다 처음 한 번만 하고 get_adapter 가 같은 어댑터를 재사용
+- StageModelRouter: 파이프라인 단계(classify / sql / plan / answer)별 모델 ID
+  분류 / SQL 생성은 작고 빠른 모델, 최종 답변은 큰 모델처럼 단계마다 다른 모델을 쓸 수 있고
+  대체 모델이 있으면 단계 모델의 최근 지연 p95 가 기준을 넘을 때 일정 시간 대체 모델로 전환
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from prompt_cache import build_system_blocks, supports_prompt_cache
+
+logger = logging.getLogger()
+
+PIPELINE_STAGES = ('classify', 'sql', 'plan', 'answer')
+
+# 단계 모델을 따로 지정하지 않으면 따르는 단계 (플래너는 분류 + SQL 생성을 한 번에 하므로 SQL 모델)
+STAGE_MODEL_INHERIT = {'plan': 'sql'}
+
+# 대체 모델로 전환하는 단계별 최근 지연 p95 기준 (ms)
+DEFAULT_FALLBACK_P95_MS = {'classify': 3000.0, 'sql': 5000.0, 'plan': 6000.0, 'answer': 12000.0}
+
+
+class ModelAdapter:
+    """모델 ID 하나의 요청 / 응답 형식 (Claude Messages API 형식이 기본)"""
+
+    family = 'default'
+    system_blocks = False
+
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        # cache_control 체크포인트 지원 여부 (system 블록을 쓰는 모델만)
+        self.prompt_cache = self.system_blocks and supports_prompt_cache(model_id)
+
+    def build_body(self, prompt: str, max_tokens: int, system: Optional[str] = None,
+                   cache: bool = False) -> Dict[str, Any]:
+        """request body (system: 정적 프롬프트, system 블록이 없는 모델은 프롬프트 앞에 붙임)"""
+        body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt if self.system_blocks or not system
+                          else f"{system}\n\n{prompt}"}],
+            "temperature": 0.1
+        }
+        if system and self.system_blocks:
+            body["system"] = build_system_blocks(system, cache=cache)
+        return body
+
+    def parse_response(self, response_body: Dict[str, Any]) -> str:
+        return response_body.get('content', [{}])[0].get('text', '')
+
+    def extract_chunk_text(self, payload: Dict[str, Any]) -> str:
+        """스트림 청크 하나의 텍스트 조각 (텍스트가 없는 이벤트는 빈 문자열)"""
+        if payload.get('type') == 'content_block_delta':
+            return payload.get('delta', {}).get('text', '')
+        return ''
+
+
+class AnthropicAdapter(ModelAdapter):
+    """Claude 모델 (system 블록 + 프롬프트 캐시 체크포인트)"""
+
+    family = 'anthropic'
+    system_blocks = True
+
+    def parse_response(self, response_body: Dict[str, Any]) -> str:
+        return response_body['content'][0]['text']
+
+
+class TitanAdapter(ModelAdapter):
+    """Amazon Titan 모델"""
+
+    family = 'titan'
+
+    def build_body(self, prompt: str, max_tokens: int, system: Optional[str] = None,
+                   cache: bool = False) -> Dict[str, Any]:
+        return {
+            "inputText": f"{system}\n\n{prompt}" if system else prompt,
+            "textGenerationConfig": {
+                "maxTokenCount": max_tokens,
+                "temperature": 0.1,
+                "topP": 0.9
+            }
+        }
+
+    def parse_response(self, response_body: Dict[str, Any]) -> str:
+        return response_body['results'][0]['outputText']
+
+    def extract_chunk_text(self, payload: Dict[str, Any]) -> str:
+        return payload.get('outputText', '')
+
+
+class LlamaAdapter(ModelAdapter):
+    """Meta Llama 모델"""
+
+    family = 'llama'
+
+    def build_body(self, prompt: str, max_tokens: int, system: Optional[str] = None,
+                   cache: bool = False) -> Dict[str, Any]:
+        return {
+            "prompt": f"{system}\n\n{prompt}" if system else prompt,
+            "max_gen_len": max_tokens,
+            "temperature": 0.1,
+            "top_p": 0.9
+        }
+
+    def parse_response(self, response_body: Dict[str, Any]) -> str:
+        return response_body['generation']
+
+    def extract_chunk_text(self, payload: Dict[str, Any]) -> str:
+        return payload.get('generation', '')
+
+
+def resolve_adapter_class(model_id: str) -> type:
+    """모델 ID → 어댑터 클래스 (Claude 판별이 Titan / Llama 보다 우선)"""
+    model = model_id.lower()
+    if 'anthropic' in model or 'claude' in model:
+        return AnthropicAdapter
+    if 'titan' in model:
+        return TitanAdapter
+    if 'llama' in model or 'meta' in model:
+        return LlamaAdapter
+    return ModelAdapter
+
+
+_adapters: Dict[str, ModelAdapter] = {}
+
+
+def get_adapter(model_id: str) -> ModelAdapter:
+    """모델 ID별 어댑터 (처음 본 모델 ID만 판별, 이후는 사전 조회)"""
+    adapter = _adapters.get(model_id)
+    if adapter is None:
+        adapter = _adapters.setdefault(model_id, resolve_adapter_class(model_id)(model_id))
+    return adapter
+
+
+def parse_stage_values(text: str) -> Dict[str, float]:
+    """'classify=2000,answer=8000' → {'classify': 2000.0, 'answer': 8000.0} (알 수 없는 단계는 무시)"""
+    values = {}
+    for item in (text or '').split(','):
+        stage, _, value = item.partition('=')
+        stage = stage.strip()
+        if stage in PIPELINE_STAGES and value.strip():
+            values[stage] = float(value)
+    return values
+
+
+def _percentile(values, pct: float) -> float:
+    """nearest-rank 백분위"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+class StageModelRouter:
+    """단계별 모델 ID 선택 + 지연 기반 대체 모델 전환
+
+    stage_models: 단계별 모델 ID (없는 단계는 STAGE_MODEL_INHERIT → default_model)
+    fallback_model: 단계 모델의 최근 window 개 호출 p95 가 단계 기준(p95_thresholds_ms)을 넘으면
+      cooldown_seconds 동안 대신 쓰는 모델 (None 이면 전환하지 않음), 전환이 끝나면 지연 표본을 비우고 다시 측정
+    """
+
+    def __init__(self, default_model: str, stage_models: Optional[Dict[str, str]] = None,
+                 fallback_model: Optional[str] = None, p95_thresholds_ms: Optional[Dict[str, float]] = None,
+                 window: int = 50, min_samples: int = 10, cooldown_seconds: float = 60.0):
+        self.default_model = default_model
+        self.stage_models = {stage: model for stage, model in (stage_models or {}).items() if model}
+        self.fallback_model = fallback_model or None
+        self.p95_thresholds_ms = dict(DEFAULT_FALLBACK_P95_MS, **(p95_thresholds_ms or {}))
+        self.window = window
+        self.min_samples = min_samples
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self._fallback_until: Dict[str, float] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def primary(self, stage: str) -> str:
+        """설정된 단계 모델 ID (대체 모델 전환과 무관)"""
+        model = self.stage_models.get(stage)
+        if model is None and stage in STAGE_MODEL_INHERIT:
+            model = self.stage_models.get(STAGE_MODEL_INHERIT[stage])
+        return model or self.default_model
+
+    def model_key(self) -> str:
+        """단계 모델 ID 조합 (답변 캐시 키용, 모든 단계가 같은 모델이면 그 모델 ID)"""
+        return '+'.join(dict.fromkeys(self.primary(stage) for stage in PIPELINE_STAGES))
+
+    def select(self, stage: str) -> str:
+        """이번 호출에 쓸 모델 ID (전환 중이면 대체 모델)"""
+        if self.fallback_model is not None:
+            with self._lock:
+                if self._fallback_until.get(stage, 0.0) > time.monotonic():
+                    self._count(stage, 'fallback_calls')
+                    return self.fallback_model
+        return self.primary(stage)
+
+    def _count(self, stage: str, name: str) -> None:
+        stats = self._stats.setdefault(stage, {'calls': 0, 'fallback_calls': 0, 'switches': 0})
+        stats[name] += 1
+
+    def record(self, stage: str, model_id: str, elapsed_ms: float) -> None:
+        """성공한 단계 호출 지연 기록 - 단계 모델의 p95 가 기준을 넘으면 대체 모델로 전환"""
+        with self._lock:
+            self._count(stage, 'calls')
+            key = (stage, model_id)
+            window = self._latencies.get(key)
+            if window is None:
+                window = self._latencies[key] = deque(maxlen=self.window)
+            window.append(elapsed_ms)
+            if (self.fallback_model is None or model_id == self.fallback_model
+                    or model_id != self.primary(stage) or len(window) < self.min_samples):
+                return
+            p95 = _percentile(window, 95)
+            threshold = self.p95_thresholds_ms.get(stage)
+            if threshold is None or p95 <= threshold:
+                return
+            self._fallback_until[stage] = time.monotonic() + self.cooldown_seconds
+            self._count(stage, 'switches')
+            window.clear()
+        logger.warning("%s 단계 모델 %s 지연 p95 %.0fms > %.0fms, %.0f초 동안 %s 사용",
+                       stage, model_id, p95, threshold, self.cooldown_seconds, self.fallback_model)
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            stats = {stage: dict(values) for stage, values in self._stats.items()}
+            windows = {key: list(window) for key, window in self._latencies.items()}
+            fallback_until = dict(self._fallback_until)
+        latency = {}
+        for (stage, model_id), window in windows.items():
+            if window:
+                latency.setdefault(stage, {})[model_id] = {
+                    'samples': len(window),
+                    'p50_ms': round(_percentile(window, 50), 1),
+                    'p95_ms': round(_percentile(window, 95), 1),
+                }
+        return {
+            'models': {stage: self.primary(stage) for stage in PIPELINE_STAGES},
+            'fallback_model': self.fallback_model,
+            'fallback_active': sorted(stage for stage, until in fallback_until.items() if until > now),
+            'stages': stats,
+            'latency': latency,
+        }
@@ -0,0 +1,76 @@
+"""
+GenAI Lambda Bedrock 프롬프트 캐시
+분류 / SQL 생성 / 플래너 프롬프트의 정적 앞부분(스키마 + 예시)을 system 블록으로 분리하고,
+프롬프트 캐시를 지원하는 Claude 모델이면 cache_control 체크포인트를 붙여서 다음 호출부터 캐시에서 읽음
+응답 usage 의 캐시 읽기 / 쓰기 토큰을 모아 첫 토큰 시간 개선 효과를 확인
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+
+# Bedrock 프롬프트 캐시를 지원하는 Claude 모델 ID 접두사 (교차 리전 추론 프로파일 접두사 제외)
+CACHE_SUPPORTED_MODEL_PREFIXES = (
+    'anthropic.claude-3-5-haiku',
+    'anthropic.claude-3-7-sonnet',
+    'anthropic.claude-sonnet-4',
+    'anthropic.claude-opus-4',
+    'anthropic.claude-haiku-4',
+)
+
+# 교차 리전 추론 프로파일 ID 접두사 (예: apac.anthropic.claude-3-7-sonnet-...)
+_INFERENCE_PROFILE_PREFIXES = ('us.', 'eu.', 'apac.', 'jp.', 'au.', 'global.')
+
+
+def supports_prompt_cache(model_id: str) -> bool:
+    """cache_control 체크포인트를 지원하는 모델인지 확인"""
+    model = model_id.lower()
+    for prefix in _INFERENCE_PROFILE_PREFIXES:
+        if model.startswith(prefix):
+            model = model[len(prefix):]
+            break
+    return model.startswith(CACHE_SUPPORTED_MODEL_PREFIXES)
+
+
+def build_system_blocks(system: str, cache: bool) -> List[Dict[str, Any]]:
+    """Claude Messages API system 블록 (cache=True 면 정적 프롬프트 끝에 캐시 체크포인트)"""
+    block: Dict[str, Any] = {'type': 'text', 'text': system}
+    if cache:
+        block['cache_control'] = {'type': 'ephemeral'}
+    return [block]
+
+
+def read_cache_usage(headers: Dict[str, str], usage: Dict[str, Any]) -> Dict[str, int]:
+    """응답 헤더 / usage 에서 캐시 읽기·쓰기 토큰 수 추출"""
+    return {
+        'cache_read_tokens': int(headers.get('x-amzn-bedrock-cache-read-input-token-count',
+                                             usage.get('cache_read_input_tokens', 0)) or 0),
+        'cache_write_tokens': int(headers.get('x-amzn-bedrock-cache-write-input-token-count',
+                                              usage.get('cache_creation_input_tokens', 0)) or 0),
+    }
+
+
+class PromptCacheStats:
+    """정적 프롬프트 호출의 캐시 읽기 / 쓰기 토큰 누적 통계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'cached_calls': 0, 'read_hits': 0,
+                       'input_tokens': 0, 'cache_read_tokens': 0, 'cache_write_tokens': 0}
+
+    def record(self, usage: Dict[str, int], cached: bool) -> None:
+        with self._lock:
+            self._stats['calls'] += 1
+            self._stats['cached_calls'] += int(cached)
+            self._stats['read_hits'] += int(usage.get('cache_read_tokens', 0) > 0)
+            for key in ('input_tokens', 'cache_read_tokens', 'cache_write_tokens'):
+                self._stats[key] += usage.get(key, 0)
+
+    def get_stats(self, enabled: Optional[bool] = None) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        prompt_tokens = stats['input_tokens'] + stats['cache_read_tokens'] + stats['cache_write_tokens']
+        # 정적 프롬프트 호출에서 캐시로 읽은 입력 토큰 비율
+        stats['cache_read_ratio'] = round(stats['cache_read_tokens'] / prompt_tokens, 4) if prompt_tokens else 0.0
+        if enabled is not None:
+            stats['enabled'] = enabled
+        return stats
@@ -0,0 +1,172 @@
+"""
+GenAI Lambda 생성 SQL 워크로드 기록
+실행한 SQL 을 값(문자열 / 숫자 / IN 목록)을 뺀 지문으로 묶어 실행 횟수 / 지연 시간 / 조회 행 수를 모음
+주기적으로 표준 출력에 SQL_WORKLOAD 한 줄(JSON)로 내보내면 scripts/genai-bench/index_advisor.py 가 모아서 인덱스 후보를 분석
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger()
+
+# 로그에서 워크로드 스냅샷 줄을 찾는 표식
+LOG_MARKER = 'SQL_WORKLOAD'
+
+# 지문별 보관하는 최근 지연 시간 수 (p50 / p95 계산용)
+_LATENCY_SAMPLES = 64
+
+_STRING_PATTERN = re.compile(r"'((?:[^'\\]|\\.|'')*)'")
+_NUMBER_PATTERN = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_IN_LIST_PATTERN = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_PARAMETER_PATTERN = re.compile(r'(?<![\w:]):([A-Za-z_]\w*)')
+
+
+def _mask_value(value: str) -> str:
+    """문자열 값 → ? (LIKE 앞뒤 와일드카드는 인덱스 사용 여부를 가르므로 유지)"""
+    prefix = '%' if value.startswith('%') else ''
+    suffix = '%' if len(value) > 1 and value.endswith('%') else ''
+    return f"'{prefix}?{suffix}'" if prefix or suffix else '?'
+
+
+def fingerprint_sql(sql: str, parameters: Optional[List[Dict[str, Any]]] = None) -> str:
+    """값을 뺀 SQL 형태 (같은 형태의 쿼리를 하나로 묶음)
+
+    Data API parameters 로 값을 넘긴 :이름 자리는 값 형태로 바꿔서 같은 모양의 생성 SQL 과 같은 지문이 되게 함
+    """
+    values = {}
+    for parameter in parameters or []:
+        value = next(iter(parameter.get('value', {}).values()), None)
+        values[parameter.get('name')] = _mask_value(value) if isinstance(value, str) else '?'
+    text = _STRING_PATTERN.sub(lambda match: _mask_value(match.group(1)), sql.strip().rstrip(';'))
+    text = _NUMBER_PATTERN.sub('?', text)
+    if values:
+        text = _PARAMETER_PATTERN.sub(lambda match: values.get(match.group(1), match.group(0)), text)
+    text = ' '.join(text.split())
+    return _IN_LIST_PATTERN.sub('IN (?)', text)
+
+
+def fingerprint_id(fingerprint: str) -> str:
+    """지문 ID (대소문자 차이는 같은 지문)"""
+    return hashlib.sha1(fingerprint.upper().encode('utf-8')).hexdigest()[:12]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class _Entry:
+    __slots__ = ('fingerprint', 'count', 'errors', 'total_ms', 'max_ms', 'rows', 'latencies', 'sources',
+                 'first_seen', 'last_seen')
+
+    def __init__(self, fingerprint: str, now: float):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.latencies: deque = deque(maxlen=_LATENCY_SAMPLES)
+        self.sources: Dict[str, int] = {}
+        self.first_seen = now
+        self.last_seen = now
+
+
+class WorkloadRecorder:
+    """지문별 실행 통계 (max_fingerprints 를 넘는 새 지문은 버리고 dropped 로 셈)
+
+    log_interval 초(0이면 내보내지 않음)마다 take_due_snapshot() 이 지난 스냅샷 이후의 통계를 반환하고 초기화
+    """
+
+    def __init__(self, max_fingerprints: int = 200, log_interval: float = 300.0,
+                 emit: Optional[Callable[[str], None]] = None):
+        self.max_fingerprints = max_fingerprints
+        self.log_interval = log_interval
+        self.emit = emit or (lambda line: (sys.stdout.write(line + '\n'), sys.stdout.flush()))
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._since = time.time()
+        self._stats = {'recorded': 0, 'dropped': 0, 'snapshots': 0}
+
+    def record(self, sql: str, elapsed_ms: float, rows: int = 0, source: Optional[str] = None,
+               error: bool = False, parameters: Optional[List[Dict[str, Any]]] = None) -> str:
+        """SQL 실행 한 번 기록 → 지문 ID"""
+        fingerprint = fingerprint_sql(sql, parameters)
+        key = fingerprint_id(fingerprint)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    self._stats['dropped'] += 1
+                    return key
+                entry = self._entries[key] = _Entry(fingerprint, now)
+            entry.count += 1
+            entry.errors += int(error)
+            entry.total_ms += elapsed_ms
+            entry.max_ms = max(entry.max_ms, elapsed_ms)
+            entry.rows += rows
+            entry.latencies.append(elapsed_ms)
+            entry.last_seen = now
+            if source:
+                entry.sources[source] = entry.sources.get(source, 0) + 1
+            self._stats['recorded'] += 1
+        return key
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """지문별 통계 (총 실행 시간 내림차순)"""
+        with self._lock:
+            entries = list(self._entries.items())
+            since = self._since
+            if reset:
+                self._entries = {}
+                self._since = time.time()
+                self._stats['snapshots'] += 1
+        fingerprints = []
+        for key, entry in entries:
+            latencies = list(entry.latencies)
+            fingerprints.append({
+                'id': key,
+                'sql': entry.fingerprint,
+                'count': entry.count,
+                'errors': entry.errors,
+                'total_ms': round(entry.total_ms, 3),
+                'avg_ms': round(entry.total_ms / entry.count, 3) if entry.count else 0.0,
+                'p50_ms': round(_percentile(latencies, 50), 3),
+                'p95_ms': round(_percentile(latencies, 95), 3),
+                'max_ms': round(entry.max_ms, 3),
+                'rows': entry.rows,
+                'sources': dict(entry.sources),
+                'first_seen': round(entry.first_seen, 3),
+                'last_seen': round(entry.last_seen, 3),
+            })
+        fingerprints.sort(key=lambda item: -item['total_ms'])
+        return {'since': round(since, 3), 'until': round(time.time(), 3), 'fingerprints': fingerprints}
+
+    def take_due_snapshot(self) -> Optional[Dict[str, Any]]:
+        """내보낼 때가 됐으면 스냅샷을 반환하고 초기화 (기록이 없거나 때가 아니면 None)"""
+        if not self.log_interval:
+            return None
+        with self._lock:
+            due = self._entries and time.time() - self._since >= self.log_interval
+        return self.snapshot(reset=True) if due else None
+
+    def emit_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """스냅샷을 LOG_MARKER 뒤 JSON 한 줄로 출력 (LOG_LEVEL 과 관계없이 CloudWatch Logs 에 남음)"""
+        try:
+            self.emit(f"{LOG_MARKER} {json.dumps(snapshot, ensure_ascii=False, separators=(',', ':'))}")
+        except Exception as e:
+            logger.warning("SQL 워크로드 출력 실패: %s", e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, fingerprints=len(self._entries), since=round(self._since, 3))
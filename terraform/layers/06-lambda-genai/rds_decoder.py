@@ -0,0 +1,148 @@
+"""
+GenAI Lambda RDS Data API 결과 디코더
+columnMetadata 로 컬럼별 값 필드를 한 번만 정하고 행 변환 함수를 컴파일해서 재사용
+formatRecordsAs='JSON' 응답(formattedRecords)과 dict / tuple(namedtuple) / 컬럼 배열 행 형식 지원
+"""
+
+import json
+import threading
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROW_FORMATS = ('dict', 'tuple', 'columns')
+
+# Data API typeName → 값이 들어 있는 필드 (MySQL 기준, DECIMAL/DATE/TIME 은 문자열로 전달됨)
+_TYPE_FIELDS = {
+    'BIGINT': 'longValue', 'BIGINT UNSIGNED': 'longValue', 'INT': 'longValue', 'INT UNSIGNED': 'longValue',
+    'INTEGER': 'longValue', 'INTEGER UNSIGNED': 'longValue', 'MEDIUMINT': 'longValue', 'MEDIUMINT UNSIGNED': 'longValue',
+    'SMALLINT': 'longValue', 'SMALLINT UNSIGNED': 'longValue', 'TINYINT': 'longValue', 'TINYINT UNSIGNED': 'longValue',
+    'YEAR': 'longValue',
+    'DOUBLE': 'doubleValue', 'FLOAT': 'doubleValue', 'REAL': 'doubleValue',
+    'BIT': 'booleanValue', 'BOOL': 'booleanValue', 'BOOLEAN': 'booleanValue',
+    'BLOB': 'blobValue', 'BINARY': 'blobValue', 'VARBINARY': 'blobValue',
+}
+
+# 필드를 알 수 없을 때 확인하는 순서 (기존 execute_sql 파싱 순서와 동일)
+_FALLBACK_FIELDS = ('stringValue', 'longValue', 'doubleValue', 'booleanValue')
+
+# 컬럼 구성별로 컴파일한 행 변환 함수 캐시 (같은 질문 형태는 같은 컬럼 구성을 반복)
+_MAX_CACHED_DECODERS = 64
+_decoder_cache: Dict[Tuple, 'RowDecoder'] = {}
+_cache_lock = threading.Lock()
+
+
+def decode_value(value: Dict[str, Any]) -> Any:
+    """필드 종류를 모르는 값 하나 변환 (NULL → None, 알 수 없는 형식 → 문자열)"""
+    for field in _FALLBACK_FIELDS:
+        if field in value:
+            return value[field]
+    if value.get('isNull'):
+        return None
+    return str(value)
+
+
+def column_fields(column_metadata: List[Dict[str, Any]]) -> List[str]:
+    """컬럼 메타데이터로 컬럼별 값 필드 목록 생성"""
+    return [_TYPE_FIELDS.get(str(column.get('typeName', '')).upper(), 'stringValue') for column in column_metadata]
+
+
+def column_names(column_metadata: List[Dict[str, Any]], width: int = 0) -> List[str]:
+    """컬럼 이름 목록 (메타데이터보다 값이 많으면 col_{i} 이름 사용)"""
+    names = [column['name'] for column in column_metadata]
+    names.extend(f'col_{i}' for i in range(len(names), width))
+    return names
+
+
+class RowDecoder:
+    """컬럼 구성 하나에 대한 행 변환 함수 묶음
+
+    셀마다 if/elif 로 필드를 찾는 대신 컬럼별 필드를 미리 정해서
+    `r[i]['longValue'] if 'longValue' in r[i] else decode_value(r[i])` 형태의 함수를 한 번 컴파일
+    """
+
+    __slots__ = ('names', 'fields', 'row_type', 'to_dict', 'to_tuple')
+
+    def __init__(self, names: List[str], fields: List[str]):
+        self.names = names
+        self.fields = fields
+        self.row_type = namedtuple('Row', names, rename=True)
+        cells = [f"(r[{i}][{field!r}] if {field!r} in r[{i}] else _decode(r[{i}]))" for i, field in enumerate(fields)]
+        namespace = {'_decode': decode_value, '_new': tuple.__new__, '_Row': self.row_type}
+        source = (
+            "def to_dict(r):\n"
+            f"    return {{{', '.join(f'{name!r}: {cell}' for name, cell in zip(names, cells))}}}\n"
+            "def to_tuple(r):\n"
+            f"    return _new(_Row, ({''.join(cell + ', ' for cell in cells)}))\n"
+        )
+        exec(source, namespace)
+        self.to_dict: Callable[[List[Dict[str, Any]]], Dict[str, Any]] = namespace['to_dict']
+        self.to_tuple: Callable[[List[Dict[str, Any]]], Tuple] = namespace['to_tuple']
+
+    def decode(self, records: List[List[Dict[str, Any]]], row_format: str):
+        if row_format == 'dict':
+            return list(map(self.to_dict, records))
+        if row_format == 'tuple':
+            return list(map(self.to_tuple, records))
+        return {
+            name: [(r[i][field] if field in r[i] else decode_value(r[i])) for r in records]
+            for i, (name, field) in enumerate(zip(self.names, self.fields))
+        }
+
+
+def get_row_decoder(column_metadata: List[Dict[str, Any]], width: Optional[int] = None) -> RowDecoder:
+    """컬럼 구성에 맞는 행 변환 함수 (캐시 재사용)"""
+    width = len(column_metadata) if width is None else width
+    names = column_names(column_metadata, width)
+    fields = column_fields(column_metadata)
+    fields.extend('stringValue' for _ in range(len(fields), width))
+    key = tuple(zip(names, fields))
+
+    decoder = _decoder_cache.get(key)
+    if decoder is None:
+        decoder = RowDecoder(names, fields)
+        with _cache_lock:
+            if len(_decoder_cache) >= _MAX_CACHED_DECODERS:
+                _decoder_cache.pop(next(iter(_decoder_cache)))
+            _decoder_cache[key] = decoder
+    return decoder
+
+
+def decode_records(column_metadata: List[Dict[str, Any]], records: List[List[Dict[str, Any]]],
+                   row_format: str = 'dict'):
+    """records(typed 값 목록) 변환
+
+    row_format:
+      - dict: 행마다 {컬럼: 값} (기존 execute_sql 반환 형식)
+      - tuple: 행마다 namedtuple (row.first_name / row[0])
+      - columns: {컬럼: [값, ...]} 컬럼 배열
+    """
+    if row_format not in ROW_FORMATS:
+        raise ValueError(f"지원하지 않는 행 형식: {row_format}")
+    width = len(column_metadata)
+    if any(len(record) != width for record in records):
+        # 메타데이터와 값 개수가 다른 응답은 부족한 값을 NULL 로 채워서 변환
+        width = max(len(record) for record in records)
+        records = [record + [{'isNull': True}] * (width - len(record)) for record in records]
+    return get_row_decoder(column_metadata, width).decode(records, row_format)
+
+
+def decode_json_records(formatted_records: str, column_metadata: Optional[List[Dict[str, Any]]] = None,
+                        row_format: str = 'dict'):
+    """formatRecordsAs='JSON' 응답의 formattedRecords 변환 (값은 이미 JSON 타입)"""
+    if row_format not in ROW_FORMATS:
+        raise ValueError(f"지원하지 않는 행 형식: {row_format}")
+    rows = json.loads(formatted_records or '[]')
+    if row_format == 'dict':
+        return rows
+    names = column_names(column_metadata) if column_metadata else (list(rows[0].keys()) if rows else [])
+    if row_format == 'columns':
+        return {name: [row.get(name) for row in rows] for name in names}
+    row_type = namedtuple('Row', names, rename=True)
+    return [row_type._make(row.get(name) for name in names) for row in rows]
+
+
+def decode_response(response: Dict[str, Any], row_format: str = 'dict'):
+    """execute_statement 응답 전체 변환 (JSON / typed 응답 자동 판별)"""
+    if 'formattedRecords' in response:
+        return decode_json_records(response['formattedRecords'], response.get('columnMetadata'), row_format)
+    return decode_records(response.get('columnMetadata', []), response.get('records', []), row_format)
@@ -0,0 +1,125 @@
+"""
+GenAI Lambda SQL 결과 페이지 조회
+SELECT 문에 LIMIT/OFFSET 을 붙여 페이지 단위로 실행하고 행/바이트 예산을 채우면 더 조회하지 않음
+RDS Data API 응답 크기 제한(1MB) 오류는 페이지 크기를 줄여 다시 시도하고, 그래도 안 되면 받은 결과까지만 반환
+"""
+
+import logging
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger()
+
+# 문장 끝의 LIMIT n / LIMIT n OFFSET m / LIMIT m, n
+_TRAILING_LIMIT_PATTERN = re.compile(
+    r'\s+LIMIT\s+(\d+)(?:\s*,\s*(\d+)|\s+OFFSET\s+(\d+))?\s*$',
+    re.IGNORECASE
+)
+_SELECT_PATTERN = re.compile(r'\s*\(?\s*(?:SELECT|WITH)\b', re.IGNORECASE)
+
+
+def is_response_size_error(error: Exception) -> bool:
+    """Data API 응답 크기 제한 초과 오류 여부"""
+    message = str(error).lower()
+    return 'response size' in message or 'size limit' in message
+
+
+def split_limit(sql: str) -> Tuple[str, Optional[int], int]:
+    """SQL 끝의 LIMIT 절 분리 → (LIMIT 없는 SQL, 원래 LIMIT, 원래 OFFSET)"""
+    body = sql.strip().rstrip(';').rstrip()
+    match = _TRAILING_LIMIT_PATTERN.search(body)
+    if not match:
+        return body, None, 0
+    if match.group(2) is not None:
+        # MySQL LIMIT offset, count 형식
+        offset, limit = int(match.group(1)), int(match.group(2))
+    else:
+        limit, offset = int(match.group(1)), int(match.group(3) or 0)
+    return body[:match.start()], limit, offset
+
+
+def is_pageable(sql: str) -> bool:
+    """LIMIT/OFFSET 을 붙일 수 있는 조회 문(SELECT / WITH)인지 확인"""
+    return _SELECT_PATTERN.match(sql) is not None
+
+
+def estimate_row_bytes(row: Any) -> int:
+    """행 하나의 대략적인 크기 (값 문자열 길이 합)"""
+    values = row.values() if isinstance(row, dict) else row
+    return sum(len(str(value)) for value in values if value is not None) + 2 * len(values)
+
+
+class ResultPager:
+    """페이지 단위 SQL 조회기 (fetch_page(sql) → 행 목록)"""
+
+    def __init__(self, fetch_page: Callable[[str], List[Any]], page_size: int = 100,
+                 max_rows: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.fetch_page = fetch_page
+        self.page_size = max(1, page_size)
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.stats: Dict[str, Any] = {'pages': 0, 'rows': 0, 'bytes': 0, 'truncated': None, 'size_limit_retries': 0}
+
+    def iter_rows(self, sql: str) -> Iterator[Any]:
+        """예산을 채우거나 결과가 끝날 때까지 페이지를 이어서 조회하며 행 반환"""
+        if not is_pageable(sql):
+            rows = self.fetch_page(sql)
+            self.stats['pages'] += 1
+            yield from self._within_budget(rows)
+            return
+
+        base_sql, limit, offset = split_limit(sql)
+        page_size = self.page_size
+        fetched = 0
+        while True:
+            remaining = None if limit is None else limit - fetched
+            if remaining is not None and remaining <= 0:
+                return
+            size = page_size if remaining is None else min(page_size, remaining)
+            if self.max_rows is not None:
+                # 예산을 넘는 마지막 행 하나까지 조회해서 잘림 여부 판단
+                size = min(size, self.max_rows - self.stats['rows'] + 1)
+
+            page_sql = f"{base_sql} LIMIT {size} OFFSET {offset + fetched}"
+            try:
+                rows = self.fetch_page(page_sql)
+            except Exception as e:
+                if not is_response_size_error(e):
+                    raise
+                self.stats['size_limit_retries'] += 1
+                if size > 1:
+                    # 응답 크기 제한 초과 - 페이지를 줄여서 같은 위치부터 다시 조회
+                    page_size = max(1, size // 2)
+                    logger.warning("Data API 응답 크기 제한 초과, 페이지 크기 %s → %s", size, page_size)
+                    continue
+                logger.warning("Data API 응답 크기 제한 초과 (행 1개), 조회한 결과까지만 반환")
+                self.stats['truncated'] = 'response_size_limit'
+                return
+
+            self.stats['pages'] += 1
+            for row in rows:
+                if not self._consume(row):
+                    return
+                yield row
+            fetched += len(rows)
+            if len(rows) < size:
+                return
+
+    def _within_budget(self, rows: List[Any]) -> Iterator[Any]:
+        for row in rows:
+            if not self._consume(row):
+                return
+            yield row
+
+    def _consume(self, row: Any) -> bool:
+        """행 하나를 예산에 반영 (예산을 넘으면 False)"""
+        if self.max_rows is not None and self.stats['rows'] >= self.max_rows:
+            self.stats['truncated'] = 'max_rows'
+            return False
+        row_bytes = estimate_row_bytes(row)
+        if self.max_bytes is not None and self.stats['bytes'] + row_bytes > self.max_bytes and self.stats['rows']:
+            self.stats['truncated'] = 'max_bytes'
+            return False
+        self.stats['rows'] += 1
+        self.stats['bytes'] += row_bytes
+        return True
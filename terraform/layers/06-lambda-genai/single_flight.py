@@ -0,0 +1,198 @@
+"""
+GenAI Lambda 동시 중복 질문 합치기 (single-flight)
+정규화한 질문이 같은 요청이 동시에 들어오면 먼저 온 요청(leader)만 파이프라인을 실행하고
+나머지(follower)는 그 실행이 끝나기를 기다렸다가 같은 결과(또는 같은 예외)를 받음
+스트리밍(stream)은 leader 가 만든 이벤트를 follower 가 처음부터 다시 받고 이후 이벤트는 만들어지는 대로 받음
+한 프로세스가 여러 요청을 동시에 처리할 때(서버 모드, 배치 스레드) 인기 질문의 Bedrock / Data API 호출을 한 번으로 줄임
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+logger = logging.getLogger()
+
+
+class SingleFlightTimeout(TimeoutError):
+    """follower 가 timeout 안에 leader 결과를 받지 못함"""
+
+
+class SingleFlightAbandoned(RuntimeError):
+    """leader 가 스트림을 끝까지 받지 않고 닫음 (연결 끊김 등) - follower 는 남은 이벤트를 받을 수 없음"""
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'started', 'followers')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.started = time.monotonic()
+        self.followers = 0
+
+
+class _Stream:
+    __slots__ = ('changed', 'events', 'finished', 'error', 'started', 'followers')
+
+    def __init__(self):
+        self.changed = threading.Condition()
+        self.events: List[Any] = []
+        self.finished = False
+        self.error: BaseException = None
+        self.started = time.monotonic()
+        self.followers = 0
+
+
+class SingleFlight:
+    """키별 진행 중인 실행 하나에 동시 호출을 합침
+
+    timeout: follower 가 기다리는 최대 시간 (초), 실행이 이 시간보다 오래 걸리고 있으면 새 호출은 합치지 않고 따로 실행
+      스트리밍 follower 는 다음 이벤트를 기다리는 최대 시간
+    """
+
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, _Stream] = {}
+        self._stats = {'calls': 0, 'executions': 0, 'coalesced': 0, 'shared_errors': 0, 'timeouts': 0,
+                       'expired': 0, 'max_followers': 0, 'wait_ms': 0.0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(결과, 다른 호출의 결과를 받았는지) - leader 예외는 follower 에도 그대로 전달"""
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None and time.monotonic() - call.started >= self.timeout:
+                # 오래 걸리는 실행에는 더 합치지 않음 (멈춘 실행 하나에 요청이 계속 묶이지 않도록)
+                self._stats['expired'] += 1
+                call = None
+                leader = False
+            elif call is not None:
+                call.followers += 1
+                self._stats['max_followers'] = max(self._stats['max_followers'], call.followers)
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if call is None:
+            with self._lock:
+                self._stats['executions'] += 1
+            return fn(), False
+        if leader:
+            return self._lead(key, call, fn), False
+        return self._follow(call), True
+
+    def _lead(self, key: str, call: _Call, fn: Callable[[], Any]) -> Any:
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._stats['executions'] += 1
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def _follow(self, call: _Call) -> Any:
+        started = time.monotonic()
+        remaining = max(0.0, self.timeout - (started - call.started))
+        finished = call.done.wait(remaining)
+        with self._lock:
+            self._stats['wait_ms'] += (time.monotonic() - started) * 1000
+            if not finished:
+                self._stats['timeouts'] += 1
+            elif call.error is not None:
+                self._stats['shared_errors'] += 1
+            else:
+                self._stats['coalesced'] += 1
+        if not finished:
+            raise SingleFlightTimeout(f"진행 중인 같은 질문 처리를 {self.timeout:g}초 안에 받지 못했습니다")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stream(self, key: str, fn: Callable[[], Iterator[Any]]) -> Tuple[Iterator[Any], bool]:
+        """스트리밍 버전 - (이벤트 iterator, 다른 호출의 이벤트를 받는지)
+
+        follower iterator 는 leader 예외를 그대로, leader 가 도중에 닫으면 SingleFlightAbandoned,
+        다음 이벤트가 timeout 안에 오지 않으면 SingleFlightTimeout 을 발생
+        """
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._streams.get(key)
+            if call is not None and time.monotonic() - call.started >= self.timeout:
+                self._stats['expired'] += 1
+                self._stats['executions'] += 1
+                return fn(), False
+            if call is not None:
+                call.followers += 1
+                self._stats['max_followers'] = max(self._stats['max_followers'], call.followers)
+                return self._follow_stream(call), True
+            call = self._streams[key] = _Stream()
+        return self._lead_stream(key, call, fn), False
+
+    def _lead_stream(self, key: str, call: _Stream, fn: Callable[[], Iterator[Any]]) -> Iterator[Any]:
+        try:
+            for event in fn():
+                with call.changed:
+                    call.events.append(event)
+                    call.changed.notify_all()
+                yield event
+        except GeneratorExit:
+            call.error = SingleFlightAbandoned("앞선 같은 질문 요청이 스트림을 끝까지 받지 않았습니다")
+            raise
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._stats['executions'] += 1
+                if self._streams.get(key) is call:
+                    del self._streams[key]
+            with call.changed:
+                call.finished = True
+                call.changed.notify_all()
+
+    def _follow_stream(self, call: _Stream) -> Iterator[Any]:
+        sent = 0
+        waited = 0.0
+        try:
+            while True:
+                with call.changed:
+                    started = time.monotonic()
+                    if sent >= len(call.events) and not call.finished:
+                        call.changed.wait_for(lambda: sent < len(call.events) or call.finished, self.timeout)
+                    waited += time.monotonic() - started
+                    events = call.events[sent:]
+                    finished = call.finished
+                if not events and not finished:
+                    with self._lock:
+                        self._stats['timeouts'] += 1
+                    raise SingleFlightTimeout(f"진행 중인 같은 질문의 다음 이벤트를 {self.timeout:g}초 안에 받지 못했습니다")
+                sent += len(events)
+                yield from events
+                if finished:
+                    break
+        finally:
+            with self._lock:
+                self._stats['wait_ms'] += waited * 1000
+        with self._lock:
+            if call.error is not None:
+                self._stats['shared_errors'] += 1
+            else:
+                self._stats['coalesced'] += 1
+        if call.error is not None:
+            raise call.error
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats, in_flight=len(self._calls) + len(self._streams))
+        stats['wait_ms'] = round(stats['wait_ms'], 3)
+        return dict(stats, timeout=self.timeout)
@@ -0,0 +1,150 @@
+"""
+GenAI Lambda 추측 실행(speculative execution)
+질문 유형 분류와 일반 상담 답변 생성을 스레드 풀에서 동시에 시작하고
+분류 결과가 일반 상담이면 미리 만든 답변을 사용, 아니면 폐기
+절약한 지연 시간과 버린 토큰을 함께 기록해서 트래픽 구성별 손익을 판단
+이미 시작된 Bedrock 호출은 폐기해도 끝까지 실행되고 토큰 비용이 그대로 청구되며 worker 도 계속 차지함
+→ 아직 끝나지 않은 폐기 호출이 max_discarded 개 이상이면 새 요청은 추측 없이 분류만 실행
+폐기 호출은 요청이 끝난 뒤 완료될 수 있으므로 낭비 토큰은 take_unreported() 로 가져간 호출의 지표에 합산
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger()
+
+
+def _timed(fn: Callable[[], Any]) -> Callable[[], Tuple[Any, float]]:
+    def _run():
+        started = time.perf_counter()
+        result = fn()
+        return result, (time.perf_counter() - started) * 1000
+    return _run
+
+
+class SpeculativeExecutor:
+    """분류 + 추측 답변 동시 실행기 (컨테이너 단위 스레드 풀 재사용)
+
+    max_discarded: 폐기했지만 아직 실행 중인 추측 호출 상한 (넘으면 추측 생략)
+    """
+
+    def __init__(self, max_workers: int = 4, max_discarded: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='genai-speculative')
+        self.max_discarded = max_discarded
+        self._discarded_running = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0, 'used': 0, 'discarded': 0, 'cancelled': 0, 'rejected': 0, 'skipped': 0,
+            'latency_saved_ms': 0.0, 'wasted_model_ms': 0.0,
+            'wasted_input_tokens': 0, 'wasted_output_tokens': 0,
+            'by_type': {}
+        }
+        # 완료됐지만 아직 호출 지표(EMF)로 보고하지 않은 폐기 호출 토큰
+        self._unreported = {'input_tokens': 0, 'output_tokens': 0}
+
+    def run(self, classify: Callable[[], Dict[str, Any]],
+            speculate: Callable[[], Tuple[str, Dict[str, int]]],
+            accept: Callable[[Dict[str, Any]], bool],
+            usable: Optional[Callable[[Any], bool]] = None) -> Dict[str, Any]:
+        """classify 와 speculate 를 동시에 실행하고 accept(분류 결과)가 참이면 추측 답변 반환
+
+        speculate 는 (답변, 토큰 사용량) 을 반환해야 하며, 폐기된 경우 사용량을 낭비 토큰으로 기록
+        usable(답변)이 거짓이면(오류 안내 문구 등) 추측 답변을 쓰지 않고 answer=None 반환
+        추측 답변을 쓰면 saved_ms(순차 실행 대비 절약한 시간)도 함께 반환
+        """
+        with self._lock:
+            skip = self._discarded_running >= self.max_discarded
+        if skip:
+            analysis = classify()
+            with self._lock:
+                self._stats['skipped'] += 1
+                self._count(analysis.get('type', 'UNKNOWN'))
+            logger.info("추측 생략: 실행 중인 폐기 호출이 %d개 이상", self.max_discarded)
+            return {'analysis': analysis, 'answer': None}
+
+        # 요청 컨텍스트(현재 호출 지표 / 요청 로그 상태)를 작업 스레드로 전달
+        classify_future = self._executor.submit(contextvars.copy_context().run, _timed(classify))
+        speculative_future = self._executor.submit(contextvars.copy_context().run, _timed(speculate))
+
+        try:
+            analysis, classify_ms = classify_future.result()
+        except Exception:
+            speculative_future.cancel()
+            raise
+
+        question_type = analysis.get('type', 'UNKNOWN')
+        with self._lock:
+            self._count(question_type)
+
+        if accept(analysis):
+            (answer, _), speculative_ms = speculative_future.result()
+            if usable is not None and not usable(answer):
+                with self._lock:
+                    self._stats['rejected'] += 1
+                logger.warning("추측 답변 사용 불가 (%s), 다시 생성", question_type)
+                return {'analysis': analysis, 'answer': None}
+            # 순차 실행(분류 후 답변 생성) 대비 겹친 구간만큼 절약
+            saved_ms = min(classify_ms, speculative_ms)
+            with self._lock:
+                self._stats['used'] += 1
+                self._stats['latency_saved_ms'] += saved_ms
+            logger.info("추측 답변 사용: 분류 %.0fms / 답변 %.0fms (절약 %.0fms)",
+                        classify_ms, speculative_ms, saved_ms)
+            return {'analysis': analysis, 'answer': answer, 'saved_ms': saved_ms}
+
+        if speculative_future.cancel():
+            with self._lock:
+                self._stats['cancelled'] += 1
+            logger.info("추측 답변 취소 (%s, 시작 전)", question_type)
+        else:
+            # 이미 실행 중인 Bedrock 호출은 중단할 수 없으므로 완료 시점에 낭비 토큰 기록
+            with self._lock:
+                self._discarded_running += 1
+            speculative_future.add_done_callback(self._record_discarded)
+            logger.info("추측 답변 폐기 (%s)", question_type)
+        return {'analysis': analysis, 'answer': None}
+
+    def _count(self, question_type: str) -> None:
+        self._stats['requests'] += 1
+        self._stats['by_type'][question_type] = self._stats['by_type'].get(question_type, 0) + 1
+
+    def _record_discarded(self, future) -> None:
+        try:
+            (_, usage), speculative_ms = future.result()
+        except Exception as e:
+            logger.warning("폐기된 추측 답변 실패: %s", e)
+            usage, speculative_ms = {}, 0.0
+        with self._lock:
+            self._discarded_running -= 1
+            self._stats['discarded'] += 1
+            self._stats['wasted_model_ms'] += speculative_ms
+            for key in ('input_tokens', 'output_tokens'):
+                self._stats[f'wasted_{key}'] += (usage or {}).get(key, 0)
+                self._unreported[key] += (usage or {}).get(key, 0)
+
+    def take_unreported(self) -> Dict[str, int]:
+        """완료된 폐기 호출 중 아직 보고하지 않은 낭비 토큰을 가져가고 0으로 초기화"""
+        with self._lock:
+            unreported, self._unreported = self._unreported, {'input_tokens': 0, 'output_tokens': 0}
+        return unreported
+
+    def get_stats(self) -> Dict[str, Any]:
+        """절약한 지연 시간과 버린 토큰 통계"""
+        with self._lock:
+            stats = dict(self._stats, by_type=dict(self._stats['by_type']), discarded_running=self._discarded_running,
+                         max_discarded=self.max_discarded)
+        requests = stats['requests']
+        stats['use_rate'] = round(stats['used'] / requests, 4) if requests else 0.0
+        stats['avg_latency_saved_ms'] = round(stats['latency_saved_ms'] / stats['used'], 1) if stats['used'] else 0.0
+        wasted_tokens = stats['wasted_input_tokens'] + stats['wasted_output_tokens']
+        stats['wasted_tokens_per_saved_second'] = (
+            round(wasted_tokens / (stats['latency_saved_ms'] / 1000), 1) if stats['latency_saved_ms'] else None
+        )
+        stats['latency_saved_ms'] = round(stats['latency_saved_ms'], 1)
+        stats['wasted_model_ms'] = round(stats['wasted_model_ms'], 1)
+        return stats
+
@@ -0,0 +1,209 @@
+"""
+GenAI Lambda 구조화 로깅
+LOG_FORMAT=json 이면 한 줄 JSON 으로 출력하고, 메시지 / 스택 트레이스 길이를 제한해서 CloudWatch Logs 수집량을 줄임
+상세(DEBUG) 로그는 요청 단위로 샘플링한 요청에서만 출력하고, 나머지 요청은 버퍼에 두었다가 오류가 난 요청에서만 출력
+로그 호출은 logger.debug("... %s", 값) 형식으로 인자를 넘겨서 실제로 출력될 때만 문자열을 만듦
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# 상세 로그를 많이 남기는 라이브러리 (루트 로거를 DEBUG 로 내려도 설정 레벨 그대로 유지)
+NOISY_LOGGERS = ('boto3', 'botocore', 'urllib3')
+
+
+def truncate(text: str, max_chars: int) -> str:
+    """max_chars 보다 긴 문자열은 잘라서 원래 길이 표시 (0이면 제한 없음)"""
+    if not max_chars or len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}... (총 {len(text)}자 중 {max_chars}자)"
+
+
+class JsonFormatter(logging.Formatter):
+    """로그 레코드 → 한 줄 JSON (timestamp / level / message / request_id / logger / exception)"""
+
+    def __init__(self, max_chars: int = 2000):
+        super().__init__()
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'message': truncate(record.getMessage(), self.max_chars),
+            'request_id': getattr(record, 'request_id', None),
+            'logger': record.name,
+        }
+        if record.exc_info:
+            payload['exception'] = truncate(self.formatException(record.exc_info), self.max_chars)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TruncatingFormatter(logging.Formatter):
+    """기존 텍스트 포맷터 출력 길이 제한"""
+
+    def __init__(self, base: Optional[logging.Formatter], max_chars: int = 2000):
+        super().__init__()
+        self.base = base or logging.Formatter()
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        return truncate(self.base.format(record), self.max_chars)
+
+
+class _RequestState:
+    """요청 하나의 로그 상태 (요청 ID, 상세 로그 출력 여부, 보류 중인 상세 로그)"""
+
+    __slots__ = ('request_id', 'verbose', 'buffer')
+
+    def __init__(self, request_id: str, verbose: bool, buffer_size: int):
+        self.request_id = request_id
+        self.verbose = verbose
+        self.buffer: deque = deque(maxlen=buffer_size or None)
+
+
+class RequestLogBuffer(logging.Filter):
+    """요청 단위 상세 로그 샘플링 + 오류 시 출력 버퍼 (루트 로거 필터)
+
+    level 이상은 바로 출력, 미만은 샘플링된 요청이면 출력하고 아니면 버퍼에 보관
+    ERROR 레코드가 오거나 요청이 실패하면 버퍼를 먼저 출력하고 그 요청의 나머지 상세 로그도 출력
+    요청 상태는 contextvars 로 보관 (서버 모드에서 동시에 처리하는 요청끼리 섞이지 않음)
+    """
+
+    def __init__(self, logger: logging.Logger, level: int = logging.INFO, sample_rate: float = 0.0,
+                 buffer_size: int = 0):
+        super().__init__()
+        self.logger = logger
+        self.level = level
+        self.sample_rate = sample_rate
+        self.buffer_size = buffer_size
+        self._state: contextvars.ContextVar = contextvars.ContextVar(f'request_log_{id(self)}', default=None)
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'sampled': 0, 'flushed_requests': 0, 'flushed_records': 0,
+                       'discarded_records': 0}
+
+    @property
+    def request_id(self) -> Optional[str]:
+        state = self._state.get()
+        return state.request_id if state else None
+
+    def begin(self, request_id: str) -> None:
+        """요청 시작 - 이 요청의 버퍼를 만들고 상세 로그 출력 여부 결정"""
+        verbose = self.sample_rate > 0 and random.random() < self.sample_rate
+        self._state.set(_RequestState(request_id, verbose, self.buffer_size))
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['sampled'] += int(verbose)
+
+    def end(self, failed: bool = False) -> None:
+        """요청 종료 - 실패한 요청이면 남은 상세 로그 출력, 아니면 버린 레코드 수만 기록"""
+        if failed:
+            self.flush()
+        state = self._state.get()
+        if state is not None:
+            with self._lock:
+                self._stats['discarded_records'] += len(state.buffer)
+            self._state.set(None)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        state = self._state.get()
+        record.request_id = state.request_id if state else None
+        if state is not None and state.verbose:
+            return True
+        if record.levelno >= self.level:
+            if record.levelno >= logging.ERROR and state is not None:
+                # 오류 직전까지의 상세 로그를 먼저 출력하고 이후 로그도 모두 출력
+                self.flush()
+                state.verbose = True
+            return True
+        if self.buffer_size and state is not None:
+            with self._lock:
+                state.buffer.append(record)
+        return False
+
+    def flush(self) -> None:
+        state = self._state.get()
+        if state is None:
+            return
+        with self._lock:
+            records = list(state.buffer)
+            state.buffer.clear()
+            if not records:
+                return
+            self._stats['flushed_requests'] += 1
+            self._stats['flushed_records'] += len(records)
+        for record in records:
+            # 로거 필터를 거치지 않도록 핸들러에 직접 전달
+            for handler in self.logger.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+    def instrument_handler(self, handler: Callable) -> Callable:
+        """lambda_handler 데코레이터 - 예외나 5xx 응답이면 버퍼 출력"""
+        @functools.wraps(handler)
+        def _wrapped(event, context):
+            self.begin(getattr(context, 'aws_request_id', 'unknown'))
+            failed = True
+            deferred = False
+            try:
+                response = handler(event, context)
+                failed = isinstance(response, dict) and (response.get('statusCode') or 200) >= 500
+                if isinstance(response, dict) and isinstance(response.get('body'), Iterator):
+                    # 본문을 나눠 보내는 응답은 본문을 다 보낸 뒤 요청 종료 (본문 생성 중 예외도 실패로 처리)
+                    response['body'] = self._end_after(response['body'], failed)
+                    deferred = True
+                return response
+            finally:
+                if not deferred:
+                    self.end(failed)
+        return _wrapped
+
+    def _end_after(self, body: Iterator, failed: bool) -> Iterator:
+        completed = False
+        try:
+            yield from body
+            completed = True
+        finally:
+            self.end(failed or not completed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """샘플링 / 버퍼 설정과 통계"""
+        return dict(self._stats, level=logging.getLevelName(self.level), sample_rate=self.sample_rate,
+                    buffer_size=self.buffer_size)
+
+
+def configure_logging(logger: logging.Logger, level: str = 'INFO', log_format: str = 'text',
+                      sample_rate: float = 0.0, buffer_size: int = 0, max_chars: int = 2000) -> RequestLogBuffer:
+    """로거 포맷 / 레벨 / 요청 단위 필터 설정 → RequestLogBuffer"""
+    threshold = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+    if not isinstance(threshold, int):
+        threshold = logging.INFO
+
+    if log_format == 'json' and not logger.handlers:
+        logger.addHandler(logging.StreamHandler())
+    for handler in logger.handlers:
+        if log_format == 'json':
+            handler.setFormatter(JsonFormatter(max_chars))
+        elif max_chars and not isinstance(handler.formatter, TruncatingFormatter):
+            handler.setFormatter(TruncatingFormatter(handler.formatter, max_chars))
+
+    request_buffer = RequestLogBuffer(logger, threshold, sample_rate, buffer_size)
+    for existing in [f for f in logger.filters if isinstance(f, RequestLogBuffer)]:
+        logger.removeFilter(existing)
+    logger.addFilter(request_buffer)
+
+    # 샘플링이나 버퍼를 쓸 때만 DEBUG 레코드를 만들고, 아니면 설정 레벨 미만 로그 호출은 바로 반환
+    verbose_needed = sample_rate > 0 or buffer_size > 0
+    logger.setLevel(min(threshold, logging.DEBUG) if verbose_needed else threshold)
+    for name in NOISY_LOGGERS:
+        noisy = logging.getLogger(name)
+        if noisy.level == logging.NOTSET:
+            noisy.setLevel(threshold)
+    return request_buffer